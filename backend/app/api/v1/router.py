@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.routes import auth, dashboard, users, inventory, roles, permissions, project
+from app.api.v1.routes import auth, dashboard, users, inventory, roles, permissions, project, monitoring
 
 api_router = APIRouter()
 
@@ -11,3 +11,4 @@ api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventor
 api_router.include_router(roles.router, prefix="/roles", tags=["Roles"])
 api_router.include_router(permissions.router, prefix="/permissions", tags=["Permissions"])
 api_router.include_router(project.router, prefix="/projects", tags=["Projects"])
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["Monitoring"])
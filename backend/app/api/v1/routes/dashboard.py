@@ -9,7 +9,6 @@ from app.repositories.inventory import (
     MaterialRepository,
     StockInRepository,
     StockOutRepository,
-    NotificationRepository,
     MandorRepository
 )
 from app.services.inventory.stock_service import StockService
@@ -36,7 +35,6 @@ async def get_dashboard_stats(
         mandor_repo = MandorRepository(db)
         stock_in_repo = StockInRepository(db)
         stock_out_repo = StockOutRepository(db)
-        notification_repo = NotificationRepository(db)
         stock_service = StockService(db)
         notification_service = NotificationService(db)
         
@@ -53,12 +51,13 @@ async def get_dashboard_stats(
         total_mandors = mandor_repo.count(filters={"is_active": 1})
         
         # Total stock masuk bulan ini
-        stock_ins_month = stock_in_repo.get_by_date_range(month_start, month_end, skip=0, limit=10000)
-        total_stock_in_month = sum(si.quantity for si in stock_ins_month if si.is_deleted == 0)
+        # Stream tanpa batas row (sebelumnya terpotong di 10000 row)
+        stock_ins_month = stock_in_repo.query_by_date_range(month_start, month_end)
+        total_stock_in_month = sum(si.quantity for si in stock_in_repo.iter_all(stock_ins_month))
         
         # Total stock keluar bulan ini
-        stock_outs_month = stock_out_repo.get_by_date_range(month_start, month_end, skip=0, limit=10000)
-        total_stock_out_month = sum(so.quantity for so in stock_outs_month if so.is_deleted == 0)
+        stock_outs_month = stock_out_repo.query_by_date_range(month_start, month_end)
+        total_stock_out_month = sum(so.quantity for so in stock_out_repo.iter_all(stock_outs_month))
         
         # Total stock saat ini (dari semua materials)
         stock_balance = stock_service.get_stock_balance()
@@ -68,7 +67,7 @@ async def get_dashboard_stats(
             total_stock_current = stock_balance.get("stock_saat_ini", 0) if stock_balance else 0
         
         # Notifications belum dibaca
-        unread_notifications = notification_repo.count(filters={"is_read": False})
+        unread_notifications = notification_service.get_unread_count()
         
         # Jumlah discrepancies yang aktif (selisih_aktual > 0)
         discrepancies = notification_service.check_discrepancy()
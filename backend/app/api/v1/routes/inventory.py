@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, UploadFile, File, Form, status, Response, HTTPException
+from fastapi import APIRouter, Depends, Path, Query, Request, UploadFile, File, Form, status, Response, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import date, datetime
@@ -17,8 +17,22 @@ from app.services.inventory import (
 from app.services.inventory.surat_permintaan_service import SuratPermintaanService
 from app.services.inventory.surat_jalan_service import SuratJalanService
 from app.services.inventory.audit_log_service import AuditLogService, ActionType
-from app.utils.excel_importer import parse_excel_file, validate_material_row
-from app.utils.excel_template import create_material_import_template
+from app.services.inventory.autocomplete_service import AutocompleteService
+from app.services.inventory.reference_data_service import (
+    ReferenceDataService, REFERENCE_ALL, REFERENCE_KATEGORIS, REFERENCE_SATUANS
+)
+from app.services.inventory.import_job_service import (
+    ImportJobService,
+    IMPORT_JOB_MATERIALS,
+    IMPORT_JOB_STOCK_IN,
+    IMPORT_JOB_STOCK_OUT,
+)
+from app.utils.excel_importer import iter_import_rows, SUPPORTED_IMPORT_EXTENSIONS, MATERIAL_IMPORT_HEADERS
+from app.utils.excel_template import (
+    create_material_import_template,
+    create_stock_in_import_template,
+    create_stock_out_import_template,
+)
 from app.schemas.inventory.request import (
     MaterialCreateRequest,
     MaterialUpdateRequest,
@@ -52,10 +66,24 @@ from app.schemas.inventory.response import (
     DiscrepancyResponse,
     NotificationResponse,
 )
-from app.utils.response import success_response, paginated_response, error_response
+from app.utils.response import success_response, paginated_response, error_response, cursor_paginated_response, etag_response
+from app.utils.pagination import (
+    PAGINATION_OFFSET, PAGINATION_CURSOR, PAGINATION_MODE_PATTERN, decode_cursor, paginate_keyset
+)
+from app.utils.text_search import SEARCH_CONTAINS, SEARCH_MODE_PATTERN, text_search, text_search_ids
 from app.utils.file_upload import save_uploaded_files, get_evidence_paths_from_db
 from app.utils.excel_exporter import create_excel_export
+from app.utils.stream_exporter import (
+    EXPORT_CSV,
+    EXPORT_AUDIT_LOGS,
+    EXPORT_FORMAT_PATTERN,
+    EXPORT_MEDIA_TYPES,
+    EXPORT_TABLE_PATTERN,
+    build_export_query,
+    stream_export,
+)
 from app.core.exceptions import ForbiddenError, NotFoundError, ValidationError
+from app.core.metrics import track_job
 from app.utils.helpers import sanitize_dict
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import json
@@ -72,6 +100,55 @@ def check_role_permission(user: User, allowed_roles: List[UserRole]):
         raise ForbiddenError(f"Hanya {', '.join([r.value for r in allowed_roles])} yang dapat mengakses endpoint ini")
 
 
+async def _submit_import_job(
+    job_type: str,
+    file: UploadFile,
+    all_or_nothing: bool,
+    db: Session,
+    current_user: User,
+    project_id: int
+):
+    """Validasi file upload lalu buat import job di background (response 202 berisi job id)"""
+    if not file.filename.lower().endswith(SUPPORTED_IMPORT_EXTENSIONS):
+        return success_response(
+            data=None,
+            message="Format file tidak valid. Hanya file .xlsx atau .csv yang diperbolehkan",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    
+    file_content = await file.read()
+    if len(file_content) > 10 * 1024 * 1024:  # 10MB
+        return success_response(
+            data=None,
+            message="Ukuran file terlalu besar. Maksimal 10MB",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    
+    job = ImportJobService(db).submit(
+        job_type,
+        file_name=file.filename,
+        file_content=file_content,
+        project_id=project_id,
+        user_id=current_user.id,
+        options={'all_or_nothing': all_or_nothing}
+    )
+    return success_response(
+        data=ImportJobService.to_dict(job),
+        message="File diterima, import sedang diproses",
+        status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+def _xlsx_response(content: bytes, filename: str) -> Response:
+    return Response(
+        content=content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
 # ========== MATERIAL ROUTES ==========
 @router.get(
     "/materials",
@@ -84,6 +161,8 @@ async def get_materials(
     page: int = Query(1, ge=1),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    include_deletable: bool = Query(False, description="Tambahkan flag deletable (material tidak dipakai di transaksi manapun)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
@@ -95,13 +174,22 @@ async def get_materials(
     material_service = MaterialService(db)
     
     if search:
-        materials = material_service.search_by_name(search, skip=skip, limit=limit, project_id=project_id)
+        materials = material_service.search_by_name_or_code(
+            search, skip=skip, limit=limit, project_id=project_id, mode=search_mode
+        )
         total = len(materials)
     else:
         materials, total = material_service.get_all(skip=skip, limit=limit, project_id=project_id)
     
+    data = [MaterialResponse.model_validate(m).model_dump(mode="json") for m in materials]
+    if include_deletable:
+        # Satu query pemakaian untuk seluruh halaman
+        deletable = material_service.get_deletable_flags(m.id for m in materials)
+        for item in data:
+            item["deletable"] = deletable[item["id"]]
+    
     return paginated_response(
-        data=[MaterialResponse.model_validate(m).model_dump(mode="json") for m in materials],
+        data=data,
         total=total,
         page=page,
         limit=limit,
@@ -142,18 +230,19 @@ async def get_material(
     tags=["Materials"]
 )
 async def get_unique_satuans(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
-    """Get unique satuan values from all active materials"""
+    """Get unique satuan values from active materials di project aktif (cache + ETag)"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
     
-    material_service = MaterialService(db)
-    satuans = material_service.get_unique_satuans()
-    
-    return success_response(
-        data=satuans,
+    reference = ReferenceDataService(db).get(project_id, REFERENCE_SATUANS)
+    return etag_response(
+        request,
+        data=reference["data"],
+        etag=reference["etag"],
         message="Daftar satuan berhasil diambil"
     )
 
@@ -166,22 +255,49 @@ async def get_unique_satuans(
     tags=["Materials"]
 )
 async def get_unique_kategoris(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
-    """Get unique kategori values from all active materials"""
+    """Get unique kategori values from active materials di project aktif (cache + ETag)"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
     
-    material_service = MaterialService(db)
-    kategoris = material_service.get_unique_kategoris()
-    
-    return success_response(
-        data=kategoris,
+    reference = ReferenceDataService(db).get(project_id, REFERENCE_KATEGORIS)
+    return etag_response(
+        request,
+        data=reference["data"],
+        etag=reference["etag"],
         message="Daftar kategori berhasil diambil"
     )
 
 
+@router.get(
+    "/reference-data",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Get reference data untuk form",
+    description="Satuan, kategori, kategori valid dan konfigurasi pages dalam satu request (cache + ETag/304)",
+    tags=["Materials"]
+)
+async def get_reference_data(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Bootstrap data form material/stock: satuans, kategoris, valid_kategoris, pages"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    reference = ReferenceDataService(db).get(project_id, REFERENCE_ALL)
+    return etag_response(
+        request,
+        data=reference["data"],
+        etag=reference["etag"],
+        message="Reference data berhasil diambil"
+    )
+
+
 @router.put(
     "/materials/{material_id}",
     response_model=None,
@@ -334,22 +450,24 @@ async def create_material(
 )
 async def bulk_import_materials(
     file: UploadFile = File(...),
+    all_or_nothing: bool = Form(False, description="Jika true, import dibatalkan seluruhnya bila ada row yang gagal"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """
-    Bulk import materials dari file Excel (.xlsx)
-    Format Excel: Header di row 1, data mulai dari row 2
+    Bulk import materials dari file Excel (.xlsx) atau CSV (.csv)
+    Format: Header di row 1, data mulai dari row 2
     Kolom: NO, NAMA BARANG, KODE BARANG, SATUAN, KATEGORI, HARGA
+    Semua row valid disimpan dalam satu transaksi; all_or_nothing=true membatalkan seluruh import jika ada error
     """
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
     
     # Validasi file type
-    if not file.filename.endswith('.xlsx'):
+    if not file.filename.lower().endswith(SUPPORTED_IMPORT_EXTENSIONS):
         return success_response(
             data=None,
-            message="Format file tidak valid. Hanya file .xlsx yang diperbolehkan",
+            message="Format file tidak valid. Hanya file .xlsx atau .csv yang diperbolehkan",
             status_code=status.HTTP_400_BAD_REQUEST
         )
     
@@ -363,128 +481,43 @@ async def bulk_import_materials(
         )
     
     try:
-        # Expected headers sesuai dengan format Excel
-        expected_headers = ["NO", "NAMA BARANG", "KODE BARANG", "SATUAN", "KATEGORI", "HARGA"]
-        
-        # Parse Excel file
-        rows_data, parse_errors = parse_excel_file(
-            file_content=file_content,
-            expected_headers=expected_headers,
-            start_row=2,  # Data mulai dari row 2 (row 1 adalah header)
-            skip_empty_rows=True
+        # Parse file secara streaming, setiap row langsung divalidasi lalu row valid disimpan
+        rows_iter = iter_import_rows(
+            file_content,
+            file.filename,
+            expected_headers=MATERIAL_IMPORT_HEADERS,
+            start_row=2  # Data mulai dari row 2 (row 1 adalah header)
         )
         
-        if parse_errors:
-            return success_response(
-                data={
-                    'success_count': 0,
-                    'failed_count': len(rows_data),
-                    'errors': parse_errors
-                },
-                message="Gagal membaca file Excel",
-                status_code=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if not rows_data:
+        material_service = MaterialService(db)
+        try:
+            with track_job("import"):
+                report = material_service.import_rows(rows_iter, project_id=project_id, all_or_nothing=all_or_nothing)
+        except ValidationError as e:
             return success_response(
                 data={
                     'success_count': 0,
                     'failed_count': 0,
-                    'errors': []
+                    'errors': [e.detail]
                 },
-                message="File Excel tidak memiliki data",
+                message="Gagal membaca file",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validasi setiap row
-        material_service = MaterialService(db)
-        valid_kategoris = material_service.get_valid_kategoris()
-        
-        validated_rows = []
-        validation_errors = []
-        
-        for row in rows_data:
-            is_valid, error_msg = validate_material_row(row, valid_kategoris)
-            if is_valid:
-                validated_rows.append(row)
-            else:
-                validation_errors.append(error_msg)
-        
-        # Jika semua row tidak valid
-        if not validated_rows:
+        message = material_service.import_message(report)
+        # File kosong, semua row tidak valid, atau dibatalkan all-or-nothing sebelum insert
+        if not material_service.import_was_attempted(report):
             return success_response(
-                data={
-                    'success_count': 0,
-                    'validation_failed_count': len(rows_data),
-                    'processing_failed_count': 0,
-                    'validation_errors': validation_errors,
-                    'processing_errors': [],
-                    'errors': validation_errors  # Backward compatibility
-                },
-                message="Tidak ada data yang valid",
+                data=report,
+                message=message,
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
-        # Bulk create materials
-        logger.info(f"Bulk import: {len(validated_rows)} rows validated, {len(validation_errors)} validation errors")
-        result = material_service.bulk_create(validated_rows, project_id=project_id)
-        logger.info(f"Bulk import result: {result['success_count']} sukses, {result['failed_count']} gagal, {len(result['errors'])} errors")
-        
-        # Pisahkan validation errors dan processing errors
-        validation_failed_count = len(validation_errors)
-        processing_failed_count = result.get('failed_count', 0)
-        processing_errors = result.get('errors', [])
-        
-        # Gabungkan semua errors untuk backward compatibility
-        all_errors = validation_errors + processing_errors
-        
-        # Log semua errors untuk debugging
-        if all_errors:
-            logger.warning(f"Bulk import errors: {all_errors}")
-        
-        # Audit log
-        audit_service = AuditLogService(db)
-        total_failed = validation_failed_count + processing_failed_count
-        audit_service.create_log(
-            user_id=current_user.id,
-            action=ActionType.CREATE,
-            table_name="materials",
-            record_id=0,  # Bulk operation, tidak punya single record_id
-            new_values={"bulk_import": True, "file_name": file.filename},
-            description=f"Bulk import materials: {result['success_count']} sukses, {total_failed} gagal (validasi: {validation_failed_count}, proses: {processing_failed_count})"
-        )
-        
-        # Prepare response dengan struktur baru
-        response_data = {
-            'success_count': result['success_count'],
-            'validation_failed_count': validation_failed_count,
-            'processing_failed_count': processing_failed_count,
-            'validation_errors': validation_errors,
-            'processing_errors': processing_errors,
-            'errors': all_errors  # Backward compatibility
-        }
-        
-        # Prepare response message - fokus pada data yang berhasil masuk
-        if result['success_count'] > 0:
-            if validation_failed_count > 0 or processing_failed_count > 0:
-                message = f"Berhasil mengimpor {result['success_count']} material"
-                if validation_failed_count > 0:
-                    message += f", {validation_failed_count} data tidak valid (tidak masuk database)"
-                if processing_failed_count > 0:
-                    message += f", {processing_failed_count} data gagal saat insert"
-            else:
-                message = f"Berhasil mengimpor {result['success_count']} material"
-        else:
-            # Tidak ada yang berhasil
-            if validation_failed_count > 0:
-                message = f"Gagal mengimpor: {validation_failed_count} data tidak valid"
-            elif processing_failed_count > 0:
-                message = f"Gagal mengimpor: {processing_failed_count} data gagal saat insert"
-            else:
-                message = "Gagal mengimpor material"
+        logger.info(f"Bulk import result: {report['success_count']} sukses, {report['failed_count']} gagal")
+        material_service.record_import_audit(current_user.id, file.filename, report)
         
         return success_response(
-            data=response_data,
+            data=report,
             message=message,
             status_code=status.HTTP_200_OK
         )
@@ -506,6 +539,29 @@ async def bulk_import_materials(
         )
 
 
+@router.post(
+    "/materials/bulk-import/jobs",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Bulk import materials from Excel in background",
+    tags=["Materials"]
+)
+async def create_material_import_job(
+    file: UploadFile = File(...),
+    all_or_nothing: bool = Form(False, description="Jika true, import dibatalkan seluruhnya bila ada row yang gagal"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Bulk import materials di background (format file sama dengan /materials/bulk-import)
+    Response langsung berisi job id; progress, error per row dan laporan akhir di-poll lewat GET /import-jobs/{job_id}
+    """
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    return await _submit_import_job(IMPORT_JOB_MATERIALS, file, all_or_nothing, db, current_user, project_id)
+
+
 @router.get(
     "/materials-template",
     response_model=None,
@@ -549,6 +605,7 @@ async def get_mandors(
     page: int = Query(1, ge=1),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
@@ -560,7 +617,7 @@ async def get_mandors(
     mandor_service = MandorService(db)
     
     if search:
-        mandors = mandor_service.search_by_name(search, skip=skip, limit=limit, project_id=project_id)
+        mandors = mandor_service.search_by_name(search, skip=skip, limit=limit, project_id=project_id, mode=search_mode)
         total = len(mandors)
     else:
         mandors, total = mandor_service.get_all(skip=skip, limit=limit, project_id=project_id)
@@ -611,6 +668,105 @@ async def create_mandor(
     )
 
 
+# ========== IMPORT JOB ROUTES ==========
+
+@router.get(
+    "/import-jobs",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="List recent import jobs",
+    tags=["Import Jobs"]
+)
+async def list_import_jobs(
+    job_type: Optional[str] = Query(None, description="Filter jenis import, misal: materials"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Daftar import job terbaru di project (selain admin hanya job milik sendiri)"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    jobs = ImportJobService(db).list_jobs(project_id, current_user, job_type=job_type, limit=limit)
+    return success_response(
+        data=[ImportJobService.to_dict(job, include_result=False) for job in jobs],
+        message="Data import job berhasil diambil"
+    )
+
+
+@router.get(
+    "/import-jobs/{job_id}",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Get import job progress and result",
+    tags=["Import Jobs"]
+)
+async def get_import_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Status import job: pending, running, completed, failed
+    Selama berjalan berisi processed_rows dan error per row sejauh ini; setelah selesai `result`
+    berisi laporan dengan struktur sama seperti response /materials/bulk-import
+    """
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    job = ImportJobService(db).get_job(job_id, project_id, current_user)
+    return success_response(
+        data=ImportJobService.to_dict(job),
+        message="Data import job berhasil diambil"
+    )
+
+
+# ========== AUTOCOMPLETE ROUTES ==========
+
+@router.get(
+    "/autocomplete/materials",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Autocomplete materials",
+    description="Top-N material berdasarkan prefix kode/nama atau kata di nama, dari index in-memory per project",
+    tags=["Materials"]
+)
+async def autocomplete_materials(
+    q: str = Query(..., min_length=1, max_length=100, description="Kata kunci (prefix kode, nama, atau kata)"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Autocomplete material untuk picker form"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+
+    items = AutocompleteService(db).search_materials(project_id, q, limit)
+    return success_response(data=items, message="Autocomplete materials berhasil diambil")
+
+
+@router.get(
+    "/autocomplete/mandors",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Autocomplete mandors",
+    description="Top-N mandor berdasarkan prefix nama atau kata di nama, dari index in-memory per project",
+    tags=["Mandors"]
+)
+async def autocomplete_mandors(
+    q: str = Query(..., min_length=1, max_length=100, description="Kata kunci (prefix nama atau kata)"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Autocomplete mandor untuk picker form"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+
+    items = AutocompleteService(db).search_mandors(project_id, q, limit)
+    return success_response(data=items, message="Autocomplete mandors berhasil diambil")
+
+
 # ========== STOCK IN ROUTES ==========
 @router.get(
     "/stock-in",
@@ -625,12 +781,17 @@ async def get_stock_in_list(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Ambil daftar barang masuk dengan pagination"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
 
     try:
         skip = (page - 1) * limit
@@ -674,32 +835,43 @@ async def get_stock_in_list(
             query = query.filter(StockIn.tanggal_masuk <= end_date)
 
         # Apply search filter
-        if search:
-            search_term = f"%{search}%"
-            # Pastikan Material sudah di-join sebelumnya jika sudah ada project_id filter
-            if project_id is None:
-                query = query.join(Material)
+        if search and search.strip():
+            # Material dicari lewat subquery id agar FULLTEXT index material tetap terpakai
+            nomor_filter, _ = text_search(db, [StockIn.nomor_invoice], search, search_mode)
             query = query.filter(
                 or_(
-                    StockIn.nomor_invoice.ilike(search_term),
-                    Material.nama_barang.ilike(search_term),
-                    Material.kode_barang.ilike(search_term)
+                    nomor_filter,
+                    StockIn.material_id.in_(text_search_ids(db, Material.id, [Material.kode_barang, Material.nama_barang], search, search_mode))
                 )
             )
 
-        # Get total count menggunakan func.count untuk menghindari select kolom project_id
-        total = query.with_entities(func.count(StockIn.id)).scalar() or 0
+        if pagination == PAGINATION_CURSOR:
+            # Keyset pagination: WHERE id < cursor, tanpa OFFSET dan COUNT (kecuali diminta)
+            items, next_cursor = paginate_keyset(query, StockIn.id, cursor_values, limit)
+            total = (query.with_entities(func.count(StockIn.id)).scalar() or 0) if include_total else None
+        else:
+            # Get total count menggunakan func.count untuk menghindari select kolom project_id
+            total = query.with_entities(func.count(StockIn.id)).scalar() or 0
 
-        # Apply pagination and ordering
-        items = query.order_by(StockIn.id.desc()).offset(skip).limit(limit).all()
+            # Apply pagination and ordering
+            items = query.order_by(StockIn.id.desc()).offset(skip).limit(limit).all()
 
         # Ensure relationships are loaded
         for item in items:
             if item.material_id:
                 _ = item.material
 
+        data = [StockInResponse.model_validate(it).model_dump(mode="json") for it in items]
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=data,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar barang masuk berhasil diambil"
+            )
         return paginated_response(
-            data=[StockInResponse.model_validate(it).model_dump(mode="json") for it in items],
+            data=data,
             total=total,
             page=page,
             limit=limit,
@@ -988,6 +1160,48 @@ async def create_stock_in_bulk(
         )
 
 
+@router.get(
+    "/stock-in/import-template",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Download Excel template for stock in import",
+    tags=["Stock In"]
+)
+async def download_stock_in_import_template(
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Download template Excel untuk import barang masuk (nomor invoice, kode barang, quantity, tanggal masuk)"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    filename = f"template_import_barang_masuk_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    return _xlsx_response(create_stock_in_import_template().read(), filename)
+
+
+@router.post(
+    "/stock-in/import",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import stock in from Excel/CSV in background",
+    tags=["Stock In"]
+)
+async def create_stock_in_import_job(
+    file: UploadFile = File(...),
+    all_or_nothing: bool = Form(False, description="Jika true, import dibatalkan seluruhnya bila ada row yang gagal"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Import barang masuk (nomor invoice, kode barang, quantity, tanggal masuk) dari file Excel (.xlsx) atau CSV (.csv) di background
+    Format kolom sesuai template /stock-in/import-template, header di row 1 dan data mulai row 2
+    Progress dan laporan akhir di-poll lewat GET /import-jobs/{job_id}
+    """
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    return await _submit_import_job(IMPORT_JOB_STOCK_IN, file, all_or_nothing, db, current_user, project_id)
+
+
 @router.put(
     "/stock-in/{stock_in_id}",
     response_model=None,
@@ -1140,12 +1354,17 @@ async def get_stock_out_list(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Ambil daftar barang keluar dengan pagination"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
 
     try:
         skip = (page - 1) * limit
@@ -1208,26 +1427,27 @@ async def get_stock_out_list(
             query = query.filter(StockOut.tanggal_keluar <= end_date)
 
         # Apply search filter
-        if search:
-            search_term = f"%{search}%"
-            # Jika belum join Material dari filter project, join sekarang
-            if project_id is None:
-                query = query.join(Material, StockOut.material_id == Material.id)
-            # Pastikan join Mandor untuk pencarian nama mandor
-            query = query.join(Mandor, StockOut.mandor_id == Mandor.id).filter(
+        if search and search.strip():
+            # Material & mandor dicari lewat subquery id agar FULLTEXT index tetap terpakai
+            nomor_filter, _ = text_search(db, [StockOut.nomor_barang_keluar], search, search_mode)
+            query = query.filter(
                 or_(
-                    StockOut.nomor_barang_keluar.ilike(search_term),
-                    Material.nama_barang.ilike(search_term),
-                    Material.kode_barang.ilike(search_term),
-                    Mandor.nama.ilike(search_term)
+                    nomor_filter,
+                    StockOut.material_id.in_(text_search_ids(db, Material.id, [Material.kode_barang, Material.nama_barang], search, search_mode)),
+                    StockOut.mandor_id.in_(text_search_ids(db, Mandor.id, [Mandor.nama], search, search_mode))
                 )
             )
         
-        # Get total count aman (hindari select kolom yang tidak ada)
-        total = query.with_entities(func.count(StockOut.id)).scalar() or 0
-        
-        # Apply pagination and ordering
-        items = query.order_by(StockOut.id.desc()).offset(skip).limit(limit).all()
+        if pagination == PAGINATION_CURSOR:
+            # Keyset pagination: WHERE id < cursor, tanpa OFFSET dan COUNT (kecuali diminta)
+            items, next_cursor = paginate_keyset(query, StockOut.id, cursor_values, limit)
+            total = (query.with_entities(func.count(StockOut.id)).scalar() or 0) if include_total else None
+        else:
+            # Get total count aman (hindari select kolom yang tidak ada)
+            total = query.with_entities(func.count(StockOut.id)).scalar() or 0
+
+            # Apply pagination and ordering
+            items = query.order_by(StockOut.id.desc()).offset(skip).limit(limit).all()
         
         # Pastikan semua relationship ter-load sebelum serialize
         for item in items:
@@ -1236,8 +1456,17 @@ async def get_stock_out_list(
             if item.mandor_id:
                 _ = item.mandor
 
+        data = [StockOutResponse.model_validate(it).model_dump(mode="json") for it in items]
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=data,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar barang keluar berhasil diambil"
+            )
         return paginated_response(
-            data=[StockOutResponse.model_validate(it).model_dump(mode="json") for it in items],
+            data=data,
             total=total,
             page=page,
             limit=limit,
@@ -1275,8 +1504,6 @@ async def get_stock_outs_by_mandor(
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
     
     try:
-        stock_service = StockService(db)
-
         # Build query seperti list stock-out, namun difokuskan pada mandor yang diminta
         from sqlalchemy.orm import joinedload, load_only
         from sqlalchemy import and_, or_, exists
@@ -1332,52 +1559,15 @@ async def get_stock_outs_by_mandor(
 
         stock_outs = query.order_by(StockOut.id.desc()).limit(1000).all()
         
-        # Hitung quantity_terpasang per SO hanya dari pemasangan yang tertaut langsung (strict by stock_out_id)
+        # Sisa quantity per SO (terpasang strict by stock_out_id, total return dan reject) dihitung
+        # sekaligus untuk semua SO dengan query GROUP BY, bukan query per SO
+        from app.services.inventory.stock_out_quantity_service import StockOutQuantityService
+        remaining_by_so = StockOutQuantityService(db).get_remaining(stock_outs)
+        
         result_data = []
-        from sqlalchemy import func
-        from app.models.inventory.installed import Installed
-
-        so_ids = [so.id for so in stock_outs]
-        linked_installed_sum_by_so: dict[int, float] = {}
-        if so_ids:
-            rows = (
-                db.query(Installed.stock_out_id, func.coalesce(func.sum(Installed.quantity), 0))
-                .filter(Installed.is_deleted == 0)
-                .filter(Installed.stock_out_id.in_(so_ids))
-                .group_by(Installed.stock_out_id)
-                .all()
-            )
-            # Konversi ke float untuk mempertahankan nilai desimal (2.10 bukan 2.00)
-            linked_installed_sum_by_so = {row[0]: float(row[1] or 0) for row in rows}
-
         for so in stock_outs:
             stock_out_dict = StockOutResponse.model_validate(so).model_dump(mode="json")
-            # Gunakan float untuk mempertahankan nilai desimal
-            terpasang = max(0.0, float(linked_installed_sum_by_so.get(so.id, 0)))
-            # Get total kondisi reject untuk stock_out_id ini (kembalikan Decimal, konversi ke float untuk response)
-            total_reject = float(stock_service.return_repo.get_total_reject_by_stock_out(so.id))
-            # Get total quantity kembali (kembalikan Decimal, konversi ke float untuk response)
-            total_quantity_kembali = float(stock_service.return_repo.get_total_quantity_by_stock_out(so.id))
-            
-            # BEST PRACTICE: Logika sisa yang jelas dan konsisten
-            qty_keluar = float(so.quantity or 0)
-            
-            # 1. Sisa Total = Qty Keluar - Terpasang (untuk informasi umum)
-            #    Menunjukkan sisa total yang belum terpasang
-            quantity_sisa_total = max(0.0, qty_keluar - terpasang)
-            
-            # 2. Sisa Bisa Kembali = Qty Keluar - Terpasang - Sudah Kembali (untuk validasi)
-            #    Menunjukkan sisa yang masih bisa dikembalikan
-            #    Note: Reject tidak mengurangi sisa bisa kembali karena reject sudah tidak bisa digunakan lagi
-            quantity_sisa_kembali = max(0.0, qty_keluar - terpasang - total_quantity_kembali)
-
-            stock_out_dict["quantity_terpasang"] = terpasang
-            stock_out_dict["quantity_sisa_total"] = quantity_sisa_total  # Sisa total (Qty - Terpasang)
-            stock_out_dict["quantity_sisa_kembali"] = quantity_sisa_kembali  # Sisa bisa kembali (Qty - Terpasang - Sudah Kembali)
-            stock_out_dict["quantity_sudah_kembali"] = max(0.0, total_quantity_kembali)
-            stock_out_dict["quantity_reject"] = max(0.0, total_reject)  # Informasi reject terpisah
-            stock_out_dict["quantity_sisa"] = quantity_sisa_kembali  # Backward compatibility
-
+            stock_out_dict.update(StockOutQuantityService.to_response_fields(remaining_by_so[so.id]))
             result_data.append(stock_out_dict)
         
         return success_response(
@@ -1463,14 +1653,15 @@ async def get_stock_outs_by_nomor(
         
         stock_outs = query.order_by(StockOut.id.asc()).all()
         
-        # Pastikan semua relationship ter-load sebelum serialize
-        for item in stock_outs:
-            if item.material_id:
-                _ = item.material
-            if item.mandor_id:
-                _ = item.mandor
+        # Material dan mandor sudah di-joinedload; sisa quantity dari service yang sama dengan picker
+        from app.services.inventory.stock_out_quantity_service import StockOutQuantityService
+        remaining_by_so = StockOutQuantityService(db).get_remaining(stock_outs)
         
-        result_data = [StockOutResponse.model_validate(so).model_dump(mode="json") for so in stock_outs]
+        result_data = []
+        for so in stock_outs:
+            stock_out_dict = StockOutResponse.model_validate(so).model_dump(mode="json")
+            stock_out_dict.update(StockOutQuantityService.to_response_fields(remaining_by_so[so.id]))
+            result_data.append(stock_out_dict)
         
         return success_response(
             data=result_data,
@@ -1781,6 +1972,48 @@ async def create_stock_out_bulk(
 
 
 # ========== INSTALLED ROUTES ==========
+@router.get(
+    "/stock-out/import-template",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Download Excel template for stock out import",
+    tags=["Stock Out"]
+)
+async def download_stock_out_import_template(
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Download template Excel untuk import barang keluar (nama mandor, kode barang, quantity, tanggal keluar); nomor barang keluar dibuat otomatis"""
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    filename = f"template_import_barang_keluar_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    return _xlsx_response(create_stock_out_import_template().read(), filename)
+
+
+@router.post(
+    "/stock-out/import",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import stock out from Excel/CSV in background",
+    tags=["Stock Out"]
+)
+async def create_stock_out_import_job(
+    file: UploadFile = File(...),
+    all_or_nothing: bool = Form(False, description="Jika true, import dibatalkan seluruhnya bila ada row yang gagal"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Import barang keluar (nama mandor, kode barang, quantity, tanggal keluar); nomor barang keluar dibuat otomatis dari file Excel (.xlsx) atau CSV (.csv) di background
+    Format kolom sesuai template /stock-out/import-template, header di row 1 dan data mulai row 2
+    Progress dan laporan akhir di-poll lewat GET /import-jobs/{job_id}
+    """
+    check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    
+    return await _submit_import_job(IMPORT_JOB_STOCK_OUT, file, all_or_nothing, db, current_user, project_id)
+
+
 @router.get(
     "/installed",
     response_model=None,
@@ -1794,12 +2027,17 @@ async def get_installed_list(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Ambil daftar barang terpasang dengan pagination"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
 
     try:
         skip = (page - 1) * limit
@@ -1851,25 +2089,27 @@ async def get_installed_list(
             query = query.filter(Installed.tanggal_pasang <= end_date)
 
         # Apply search filter
-        if search:
-            search_term = f"%{search}%"
-            # Jika belum di-join Material dari filter project, join sekarang
-            if project_id is None:
-                query = query.join(Material, Installed.material_id == Material.id)
-            query = query.join(Mandor, Installed.mandor_id == Mandor.id).filter(
+        if search and search.strip():
+            # Material & mandor dicari lewat subquery id agar FULLTEXT index tetap terpakai
+            register_filter, _ = text_search(db, [Installed.no_register], search, search_mode)
+            query = query.filter(
                 or_(
-                    Installed.no_register.ilike(search_term),
-                    Material.nama_barang.ilike(search_term),
-                    Material.kode_barang.ilike(search_term),
-                    Mandor.nama.ilike(search_term)
+                    register_filter,
+                    Installed.material_id.in_(text_search_ids(db, Material.id, [Material.kode_barang, Material.nama_barang], search, search_mode)),
+                    Installed.mandor_id.in_(text_search_ids(db, Mandor.id, [Mandor.nama], search, search_mode))
                 )
             )
         
-        # Get total count aman
-        total = query.with_entities(func.count(Installed.id)).scalar() or 0
-        
-        # Apply pagination and ordering
-        items = query.order_by(Installed.id.desc()).offset(skip).limit(limit).all()
+        if pagination == PAGINATION_CURSOR:
+            # Keyset pagination: WHERE id < cursor, tanpa OFFSET dan COUNT (kecuali diminta)
+            items, next_cursor = paginate_keyset(query, Installed.id, cursor_values, limit)
+            total = (query.with_entities(func.count(Installed.id)).scalar() or 0) if include_total else None
+        else:
+            # Get total count aman
+            total = query.with_entities(func.count(Installed.id)).scalar() or 0
+
+            # Apply pagination and ordering
+            items = query.order_by(Installed.id.desc()).offset(skip).limit(limit).all()
         
         # Pastikan semua relationship ter-load sebelum serialize
         for item in items:
@@ -1878,8 +2118,17 @@ async def get_installed_list(
             if item.mandor_id:
                 _ = item.mandor
 
+        data = [InstalledResponse.model_validate(it).model_dump(mode="json") for it in items]
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=data,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar barang terpasang berhasil diambil"
+            )
         return paginated_response(
-            data=[InstalledResponse.model_validate(it).model_dump(mode="json") for it in items],
+            data=data,
             total=total,
             page=page,
             limit=limit,
@@ -2235,12 +2484,17 @@ async def get_returns(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Get list of returns with optional filters"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
 
     try:
         skip = (page - 1) * limit
@@ -2276,23 +2530,22 @@ async def get_returns(
             query = query.filter(Return.tanggal_kembali <= end_date)
 
         # Apply search filter
-        if search:
-            search_term = f"%{search}%"
-            # Join Material & Mandor untuk search
-            query = query.join(Material, Return.material_id == Material.id)
-            query = query.join(Mandor, Return.mandor_id == Mandor.id).filter(
+        if search and search.strip():
+            # Material & mandor dicari lewat subquery id agar FULLTEXT index tetap terpakai
+            query = query.filter(
                 or_(
-                    Material.nama_barang.ilike(search_term),
-                    Material.kode_barang.ilike(search_term),
-                    Mandor.nama.ilike(search_term)
+                    Return.material_id.in_(text_search_ids(db, Material.id, [Material.kode_barang, Material.nama_barang], search, search_mode)),
+                    Return.mandor_id.in_(text_search_ids(db, Mandor.id, [Mandor.nama], search, search_mode))
                 )
             )
         
-        # Get total count
-        if search:
-            total = query.with_entities(func.count(func.distinct(Return.id))).scalar() or 0
-        else:
-            total = query.with_entities(func.count(Return.id)).scalar() or 0
+        # Get total count (mode cursor: hanya jika include_total)
+        total = None
+        if pagination != PAGINATION_CURSOR or include_total:
+            if search:
+                total = query.with_entities(func.count(func.distinct(Return.id))).scalar() or 0
+            else:
+                total = query.with_entities(func.count(Return.id)).scalar() or 0
         
         logger.info(f"Query returns: total={total}, project_id={project_id}, page={page}, limit={limit}, search={'Y' if search else 'N'}")
         
@@ -2315,7 +2568,11 @@ async def get_returns(
             ),
         )
         
-        items = query.order_by(Return.id.desc()).offset(skip).limit(limit).all()
+        next_cursor = None
+        if pagination == PAGINATION_CURSOR:
+            items, next_cursor = paginate_keyset(query, Return.id, cursor_values, limit)
+        else:
+            items = query.order_by(Return.id.desc()).offset(skip).limit(limit).all()
         
         logger.info(f"Found {len(items)} returns in database")
         
@@ -2332,6 +2589,14 @@ async def get_returns(
         
         logger.info(f"Successfully validated {len(result_data)} returns")
 
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=result_data,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar returns berhasil diambil"
+            )
         return paginated_response(
             data=result_data,
             total=total,
@@ -2566,15 +2831,12 @@ async def get_notifications(
         project_id=project_id
     )
     
-    # Add mandor and material names
+    # Add mandor and material names (sudah di-load bersama notifikasi, tanpa query per row)
     result = []
     for notif in notifications:
         notif_dict = NotificationResponse.model_validate(notif).model_dump(mode="json")
-        # Get related data
-        mandor = notification_service.mandor_repo.get(notif.mandor_id)
-        material = notification_service.material_repo.get(notif.material_id)
-        notif_dict["mandor_nama"] = mandor.nama if mandor else None
-        notif_dict["material_nama"] = material.nama_barang if material else None
+        notif_dict["mandor_nama"] = notif.mandor.nama if notif.mandor else None
+        notif_dict["material_nama"] = notif.material.nama_barang if notif.material else None
         result.append(notif_dict)
     
     return paginated_response(
@@ -2628,14 +2890,15 @@ async def export_excel(
     try:
         check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
         
-        excel_file = create_excel_export(
-            db=db,
-            start_date=export_data.start_date,
-            end_date=export_data.end_date,
-            mandor_id=export_data.mandor_id,
-            material_id=export_data.material_id,
-            search=export_data.search
-        )
+        with track_job("export"):
+            excel_file = create_excel_export(
+                db=db,
+                start_date=export_data.start_date,
+                end_date=export_data.end_date,
+                mandor_id=export_data.mandor_id,
+                material_id=export_data.material_id,
+                search=export_data.search
+            )
         
         # Get file content before closing
         file_content = excel_file.read()
@@ -2671,6 +2934,141 @@ async def export_excel(
         )
 
 
+@router.get(
+    "/export/{table}",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Streaming export CSV / NDJSON",
+    tags=["Export"]
+)
+async def export_stream(
+    table: str = Path(..., pattern=EXPORT_TABLE_PATTERN, description="stock_ins, stock_outs, installed, returns atau audit_logs"),
+    export_format: str = Query(EXPORT_CSV, alias="format", pattern=EXPORT_FORMAT_PATTERN, description="csv (default) atau ndjson"),
+    search: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    search_mode: str = Query(SEARCH_CONTAINS, pattern=SEARCH_MODE_PATTERN, description="contains (default), prefix atau fuzzy"),
+    mandor_id: Optional[int] = Query(None),
+    material_id: Optional[int] = Query(None),
+    is_released: Optional[bool] = Query(None, description="Khusus returns"),
+    user_id: Optional[int] = Query(None, description="Khusus audit_logs"),
+    action: Optional[str] = Query(None, description="Khusus audit_logs"),
+    table_name: Optional[str] = Query(None, description="Khusus audit_logs"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Export streaming satu tabel transaksi / audit log sebagai CSV atau NDJSON.
+    Data dikirim bertahap (server-side cursor) sehingga cocok untuk integrasi dan audit data besar.
+    """
+    # Audit log hanya untuk admin
+    if table == EXPORT_AUDIT_LOGS:
+        check_role_permission(current_user, [UserRole.ADMIN])
+    else:
+        check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+
+    statement = build_export_query(
+        db=db,
+        table=table,
+        project_id=project_id,
+        start_date=start_date,
+        end_date=end_date,
+        search=search,
+        search_mode=search_mode,
+        mandor_id=mandor_id,
+        material_id=material_id,
+        is_released=is_released,
+        user_id=user_id,
+        action=action,
+        table_name=table_name,
+    )
+
+    # Audit log
+    try:
+        audit_service = AuditLogService(db)
+        audit_service.create_log(
+            user_id=current_user.id,
+            action=ActionType.EXPORT,
+            table_name=table,
+            description=f"Export {export_format.upper()} {table} - Date: {start_date} to {end_date}"
+        )
+    except Exception as audit_error:
+        logger.warning(f"Failed to create audit log: {audit_error}")
+
+    from fastapi.responses import StreamingResponse
+    filename = f"{table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        stream_export(statement, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
+@router.post(
+    "/exports/parquet",
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Buat snapshot Parquet project (background)",
+    tags=["Export"]
+)
+async def create_parquet_export(
+    force: bool = Query(False, description="Tulis ulang semua partisi walau tidak berubah"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """
+    Tulis snapshot Parquet inventory project di background.
+    Hanya bulan yang baru / berubah yang ditulis ulang; cek hasilnya lewat GET /exports/parquet.
+    """
+    check_role_permission(current_user, [UserRole.ADMIN])
+
+    from app.services.inventory.parquet_export_service import ParquetExportService
+    status_data = ParquetExportService(db).submit(project_id, current_user.id, force=force)
+
+    try:
+        audit_service = AuditLogService(db)
+        audit_service.create_log(
+            user_id=current_user.id,
+            action=ActionType.EXPORT,
+            table_name="inventory",
+            description=f"Export Parquet project {project_id}" + (" (force)" if force else "")
+        )
+    except Exception as audit_error:
+        logger.warning(f"Failed to create audit log: {audit_error}")
+
+    return success_response(
+        data=status_data,
+        message="Export Parquet sedang diproses",
+        status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@router.get(
+    "/exports/parquet",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Status dan daftar file snapshot Parquet",
+    tags=["Export"]
+)
+async def get_parquet_export_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    project_id: int = Depends(get_current_project)
+):
+    """Status export Parquet terakhir dan partisi yang tersedia per tabel"""
+    check_role_permission(current_user, [UserRole.ADMIN])
+
+    from app.services.inventory.parquet_export_service import ParquetExportService
+    return success_response(
+        data=ParquetExportService(db).get_status(project_id),
+        message="Status export Parquet berhasil diambil"
+    )
+
+
 # ========== SURAT PERMINTAAN ROUTES ==========
 @router.post(
     "/surat-permintaan",
@@ -2843,130 +3241,55 @@ async def get_surat_permintaans(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Get list surat permintaan dengan pagination"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
     
     try:
         surat_permintaan_service = SuratPermintaanService(db)
         skip = (page - 1) * limit
+        next_cursor = None
+        
+        if pagination == PAGINATION_CURSOR:
+            surat_permintaans, next_cursor, total = surat_permintaan_service.get_page_keyset(
+                cursor_values,
+                limit=limit,
+                search=search,
+                start_date=start_date,
+                end_date=end_date,
+                project_id=project_id,
+                user_id=current_user.id,
+                include_total=include_total
+            )
+        else:
+            surat_permintaans, total = surat_permintaan_service.get_all(
+                skip=skip,
+                limit=limit,
+                search=search,
+                start_date=start_date,
+                end_date=end_date,
+                project_id=project_id,
+                user_id=current_user.id
+            )
         
-        surat_permintaans, total = surat_permintaan_service.get_all(
-            skip=skip,
-            limit=limit,
-            search=search,
-            start_date=start_date,
-            end_date=end_date,
-            project_id=project_id,
-            user_id=current_user.id
-        )
-        
-        # Convert to response format
-        from sqlalchemy.orm import joinedload
-        from app.models.inventory.surat_permintaan import SuratPermintaan
-        from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
-        
-        response_items = []
-        for sp in surat_permintaans:
-            # Load with relationships
-            sp_full = db.query(SuratPermintaan).options(
-                joinedload(SuratPermintaan.items).joinedload(SuratPermintaanItem.material),
-                joinedload(SuratPermintaan.project),
-                joinedload(SuratPermintaan.creator)
-            ).filter(SuratPermintaan.id == sp.id).first()
-            
-            if sp_full:
-                # Build response data manually
-                item_data = {
-                    "id": sp_full.id,
-                    "nomor_surat": sp_full.nomor_surat,
-                    "tanggal": sp_full.tanggal.isoformat() if isinstance(sp_full.tanggal, date) else str(sp_full.tanggal),
-                    "project_id": sp_full.project_id,
-                    "status": getattr(sp_full, 'status', 'Draft'),
-                    "created_by": sp_full.created_by,
-                    "created_at": sp_full.created_at.isoformat() if isinstance(sp_full.created_at, datetime) else str(sp_full.created_at),
-                    "updated_at": sp_full.updated_at.isoformat() if isinstance(sp_full.updated_at, datetime) else str(sp_full.updated_at),
-                    "items": []
-                }
-                
-                # Parse signatures JSON
-                if sp_full.signatures:
-                    try:
-                        item_data["signatures"] = json.loads(sp_full.signatures) if isinstance(sp_full.signatures, str) else sp_full.signatures
-                    except:
-                        item_data["signatures"] = None
-                else:
-                    item_data["signatures"] = None
-                
-                # Build items
-                for item in sp_full.items:
-                    # Convert Decimal/Numeric qty to float to preserve decimal precision in JSON
-                    qty_value = float(item.qty) if isinstance(item.qty, Decimal) else item.qty
-                    
-                    item_dict = {
-                        "id": item.id,
-                        "material_id": item.material_id,
-                        "kode_barang": item.kode_barang,
-                        "nama_barang": item.nama_barang,
-                        "qty": qty_value,
-                        "satuan": item.satuan,
-                        "material": None
-                    }
-                    
-                    # Parse sumber_barang JSON
-                    if item.sumber_barang:
-                        try:
-                            item_dict["sumber_barang"] = json.loads(item.sumber_barang) if isinstance(item.sumber_barang, str) else item.sumber_barang
-                        except:
-                            item_dict["sumber_barang"] = None
-                    else:
-                        item_dict["sumber_barang"] = None
-                    
-                    # Parse peruntukan JSON
-                    if item.peruntukan:
-                        try:
-                            item_dict["peruntukan"] = json.loads(item.peruntukan) if isinstance(item.peruntukan, str) else item.peruntukan
-                        except:
-                            item_dict["peruntukan"] = None
-                    else:
-                        item_dict["peruntukan"] = None
-                    
-                    # Add material if exists
-                    if item.material:
-                        item_dict["material"] = {
-                            "id": item.material.id,
-                            "kode_barang": item.material.kode_barang,
-                            "nama_barang": item.material.nama_barang,
-                            "satuan": item.material.satuan
-                        }
-                    
-                    item_data["items"].append(item_dict)
-                
-                # Add project if exists
-                if sp_full.project:
-                    item_data["project"] = {
-                        "id": sp_full.project.id,
-                        "name": sp_full.project.name,
-                        "code": sp_full.project.code
-                    }
-                else:
-                    item_data["project"] = None
-                
-                # Add creator if exists
-                if sp_full.creator:
-                    item_data["creator"] = {
-                        "id": sp_full.creator.id,
-                        "name": sp_full.creator.name,
-                        "email": sp_full.creator.email
-                    }
-                else:
-                    item_data["creator"] = None
-                
-                response_items.append(item_data)
+        # Convert to response format (relasi sudah di-load oleh query halaman)
+        response_items = surat_permintaan_service.to_list_response(surat_permintaans)
         
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=response_items,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar surat permintaan berhasil diambil"
+            )
         return paginated_response(
             data=response_items,
             total=total,
@@ -3402,26 +3725,43 @@ async def get_surat_jalans(
     search: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     project_id: int = Depends(get_current_project)
 ):
     """Get list surat jalan dengan pagination"""
     check_role_permission(current_user, [UserRole.ADMIN, UserRole.GUDANG])
+    cursor_values = decode_cursor(cursor) if pagination == PAGINATION_CURSOR else None
     
     try:
         surat_jalan_service = SuratJalanService(db)
         skip = (page - 1) * limit
-        
-        surat_jalans, total = surat_jalan_service.get_all(
-            skip=skip,
-            limit=limit,
-            search=search,
-            start_date=start_date,
-            end_date=end_date,
-            project_id=project_id,
-            user_id=current_user.id
-        )
+        next_cursor = None
+        
+        if pagination == PAGINATION_CURSOR:
+            surat_jalans, next_cursor, total = surat_jalan_service.get_page_keyset(
+                cursor_values,
+                limit=limit,
+                search=search,
+                start_date=start_date,
+                end_date=end_date,
+                project_id=project_id,
+                user_id=current_user.id,
+                include_total=include_total
+            )
+        else:
+            surat_jalans, total = surat_jalan_service.get_all(
+                skip=skip,
+                limit=limit,
+                search=search,
+                start_date=start_date,
+                end_date=end_date,
+                project_id=project_id,
+                user_id=current_user.id
+            )
         
         # Convert to response format
         from sqlalchemy.orm import joinedload
@@ -3490,6 +3830,14 @@ async def get_surat_jalans(
                 
                 response_items.append(item_data)
         
+        if pagination == PAGINATION_CURSOR:
+            return cursor_paginated_response(
+                data=response_items,
+                limit=limit,
+                next_cursor=next_cursor,
+                total=total,
+                message="Daftar surat jalan berhasil diambil"
+            )
         return paginated_response(
             data=response_items,
             total=total,
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Query, status
+from typing import Optional
+import os
+from app.config.settings import settings
+from app.core.security import get_current_user
+from app.core.slow_query import get_slow_query_recorder
+from app.models.user.user import User
+from app.utils.response import success_response
+from app.api.v1.deps import check_superuser
+
+router = APIRouter()
+
+
+@router.get(
+    "/slow-queries",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Get slow queries",
+    description="Mendapatkan daftar query lambat terbaru (per worker) beserta EXPLAIN plan jika aktif"
+)
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="Jumlah entry"),
+    min_duration_ms: Optional[float] = Query(None, ge=0, description="Filter durasi minimal (ms)"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get slow query log (admin only)"""
+    check_superuser(current_user)
+
+    recorder = get_slow_query_recorder()
+    items = recorder.get_entries(limit=limit, min_duration_ms=min_duration_ms) if recorder else []
+
+    return success_response(
+        data={
+            "enabled": recorder is not None,
+            "threshold_ms": recorder.threshold_ms if recorder else settings.SLOW_QUERY_THRESHOLD_MS,
+            "explain": recorder.explain if recorder else False,
+            # Ring buffer disimpan per worker uvicorn
+            "worker_pid": os.getpid(),
+            "items": items,
+        },
+        message="Daftar slow query berhasil diambil"
+    )
+
+
+@router.delete(
+    "/slow-queries",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    summary="Clear slow queries",
+    description="Mengosongkan ring buffer slow query pada worker ini"
+)
+async def clear_slow_queries(
+    current_user: User = Depends(get_current_user)
+):
+    """Clear slow query log (admin only)"""
+    check_superuser(current_user)
+
+    recorder = get_slow_query_recorder()
+    cleared = recorder.clear() if recorder else 0
+
+    return success_response(
+        data={"cleared": cleared, "worker_pid": os.getpid()},
+        message="Slow query log berhasil dikosongkan"
+    )
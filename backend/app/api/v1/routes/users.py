@@ -14,7 +14,11 @@ from app.schemas.user.request import (
 from app.schemas.user.response import UserResponse, UserListResponse
 from app.core.security import get_current_user
 from app.models.user.user import User
-from app.utils.response import success_response, paginated_response, error_response
+from app.utils.response import success_response, paginated_response, error_response, cursor_paginated_response
+from app.utils.pagination import (
+    PAGINATION_OFFSET, PAGINATION_CURSOR, PAGINATION_MODE_PATTERN, decode_cursor
+)
+from app.utils.text_search import SEARCH_PREFIX, SEARCH_MODE_PATTERN
 from app.core.exceptions import ForbiddenError, NotFoundError, ValidationError
 from app.api.v1.deps import check_superuser
 
@@ -32,6 +36,11 @@ async def get_users(
     page: int = Query(1, ge=1, description="Halaman"),
     limit: int = Query(100, ge=1, le=100, description="Jumlah data per halaman"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    search: Optional[str] = Query(None, description="Cari berdasarkan email atau nama"),
+    search_mode: str = Query(SEARCH_PREFIX, pattern=SEARCH_MODE_PATTERN, description="prefix (default, memakai index), contains atau fuzzy"),
+    pagination: str = Query(PAGINATION_OFFSET, pattern=PAGINATION_MODE_PATTERN, description="offset (default) atau cursor"),
+    cursor: Optional[str] = Query(None, description="Cursor dari meta.pagination.next_cursor (mode cursor)"),
+    include_total: bool = Query(False, description="Hitung total data pada mode cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -44,7 +53,26 @@ async def get_users(
         filters["is_active"] = is_active
     
     user_service = UserService(db)
-    users, total = user_service.get_all(skip=skip, limit=limit, filters=filters)
+    if pagination == PAGINATION_CURSOR:
+        users, next_cursor, total = user_service.get_page_keyset(
+            decode_cursor(cursor),
+            limit=limit,
+            filters=filters,
+            search=search,
+            search_mode=search_mode,
+            include_total=include_total
+        )
+        return cursor_paginated_response(
+            data=[user.model_dump() for user in users],
+            limit=limit,
+            next_cursor=next_cursor,
+            total=total,
+            message="Daftar users berhasil diambil"
+        )
+    
+    users, total = user_service.get_all(
+        skip=skip, limit=limit, filters=filters, search=search, search_mode=search_mode
+    )
     
     return paginated_response(
         data=[user.model_dump() for user in users],
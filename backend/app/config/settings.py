@@ -82,6 +82,39 @@ class Settings(BaseSettings):
     # Stop migration jika ada error (best practice: True untuk safety)
     MIGRATION_STOP_ON_ERROR: bool = True
 
+    # Metrics (Prometheus)
+    METRICS_ENABLED: bool = True
+    # Network yang boleh mengakses /metrics (comma-separated IP/CIDR), default: localhost + private network Docker
+    METRICS_ALLOWED_IPS: Union[str, List[str]] = "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    # Token opsional untuk akses /metrics dari luar network internal (Authorization: Bearer <token>)
+    METRICS_TOKEN: str = ""
+
+    # Slow Query Log
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    # Jalankan EXPLAIN untuk SELECT yang lambat (di background thread, koneksi terpisah)
+    SLOW_QUERY_EXPLAIN: bool = False
+    # Jumlah entry maksimal di ring buffer (per worker)
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+
+    # Autocomplete material/mandor (index in-memory per worker)
+    # Interval minimal delta refresh dari database untuk perubahan dari worker lain
+    AUTOCOMPLETE_REFRESH_SECONDS: float = 5.0
+
+    # Cache in-memory per worker (permissions, dll) dengan version stamp di database
+    # TTL pengaman untuk perubahan di luar aplikasi (SQL manual / import dump)
+    CACHE_TTL_SECONDS: int = 300
+
+    # Import job (import spreadsheet di background, thread pool per worker)
+    IMPORT_JOB_WORKERS: int = 2
+    # Direktori file upload sementara, dihapus setelah job selesai
+    IMPORT_JOB_DIR: str = "uploads/imports"
+    # Job pending/running tanpa update progress selama ini dianggap terhenti (misal worker restart)
+    IMPORT_JOB_STALE_SECONDS: int = 1800
+
+    # Snapshot Parquet untuk analitik (per project, per bulan)
+    PARQUET_EXPORT_DIR: str = "uploads/exports"
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def parse_cors_origins(cls, v):
@@ -105,6 +138,14 @@ class Settings(BaseSettings):
             return v
         return v
 
+    @field_validator("METRICS_ALLOWED_IPS", mode="before")
+    @classmethod
+    def parse_metrics_allowed_ips(cls, v):
+        """Parse METRICS_ALLOWED_IPS dari string comma-separated ke list"""
+        if isinstance(v, str):
+            return [ip.strip() for ip in v.split(",") if ip.strip()]
+        return v
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Get CORS origins as list"""
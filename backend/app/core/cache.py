@@ -0,0 +1,146 @@
+"""
+Cache in-memory per worker dengan version stamp bersama di database.
+
+Setiap cache punya nama (misal "permissions") dengan satu baris di table cache_versions.
+Perubahan data memanggil bump_version() di transaksi yang sama dengan perubahan tersebut,
+sehingga setelah commit semua worker melihat version baru dan membuang entry lama.
+Membaca cache cukup satu lookup primary key (version) tanpa query data.
+
+Cache yang datanya per project memakai scope (VersionedCache(..., scoped=True)): perubahan di satu
+project hanya mem-bump "nama:project_id" (dan "nama:*" untuk entry semua project), sehingga entry
+project lain tetap valid. Bump tanpa scope membuang entry semua project.
+
+Entry juga punya TTL (CACHE_TTL_SECONDS) sebagai pengaman untuk perubahan yang
+dilakukan di luar aplikasi (SQL manual, import dump).
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.models.cache_version import CacheVersion
+
+# Nama cache (satu baris per nama di cache_versions)
+PERMISSIONS_CACHE = "permissions"
+USER_PROJECTS_CACHE = "user_projects"
+NOTIFICATIONS_CACHE = "notifications"
+REFERENCE_DATA_CACHE = "reference_data"
+
+# Scope untuk entry yang mencakup semua project (key None)
+ALL_SCOPES = "*"
+
+
+def scoped_name(name: str, scope: Any) -> str:
+    """Nama version stamp untuk satu scope cache, misal reference_data:3"""
+    return f"{name}:{scope}"
+
+
+def get_version(db: Session, name: str) -> int:
+    """Version stamp saat ini untuk cache `name` (0 jika belum pernah di-bump)"""
+    version = db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar()
+    return version or 0
+
+
+def get_versions(db: Session, names: Tuple[str, ...]) -> Tuple[int, ...]:
+    """Version stamp beberapa nama sekaligus dalam satu query (0 untuk yang belum pernah di-bump)"""
+    rows = db.execute(select(CacheVersion.name, CacheVersion.version).where(CacheVersion.name.in_(names)))
+    versions = dict(rows.all())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def bump_version(db: Session, name: str, scope: Any = None) -> None:
+    """
+    Naikkan version stamp cache `name`. Tidak commit: panggil di transaksi yang sama dengan
+    perubahan data agar invalidasi hanya terjadi jika perubahan ikut tersimpan.
+
+    Dengan `scope` (misal project_id) hanya entry scope tersebut dan entry semua project yang
+    di-invalidasi; tanpa scope semua entry cache `name` di-invalidasi.
+    """
+    if scope is None:
+        _upsert_version(db, name)
+    else:
+        _upsert_version(db, scoped_name(name, scope))
+        _upsert_version(db, scoped_name(name, ALL_SCOPES))
+
+
+def _upsert_version(db: Session, name: str) -> None:
+    """Naikkan satu baris cache_versions dengan satu upsert"""
+    dialect = db.get_bind().dialect.name
+    values = {"name": name, "version": 1}
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        statement = mysql_insert(CacheVersion).values(**values)
+        statement = statement.on_duplicate_key_update(version=CacheVersion.version + 1)
+        db.execute(statement)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        statement = sqlite_insert(CacheVersion).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CacheVersion.name], set_={"version": CacheVersion.version + 1}
+        )
+        db.execute(statement)
+    else:
+        updated = db.execute(
+            update(CacheVersion).where(CacheVersion.name == name).values(version=CacheVersion.version + 1)
+        ).rowcount
+        if not updated:
+            db.add(CacheVersion(**values))
+            db.flush()
+
+
+class VersionedCache:
+    """Cache in-memory per worker; entry valid selama version stamp-nya sama dengan di database"""
+
+    def __init__(self, name: str, max_entries: int = 10000, scoped: bool = False):
+        self.name = name
+        # scoped: key adalah scope (project_id, None = semua project) dengan version stamp sendiri
+        self.scoped = scoped
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[int, float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry_version, expires_at, value = entry
+        if entry_version != version or time.monotonic() >= expires_at:
+            return None
+        return value
+
+    def set(self, key: Hashable, version: Any, value: Any) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Buang entry dengan version lama dulu; jika masih penuh kosongkan semua
+                self._entries = {k: v for k, v in self._entries.items() if v[0] == version}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (version, time.monotonic() + settings.CACHE_TTL_SECONDS, value)
+
+    def get_or_load(self, db: Session, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Ambil dari cache atau jalankan loader. Version dibaca sebelum loader sehingga jika
+        terjadi bump di tengah jalan, hasil lama tersimpan dengan version lama dan dibuang
+        pada request berikutnya.
+        """
+        version = self._current_version(db, key)
+        value = self.get(key, version)
+        if value is None:
+            value = loader()
+            self.set(key, version, value)
+        return value
+
+    def _current_version(self, db: Session, key: Hashable) -> Any:
+        """Version entry `key`: stamp global, ditambah stamp scope-nya untuk cache scoped"""
+        if not self.scoped:
+            return get_version(db, self.name)
+        scope = ALL_SCOPES if key is None else key
+        return get_versions(db, (self.name, scoped_name(self.name, scope)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
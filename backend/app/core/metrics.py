@@ -0,0 +1,256 @@
+"""
+Prometheus metrics untuk observability API.
+
+Metrics yang di-export:
+- Request count, latency histogram dan in-flight request per route (template path)
+- Waktu dan jumlah query database per request
+- Statistik connection pool SQLAlchemy
+- Kedalaman antrian job (export, import, upload)
+
+Multiprocess mode: jika environment variable PROMETHEUS_MULTIPROC_DIR di-set
+(lihat Dockerfile), setiap worker uvicorn menulis nilai metric ke direktori tersebut
+dan endpoint /metrics meng-agregasi semua worker sekaligus.
+"""
+import hmac
+import os
+import time
+import ipaddress
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    CONTENT_TYPE_LATEST,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Label route untuk request yang tidak cocok dengan route manapun (404, static files)
+# Best practice: jangan pakai raw path sebagai label agar cardinality tetap terbatas
+UNMATCHED_ROUTE = "<unmatched>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "jargas_http_requests_total",
+    "Jumlah HTTP request",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "jargas_http_request_duration_seconds",
+    "Latency HTTP request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "jargas_http_requests_in_progress",
+    "Jumlah HTTP request yang sedang diproses",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_TOTAL = Counter(
+    "jargas_db_queries_total",
+    "Jumlah query database yang dieksekusi",
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "jargas_db_time_per_request_seconds",
+    "Total waktu query database per HTTP request",
+    ["route"],
+    buckets=DB_TIME_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "jargas_db_queries_per_request",
+    "Jumlah query database per HTTP request",
+    ["route"],
+    buckets=DB_QUERY_COUNT_BUCKETS,
+)
+DB_POOL_SIZE = Gauge(
+    "jargas_db_pool_size",
+    "Ukuran connection pool database",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "jargas_db_pool_checked_out",
+    "Jumlah koneksi database yang sedang dipakai",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "jargas_db_pool_overflow",
+    "Jumlah koneksi overflow di luar pool_size",
+    multiprocess_mode="livesum",
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "jargas_job_queue_depth",
+    "Jumlah job yang sedang antri atau berjalan per queue",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+
+# Akumulator statistik database untuk request yang sedang berjalan.
+# Berupa dict mutable agar update dari threadpool (route sync) tetap terlihat di middleware.
+_request_db_stats: ContextVar[Optional[dict]] = ContextVar("request_db_stats", default=None)
+
+
+def _route_label(scope: dict) -> str:
+    """Ambil template path route (misal /api/v1/inventory/stock-out/{stock_out_id})"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return f"{scope.get('root_path', '')}{path}"
+    return UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware untuk mencatat metrics HTTP.
+
+    Ditulis sebagai pure ASGI middleware (bukan BaseHTTPMiddleware) agar tidak
+    mengganggu StreamingResponse dan overhead per request tetap minimal.
+    """
+
+    def __init__(self, app, exclude_paths: Optional[List[str]] = None):
+        self.app = app
+        self.exclude_paths = set(exclude_paths or [])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        status_code = 500
+        db_stats = {"count": 0, "duration": 0.0}
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method=method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.labels(method=method).dec()
+            _request_db_stats.reset(token)
+
+            route = _route_label(scope)
+            HTTP_REQUESTS_TOTAL.labels(method=method, route=route, status=str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(duration)
+            DB_TIME_PER_REQUEST.labels(route=route).observe(db_stats["duration"])
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(db_stats["count"])
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Pasang event listener SQLAlchemy untuk waktu query dan statistik pool"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        DB_QUERIES_TOTAL.inc()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats["count"] += 1
+            stats["duration"] += duration
+
+    def _update_pool_stats(*args):
+        pool = engine.pool
+        try:
+            DB_POOL_SIZE.set(pool.size())
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        except (AttributeError, NotImplementedError):
+            # Pool tanpa statistik (misal StaticPool/NullPool di testing)
+            pass
+
+    event.listen(engine, "checkout", _update_pool_stats)
+    event.listen(engine, "checkin", _update_pool_stats)
+
+
+@contextmanager
+def track_job(queue: str):
+    """
+    Context manager untuk mencatat job yang sedang berjalan pada sebuah queue.
+
+    Contoh:
+        with track_job("export"):
+            create_excel_export(...)
+    """
+    gauge = JOB_QUEUE_DEPTH.labels(queue=queue)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render semua metrics dalam format text Prometheus (agregasi multiprocess jika aktif)"""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Bersihkan file gauge live* milik worker yang berhenti (multiprocess mode)"""
+    if not MULTIPROC_DIR:
+        return
+    try:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+    except Exception as e:
+        logger.warning(f"Gagal membersihkan metrics worker: {str(e)}")
+
+
+def is_metrics_access_allowed(client_host: Optional[str], authorization: Optional[str],
+                              allowed_networks: List[str], token: str) -> bool:
+    """
+    Cek akses ke endpoint /metrics.
+
+    Akses diizinkan jika IP client berada di salah satu network internal yang diizinkan,
+    atau jika request membawa header `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    if token and authorization and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return True
+    if not client_host:
+        return False
+    try:
+        client_ip = ipaddress.ip_address(client_host)
+    except ValueError:
+        return False
+    for network in allowed_networks:
+        try:
+            if client_ip in ipaddress.ip_network(network, strict=False):
+                return True
+        except ValueError:
+            logger.warning(f"METRICS_ALLOWED_IPS berisi network tidak valid: {network}")
+    return False
@@ -0,0 +1,214 @@
+"""
+Slow-query recorder untuk SQLAlchemy engine.
+
+Setiap query yang melebihi SLOW_QUERY_THRESHOLD_MS dicatat ke ring buffer in-memory
+(per worker) beserta statement, bentuk parameter (tipe, bukan nilai), durasi,
+route yang sedang diproses dan method repository/service pemanggil.
+Untuk SELECT, EXPLAIN bisa dijalankan otomatis (SLOW_QUERY_EXPLAIN=True) di background
+thread dengan koneksi terpisah agar tidak menambah latency request.
+
+Lihat hasilnya di endpoint admin: GET /api/v1/monitoring/slow-queries
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional, List, Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Batas panjang statement yang disimpan
+MAX_STATEMENT_LENGTH = 4000
+# Sequence parameter lebih panjang dari ini (misal IN list) diringkas
+MAX_PARAM_ITEMS = 20
+# Execution option untuk menandai koneksi yang tidak perlu dicatat (misal koneksi EXPLAIN)
+SKIP_OPTION = "slow_query_skip"
+
+# Scope ASGI request yang sedang berjalan, untuk menentukan route pemanggil
+_current_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+
+
+class SlowQueryContextMiddleware:
+    """Pure ASGI middleware yang menyimpan scope request agar route bisa dicatat per query"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def _current_route() -> Optional[str]:
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    method = scope.get("method", "")
+    # Route template baru tersedia setelah routing, fallback ke raw path
+    return f"{method} {path or scope.get('path')}"
+
+
+def _caller() -> Optional[str]:
+    """
+    Cari method repository (atau service jika tidak ada) yang memicu query.
+    Hanya dipanggil untuk query lambat, jadi biaya stack walk tidak masuk hot path.
+    """
+    frame = sys._getframe(2)
+    service_caller = None
+    app_caller = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith("app.core."):
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            label = f"{type(owner).__name__}.{name}" if owner is not None else f"{module}.{name}"
+            if module.startswith("app.repositories"):
+                return label
+            if module.startswith("app.services") and service_caller is None:
+                service_caller = label
+            elif app_caller is None:
+                app_caller = label
+        frame = frame.f_back
+    return service_caller or app_caller
+
+
+def _value_shape(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        if len(value) > MAX_PARAM_ITEMS:
+            return {
+                "count": len(value),
+                "types": sorted({type(v).__name__ for v in value}),
+            }
+        return [type(v).__name__ for v in value]
+    return type(value).__name__
+
+
+def param_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Ringkas parameter query menjadi bentuk (tipe), tanpa menyimpan nilai asli"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"executemany": len(parameters), "row": param_shape(first)}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if parameters is None:
+        return None
+    return _value_shape(parameters)
+
+
+class SlowQueryRecorder:
+    """Ring buffer thread-safe untuk entry slow query"""
+
+    def __init__(self, threshold_ms: int = 500, buffer_size: int = 200, explain: bool = False):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._entries = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine) -> None:
+        """Pasang event listener pada engine"""
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        if conn.get_execution_options().get(SKIP_OPTION):
+            return
+        self.record(statement, parameters, duration_ms, executemany)
+
+    def record(self, statement: str, parameters: Any, duration_ms: float, executemany: bool = False) -> dict:
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "params_shape": param_shape(parameters, executemany),
+            "route": _current_route(),
+            "caller": _caller(),
+            "worker_pid": os.getpid(),
+            "explain": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+        logger.warning(
+            f"Slow query ({entry['duration_ms']} ms) route={entry['route']} caller={entry['caller']}: "
+            f"{entry['statement'][:200]}"
+        )
+
+        if self.explain and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            self._submit_explain(entry, statement, parameters)
+        return entry
+
+    def _submit_explain(self, entry: dict, statement: str, parameters: Any) -> None:
+        if self._engine is None:
+            return
+        if self._executor is None:
+            # Satu thread cukup: EXPLAIN hanya untuk query lambat dan tidak boleh membebani pool
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._run_explain, entry, statement, parameters)
+
+    def _run_explain(self, entry: dict, statement: str, parameters: Any) -> None:
+        try:
+            prefix = "EXPLAIN QUERY PLAN " if self._engine.dialect.name == "sqlite" else "EXPLAIN "
+            with self._engine.connect().execution_options(**{SKIP_OPTION: True}) as conn:
+                result = conn.exec_driver_sql(prefix + statement, parameters)
+                entry["explain"] = [dict(row._mapping) for row in result]
+        except Exception as e:
+            entry["explain"] = {"error": str(e)}
+
+    def get_entries(self, limit: int = 50, min_duration_ms: Optional[float] = None) -> List[dict]:
+        """Ambil entry terbaru lebih dulu"""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        if min_duration_ms is not None:
+            entries = [e for e in entries if e["duration_ms"] >= min_duration_ms]
+        return entries[:limit]
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+
+_recorder: Optional[SlowQueryRecorder] = None
+
+
+def install_slow_query_recorder(engine: Engine, threshold_ms: int, buffer_size: int,
+                                explain: bool = False) -> SlowQueryRecorder:
+    """Buat recorder global dan pasang ke engine (dipanggil sekali dari main.py)"""
+    global _recorder
+    _recorder = SlowQueryRecorder(threshold_ms=threshold_ms, buffer_size=buffer_size, explain=explain)
+    _recorder.attach(engine)
+    return _recorder
+
+
+def get_slow_query_recorder() -> Optional[SlowQueryRecorder]:
+    return _recorder
@@ -1,9 +1,10 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.config.settings import settings
+from app.config.database import engine
 from app.api.v1.router import api_router
 from app.core.exceptions import (
     NotFoundError,
@@ -53,6 +54,26 @@ app.add_middleware(
 )
 
 
+# Metrics Middleware (Prometheus)
+if settings.METRICS_ENABLED:
+    from app.core.metrics import PrometheusMiddleware, instrument_engine
+
+    app.add_middleware(PrometheusMiddleware, exclude_paths=["/metrics", "/health"])
+    instrument_engine(engine)
+
+# Slow Query Log
+if settings.SLOW_QUERY_LOG_ENABLED:
+    from app.core.slow_query import SlowQueryContextMiddleware, install_slow_query_recorder
+
+    app.add_middleware(SlowQueryContextMiddleware)
+    install_slow_query_recorder(
+        engine,
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        buffer_size=settings.SLOW_QUERY_BUFFER_SIZE,
+        explain=settings.SLOW_QUERY_EXPLAIN
+    )
+
+
 # Exception Handlers
 @app.exception_handler(NotFoundError)
 async def not_found_handler(request: Request, exc: NotFoundError):
@@ -272,6 +293,14 @@ async def startup_event():
         logger.warning("Application will continue despite auto-generate error")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Bersihkan metrics worker ini (multiprocess mode) saat shutdown"""
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import mark_worker_dead
+        mark_worker_dead()
+
+
 @app.get("/")
 async def root():
     return {
@@ -284,3 +313,27 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus metrics endpoint.
+    Hanya bisa diakses dari network internal (METRICS_ALLOWED_IPS) atau dengan METRICS_TOKEN.
+    """
+    if not settings.METRICS_ENABLED:
+        return error_response(message="Metrics tidak diaktifkan", status_code=status.HTTP_404_NOT_FOUND)
+
+    from app.core.metrics import render_metrics, is_metrics_access_allowed
+
+    client_host = request.client.host if request.client else None
+    if not is_metrics_access_allowed(
+        client_host,
+        request.headers.get("authorization"),
+        settings.METRICS_ALLOWED_IPS,
+        settings.METRICS_TOKEN
+    ):
+        return error_response(message="Akses ke metrics ditolak", status_code=status.HTTP_403_FORBIDDEN)
+
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
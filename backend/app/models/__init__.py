@@ -7,6 +7,8 @@ from app.models.user.permission import Page, Permission
 from app.models.user.role_permission import RolePermission
 from app.models.user.user_permission import UserPermission
 from app.models.user.user_menu_preference import UserMenuPreference
+from app.models.user.user_closure import UserClosure
+from app.models.cache_version import CacheVersion
 from app.models.project import Project, UserProject
 from app.models.inventory import (
     Material,
@@ -17,6 +19,7 @@ from app.models.inventory import (
     Return,
     Notification,
     AuditLog,
+    ImportJob,
 )
 
 # Note: Table creation sekarang dilakukan via Alembic migrations, bukan di sini
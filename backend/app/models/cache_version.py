@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from app.models.base import Base
+
+
+class CacheVersion(Base):
+    """
+    Version stamp cache in-memory (lihat app/core/cache.py).
+    Disimpan di database agar invalidasi dari satu worker uvicorn terlihat oleh worker lain.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(100), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
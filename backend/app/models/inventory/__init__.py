@@ -10,6 +10,7 @@ from app.models.inventory.surat_permintaan import SuratPermintaan
 from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
 from app.models.inventory.surat_jalan import SuratJalan
 from app.models.inventory.surat_jalan_item import SuratJalanItem
+from app.models.inventory.import_job import ImportJob, ImportJobStatus
 
 __all__ = [
     "Material",
@@ -24,5 +25,7 @@ __all__ = [
     "SuratPermintaanItem",
     "SuratJalan",
     "SuratJalanItem",
+    "ImportJob",
+    "ImportJobStatus",
 ]
 
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime
+from app.models.base import BaseModel
+import enum
+
+
+class ImportJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(BaseModel):
+    """
+    Job import spreadsheet yang diproses di background.
+    Disimpan di database agar progress bisa di-poll dari worker uvicorn manapun.
+    """
+    __tablename__ = "import_jobs"
+
+    job_type = Column(String(50), nullable=False, index=True)  # materials, stock_in, stock_out
+    status = Column(String(20), default=ImportJobStatus.PENDING.value, nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    file_name = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=True)  # File upload sementara, dihapus setelah job selesai
+    options = Column(Text, nullable=True)  # JSON opsi import (misal all_or_nothing)
+    processed_rows = Column(Integer, default=0, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    errors = Column(Text, nullable=True)  # JSON list error per row (dibatasi, terisi bertahap selama proses)
+    result = Column(Text, nullable=True)  # JSON laporan akhir (struktur sama dengan response import sinkron)
+    message = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
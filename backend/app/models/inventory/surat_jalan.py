@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
@@ -7,6 +7,8 @@ class SuratJalan(BaseModel):
     __tablename__ = "surat_jalans"
     __table_args__ = (
         UniqueConstraint('nomor_form', name='uq_surat_jalan_number'),
+        # Keyset pagination listing (created_at DESC, id DESC) per project
+        Index('ix_surat_jalans_project_created_id', 'project_id', 'created_at', 'id'),
     )
 
     nomor_form = Column(String(255), unique=True, nullable=False, index=True)  # Auto-generated nomor form atau nomor barang keluar
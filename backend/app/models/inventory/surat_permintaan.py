@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
@@ -7,6 +7,8 @@ class SuratPermintaan(BaseModel):
     __tablename__ = "surat_permintaans"
     __table_args__ = (
         UniqueConstraint('nomor_surat', name='uq_surat_permintaan_number'),
+        # Keyset pagination listing (created_at DESC, id DESC) per project
+        Index('ix_surat_permintaans_project_created_id', 'project_id', 'created_at', 'id'),
     )
 
     nomor_surat = Column(String(255), unique=True, nullable=False, index=True)  # JRGS-KDL-YYYYMMDD-XXXX
@@ -14,7 +14,7 @@ class User(BaseModel):
     __tablename__ = "users"
 
     email = Column(String(255), unique=True, index=True, nullable=False)
-    name = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     role = Column(SQLEnum(UserRole), default=UserRole.GUDANG, nullable=False, index=True)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=True, index=True)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.models.base import Base
+
+
+class UserClosure(Base):
+    """
+    Closure table hierarchy user (users.created_by): satu baris per pasangan ancestor -> descendant.
+    depth 0 = user itu sendiri, 1 = child langsung, dst. Dipelihara saat user dibuat / dihapus
+    (lihat app/utils/user_hierarchy.py) sehingga semua descendant bisa dibaca dengan satu lookup index.
+    """
+    __tablename__ = "user_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('ix_user_closure_descendant_id', 'descendant_id'),
+    )
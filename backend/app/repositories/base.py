@@ -1,11 +1,55 @@
-from typing import Generic, TypeVar, Type, Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Generic, TypeVar, Type, Optional, List, Dict, Any, Iterator, Iterable, Set
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, Query
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.models.base import BaseModel
 import logging
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
+# Jumlah record per batch untuk stream / iter_all
+STREAM_BATCH_SIZE = 1000
+
+# Jumlah id / row per statement untuk bulk_update, bulk_soft_delete, bulk_create
+BULK_BATCH_SIZE = 1000
+
+# Key di session.info penanda unit of work aktif
+_UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+def in_unit_of_work(db: Session) -> bool:
+    """Cek apakah session sedang berada di dalam unit_of_work"""
+    return bool(db.info.get(_UNIT_OF_WORK_KEY))
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Jalankan beberapa operasi repository dalam satu transaksi.
+
+    Selama blok aktif, create/update/delete/bulk_* di semua repository yang memakai session ini
+    hanya flush (id tetap tersedia), lalu commit sekali di akhir blok. Jika terjadi exception,
+    seluruh perubahan di-rollback. Blok bersarang ikut transaksi terluar.
+
+    Contoh:
+        with unit_of_work(self.db):
+            header = self.header_repo.create(header_data)
+            self.item_repo.bulk_create([{**item, "header_id": header.id} for item in items])
+    """
+    if in_unit_of_work(db):
+        yield db
+        return
+
+    db.info[_UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        db.info.pop(_UNIT_OF_WORK_KEY, None)
+        db.commit()
+    except BaseException:
+        db.info.pop(_UNIT_OF_WORK_KEY, None)
+        db.rollback()
+        raise
+
 
 class BaseRepository(Generic[ModelType]):
     """Base repository class dengan CRUD operations"""
@@ -15,6 +59,22 @@ class BaseRepository(Generic[ModelType]):
         self.db = db
         self.logger = logging.getLogger(__name__)
 
+    def _commit(self) -> None:
+        """Commit, atau hanya flush jika caller mengontrol transaksi lewat unit_of_work"""
+        if in_unit_of_work(self.db):
+            self.db.flush()
+        else:
+            self.db.commit()
+
+    def _rollback(self) -> None:
+        """
+        Rollback hanya jika repository sendiri yang mengontrol transaksi. Dalam unit_of_work
+        exception cukup di-raise ulang agar unit_of_work yang me-rollback seluruh blok;
+        rollback di sini akan membuang perubahan sebelumnya sementara blok tetap berjalan.
+        """
+        if not in_unit_of_work(self.db):
+            self.db.rollback()
+
     def get(self, id: int, project_id: Optional[int] = None) -> Optional[ModelType]:
         """Get single record by ID"""
         try:
@@ -38,26 +98,93 @@ class BaseRepository(Generic[ModelType]):
     ) -> List[ModelType]:
         """Get multiple records with pagination and filters"""
         try:
-            query = self.db.query(self.model)
-            
-            # Auto-filter by project_id if model has project_id column and project_id is provided
-            if project_id is not None and hasattr(self.model, 'project_id'):
-                query = query.filter(self.model.project_id == project_id)
-            
-            # Auto-filter by user hierarchy if model has created_by column and user_id is provided
-            if user_id is not None and hasattr(self.model, 'created_by'):
-                from app.utils.user_hierarchy import filter_by_user_hierarchy
-                query = filter_by_user_hierarchy(query, self.db, user_id, self.model.created_by)
-            
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key):
-                        query = query.filter(getattr(self.model, key) == value)
-            
+            query = self.apply_filters(self.db.query(self.model), project_id, user_id, filters)
             return query.offset(skip).limit(limit).all()
         except SQLAlchemyError:
             return []
 
+    def apply_filters(
+        self,
+        query: Query,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Query:
+        """
+        Terapkan filter standar: project_id, hierarki user (created_by) dan filter kesamaan kolom.
+        Dipakai bersama oleh get_all dan stream agar hasilnya konsisten.
+        """
+        # Auto-filter by project_id if model has project_id column and project_id is provided
+        if project_id is not None and hasattr(self.model, 'project_id'):
+            query = query.filter(self.model.project_id == project_id)
+        
+        # Auto-filter by user hierarchy if model has created_by column and user_id is provided
+        if user_id is not None and hasattr(self.model, 'created_by'):
+            from app.utils.user_hierarchy import filter_by_user_hierarchy
+            query = filter_by_user_hierarchy(query, self.db, user_id, self.model.created_by)
+        
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key):
+                    query = query.filter(getattr(self.model, key) == value)
+        
+        return query
+
+    def stream(
+        self,
+        query: Optional[Query] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[List[ModelType]]:
+        """
+        Baca semua record per batch memakai server-side cursor (yield_per + stream_results),
+        tanpa batas jumlah row dan dengan memory sebesar satu batch.
+
+        Args:
+            query: Query dasar (default: semua record model); filter standar tetap diterapkan
+            batch_size: Jumlah record per batch
+            project_id / user_id / filters: Sama dengan get_all
+
+        Best practice: selama iterasi jangan menjalankan query lain di session yang sama
+        (di MySQL cursor masih terbuka). Relasi yang dibutuhkan harus di-eager load lewat
+        query.options(joinedload(...)), bukan lazy load per record.
+        """
+        if query is None:
+            query = self.db.query(self.model)
+        query = self.apply_filters(query, project_id, user_id, filters)
+        # yield_per otomatis mengaktifkan stream_results (SSCursor di pymysql)
+        query = query.execution_options(stream_results=True).yield_per(batch_size)
+
+        batch: List[ModelType] = []
+        for record in query:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def iter_all(
+        self,
+        query: Optional[Query] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[ModelType]:
+        """Sama dengan stream, tetapi menghasilkan record satu per satu"""
+        for batch in self.stream(query, batch_size, project_id, user_id, filters):
+            yield from batch
+
+    def get_existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """Subset ids yang ada di database, dengan satu query IN (untuk validasi banyak id sekaligus)"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return set()
+        return {row[0] for row in self.db.query(self.model.id).filter(self.model.id.in_(ids)).all()}
+
     def get_by(self, **kwargs) -> Optional[ModelType]:
         """Get single record by field(s)"""
         try:
@@ -71,7 +198,7 @@ class BaseRepository(Generic[ModelType]):
             self.logger.debug(f"Creating {self.model.__name__} with data keys: {list(obj_data.keys())}")
             db_obj = self.model(**obj_data)
             self.db.add(db_obj)
-            self.db.commit()
+            self._commit()
             # Refresh bisa gagal bila skema DB belum sepenuhnya sinkron atau ada masalah dengan enum.
             # Jangan gagalkan operasi create jika refresh gagal.
             try:
@@ -108,7 +235,7 @@ class BaseRepository(Generic[ModelType]):
             self.logger.debug(f"Successfully created {self.model.__name__} with ID: {obj_id}")
             return db_obj
         except IntegrityError as e:
-            self.db.rollback()
+            self._rollback()
             self.logger.error(
                 f"Integrity error creating {self.model.__name__}: {str(e)}. "
                 f"Data keys: {list(obj_data.keys())}",
@@ -117,10 +244,113 @@ class BaseRepository(Generic[ModelType]):
             # Re-raise with original error for upstream handlers to process
             raise
         except SQLAlchemyError as e:
-            self.db.rollback()
+            self._rollback()
             self.logger.error(f"SQLAlchemy error creating {self.model.__name__}: {str(e)}", exc_info=True)
             raise e
 
+    def bulk_create(
+        self,
+        rows: List[Dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+        return_ids: bool = True
+    ) -> List[int]:
+        """
+        Insert banyak record dan kembalikan id-nya dengan urutan yang sama dengan rows.
+
+        return_ids=False (bulk import yang tidak butuh id): satu INSERT executemany per batch
+        di semua database, return list kosong.
+
+        Database yang mendukung INSERT ... RETURNING untuk executemany (SQLite, MariaDB >= 10.5)
+        memakai satu statement per batch. MySQL tidak punya RETURNING, jadi objek ditambahkan
+        lewat ORM dan di-flush per batch; flush tetap mengirim satu INSERT per row karena id
+        diambil dari last-insert-id tiap row (id multi-row INSERT tidak dijamin berurutan pada
+        innodb_autoinc_lock_mode=2). Keuntungannya hanya tanpa get/refresh per row dan commit sekali.
+        Jika id tidak dibutuhkan, pakai return_ids=False.
+        Semua dict sebaiknya punya keys yang sama. Commit sekali di akhir (atau flush dalam unit_of_work).
+        """
+        from sqlalchemy import insert
+
+        ids: List[int] = []
+        if not rows:
+            return ids
+
+        dialect = self.db.get_bind().dialect
+        use_returning = getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False)
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                if not return_ids:
+                    self.db.execute(insert(self.model), batch)
+                elif use_returning:
+                    statement = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+                    ids.extend(self.db.execute(statement, batch).scalars().all())
+                else:
+                    objects = [self.model(**row) for row in batch]
+                    self.db.add_all(objects)
+                    self.db.flush()
+                    ids.extend(obj.id for obj in objects)
+            self._commit()
+            return ids
+        except SQLAlchemyError as e:
+            self._rollback()
+            self.logger.error(f"SQLAlchemy error bulk creating {self.model.__name__}: {str(e)}", exc_info=True)
+            raise
+
+    def bulk_update(
+        self,
+        ids: Iterable[int],
+        values: Dict[str, Any],
+        project_id: Optional[int] = None
+    ) -> int:
+        """
+        Update banyak record dengan satu UPDATE ... WHERE id IN (...) per batch, tanpa get/refresh per row.
+        Keys yang bukan kolom model diabaikan (sama dengan update). Return jumlah row yang berubah.
+        """
+        values = {key: value for key, value in values.items() if hasattr(self.model, key)}
+        if not values:
+            return 0
+        return self._bulk_update(ids, values, project_id)
+
+    def bulk_soft_delete(self, ids: Iterable[int], deleted_by: int, project_id: Optional[int] = None) -> int:
+        """
+        Soft delete banyak record sekaligus (is_deleted=1, deleted_by). Record yang sudah terhapus
+        tidak disentuh sehingga deleted_by aslinya tetap. Return jumlah row yang dihapus.
+        """
+        from sqlalchemy import or_
+
+        if not hasattr(self.model, "is_deleted"):
+            raise AttributeError(f"{self.model.__name__} tidak mendukung soft delete")
+        not_deleted = or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        return self._bulk_update(ids, {"is_deleted": 1, "deleted_by": deleted_by}, project_id, not_deleted)
+
+    def soft_delete(self, id: int, deleted_by: int) -> bool:
+        """Soft delete satu record dengan satu UPDATE (tanpa get/refresh). Return True jika ada yang dihapus"""
+        return self.bulk_soft_delete([id], deleted_by) > 0
+
+    def _bulk_update(self, ids: Iterable[int], values: Dict[str, Any], project_id: Optional[int], *criteria) -> int:
+        from sqlalchemy import update
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return 0
+
+        total = 0
+        try:
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                statement = update(self.model).where(
+                    self.model.id.in_(ids[start:start + BULK_BATCH_SIZE]), *criteria
+                ).values(**values)
+                # Auto-filter by project_id if model has project_id column and project_id is provided
+                if project_id is not None and hasattr(self.model, 'project_id'):
+                    statement = statement.where(self.model.project_id == project_id)
+                total += self.db.execute(statement).rowcount
+            self._commit()
+            return total
+        except SQLAlchemyError as e:
+            self._rollback()
+            self.logger.error(f"SQLAlchemy error bulk updating {self.model.__name__}: {str(e)}", exc_info=True)
+            raise
+
     def update(self, id: int, obj_data: Dict[str, Any]) -> Optional[ModelType]:
         """Update existing record"""
         try:
@@ -132,11 +362,11 @@ class BaseRepository(Generic[ModelType]):
                 if hasattr(db_obj, key):
                     setattr(db_obj, key, value)
             
-            self.db.commit()
+            self._commit()
             self.db.refresh(db_obj)
             return db_obj
         except SQLAlchemyError as e:
-            self.db.rollback()
+            self._rollback()
             raise e
 
     def delete(self, id: int) -> bool:
@@ -147,10 +377,10 @@ class BaseRepository(Generic[ModelType]):
                 return False
             
             self.db.delete(db_obj)
-            self.db.commit()
+            self._commit()
             return True
         except SQLAlchemyError as e:
-            self.db.rollback()
+            self._rollback()
             raise e
 
     def count(self, filters: Optional[Dict[str, Any]] = None, project_id: Optional[int] = None) -> int:
@@ -171,6 +401,56 @@ class BaseRepository(Generic[ModelType]):
         except SQLAlchemyError:
             return 0
 
+    def active_query(
+        self,
+        project_id: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Query:
+        """
+        Query record aktif (is_active == 1 or None) dengan filter project dan filter tambahan.
+        Dipakai get_active / count_active, dan bisa dipakai stream untuk membaca semua record aktif.
+        """
+        from sqlalchemy import or_
+        
+        query = self.db.query(self.model)
+        
+        # Filter by is_active (handle both int 1 and boolean True)
+        if hasattr(self.model, 'is_active'):
+            # Check column type - boolean or integer
+            is_active_col = getattr(self.model.__table__.columns, 'is_active', None)
+            if is_active_col is not None and hasattr(is_active_col.type, 'python_type'):
+                # If boolean type, use True (but convert to proper SQLAlchemy boolean)
+                if is_active_col.type.python_type == bool:
+                    # Use is_(True) instead of == True for proper SQLAlchemy boolean handling
+                    query = query.filter(or_(self.model.is_active.is_(True), self.model.is_active.is_(None)))
+                else:
+                    # Integer type, use 1
+                    query = query.filter(or_(self.model.is_active == 1, self.model.is_active.is_(None)))
+            else:
+                # Fallback: use 1 for integer type (MySQL typically uses INT)
+                query = query.filter(or_(
+                    self.model.is_active == 1,
+                    self.model.is_active.is_(None)
+                ))
+        
+        # Auto-filter by project_id if model has project_id column and project_id is provided
+        if project_id is not None and hasattr(self.model, 'project_id'):
+            query = query.filter(self.model.project_id == project_id)
+        
+        # Apply additional filters
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key):
+                    # Support for LIKE operator (e.g., "nama__like")
+                    if key.endswith('__like'):
+                        field_name = key[:-6]
+                        if hasattr(self.model, field_name):
+                            query = query.filter(getattr(self.model, field_name).like(f"%{value}%"))
+                    else:
+                        query = query.filter(getattr(self.model, key) == value)
+        
+        return query
+
     def get_active(
         self,
         skip: int = 0,
@@ -192,45 +472,7 @@ class BaseRepository(Generic[ModelType]):
             List of active records
         """
         try:
-            from sqlalchemy import or_
-            
-            query = self.db.query(self.model)
-            
-            # Filter by is_active (handle both int 1 and boolean True)
-            if hasattr(self.model, 'is_active'):
-                # Check column type - boolean or integer
-                is_active_col = getattr(self.model.__table__.columns, 'is_active', None)
-                if is_active_col is not None and hasattr(is_active_col.type, 'python_type'):
-                    # If boolean type, use True (but convert to proper SQLAlchemy boolean)
-                    if is_active_col.type.python_type == bool:
-                        # Use is_(True) instead of == True for proper SQLAlchemy boolean handling
-                        query = query.filter(or_(self.model.is_active.is_(True), self.model.is_active.is_(None)))
-                    else:
-                        # Integer type, use 1
-                        query = query.filter(or_(self.model.is_active == 1, self.model.is_active.is_(None)))
-                else:
-                    # Fallback: use 1 for integer type (MySQL typically uses INT)
-                    query = query.filter(or_(
-                        self.model.is_active == 1,
-                        self.model.is_active.is_(None)
-                    ))
-            
-            # Auto-filter by project_id if model has project_id column and project_id is provided
-            if project_id is not None and hasattr(self.model, 'project_id'):
-                query = query.filter(self.model.project_id == project_id)
-            
-            # Apply additional filters
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key):
-                        # Support for LIKE operator (e.g., "nama__like")
-                        if key.endswith('__like'):
-                            field_name = key[:-6]
-                            if hasattr(self.model, field_name):
-                                query = query.filter(getattr(self.model, field_name).like(f"%{value}%"))
-                        else:
-                            query = query.filter(getattr(self.model, key) == value)
-            
+            query = self.active_query(project_id, filters)
             return query.offset(skip).limit(limit).all()
         except SQLAlchemyError:
             return []
@@ -252,45 +494,7 @@ class BaseRepository(Generic[ModelType]):
             Count of active records
         """
         try:
-            from sqlalchemy import or_
-            
-            query = self.db.query(self.model)
-            
-            # Filter by is_active (handle both int 1 and boolean True)
-            if hasattr(self.model, 'is_active'):
-                # Check column type - boolean or integer
-                is_active_col = getattr(self.model.__table__.columns, 'is_active', None)
-                if is_active_col is not None and hasattr(is_active_col.type, 'python_type'):
-                    # If boolean type, use True (but convert to proper SQLAlchemy boolean)
-                    if is_active_col.type.python_type == bool:
-                        # Use is_(True) instead of == True for proper SQLAlchemy boolean handling
-                        query = query.filter(or_(self.model.is_active.is_(True), self.model.is_active.is_(None)))
-                    else:
-                        # Integer type, use 1
-                        query = query.filter(or_(self.model.is_active == 1, self.model.is_active.is_(None)))
-                else:
-                    # Fallback: use 1 for integer type (MySQL typically uses INT)
-                    query = query.filter(or_(
-                        self.model.is_active == 1,
-                        self.model.is_active.is_(None)
-                    ))
-            
-            # Auto-filter by project_id if model has project_id column and project_id is provided
-            if project_id is not None and hasattr(self.model, 'project_id'):
-                query = query.filter(self.model.project_id == project_id)
-            
-            # Apply additional filters
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key):
-                        # Support for LIKE operator (e.g., "nama__like")
-                        if key.endswith('__like'):
-                            field_name = key[:-6]
-                            if hasattr(self.model, field_name):
-                                query = query.filter(getattr(self.model, field_name).like(f"%{value}%"))
-                        else:
-                            query = query.filter(getattr(self.model, key) == value)
-            
+            query = self.active_query(project_id, filters)
             return query.count()
         except SQLAlchemyError:
             return 0
\ No newline at end of file
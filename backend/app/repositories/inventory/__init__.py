@@ -8,6 +8,7 @@ from app.repositories.inventory.notification_repository import NotificationRepos
 from app.repositories.inventory.audit_log_repository import AuditLogRepository
 from app.repositories.inventory.surat_permintaan_repository import SuratPermintaanRepository
 from app.repositories.inventory.surat_jalan_repository import SuratJalanRepository
+from app.repositories.inventory.import_job_repository import ImportJobRepository
 
 __all__ = [
     "MaterialRepository",
@@ -20,5 +21,6 @@ __all__ = [
     "AuditLogRepository",
     "SuratPermintaanRepository",
     "SuratJalanRepository",
+    "ImportJobRepository",
 ]
 
@@ -0,0 +1,26 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.repositories.base import BaseRepository
+from app.models.inventory.import_job import ImportJob
+
+
+class ImportJobRepository(BaseRepository[ImportJob]):
+    """Repository untuk ImportJob"""
+
+    def __init__(self, db: Session):
+        super().__init__(ImportJob, db)
+
+    def get_recent(
+        self,
+        project_id: int,
+        created_by: Optional[int] = None,
+        job_type: Optional[str] = None,
+        limit: int = 20
+    ) -> List[ImportJob]:
+        """Job terbaru di project (opsional hanya milik user tertentu / jenis tertentu)"""
+        query = self.db.query(ImportJob).filter(ImportJob.project_id == project_id)
+        if created_by is not None:
+            query = query.filter(ImportJob.created_by == created_by)
+        if job_type:
+            query = query.filter(ImportJob.job_type == job_type)
+        return query.order_by(ImportJob.id.desc()).limit(limit).all()
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, Query
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy import and_
 from datetime import date
 from decimal import Decimal
@@ -13,6 +13,31 @@ class InstalledRepository(BaseRepository[Installed]):
     def __init__(self, db: Session):
         super().__init__(Installed, db)
 
+    def query_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        material_project_id: Optional[int] = None
+    ) -> Query:
+        """
+        Query barang terpasang yang tidak dihapus, opsional per rentang tanggal dan project
+        (lewat material, sama dengan list endpoint). Dipakai untuk stream tanpa batas row.
+        """
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        )
+        if start_date:
+            query = query.filter(self.model.tanggal_pasang >= start_date)
+        if end_date:
+            query = query.filter(self.model.tanggal_pasang <= end_date)
+        if material_project_id is not None:
+            from app.models.inventory.material import Material
+            query = query.join(Material, self.model.material_id == Material.id).filter(
+                Material.project_id == material_project_id
+            )
+        return query
+
     def get_by_date_range(
         self, 
         start_date: date, 
@@ -45,10 +70,13 @@ class InstalledRepository(BaseRepository[Installed]):
     def get_all_by_project(
         self,
         skip: int = 0,
-        limit: int = 10000,
+        limit: Optional[int] = None,
         project_id: Optional[int] = None
     ) -> List[Installed]:
-        """Get all installed items, optionally filtered by project_id through material"""
+        """Get all installed items, optionally filtered by project_id through material
+        
+        limit=None berarti tanpa batas row (dibaca per batch via iter_all)
+        """
         try:
             from app.models.inventory.material import Material
             
@@ -61,6 +89,9 @@ class InstalledRepository(BaseRepository[Installed]):
             if project_id is not None:
                 query = query.filter(Material.project_id == project_id)
             
+            query = query.order_by(self.model.id)
+            if limit is None:
+                return list(self.iter_all(query.offset(skip)))
             return query.offset(skip).limit(limit).all()
         except Exception:
             return []
@@ -107,7 +138,26 @@ class InstalledRepository(BaseRepository[Installed]):
         except Exception:
             return Decimal('0')
 
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[Installed]:
-        """Soft delete installed item"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
+    def sum_quantity_by_material(self, material_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Total quantity terpasang (tidak dihapus) per material dalam satu query GROUP BY"""
+        from sqlalchemy import func, or_
+        ids = list(set(material_ids))
+        if not ids:
+            return {}
+        rows = self.db.query(self.model.material_id, func.sum(self.model.quantity)).filter(
+            self.model.material_id.in_(ids),
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        ).group_by(self.model.material_id).all()
+        return {material_id: Decimal(str(total or 0)) for material_id, total in rows}
 
+    def sum_quantity_by_stock_out(self, stock_out_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Total quantity terpasang (tidak dihapus) per stock_out_id dalam satu query GROUP BY"""
+        from sqlalchemy import func, or_
+        ids = list(set(stock_out_ids))
+        if not ids:
+            return {}
+        rows = self.db.query(self.model.stock_out_id, func.sum(self.model.quantity)).filter(
+            self.model.stock_out_id.in_(ids),
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        ).group_by(self.model.stock_out_id).all()
+        return {stock_out_id: Decimal(str(total or 0)) for stock_out_id, total in rows}
@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict
 from app.models.inventory.mandor import Mandor
 from app.repositories.base import BaseRepository
+from app.utils.text_search import text_search, SEARCH_CONTAINS
 
 
 class MandorRepository(BaseRepository[Mandor]):
@@ -14,21 +15,44 @@ class MandorRepository(BaseRepository[Mandor]):
         """Get all active mandors - menggunakan get_active() dari base"""
         return self.get_active(skip=skip, limit=limit, project_id=project_id)
 
-    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[Mandor]:
-        """Search mandors by name"""
+    def get_name_map(self, project_id: int) -> Dict[str, List[int]]:
+        """
+        Map nama mandor (lowercase, spasi dirapikan) -> list id mandor aktif di project.
+        Lebih dari satu id berarti nama ambigu. Dipakai import barang keluar.
+        """
+        rows = self.db.query(self.model.id, self.model.nama).filter(
+            self.model.project_id == project_id,
+            self.model.is_active == 1
+        ).all()
+        name_map: Dict[str, List[int]] = {}
+        for row in rows:
+            key = " ".join((row.nama or "").lower().split())
+            if key:
+                name_map.setdefault(key, []).append(row.id)
+        return name_map
+
+    def search_by_name(
+        self,
+        nama: str,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[int] = None,
+        mode: str = SEARCH_CONTAINS
+    ) -> List[Mandor]:
+        """Search mandors by name, urut berdasarkan relevansi (FULLTEXT di MySQL)"""
         try:
-            from sqlalchemy import and_
+            criterion, relevance = text_search(self.db, [self.model.nama], nama, mode)
+            if criterion is None:
+                return []
             query = self.db.query(self.model).filter(
-                and_(
-                    self.model.nama.like(f"%{nama}%"),
-                    self.model.is_active == 1
-                )
+                criterion,
+                self.model.is_active == 1
             )
             
             if project_id is not None:
                 query = query.filter(self.model.project_id == project_id)
             
-            return query.offset(skip).limit(limit).all()
+            return query.order_by(relevance.desc(), self.model.nama).offset(skip).limit(limit).all()
         except Exception:
             return []
 
@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query
 from sqlalchemy import or_
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Set, Tuple
 from app.models.inventory.material import Material
 from app.repositories.base import BaseRepository
+from app.utils.text_search import text_search, SEARCH_CONTAINS
 
 
 class MaterialRepository(BaseRepository[Material]):
@@ -28,72 +29,157 @@ class MaterialRepository(BaseRepository[Material]):
         """Hitung jumlah material aktif + NULL - menggunakan count_active() dari base"""
         return self.count_active(project_id=project_id)
 
-    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[Material]:
-        """Search materials by name"""
-        try:
-            from sqlalchemy import and_
-            query = self.db.query(self.model).filter(
-                and_(
-                    self.model.nama_barang.like(f"%{nama}%"),
-                    or_(self.model.is_active == 1, self.model.is_active.is_(None))
-                )
-            )
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
-            return query.offset(skip).limit(limit).all()
-        except Exception:
-            return []
+    def search_by_name(
+        self,
+        nama: str,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[int] = None,
+        mode: str = SEARCH_CONTAINS
+    ) -> List[Material]:
+        """Search materials by name, urut berdasarkan relevansi"""
+        return self._search([self.model.nama_barang], nama, skip, limit, project_id, mode)
 
-    def search_by_name_or_code(self, search_term: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[Material]:
-        """Search materials by name or code"""
+    def search_by_name_or_code(
+        self,
+        search_term: str,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[int] = None,
+        mode: str = SEARCH_CONTAINS
+    ) -> List[Material]:
+        """Search materials by name or code, urut berdasarkan relevansi (FULLTEXT di MySQL)"""
+        return self._search(
+            [self.model.kode_barang, self.model.nama_barang], search_term, skip, limit, project_id, mode
+        )
+
+    def search_query(
+        self,
+        search_term: str,
+        project_id: Optional[int] = None,
+        mode: str = SEARCH_CONTAINS
+    ) -> Optional[Query]:
+        """Query material aktif yang cocok dengan nama / kode tanpa limit (untuk stream), None jika term kosong"""
+        return self._search_query([self.model.kode_barang, self.model.nama_barang], search_term, project_id, mode)
+
+    def _search_query(self, columns, term: str, project_id: Optional[int], mode: str) -> Optional[Query]:
+        criterion, relevance = text_search(self.db, columns, term, mode)
+        if criterion is None:
+            return None
+        query = self.db.query(self.model).filter(
+            criterion,
+            or_(self.model.is_active == 1, self.model.is_active.is_(None))
+        )
+        
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+        
+        return query.order_by(relevance.desc(), self.model.nama_barang)
+
+    def _search(self, columns, term: str, skip: int, limit: int, project_id: Optional[int], mode: str) -> List[Material]:
         try:
-            from sqlalchemy import and_
-            query = self.db.query(self.model).filter(
-                and_(
-                    or_(
-                        self.model.nama_barang.like(f"%{search_term}%"),
-                        self.model.kode_barang.like(f"%{search_term}%")
-                    ),
-                    or_(self.model.is_active == 1, self.model.is_active.is_(None))
-                )
-            )
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
+            query = self._search_query(columns, term, project_id, mode)
+            if query is None:
+                return []
             return query.offset(skip).limit(limit).all()
         except Exception:
             return []
 
-    def get_unique_satuans(self) -> List[str]:
-        """Get unique satuan values from active materials"""
+    def get_kode_set(self, project_id: int) -> Set[str]:
+        """Ambil semua kode_barang di project dalam satu query (untuk validasi bulk import)"""
+        rows = self.db.query(self.model.kode_barang).filter(
+            self.model.project_id == project_id,
+            self.model.kode_barang.isnot(None)
+        ).all()
+        return {row[0] for row in rows}
+
+    def get_kode_map(self, project_id: int) -> Dict[str, Tuple[int, int]]:
+        """
+        Map kode_barang (lowercase) -> (material_id, is_active) untuk semua material di project.
+        Dipakai import transaksi agar kode barang di file di-resolve tanpa query per row.
+        """
+        rows = self.db.query(self.model.id, self.model.kode_barang, self.model.is_active).filter(
+            self.model.project_id == project_id,
+            self.model.kode_barang.isnot(None)
+        ).all()
+        return {
+            row.kode_barang.strip().lower(): (row.id, 0 if row.is_active == 0 else 1)
+            for row in rows if row.kode_barang.strip()
+        }
+
+    def get_unique_satuans(self, project_id: Optional[int] = None) -> List[str]:
+        """Get unique satuan values from active materials (optional per project)"""
         try:
             from sqlalchemy import distinct, and_
-            results = self.db.query(distinct(self.model.satuan)).filter(
+            query = self.db.query(distinct(self.model.satuan)).filter(
                 and_(
                     or_(self.model.is_active == 1, self.model.is_active.is_(None)),
                     self.model.satuan.isnot(None),
                     self.model.satuan != ''
                 )
-            ).order_by(self.model.satuan).all()
+            )
+            if project_id is not None:
+                query = query.filter(self.model.project_id == project_id)
+            results = query.order_by(self.model.satuan).all()
             return [result[0] for result in results if result[0]]
         except Exception:
             return []
 
-    def get_unique_kategoris(self) -> List[str]:
-        """Get unique kategori values from active materials"""
+    def get_unique_kategoris(self, project_id: Optional[int] = None) -> List[str]:
+        """Get unique kategori values from active materials (optional per project)"""
         try:
             from sqlalchemy import distinct, and_
-            results = self.db.query(distinct(self.model.kategori)).filter(
+            query = self.db.query(distinct(self.model.kategori)).filter(
                 and_(
                     or_(self.model.is_active == 1, self.model.is_active.is_(None)),
                     self.model.kategori.isnot(None),
                     self.model.kategori != ''
                 )
-            ).order_by(self.model.kategori).all()
+            )
+            if project_id is not None:
+                query = query.filter(self.model.project_id == project_id)
+            results = query.order_by(self.model.kategori).all()
             return [result[0] for result in results if result[0]]
         except Exception:
             return []
 
+    def count_usage(self, material_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Jumlah pemakaian material di tabel transaksi (stock in/out, installed, return yang belum dihapus
+        dan surat permintaan item) untuk banyak material sekaligus.
+
+        Best practice: satu query UNION ALL dari COUNT ... GROUP BY material_id per tabel (memakai index
+        material_id), bukan lima COUNT per material. Material yang tidak dipakai tidak ada di hasil.
+
+        Returns:
+            {material_id: {sumber: jumlah}} dengan sumber stock_in, stock_out, installed, return, surat_permintaan
+        """
+        from sqlalchemy import func, literal, select, union_all
+        from app.models.inventory.stock_in import StockIn
+        from app.models.inventory.stock_out import StockOut
+        from app.models.inventory.installed import Installed
+        from app.models.inventory.return_model import Return
+        from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
+
+        ids = list(set(material_ids))
+        if not ids:
+            return {}
+
+        def usage_select(source: str, model, *conditions):
+            return select(
+                literal(source).label("source"),
+                model.material_id.label("material_id"),
+                func.count().label("total")
+            ).where(model.material_id.in_(ids), *conditions).group_by(model.material_id)
+
+        statement = union_all(
+            usage_select("stock_in", StockIn, StockIn.is_deleted == 0),
+            usage_select("stock_out", StockOut, StockOut.is_deleted == 0),
+            usage_select("installed", Installed, Installed.is_deleted == 0),
+            usage_select("return", Return, Return.is_deleted == 0),
+            usage_select("surat_permintaan", SuratPermintaanItem),
+        )
+        usage: Dict[int, Dict[str, int]] = {}
+        for source, material_id, total in self.db.execute(statement):
+            usage.setdefault(material_id, {})[source] = total
+        return usage
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.models.inventory.notification import Notification
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, in_unit_of_work
 
 
 class NotificationRepository(BaseRepository[Notification]):
@@ -14,6 +14,23 @@ class NotificationRepository(BaseRepository[Notification]):
         """Get all unread notifications"""
         return self.get_all(skip=skip, limit=limit, filters={"is_read": False})
 
+    def count_unread(self, project_id: Optional[int] = None) -> int:
+        """Jumlah notifikasi belum dibaca, optional per project (lewat material)"""
+        query = self.db.query(self.model).filter(self.model.is_read == False)
+        if project_id is not None:
+            from app.models.inventory.material import Material
+            query = query.join(Material, Material.id == self.model.material_id).filter(
+                Material.project_id == project_id
+            )
+        return query.count()
+
+    def get_project_id(self, id: int) -> Optional[int]:
+        """Project notifikasi (lewat material)"""
+        from app.models.inventory.material import Material
+        return self.db.query(Material.project_id).join(
+            self.model, self.model.material_id == Material.id
+        ).filter(self.model.id == id).scalar()
+
     def mark_as_read(self, id: int) -> bool:
         """Mark notification as read"""
         updated = self.update(id, {"is_read": True})
@@ -25,9 +42,11 @@ class NotificationRepository(BaseRepository[Notification]):
             count = self.db.query(self.model).filter(
                 self.model.is_read == False
             ).update({"is_read": True})
-            self.db.commit()
+            self._commit()
             return count
         except Exception:
+            if in_unit_of_work(self.db):
+                raise
             self.db.rollback()
             return 0
 
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, Query
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy import and_, func
 from datetime import date
 from decimal import Decimal
@@ -13,6 +13,31 @@ class ReturnRepository(BaseRepository[Return]):
     def __init__(self, db: Session):
         super().__init__(Return, db)
 
+    def query_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        material_project_id: Optional[int] = None
+    ) -> Query:
+        """
+        Query barang pengembalian yang tidak dihapus, opsional per rentang tanggal dan project
+        (lewat material, sama dengan list endpoint). Dipakai untuk stream tanpa batas row.
+        """
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        )
+        if start_date:
+            query = query.filter(self.model.tanggal_kembali >= start_date)
+        if end_date:
+            query = query.filter(self.model.tanggal_kembali <= end_date)
+        if material_project_id is not None:
+            from app.models.inventory.material import Material
+            query = query.join(Material, self.model.material_id == Material.id).filter(
+                Material.project_id == material_project_id
+            )
+        return query
+
     def get_by_date_range(
         self, 
         start_date: date, 
@@ -95,6 +120,28 @@ class ReturnRepository(BaseRepository[Return]):
         except Exception:
             return Decimal('0')
 
+    def sum_by_stock_out(self, stock_out_ids: Iterable[int]) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """
+        Total (quantity_kembali, quantity_kondisi_reject) per stock_out_id dalam satu query GROUP BY
+        (tidak termasuk yang deleted). stock_out tanpa return tidak ada di hasil.
+        """
+        from sqlalchemy import or_
+        ids = list(set(stock_out_ids))
+        if not ids:
+            return {}
+        rows = self.db.query(
+            self.model.stock_out_id,
+            func.sum(self.model.quantity_kembali),
+            func.sum(self.model.quantity_kondisi_reject)
+        ).filter(
+            self.model.stock_out_id.in_(ids),
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        ).group_by(self.model.stock_out_id).all()
+        return {
+            stock_out_id: (Decimal(str(kembali or 0)), Decimal(str(reject or 0)))
+            for stock_out_id, kembali, reject in rows
+        }
+
     def get_by_stock_out(self, stock_out_id: int) -> List[Return]:
         """Get all returns by stock_out_id (tidak termasuk yang deleted)"""
         try:
@@ -108,20 +155,21 @@ class ReturnRepository(BaseRepository[Return]):
         except Exception:
             return []
 
-    def get_all_by_material(self, material_id: int, skip: int = 0, limit: int = 10000) -> List[Return]:
-        """Get all returns by material_id, tanpa filter project_id (untuk backward compatibility)"""
+    def get_all_by_material(self, material_id: int, skip: int = 0, limit: Optional[int] = None) -> List[Return]:
+        """Get all returns by material_id, tanpa filter project_id (untuk backward compatibility)
+        
+        limit=None berarti tanpa batas row (dibaca per batch via iter_all)
+        """
         try:
             from sqlalchemy import or_
-            return self.db.query(self.model).filter(
+            query = self.db.query(self.model).filter(
                 and_(
                     self.model.material_id == material_id,
                     or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
                 )
-            ).offset(skip).limit(limit).all()
+            ).order_by(self.model.id)
+            if limit is None:
+                return list(self.iter_all(query.offset(skip)))
+            return query.offset(skip).limit(limit).all()
         except Exception:
             return []
-
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[Return]:
-        """Soft delete return"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
-
@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, Query
+from typing import Dict, Iterable, List, Optional
+from decimal import Decimal
 from sqlalchemy import and_
 from datetime import date
 from app.models.inventory.stock_in import StockIn
@@ -12,6 +13,31 @@ class StockInRepository(BaseRepository[StockIn]):
     def __init__(self, db: Session):
         super().__init__(StockIn, db)
 
+    def query_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        material_project_id: Optional[int] = None
+    ) -> Query:
+        """
+        Query barang masuk yang tidak dihapus, opsional per rentang tanggal dan project
+        (lewat material, sama dengan list endpoint). Dipakai untuk stream tanpa batas row.
+        """
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        )
+        if start_date:
+            query = query.filter(self.model.tanggal_masuk >= start_date)
+        if end_date:
+            query = query.filter(self.model.tanggal_masuk <= end_date)
+        if material_project_id is not None:
+            from app.models.inventory.material import Material
+            query = query.join(Material, self.model.material_id == Material.id).filter(
+                Material.project_id == material_project_id
+            )
+        return query
+
     def get_by_date_range(
         self, 
         start_date: date, 
@@ -50,7 +76,14 @@ class StockInRepository(BaseRepository[StockIn]):
         except Exception:
             return []
 
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[StockIn]:
-        """Soft delete stock in"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
-
+    def sum_quantity_by_material(self, material_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Total quantity masuk (tidak dihapus) per material dalam satu query GROUP BY"""
+        from sqlalchemy import func, or_
+        ids = list(set(material_ids))
+        if not ids:
+            return {}
+        rows = self.db.query(self.model.material_id, func.sum(self.model.quantity)).filter(
+            self.model.material_id.in_(ids),
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        ).group_by(self.model.material_id).all()
+        return {material_id: Decimal(str(total or 0)) for material_id, total in rows}
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, Query
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy import and_, func
 from datetime import date
 from app.models.inventory.stock_out import StockOut
@@ -24,6 +24,31 @@ class StockOutRepository(BaseRepository[StockOut]):
         except Exception:
             return None
 
+    def query_by_date_range(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        material_project_id: Optional[int] = None
+    ) -> Query:
+        """
+        Query barang keluar yang tidak dihapus, opsional per rentang tanggal dan project
+        (lewat material, sama dengan list endpoint). Dipakai untuk stream tanpa batas row.
+        """
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
+        )
+        if start_date:
+            query = query.filter(self.model.tanggal_keluar >= start_date)
+        if end_date:
+            query = query.filter(self.model.tanggal_keluar <= end_date)
+        if material_project_id is not None:
+            from app.models.inventory.material import Material
+            query = query.join(Material, self.model.material_id == Material.id).filter(
+                Material.project_id == material_project_id
+            )
+        return query
+
     def get_by_date_range(
         self, 
         start_date: date, 
@@ -108,16 +133,22 @@ class StockOutRepository(BaseRepository[StockOut]):
         except Exception:
             return []
     
-    def get_all_by_material(self, material_id: int, skip: int = 0, limit: int = 10000) -> List[StockOut]:
-        """Get all stock outs by material_id, tanpa filter project_id (untuk backward compatibility)"""
+    def get_all_by_material(self, material_id: int, skip: int = 0, limit: Optional[int] = None) -> List[StockOut]:
+        """Get all stock outs by material_id, tanpa filter project_id (untuk backward compatibility)
+        
+        limit=None berarti tanpa batas row (dibaca per batch via iter_all)
+        """
         try:
             from sqlalchemy import or_
-            return self.db.query(self.model).filter(
+            query = self.db.query(self.model).filter(
                 and_(
                     self.model.material_id == material_id,
                     or_(self.model.is_deleted == 0, self.model.is_deleted.is_(None))
                 )
-            ).offset(skip).limit(limit).all()
+            ).order_by(self.model.id)
+            if limit is None:
+                return list(self.iter_all(query.offset(skip)))
+            return query.offset(skip).limit(limit).all()
         except Exception:
             return []
 
@@ -185,7 +216,35 @@ class StockOutRepository(BaseRepository[StockOut]):
             logger.warning(f"Error getting next number for date {tanggal}: {str(e)}", exc_info=True)
             return 1
 
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[StockOut]:
-        """Soft delete stock out"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
+    def get_max_numbers_for_dates(self, dates: Iterable[date]) -> Dict[date, int]:
+        """
+        Nomor urut terbesar JRGS-KDL-YYYYMMDD-XXXX per tanggal, untuk banyak tanggal sekaligus.
+
+        Satu range scan di unique index nomor_barang_keluar (prefix tanggal terkecil s/d terbesar),
+        dipakai import barang keluar untuk mengalokasikan blok nomor tanpa query per row.
+        Sama seperti get_next_number_for_date: tidak filter is_deleted / project_id.
+        """
+        wanted = {tanggal.strftime("%Y%m%d"): tanggal for tanggal in dates}
+        if not wanted:
+            return {}
+        # '.' tepat setelah '-' di ASCII, jadi batas atas mencakup semua nomor di tanggal terbesar
+        lower = f"JRGS-KDL-{min(wanted)}-"
+        upper = f"JRGS-KDL-{max(wanted)}."
+        rows = self.db.query(self.model.nomor_barang_keluar).filter(
+            self.model.nomor_barang_keluar >= lower,
+            self.model.nomor_barang_keluar < upper
+        ).all()
 
+        max_numbers = {tanggal: 0 for tanggal in wanted.values()}
+        for (nomor,) in rows:
+            parts = nomor.split("-")
+            if len(parts) != 4 or parts[2] not in wanted:
+                continue
+            try:
+                num = int(parts[3])
+            except ValueError:
+                continue
+            tanggal = wanted[parts[2]]
+            if num > max_numbers[tanggal]:
+                max_numbers[tanggal] = num
+        return max_numbers
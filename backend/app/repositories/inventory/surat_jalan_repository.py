@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import date
 from app.models.inventory.surat_jalan import SuratJalan
 from app.repositories.base import BaseRepository
@@ -107,43 +107,104 @@ class SuratJalanRepository(BaseRepository[SuratJalan]):
         except Exception:
             return None
 
+    def _search_query(self, search: str, project_id: Optional[int] = None):
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(
+                self.model.nomor_form.like(f"%{search}%"),
+                self.model.kepada.like(f"%{search}%")
+            )
+        ).filter(self.model.is_deleted == 0)
+        
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+        return query
+
+    def _date_range_query(self, start_date: date, end_date: date, project_id: Optional[int] = None):
+        query = self.db.query(self.model).filter(
+            self.model.tanggal_pengiriman >= start_date,
+            self.model.tanggal_pengiriman <= end_date,
+            self.model.is_deleted == 0
+        )
+        
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+        return query
+
     def search_by_nomor_or_kepada(self, search: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[SuratJalan]:
         """Search surat jalan by nomor form atau kepada"""
         try:
-            from sqlalchemy import or_
-            query = self.db.query(self.model).filter(
-                or_(
-                    self.model.nomor_form.like(f"%{search}%"),
-                    self.model.kepada.like(f"%{search}%")
-                )
-            ).filter(self.model.is_deleted == 0)
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
-            return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
+            return self._search_query(search, project_id).order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         except Exception:
             return []
 
+    def count_search(self, search: str, project_id: Optional[int] = None) -> int:
+        """Jumlah hasil search_by_nomor_or_kepada (COUNT di database, tanpa mengambil row)"""
+        try:
+            return self._search_query(search, project_id).count()
+        except Exception:
+            return 0
+
     def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[SuratJalan]:
         """Get surat jalan by date range"""
         try:
-            query = self.db.query(self.model).filter(
-                self.model.tanggal_pengiriman >= start_date,
-                self.model.tanggal_pengiriman <= end_date,
-                self.model.is_deleted == 0
-            )
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
-            return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
+            return self._date_range_query(start_date, end_date, project_id).order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         except Exception:
             return []
 
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[SuratJalan]:
-        """Soft delete surat jalan"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
+    def count_by_date_range(self, start_date: date, end_date: date, project_id: Optional[int] = None) -> int:
+        """Jumlah surat jalan pada rentang tanggal (COUNT di database, tanpa mengambil row)"""
+        try:
+            return self._date_range_query(start_date, end_date, project_id).count()
+        except Exception:
+            return 0
+
+    def get_page_keyset(
+        self,
+        cursor_values: Optional[Dict[str, Any]],
+        limit: int = 100,
+        search: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False
+    ) -> Tuple[List, Optional[str], Optional[int]]:
+        """
+        Get satu halaman dengan keyset pagination (created_at DESC, id DESC).
+        Filter sama dengan get_all / search / get_by_date_range, tanpa OFFSET.
+
+        Returns:
+            (items, next_cursor, total) - total None jika include_total False
+        """
+        from sqlalchemy import or_
+        from app.utils.pagination import paginate_keyset
+
+        query = self.db.query(self.model).filter(self.model.is_deleted == 0)
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+
+        if search:
+            query = query.filter(
+                or_(
+                    self.model.nomor_form.like(f"%{search}%"),
+                    self.model.kepada.like(f"%{search}%")
+                )
+            )
+        elif start_date and end_date:
+            query = query.filter(
+                self.model.tanggal_pengiriman >= start_date,
+                self.model.tanggal_pengiriman <= end_date
+            )
+        elif user_id is not None:
+            from app.utils.user_hierarchy import filter_by_user_hierarchy
+            query = filter_by_user_hierarchy(query, self.db, user_id, self.model.created_by)
+
+        total = query.count() if include_total else None
+        items, next_cursor = paginate_keyset(
+            query, self.model.id, cursor_values, limit, sort_column=self.model.created_at
+        )
+        return items, next_cursor, total
 
     def is_nomor_barang_keluar_used(self, nomor_barang_keluar: str, exclude_id: Optional[int] = None, project_id: Optional[int] = None) -> bool:
         """Cek apakah nomor barang keluar sudah pernah digunakan untuk surat jalan lain
@@ -178,4 +239,3 @@ class SuratJalanRepository(BaseRepository[SuratJalan]):
         except Exception:
             # Jika error, assume belum digunakan untuk safety
             return False
-
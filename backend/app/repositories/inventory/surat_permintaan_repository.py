@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import date
 from app.models.inventory.surat_permintaan import SuratPermintaan
 from app.repositories.base import BaseRepository
@@ -64,6 +64,21 @@ class SuratPermintaanRepository(BaseRepository[SuratPermintaan]):
             logger.warning(f"Error getting next number for project code {project_code}: {str(e)}", exc_info=True)
             return 1
 
+    def _listing_options(self) -> tuple:
+        """
+        Loader relasi untuk listing: items -> material, project dan creator ikut di-load bersama query halaman.
+        Best practice: selectinload = satu query IN per relasi, jumlah query tetap berapapun ukuran halaman
+        (tanpa baris kartesian seperti joinedload pada relasi one-to-many).
+        """
+        from sqlalchemy.orm import selectinload
+        from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
+
+        return (
+            selectinload(self.model.items).selectinload(SuratPermintaanItem.material),
+            selectinload(self.model.project),
+            selectinload(self.model.creator),
+        )
+
     def get_all(
         self,
         skip: int = 0,
@@ -72,7 +87,7 @@ class SuratPermintaanRepository(BaseRepository[SuratPermintaan]):
         project_id: Optional[int] = None,
         user_id: Optional[int] = None
     ) -> List[SuratPermintaan]:
-        """Get all surat permintaan dengan sorting berdasarkan created_at DESC (terbaru dulu)"""
+        """Get all surat permintaan dengan sorting berdasarkan created_at DESC (terbaru dulu), relasi listing ikut di-load"""
         try:
             query = self.db.query(self.model)
             
@@ -91,6 +106,7 @@ class SuratPermintaanRepository(BaseRepository[SuratPermintaan]):
                         query = query.filter(getattr(self.model, key) == value)
             
             # Sort berdasarkan created_at DESC (terbaru dulu)
+            query = query.options(*self._listing_options())
             return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         except Exception:
             return []
@@ -107,41 +123,104 @@ class SuratPermintaanRepository(BaseRepository[SuratPermintaan]):
         except Exception:
             return None
 
+    def _search_query(self, search: str, project_id: Optional[int] = None):
+        from sqlalchemy import or_
+        query = self.db.query(self.model).filter(
+            or_(
+                self.model.nomor_surat.like(f"%{search}%"),
+                self.model.tanggal.like(f"%{search}%")
+            )
+        ).filter(self.model.is_deleted == 0)
+        
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+        return query
+
+    def _date_range_query(self, start_date: date, end_date: date, project_id: Optional[int] = None):
+        query = self.db.query(self.model).filter(
+            self.model.tanggal >= start_date,
+            self.model.tanggal <= end_date,
+            self.model.is_deleted == 0
+        )
+        
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+        return query
+
     def search_by_nomor_or_date(self, search: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[SuratPermintaan]:
         """Search surat permintaan by nomor surat atau tanggal"""
         try:
-            from sqlalchemy import or_
-            query = self.db.query(self.model).filter(
-                or_(
-                    self.model.nomor_surat.like(f"%{search}%"),
-                    self.model.tanggal.like(f"%{search}%")
-                )
-            ).filter(self.model.is_deleted == 0)
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
+            query = self._search_query(search, project_id).options(*self._listing_options())
             return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         except Exception:
             return []
 
+    def count_search(self, search: str, project_id: Optional[int] = None) -> int:
+        """Jumlah hasil search_by_nomor_or_date (COUNT di database, tanpa mengambil row)"""
+        try:
+            return self._search_query(search, project_id).count()
+        except Exception:
+            return 0
+
     def get_by_date_range(self, start_date: date, end_date: date, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List[SuratPermintaan]:
         """Get surat permintaan by date range"""
         try:
-            query = self.db.query(self.model).filter(
-                self.model.tanggal >= start_date,
-                self.model.tanggal <= end_date,
-                self.model.is_deleted == 0
-            )
-            
-            if project_id is not None:
-                query = query.filter(self.model.project_id == project_id)
-            
+            query = self._date_range_query(start_date, end_date, project_id).options(*self._listing_options())
             return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
         except Exception:
             return []
 
-    def soft_delete(self, id: int, deleted_by: int) -> Optional[SuratPermintaan]:
-        """Soft delete surat permintaan"""
-        return self.update(id, {"is_deleted": 1, "deleted_by": deleted_by})
+    def count_by_date_range(self, start_date: date, end_date: date, project_id: Optional[int] = None) -> int:
+        """Jumlah surat permintaan pada rentang tanggal (COUNT di database, tanpa mengambil row)"""
+        try:
+            return self._date_range_query(start_date, end_date, project_id).count()
+        except Exception:
+            return 0
+
+    def get_page_keyset(
+        self,
+        cursor_values: Optional[Dict[str, Any]],
+        limit: int = 100,
+        search: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False
+    ) -> Tuple[List, Optional[str], Optional[int]]:
+        """
+        Get satu halaman dengan keyset pagination (created_at DESC, id DESC).
+        Filter sama dengan get_all / search / get_by_date_range, tanpa OFFSET.
+
+        Returns:
+            (items, next_cursor, total) - total None jika include_total False
+        """
+        from sqlalchemy import or_
+        from app.utils.pagination import paginate_keyset
+
+        query = self.db.query(self.model).filter(self.model.is_deleted == 0)
+        if project_id is not None:
+            query = query.filter(self.model.project_id == project_id)
+
+        if search:
+            query = query.filter(
+                or_(
+                    self.model.nomor_surat.like(f"%{search}%"),
+                    self.model.tanggal.like(f"%{search}%")
+                )
+            )
+        elif start_date and end_date:
+            query = query.filter(
+                self.model.tanggal >= start_date,
+                self.model.tanggal <= end_date
+            )
+        elif user_id is not None:
+            from app.utils.user_hierarchy import filter_by_user_hierarchy
+            query = filter_by_user_hierarchy(query, self.db, user_id, self.model.created_by)
 
+        total = query.count() if include_total else None
+        items, next_cursor = paginate_keyset(
+            query.options(*self._listing_options()), self.model.id, cursor_values, limit,
+            sort_column=self.model.created_at
+        )
+        return items, next_cursor, total
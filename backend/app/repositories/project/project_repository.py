@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy import and_
 from app.models.project.project import Project
 from app.repositories.base import BaseRepository
@@ -38,3 +38,20 @@ class ProjectRepository(BaseRepository[Project]):
         except Exception:
             return []
 
+
+    def get_projects_with_ownership_by_user(self, user_id: int) -> List[Tuple[Project, bool]]:
+        """
+        Semua project aktif untuk user beserta flag is_owner, dengan satu query join.
+        Jumlah baris hasil sekaligus menjadi total (tidak perlu COUNT terpisah).
+        """
+        from app.models.project.user_project import UserProject
+
+        return self.db.query(Project, UserProject.is_owner).join(
+            UserProject, Project.id == UserProject.project_id
+        ).filter(
+            and_(
+                UserProject.user_id == user_id,
+                UserProject.is_active == True,
+                Project.is_active == True
+            )
+        ).order_by(Project.id).all()
@@ -38,6 +38,12 @@ class PermissionRepository(BaseRepository[Permission]):
         """Get all permissions for a page"""
         return self.db.query(Permission).filter(Permission.page_id == page_id).all()
 
+    def get_by_page_ids(self, page_ids: List[int]) -> List[Permission]:
+        """Get all permissions untuk banyak page sekaligus (satu query IN)"""
+        if not page_ids:
+            return []
+        return self.db.query(Permission).filter(Permission.page_id.in_(page_ids)).order_by(Permission.id).all()
+
     def get_with_page(self, permission_id: int) -> Optional[Permission]:
         """Get permission with page loaded"""
         from sqlalchemy.orm import joinedload
@@ -45,6 +51,23 @@ class PermissionRepository(BaseRepository[Permission]):
             joinedload(Permission.page)
         ).filter(Permission.id == permission_id).first()
 
+    def get_effective_for_user(self, user_id: int, role_id: Optional[int]) -> List[Permission]:
+        """Permission efektif user (role permissions ∪ user overrides) beserta page-nya dalam satu query"""
+        from sqlalchemy import select, union
+        from sqlalchemy.orm import joinedload
+        from app.models.user.role_permission import RolePermission
+        from app.models.user.user_permission import UserPermission
+
+        permission_ids = select(UserPermission.permission_id).where(UserPermission.user_id == user_id)
+        if role_id:
+            permission_ids = union(
+                permission_ids,
+                select(RolePermission.permission_id).where(RolePermission.role_id == role_id)
+            )
+        return self.db.query(Permission).options(
+            joinedload(Permission.page)
+        ).filter(Permission.id.in_(permission_ids)).order_by(Permission.id).all()
+
     def get_permission_by_page_and_crud(
         self,
         page_id: int,
@@ -39,3 +39,17 @@ class RoleRepository(BaseRepository[Role]):
             joinedload(Role.role_permissions).joinedload(RolePermission.permission).joinedload(Permission.page)
         ).offset(skip).limit(limit).all()
 
+    def replace_permissions(self, role_id: int, permission_ids: List[int]) -> None:
+        """
+        Ganti seluruh permission role: satu DELETE lalu satu INSERT executemany. Tidak commit.
+        permission_ids harus sudah unik dan tervalidasi.
+        """
+        from sqlalchemy import insert
+        from app.models.user.role_permission import RolePermission
+
+        self.db.query(RolePermission).filter(RolePermission.role_id == role_id).delete(synchronize_session=False)
+        if permission_ids:
+            self.db.execute(
+                insert(RolePermission),
+                [{"role_id": role_id, "permission_id": permission_id} for permission_id in permission_ids]
+            )
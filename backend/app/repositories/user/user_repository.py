@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Dict, Any
 from app.models.user.user import User
 from app.repositories.base import BaseRepository
+from app.utils.text_search import text_search, SEARCH_PREFIX
 
 
 class UserRepository(BaseRepository[User]):
@@ -18,3 +19,23 @@ class UserRepository(BaseRepository[User]):
         """Check if email already exists"""
         user = self.get_by_email(email)
         return user is not None
+
+    def list_query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[str] = None,
+        search_mode: str = SEARCH_PREFIX
+    ):
+        """
+        Query dasar listing user (filter + pencarian email/nama) tanpa eager load, dipakai
+        bersama oleh COUNT dan query halaman. Mode prefix (default) memakai index email dan name.
+        """
+        query = self.db.query(User)
+        if filters:
+            for key, value in filters.items():
+                if hasattr(User, key):
+                    query = query.filter(getattr(User, key) == value)
+        criterion, _ = text_search(self.db, [User.email, User.name], search, search_mode)
+        if criterion is not None:
+            query = query.filter(criterion)
+        return query
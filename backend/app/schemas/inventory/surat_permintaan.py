@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from typing import Optional, List, Any
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 import json
 
 
@@ -61,3 +61,89 @@ class SuratPermintaanResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+# Schema listing (GET /surat-permintaan): dibangun sekali per proses dan diisi langsung
+# dari ORM object (from_attributes), menggantikan penyusunan dict manual per row
+def _parse_json_field(value: Any) -> Optional[dict]:
+    """Kolom JSON disimpan sebagai string; nilai kosong atau tidak valid menjadi None"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+class SuratPermintaanMaterialSummary(BaseModel):
+    id: int
+    kode_barang: Optional[str]
+    nama_barang: str
+    satuan: str
+
+    class Config:
+        from_attributes = True
+
+
+class SuratPermintaanProjectSummary(BaseModel):
+    id: int
+    name: str
+    code: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class SuratPermintaanCreatorSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+
+    class Config:
+        from_attributes = True
+
+
+class SuratPermintaanListItemResponse(BaseModel):
+    id: int
+    material_id: Optional[int]
+    kode_barang: Optional[str]
+    nama_barang: str
+    qty: float  # float agar presisi desimal tetap di JSON (Decimal di-dump sebagai string)
+    satuan: str
+    material: Optional[SuratPermintaanMaterialSummary] = None
+    sumber_barang: Optional[dict] = None
+    peruntukan: Optional[dict] = None
+
+    _parse_json = field_validator("sumber_barang", "peruntukan", mode="before")(_parse_json_field)
+
+    class Config:
+        from_attributes = True
+
+
+class SuratPermintaanListResponse(BaseModel):
+    id: int
+    nomor_surat: str
+    tanggal: date
+    project_id: int
+    status: str = "Draft"
+    created_by: int
+    created_at: datetime
+    updated_at: datetime
+    items: List[SuratPermintaanListItemResponse] = []
+    signatures: Optional[dict] = None
+    project: Optional[SuratPermintaanProjectSummary] = None
+    creator: Optional[SuratPermintaanCreatorSummary] = None
+
+    _parse_json = field_validator("signatures", mode="before")(_parse_json_field)
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _default_status(cls, value: Any) -> str:
+        return value or "Draft"
+
+    class Config:
+        from_attributes = True
+
+
+SuratPermintaanListAdapter = TypeAdapter(List[SuratPermintaanListResponse])
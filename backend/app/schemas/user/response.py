@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -38,7 +38,8 @@ class UserListResponse(BaseModel):
     is_active: bool
     is_superuser: bool
     role_id: Optional[int] = None
-    role: Optional[RoleBasicInfo] = None
+    # Dari ORM dibaca dari relationship role_obj (kolom User.role adalah enum lama)
+    role: Optional[RoleBasicInfo] = Field(None, validation_alias=AliasChoices("role_obj", "role"))
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: datetime
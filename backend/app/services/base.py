@@ -165,9 +165,8 @@ class BaseService(Generic[RepositoryType]):
         entity = self.get_by_id(entity_id, project_id=project_id)
         
         if soft_delete:
-            # Soft delete by setting is_active = 0
-            updated = self.repository.update(entity_id, {"is_active": 0})
-            return updated is not None
+            # Soft delete by setting is_active = 0 (satu UPDATE, entity sudah divalidasi di atas)
+            return self.repository.bulk_update([entity_id], {"is_active": 0}) > 0
         else:
             # Hard delete
             return self.repository.delete(entity_id)
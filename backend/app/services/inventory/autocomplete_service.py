@@ -0,0 +1,350 @@
+"""
+Autocomplete (typeahead) untuk picker material dan mandor.
+
+Index disimpan in-memory per worker dan per project: daftar key ter-sortir
+(kode_barang, nama_barang dan tiap kata nama) sehingga pencarian prefix cukup
+bisect tanpa query ke database.
+
+Index di-update secara incremental:
+- Perubahan lewat ORM di worker ini langsung ditandai (event after_flush / after_commit)
+- Perubahan dari worker lain / bulk insert Core diambil lewat delta query `updated_at >= watermark`
+  paling cepat setiap AUTOCOMPLETE_REFRESH_SECONDS
+- Jika jumlah row aktif di database berbeda dengan index (misal hard delete di worker lain),
+  index di-rebuild penuh
+"""
+import bisect
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, or_
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.models.inventory.material import Material
+from app.models.inventory.mandor import Mandor
+
+logger = logging.getLogger(__name__)
+
+# Jumlah key maksimal yang di-scan per pencarian (prefix 1 huruf bisa sangat lebar)
+MAX_SCAN_KEYS = 5000
+# Delta query mengambil ulang row yang berubah sedikit sebelum watermark, untuk transaksi
+# yang commit terlambat dengan updated_at lebih lama dari watermark
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# Rank key: makin kecil makin relevan
+RANK_CODE = 0
+RANK_NAME = 1
+RANK_TOKEN = 2
+
+
+def normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(text.lower().split())
+
+
+class AutocompleteIndex(ABC):
+    """Index prefix untuk satu jenis data (materials / mandors) pada satu project"""
+
+    model = None
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self._entry_keys: Dict[int, List[Tuple[str, int, int]]] = {}
+        self._entry_words: Dict[int, Set[str]] = {}
+        self._keys: List[Tuple[str, int, int]] = []
+        self.watermark: Optional[datetime] = None
+        self.last_refresh: float = 0.0
+        self.built = False
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    # ---- definisi per jenis data ----
+
+    @abstractmethod
+    def columns(self) -> list:
+        ...
+
+    @abstractmethod
+    def active_filter(self):
+        ...
+
+    @abstractmethod
+    def build_keys(self, row) -> List[Tuple[str, int]]:
+        ...
+
+    @abstractmethod
+    def to_item(self, row) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def sort_name(self, item: Dict[str, Any]) -> str:
+        ...
+
+    # ---- maintenance ----
+
+    def _base_query(self, db: Session):
+        return db.query(*self.columns(), self.model.updated_at).filter(self.model.project_id == self.project_id)
+
+    def rebuild(self, db: Session) -> None:
+        rows = self._base_query(db).filter(self.active_filter()).all()
+        self.entries.clear()
+        self._entry_keys.clear()
+        self._entry_words.clear()
+        keys = []
+        watermark = None
+        for row in rows:
+            entry_keys = self._index_row(row)
+            keys.extend(entry_keys)
+            if watermark is None or row.updated_at > watermark:
+                watermark = row.updated_at
+        keys.sort()
+        self._keys = keys
+        self.watermark = watermark
+        self.built = True
+        self.dirty = False
+        self.last_refresh = time.monotonic()
+        logger.debug(f"Autocomplete {self.model.__tablename__} project {self.project_id} rebuilt: {len(rows)} rows")
+
+    def refresh(self, db: Session) -> None:
+        """Ambil row yang berubah sejak watermark dan terapkan ke index"""
+        query = db.query(*self.columns(), self.model.updated_at, self.active_filter().label("is_active_row")) \
+            .filter(self.model.project_id == self.project_id)
+        if self.watermark is not None:
+            query = query.filter(self.model.updated_at >= self.watermark - WATERMARK_OVERLAP)
+        for row in query.all():
+            if row.is_active_row:
+                self.upsert(row)
+            else:
+                self.remove(row.id)
+            if self.watermark is None or row.updated_at > self.watermark:
+                self.watermark = row.updated_at
+
+        active_count = db.query(func.count(self.model.id)).filter(
+            self.model.project_id == self.project_id,
+            self.active_filter()
+        ).scalar() or 0
+        if active_count != len(self.entries):
+            self.rebuild(db)
+            return
+        self.dirty = False
+        self.last_refresh = time.monotonic()
+
+    def _index_row(self, row) -> List[Tuple[str, int, int]]:
+        item = self.to_item(row)
+        entry_keys = sorted({(key, rank, row.id) for key, rank in self.build_keys(row) if key})
+        self.entries[row.id] = item
+        self._entry_keys[row.id] = entry_keys
+        self._entry_words[row.id] = {key for key, rank, _ in entry_keys if rank == RANK_TOKEN}
+        return entry_keys
+
+    def upsert(self, row) -> None:
+        self.remove(row.id)
+        for key in self._index_row(row):
+            bisect.insort(self._keys, key)
+
+    def remove(self, entry_id: int) -> None:
+        for key in self._entry_keys.pop(entry_id, []):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        self.entries.pop(entry_id, None)
+        self._entry_words.pop(entry_id, None)
+
+    # ---- query ----
+
+    def _scan_prefix(self, prefix: str, best: Dict[int, Tuple[int, int, str]]) -> None:
+        position = bisect.bisect_left(self._keys, (prefix,))
+        end = min(len(self._keys), position + MAX_SCAN_KEYS)
+        while position < end:
+            key, rank, entry_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            score = (0 if key == prefix else 1, rank, key)
+            if entry_id not in best or score < best[entry_id]:
+                best[entry_id] = score
+            position += 1
+
+    def search(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Cari entry dengan key yang diawali q (kode, nama lengkap, atau kata di nama).
+        Untuk q lebih dari satu kata, entry juga cocok jika setiap kata q menjadi prefix dari kata di nama.
+        Urutan: sama persis > kode > nama > kata, lalu key yang cocok terpendek / alfabetis.
+        """
+        term = normalize(q)
+        if not term:
+            return []
+        best: Dict[int, Tuple[int, int, str]] = {}
+        self._scan_prefix(term, best)
+
+        tokens = term.split()
+        if len(tokens) > 1:
+            token_hits: Dict[int, Tuple[int, int, str]] = {}
+            self._scan_prefix(max(tokens, key=len), token_hits)
+            for entry_id in token_hits:
+                words = self._entry_words.get(entry_id, set())
+                if entry_id not in best and all(any(word.startswith(t) for word in words) for t in tokens):
+                    best[entry_id] = (1, RANK_TOKEN + 1, normalize(self.sort_name(self.entries[entry_id])))
+
+        ranked = sorted(
+            best.items(),
+            key=lambda kv: (kv[1][0], kv[1][1], len(kv[1][2]), kv[1][2], self.sort_name(self.entries[kv[0]]))
+        )
+        return [self.entries[entry_id] for entry_id, _ in ranked[:limit]]
+
+
+class MaterialAutocompleteIndex(AutocompleteIndex):
+    model = Material
+
+    def columns(self) -> list:
+        return [Material.id, Material.kode_barang, Material.nama_barang, Material.satuan, Material.kategori]
+
+    def active_filter(self):
+        return or_(Material.is_active == 1, Material.is_active.is_(None))
+
+    def build_keys(self, row) -> List[Tuple[str, int]]:
+        kode = normalize(row.kode_barang)
+        nama = normalize(row.nama_barang)
+        keys = [(kode, RANK_CODE), (nama, RANK_NAME)]
+        keys.extend((word, RANK_TOKEN) for word in nama.split())
+        return keys
+
+    def to_item(self, row) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "kode_barang": row.kode_barang,
+            "nama_barang": row.nama_barang,
+            "satuan": row.satuan,
+            "kategori": row.kategori,
+        }
+
+    def sort_name(self, item: Dict[str, Any]) -> str:
+        return item["nama_barang"] or ""
+
+
+class MandorAutocompleteIndex(AutocompleteIndex):
+    model = Mandor
+
+    def columns(self) -> list:
+        return [Mandor.id, Mandor.nama, Mandor.nomor_kontak]
+
+    def active_filter(self):
+        return Mandor.is_active == 1
+
+    def build_keys(self, row) -> List[Tuple[str, int]]:
+        nama = normalize(row.nama)
+        keys = [(nama, RANK_NAME)]
+        keys.extend((word, RANK_TOKEN) for word in nama.split())
+        return keys
+
+    def to_item(self, row) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "nama": row.nama,
+            "nomor_kontak": row.nomor_kontak,
+        }
+
+    def sort_name(self, item: Dict[str, Any]) -> str:
+        return item["nama"] or ""
+
+
+INDEX_CLASSES = {
+    Material.__tablename__: MaterialAutocompleteIndex,
+    Mandor.__tablename__: MandorAutocompleteIndex,
+}
+
+_indexes: Dict[Tuple[str, int], AutocompleteIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _get_index(kind: str, project_id: int) -> AutocompleteIndex:
+    key = (kind, project_id)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = INDEX_CLASSES[kind](project_id)
+                _indexes[key] = index
+    return index
+
+
+def mark_dirty(kind: str, project_id: Optional[int]) -> None:
+    """
+    Tandai index project perlu delta refresh pada request berikutnya.
+    Dipanggil otomatis untuk perubahan lewat ORM; panggil manual setelah bulk insert/update Core.
+    """
+    if project_id is None:
+        return
+    index = _indexes.get((kind, project_id))
+    if index is not None:
+        index.dirty = True
+
+
+def clear_indexes() -> None:
+    """Hapus semua index (dipakai test)"""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+class AutocompleteService:
+    """Service untuk autocomplete material dan mandor per project"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _search(self, kind: str, project_id: int, q: str, limit: int) -> List[Dict[str, Any]]:
+        index = _get_index(kind, project_id)
+        with index.lock:
+            if not index.built:
+                index.rebuild(self.db)
+            elif index.dirty or time.monotonic() - index.last_refresh >= settings.AUTOCOMPLETE_REFRESH_SECONDS:
+                index.refresh(self.db)
+            return index.search(q, limit)
+
+    def search_materials(self, project_id: int, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._search(Material.__tablename__, project_id, q, limit)
+
+    def search_mandors(self, project_id: int, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._search(Mandor.__tablename__, project_id, q, limit)
+
+
+# ---- invalidasi otomatis dari ORM ----
+
+_SESSION_KEY = "autocomplete_changes"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Material, Mandor)):
+            if changes is None:
+                changes = session.info.setdefault(_SESSION_KEY, set())
+            deleted_id = obj.id if obj in session.deleted else None
+            changes.add((obj.__tablename__, obj.project_id, deleted_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    changes = session.info.pop(_SESSION_KEY, None)
+    if not changes:
+        return
+    for kind, project_id, deleted_id in changes:
+        index = _indexes.get((kind, project_id))
+        if index is None:
+            continue
+        if deleted_id is not None:
+            with index.lock:
+                index.remove(deleted_id)
+        index.dirty = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,392 @@
+"""
+Import job: import spreadsheet (material, barang masuk, barang keluar) yang diproses di background.
+
+Alur:
+1. Endpoint upload menyimpan file ke IMPORT_JOB_DIR, membuat row import_jobs (status pending)
+   dan langsung mengembalikan job id (tidak menunggu parsing / insert selesai)
+2. Job dijalankan di thread pool worker yang menerima upload, dengan session database sendiri;
+   heartbeat memperbarui updated_at selama job berjalan agar tidak dianggap terhenti
+3. Handler menulis progress (row yang sudah diproses + error per row sejauh ini) lewat session
+   terpisah sehingga bisa di-poll dari worker manapun sebelum transaksi import commit
+4. Laporan akhir (struktur sama dengan response import sinkron) disimpan di kolom result
+
+Jenis import baru cukup mendaftarkan handler dengan @register_import_handler("<job_type>").
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.metrics import JOB_QUEUE_DEPTH
+from app.models.inventory.import_job import ImportJob, ImportJobStatus
+from app.models.user.user import User, UserRole
+from app.repositories.inventory.import_job_repository import ImportJobRepository
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOB_MATERIALS = "materials"
+IMPORT_JOB_STOCK_IN = "stock_in"
+IMPORT_JOB_STOCK_OUT = "stock_out"
+
+# Label queue untuk metric jargas_job_queue_depth
+IMPORT_QUEUE = "import"
+# Jumlah error per row maksimal yang disimpan di job (jumlah total tetap di failed_count)
+MAX_STORED_ERRORS = 1000
+
+# Handler: fungsi(db, job, file_path, options, progress) -> (report, message)
+ImportHandler = Callable[[Session, ImportJob, Path, Dict[str, Any], "ImportProgress"], tuple]
+_handlers: Dict[str, ImportHandler] = {}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def register_import_handler(job_type: str):
+    """Decorator untuk mendaftarkan handler jenis import"""
+    def decorator(func: ImportHandler) -> ImportHandler:
+        _handlers[job_type] = func
+        return func
+    return decorator
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.IMPORT_JOB_WORKERS),
+                    thread_name_prefix="import-job"
+                )
+    return _executor
+
+
+def _dump_errors(errors: List[str]) -> str:
+    return json.dumps(errors[:MAX_STORED_ERRORS], ensure_ascii=False)
+
+
+class ImportProgress:
+    """
+    Callback progress untuk handler import.
+    Setiap update memakai session pendek tersendiri (commit langsung) agar tidak ikut
+    transaksi import yang masih berjalan.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], job_id: int):
+        self.session_factory = session_factory
+        self.job_id = job_id
+
+    def __call__(self, processed_rows: int, errors: List[str]) -> None:
+        db = self.session_factory()
+        try:
+            db.query(ImportJob).filter(ImportJob.id == self.job_id).update({
+                ImportJob.processed_rows: processed_rows,
+                ImportJob.failed_count: len(errors),
+                ImportJob.errors: _dump_errors(errors),
+                ImportJob.updated_at: datetime.utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Import job {self.job_id}: gagal update progress - {str(e)}")
+        finally:
+            db.close()
+
+
+class ImportHeartbeat:
+    """
+    Perbarui updated_at job secara berkala selama handler berjalan, termasuk fase insert yang tidak
+    memanggil progress, agar job yang masih diproses tidak ditandai terhenti (stale).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], job_id: int, interval: float):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"import-job-{job_id}-heartbeat", daemon=True)
+
+    def __enter__(self) -> "ImportHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            db = self.session_factory()
+            try:
+                db.query(ImportJob).filter(
+                    ImportJob.id == self.job_id,
+                    ImportJob.status == ImportJobStatus.RUNNING.value
+                ).update({ImportJob.updated_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Import job {self.job_id}: gagal update heartbeat - {str(e)}")
+            finally:
+                db.close()
+
+
+def _discard_upload(db: Session, job: ImportJob) -> None:
+    """Hapus file upload job yang sudah tidak akan diproses dan kosongkan file_path (commit)"""
+    file_path = job.file_path
+    if not file_path:
+        return
+    job.file_path = None
+    db.commit()
+    Path(file_path).unlink(missing_ok=True)
+
+
+def run_import_job(job_id: int, session_factory: Callable[[], Session]) -> None:
+    """
+    Jalankan satu import job sampai selesai (dipanggil dari thread pool).
+    Status akhir completed jika handler selesai (termasuk bila semua row ditolak validasi),
+    failed jika file tidak bisa dibaca atau terjadi error tak terduga.
+    """
+    db = session_factory()
+    job = None
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if job is None or job.status != ImportJobStatus.PENDING.value:
+            # Sudah diproses / ditandai terhenti, jangan diubah lagi; file upload-nya tetap dibersihkan
+            if job is not None and job.status != ImportJobStatus.RUNNING.value:
+                _discard_upload(db, job)
+            job = None
+            return
+
+        job.status = ImportJobStatus.RUNNING.value
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        handler = _handlers[job.job_type]
+        options = json.loads(job.options) if job.options else {}
+        progress = ImportProgress(session_factory, job.id)
+        heartbeat_interval = max(1, settings.IMPORT_JOB_STALE_SECONDS // 3)
+        with ImportHeartbeat(session_factory, job.id, heartbeat_interval):
+            report, message = handler(db, job, Path(job.file_path), options, progress)
+
+        job.status = ImportJobStatus.COMPLETED.value
+        job.processed_rows = report.get('total_rows', job.processed_rows)
+        job.success_count = report.get('success_count', 0)
+        job.failed_count = report.get('failed_count', 0)
+        job.errors = _dump_errors(report.get('errors', []))
+        job.result = json.dumps(report, ensure_ascii=False, default=str)
+        job.message = message
+        logger.info(f"Import job {job_id} ({job.job_type}) selesai: {message}")
+    except Exception as e:
+        db.rollback()
+        if job is None:
+            logger.error(f"Import job {job_id} gagal dimuat: {str(e)}", exc_info=True)
+            return
+        if isinstance(e, ValidationError):
+            detail = e.detail
+            message = "Gagal membaca file"
+        else:
+            logger.error(f"Import job {job_id} gagal: {str(e)}", exc_info=True)
+            detail = f"Error: {str(e)}"
+            message = "Terjadi kesalahan saat memproses file"
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        job.status = ImportJobStatus.FAILED.value
+        job.errors = _dump_errors([detail])
+        job.message = message
+    finally:
+        if job is not None:
+            job.finished_at = datetime.utcnow()
+            file_path = job.file_path
+            job.file_path = None
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Import job {job_id}: gagal menyimpan status akhir - {str(e)}", exc_info=True)
+            if file_path:
+                Path(file_path).unlink(missing_ok=True)
+        db.close()
+        JOB_QUEUE_DEPTH.labels(queue=IMPORT_QUEUE).dec()
+
+
+class ImportJobService:
+    """Service untuk membuat dan memantau import job"""
+
+    def __init__(self, db: Session, session_factory: Optional[Callable[[], Session]] = None):
+        self.db = db
+        self.repository = ImportJobRepository(db)
+        if session_factory is None:
+            from app.config.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def submit(
+        self,
+        job_type: str,
+        file_name: str,
+        file_content: bytes,
+        project_id: int,
+        user_id: int,
+        options: Optional[Dict[str, Any]] = None
+    ) -> ImportJob:
+        """Simpan file upload, buat job pending, lalu antrikan ke thread pool"""
+        if job_type not in _handlers:
+            raise ValidationError(f"Jenis import '{job_type}' tidak dikenal")
+
+        job = ImportJob(
+            job_type=job_type,
+            status=ImportJobStatus.PENDING.value,
+            project_id=project_id,
+            created_by=user_id,
+            file_name=file_name,
+            options=json.dumps(options or {}),
+        )
+        self.db.add(job)
+        self.db.flush()
+
+        import_dir = Path(settings.IMPORT_JOB_DIR)
+        import_dir.mkdir(parents=True, exist_ok=True)
+        file_path = import_dir / f"{job.id}{Path(file_name).suffix.lower()}"
+        try:
+            file_path.write_bytes(file_content)
+            job.file_path = str(file_path)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            file_path.unlink(missing_ok=True)
+            raise
+        self.db.refresh(job)
+
+        JOB_QUEUE_DEPTH.labels(queue=IMPORT_QUEUE).inc()
+        try:
+            _get_executor().submit(run_import_job, job.id, self.session_factory)
+        except Exception:
+            JOB_QUEUE_DEPTH.labels(queue=IMPORT_QUEUE).dec()
+            raise
+        logger.info(f"Import job {job.id} ({job_type}) diantrikan: {file_name}")
+        return job
+
+    def get_job(self, job_id: int, project_id: int, current_user: User) -> ImportJob:
+        """Ambil job di project aktif. Selain admin hanya bisa melihat job miliknya sendiri"""
+        job = self.repository.get(job_id, project_id=project_id)
+        if job is None or (not self._can_view_all(current_user) and job.created_by != current_user.id):
+            raise NotFoundError(f"Import job dengan ID {job_id} tidak ditemukan")
+        self._expire_if_stale(job)
+        return job
+
+    def list_jobs(self, project_id: int, current_user: User, job_type: Optional[str] = None,
+                  limit: int = 20) -> List[ImportJob]:
+        created_by = None if self._can_view_all(current_user) else current_user.id
+        jobs = self.repository.get_recent(project_id, created_by=created_by, job_type=job_type, limit=limit)
+        for job in jobs:
+            self._expire_if_stale(job)
+        return jobs
+
+    @staticmethod
+    def _can_view_all(current_user: User) -> bool:
+        return current_user.is_superuser or current_user.role == UserRole.ADMIN
+
+    def _expire_if_stale(self, job: ImportJob) -> None:
+        """
+        Job yang tidak ada update progress / heartbeat terlalu lama (worker mati / restart) ditandai
+        gagal dan file upload-nya dihapus
+        """
+        if job.status not in (ImportJobStatus.PENDING.value, ImportJobStatus.RUNNING.value):
+            return
+        if job.updated_at >= datetime.utcnow() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS):
+            return
+        job.status = ImportJobStatus.FAILED.value
+        job.message = "Import terhenti sebelum selesai, silakan upload ulang file"
+        job.finished_at = datetime.utcnow()
+        self.db.commit()
+        _discard_upload(self.db, job)
+
+    @staticmethod
+    def to_dict(job: ImportJob, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'id': job.id,
+            'job_type': job.job_type,
+            'status': job.status,
+            'file_name': job.file_name,
+            'processed_rows': job.processed_rows,
+            'success_count': job.success_count,
+            'failed_count': job.failed_count,
+            'message': job.message,
+            'created_by': job.created_by,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+        if include_result:
+            data['errors'] = json.loads(job.errors) if job.errors else []
+            data['result'] = json.loads(job.result) if job.result else None
+        return data
+
+
+# ---- handler ----
+
+@register_import_handler(IMPORT_JOB_MATERIALS)
+def _import_materials(db: Session, job: ImportJob, file_path: Path, options: Dict[str, Any],
+                      progress: ImportProgress) -> tuple:
+    from app.services.inventory.material_service import MaterialService
+    from app.utils.excel_importer import iter_import_rows, MATERIAL_IMPORT_HEADERS
+
+    material_service = MaterialService(db)
+    with open(file_path, "rb") as file:
+        rows = iter_import_rows(file, job.file_name, expected_headers=MATERIAL_IMPORT_HEADERS, start_row=2)
+        report = material_service.import_rows(
+            rows,
+            project_id=job.project_id,
+            all_or_nothing=bool(options.get('all_or_nothing')),
+            progress=progress
+        )
+    if material_service.import_was_attempted(report):
+        material_service.record_import_audit(job.created_by, job.file_name, report)
+    return report, material_service.import_message(report)
+
+
+def _import_stock(job: ImportJob, file_path: Path, headers: list, import_func: Callable, options: Dict[str, Any],
+                  progress: ImportProgress) -> Dict[str, Any]:
+    from app.utils.excel_importer import iter_import_rows
+
+    with open(file_path, "rb") as file:
+        rows = iter_import_rows(file, job.file_name, expected_headers=headers, start_row=2)
+        return import_func(
+            rows,
+            project_id=job.project_id,
+            created_by=job.created_by,
+            all_or_nothing=bool(options.get('all_or_nothing')),
+            progress=progress
+        )
+
+
+@register_import_handler(IMPORT_JOB_STOCK_IN)
+def _import_stock_in(db: Session, job: ImportJob, file_path: Path, options: Dict[str, Any],
+                     progress: ImportProgress) -> tuple:
+    from app.services.inventory.stock_import_service import StockImportService
+    from app.utils.excel_importer import STOCK_IN_IMPORT_HEADERS, import_was_attempted
+
+    service = StockImportService(db)
+    report = _import_stock(job, file_path, STOCK_IN_IMPORT_HEADERS, service.import_stock_in_rows, options, progress)
+    if import_was_attempted(report):
+        service.record_import_audit(job.created_by, "stock_ins", job.file_name, report)
+    return report, service.import_message(report, "data barang masuk")
+
+
+@register_import_handler(IMPORT_JOB_STOCK_OUT)
+def _import_stock_out(db: Session, job: ImportJob, file_path: Path, options: Dict[str, Any],
+                      progress: ImportProgress) -> tuple:
+    from app.services.inventory.stock_import_service import StockImportService
+    from app.utils.excel_importer import STOCK_OUT_IMPORT_HEADERS, import_was_attempted
+
+    service = StockImportService(db)
+    report = _import_stock(job, file_path, STOCK_OUT_IMPORT_HEADERS, service.import_stock_out_rows, options, progress)
+    if import_was_attempted(report):
+        service.record_import_audit(job.created_by, "stock_outs", job.file_name, report)
+    return report, service.import_message(report, "data barang keluar")
@@ -2,6 +2,7 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from app.repositories.inventory import MandorRepository
 from app.services.base import BaseService
+from app.utils.text_search import SEARCH_CONTAINS
 
 
 class MandorService(BaseService[MandorRepository]):
@@ -14,9 +15,10 @@ class MandorService(BaseService[MandorRepository]):
         repository = MandorRepository(db)
         super().__init__(repository, db)
 
-    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List:
+    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None,
+                       mode: str = SEARCH_CONTAINS) -> List:
         """Search mandors by name"""
-        return self.repository.search_by_name(nama, skip=skip, limit=limit, project_id=project_id)
+        return self.repository.search_by_name(nama, skip=skip, limit=limit, project_id=project_id, mode=mode)
 
     def create(self, mandor_data: dict, project_id: Optional[int] = None):
         """Create new mandor - project_id tidak wajib untuk mandor"""
@@ -1,9 +1,15 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable
+from decimal import Decimal, InvalidOperation
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.repositories.inventory import MaterialRepository
 from app.services.base import BaseService
+from app.core.cache import REFERENCE_DATA_CACHE, bump_version
 from app.core.exceptions import NotFoundError, ValidationError
+from app.repositories.base import unit_of_work
+from app.utils.text_search import SEARCH_CONTAINS
+from app.models.inventory.material import Material
+from app.services.inventory.autocomplete_service import mark_dirty as mark_autocomplete_dirty
 import logging
 
 
@@ -14,6 +20,11 @@ VALID_KATEGORIS = [
     "BUNGAN KOMPOR"
 ]
 
+# Jumlah row per statement INSERT saat bulk import
+IMPORT_BATCH_SIZE = 1000
+# Interval callback progress (jumlah row) saat validasi file import
+IMPORT_PROGRESS_EVERY = 500
+
 
 class MaterialService(BaseService[MaterialRepository]):
     """
@@ -49,9 +60,15 @@ class MaterialService(BaseService[MaterialRepository]):
             raise NotFoundError(f"Material dengan kode {kode_barang} tidak ditemukan")
         return material
 
-    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> List:
+    def search_by_name(self, nama: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None,
+                       mode: str = SEARCH_CONTAINS) -> List:
         """Search materials by name"""
-        return self.repository.search_by_name(nama, skip=skip, limit=limit, project_id=project_id)
+        return self.repository.search_by_name(nama, skip=skip, limit=limit, project_id=project_id, mode=mode)
+
+    def search_by_name_or_code(self, search_term: str, skip: int = 0, limit: int = 100, project_id: Optional[int] = None,
+                               mode: str = SEARCH_CONTAINS) -> List:
+        """Search materials by name atau kode barang"""
+        return self.repository.search_by_name_or_code(search_term, skip=skip, limit=limit, project_id=project_id, mode=mode)
 
     def create(self, material_data: dict, project_id: int):
         """
@@ -68,7 +85,11 @@ class MaterialService(BaseService[MaterialRepository]):
                 raise ValidationError(f"Kode barang {material_data['kode_barang']} sudah terdaftar di project ini")
         
         # Gunakan BaseService.create() dengan validate_project_id=True
-        return super().create(material_data, project_id=project_id, validate_project_id=True)
+        # (version reference data di-bump di transaksi yang sama)
+        with unit_of_work(self.db):
+            material = super().create(material_data, project_id=project_id, validate_project_id=True)
+            bump_version(self.db, REFERENCE_DATA_CACHE, scope=project_id)
+        return material
 
     def update(self, material_id: int, material_data: dict, project_id: int):
         """
@@ -88,60 +109,29 @@ class MaterialService(BaseService[MaterialRepository]):
                 raise ValidationError(f"Kode barang {material_data['kode_barang']} sudah terdaftar di project ini")
         
         # Gunakan BaseService.update()
-        return super().update(material_id, material_data, project_id=project_id)
+        with unit_of_work(self.db):
+            material = super().update(material_id, material_data, project_id=project_id)
+            bump_version(self.db, REFERENCE_DATA_CACHE, scope=project_id)
+        return material
+
+    # Label sumber pemakaian material untuk pesan error (urutan sesuai tampilan)
+    USAGE_LABELS = {
+        "stock_in": "data stock in",
+        "stock_out": "data stock out",
+        "installed": "data installed",
+        "return": "data return",
+        "surat_permintaan": "data surat permintaan",
+    }
 
     def _check_material_usage(self, material_id: int) -> None:
         """
-        Cek apakah material masih digunakan di tabel lain
+        Cek apakah material masih digunakan di tabel lain (satu query, lihat MaterialRepository.count_usage)
         Raise ValidationError jika masih digunakan
         """
-        from app.models.inventory.stock_in import StockIn
-        from app.models.inventory.stock_out import StockOut
-        from app.models.inventory.installed import Installed
-        from app.models.inventory.return_model import Return
-        from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
-        
-        usage_details = []
-        
-        # Cek stock_ins (yang belum dihapus)
-        stock_ins_count = self.db.query(StockIn).filter(
-            StockIn.material_id == material_id,
-            StockIn.is_deleted == 0
-        ).count()
-        if stock_ins_count > 0:
-            usage_details.append(f"{stock_ins_count} data stock in")
-        
-        # Cek stock_outs (yang belum dihapus)
-        stock_outs_count = self.db.query(StockOut).filter(
-            StockOut.material_id == material_id,
-            StockOut.is_deleted == 0
-        ).count()
-        if stock_outs_count > 0:
-            usage_details.append(f"{stock_outs_count} data stock out")
-        
-        # Cek installed (yang belum dihapus)
-        installed_count = self.db.query(Installed).filter(
-            Installed.material_id == material_id,
-            Installed.is_deleted == 0
-        ).count()
-        if installed_count > 0:
-            usage_details.append(f"{installed_count} data installed")
-        
-        # Cek returns (yang belum dihapus)
-        returns_count = self.db.query(Return).filter(
-            Return.material_id == material_id,
-            Return.is_deleted == 0
-        ).count()
-        if returns_count > 0:
-            usage_details.append(f"{returns_count} data return")
-        
-        # Cek surat_permintaan_items (hanya yang memiliki material_id)
-        surat_permintaan_count = self.db.query(SuratPermintaanItem).filter(
-            SuratPermintaanItem.material_id == material_id,
-            SuratPermintaanItem.material_id.isnot(None)
-        ).count()
-        if surat_permintaan_count > 0:
-            usage_details.append(f"{surat_permintaan_count} data surat permintaan")
+        usage = self.repository.count_usage([material_id]).get(material_id, {})
+        usage_details = [
+            f"{usage[source]} {label}" for source, label in self.USAGE_LABELS.items() if usage.get(source)
+        ]
         
         # Jika masih digunakan, raise ValidationError
         if usage_details:
@@ -151,6 +141,12 @@ class MaterialService(BaseService[MaterialRepository]):
                 f"Hapus data terkait terlebih dahulu."
             )
 
+    def get_deletable_flags(self, material_ids: Iterable[int]) -> Dict[int, bool]:
+        """Flag bisa dihapus (tidak dipakai di tabel manapun) untuk satu halaman material, dengan satu query"""
+        material_ids = list(material_ids)
+        usage = self.repository.count_usage(material_ids)
+        return {material_id: material_id not in usage for material_id in material_ids}
+
     def delete(self, material_id: int, project_id: int = None) -> bool:
         """
         Hard delete material - benar-benar menghapus dari database
@@ -160,167 +156,244 @@ class MaterialService(BaseService[MaterialRepository]):
         self._check_material_usage(material_id)
         
         # Jika validasi berhasil, lanjutkan delete
-        return super().delete(material_id, project_id=project_id, soft_delete=False)
+        with unit_of_work(self.db):
+            deleted = super().delete(material_id, project_id=project_id, soft_delete=False)
+            # Tanpa project_id project material tidak diketahui: invalidasi semua project
+            bump_version(self.db, REFERENCE_DATA_CACHE, scope=project_id)
+        return deleted
 
-    def bulk_create(self, materials_data: List[Dict[str, Any]], project_id: int) -> Dict[str, Any]:
+    def bulk_create(
+        self,
+        materials_data: List[Dict[str, Any]],
+        project_id: int,
+        all_or_nothing: bool = False,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict[str, Any]:
         """
-        Bulk create materials dari list of dictionaries
-        
+        Bulk create materials dari list of dictionaries dalam satu transaksi
+
+        Best practice: semua kode_barang existing di project di-prefetch dalam satu query,
+        seluruh file divalidasi di memory, lalu row valid di-insert dengan executemany per batch
+        (tanpa commit/refresh per row).
+
         Args:
             materials_data: List of dictionaries dengan keys: nama_barang, kode_barang, satuan, kategori, harga
-        
+            project_id: Project tujuan import
+            all_or_nothing: Jika True, tidak ada row yang disimpan bila ada satu row saja yang gagal
+            batch_size: Jumlah row per statement INSERT
+
         Returns:
-            Dictionary dengan keys: success_count, failed_count, errors (list of error messages)
+            Dictionary dengan keys: success_count, failed_count, errors (list of error messages), rolled_back
         """
-        success_count = 0
-        failed_count = 0
-        errors = []
-        
-        # Track kode_barang yang sudah diproses untuk duplicate detection
+        errors: List[str] = []
+        if project_id is None:
+            errors = [f"Row {row.get('_row_number', '?')}: Project ID harus disertakan" for row in materials_data]
+            return self._bulk_result(0, errors, rolled_back=False)
+
+        prepared = self._prepare_bulk_rows(materials_data, project_id, errors)
+
+        if all_or_nothing and errors:
+            self.logger.warning(f"Bulk import dibatalkan (all-or-nothing): {len(errors)} row gagal validasi")
+            return self._bulk_result(0, errors, rolled_back=True)
+        if not prepared:
+            return self._bulk_result(0, errors, rolled_back=False)
+
+        rows = [material_data for _, material_data in prepared]
+        try:
+            with unit_of_work(self.db):
+                self.repository.bulk_create(rows, batch_size=batch_size, return_ids=False)
+                bump_version(self.db, REFERENCE_DATA_CACHE, scope=project_id)
+            success_count = len(rows)
+        except IntegrityError as ie:
+            # Konflik dengan data yang masuk setelah prefetch (misal import paralel)
+            self.logger.warning(f"Bulk insert materials konflik, fallback per row: {str(ie.orig) if hasattr(ie, 'orig') else str(ie)}")
+            if all_or_nothing:
+                errors.append("Import dibatalkan: kode barang bentrok dengan data yang baru saja ditambahkan, silakan ulangi import")
+                return self._bulk_result(0, errors, rolled_back=True)
+            success_count = self._insert_rows_individually(prepared, errors)
+        except Exception as e:
+            self.logger.error(f"Bulk insert materials gagal: {str(e)}", exc_info=True)
+            errors.append(f"Error database - {str(e)}")
+            return self._bulk_result(0, errors, rolled_back=True)
+
+        mark_autocomplete_dirty(Material.__tablename__, project_id)
+        self.logger.info(f"Bulk import materials project {project_id}: {success_count} sukses, {len(errors)} gagal")
+        return self._bulk_result(success_count, errors, rolled_back=False)
+
+    def import_rows(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        project_id: int,
+        all_or_nothing: bool = False,
+        progress: Optional[Callable[[int, List[str]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Validasi dan simpan row hasil parsing file import (streaming dari iter_import_rows)
+
+        Dipakai endpoint import sinkron maupun import job di background.
+        ValidationError dari parser (header tidak sesuai, file rusak) diteruskan ke pemanggil.
+
+        Args:
+            rows: Iterable row dictionary dari iter_import_rows
+            project_id: Project tujuan import
+            all_or_nothing: Jika True, tidak ada row yang disimpan bila ada satu row saja yang gagal
+            progress: Callback opsional progress(processed_rows, validation_errors), dipanggil setiap
+                IMPORT_PROGRESS_EVERY row dan sekali setelah semua row divalidasi
+
+        Returns:
+            Laporan import: total_rows, success_count, failed_count, validation_failed_count,
+            processing_failed_count, validation_errors, processing_errors, errors, rolled_back
+        """
+        from app.utils.excel_importer import validate_material_row, build_import_report
+
+        valid_kategoris = self.get_valid_kategoris()
+        validated_rows: List[Dict[str, Any]] = []
+        validation_errors: List[str] = []
+        total_rows = 0
+
+        for row in rows:
+            total_rows += 1
+            is_valid, error_msg = validate_material_row(row, valid_kategoris)
+            if is_valid:
+                validated_rows.append(row)
+            else:
+                validation_errors.append(error_msg)
+            if progress is not None and total_rows % IMPORT_PROGRESS_EVERY == 0:
+                progress(total_rows, validation_errors)
+        if progress is not None:
+            progress(total_rows, validation_errors)
+
+        result = self._bulk_result(0, [], rolled_back=False)
+        if validated_rows and all_or_nothing and validation_errors:
+            result['rolled_back'] = True
+        elif validated_rows:
+            self.logger.info(f"Bulk import: {len(validated_rows)} rows validated, {len(validation_errors)} validation errors")
+            result = self.bulk_create(validated_rows, project_id=project_id, all_or_nothing=all_or_nothing)
+
+        report = build_import_report(total_rows, result['success_count'], validation_errors,
+                                     result['errors'], result['rolled_back'])
+        if report['errors']:
+            self.logger.warning(f"Bulk import errors: {report['errors']}")
+        return report
+
+    @staticmethod
+    def import_message(report: Dict[str, Any]) -> str:
+        """Pesan ringkasan hasil import_rows untuk response / laporan job"""
+        from app.utils.excel_importer import import_report_message
+        return import_report_message(report, "material")
+
+    @staticmethod
+    def import_was_attempted(report: Dict[str, Any]) -> bool:
+        """False jika tidak ada row yang sampai ke tahap insert (file kosong / semua tidak valid / dibatalkan)"""
+        from app.utils.excel_importer import import_was_attempted
+        return import_was_attempted(report)
+
+    def record_import_audit(self, user_id: int, file_name: str, report: Dict[str, Any]) -> None:
+        """Audit log untuk bulk import (satu entry per file)"""
+        from app.services.inventory.audit_log_service import AuditLogService, ActionType
+
+        total_failed = report['validation_failed_count'] + report['processing_failed_count']
+        AuditLogService(self.db).create_log(
+            user_id=user_id,
+            action=ActionType.CREATE,
+            table_name="materials",
+            record_id=0,  # Bulk operation, tidak punya single record_id
+            new_values={"bulk_import": True, "file_name": file_name},
+            description=(
+                f"Bulk import materials: {report['success_count']} sukses, {total_failed} gagal "
+                f"(validasi: {report['validation_failed_count']}, proses: {report['processing_failed_count']})"
+            )
+        )
+
+    def _prepare_bulk_rows(self, materials_data: List[Dict[str, Any]], project_id: int,
+                           errors: List[str]) -> List[tuple]:
+        """Validasi seluruh row di memory. Return list (row_num, material_data) yang valid"""
+        # Unique constraint (project_id, kode_barang) di MySQL case-insensitive
+        existing_kodes = {kode.lower() for kode in self.repository.get_kode_set(project_id)}
         processed_kodes = set()
-        
+        kategori_map = {kategori.upper(): kategori for kategori in VALID_KATEGORIS}
+        prepared = []
+
         for row in materials_data:
             row_num = row.get('_row_number', '?')
-            
             try:
-                # Prepare material data
                 material_data = {
-                    'nama_barang': row.get('nama_barang', '').strip(),
-                    'satuan': row.get('satuan', '').strip(),
-                    'is_active': 1
+                    'nama_barang': (row.get('nama_barang') or '').strip(),
+                    'satuan': (row.get('satuan') or '').strip(),
+                    'is_active': 1,
+                    'project_id': project_id,
                 }
-                
-                # Add project_id (required)
-                if project_id is None:
-                    failed_count += 1
-                    error_msg = f"Row {row_num}: Project ID harus disertakan"
-                    errors.append(error_msg)
-                    self.logger.warning(error_msg)
-                    continue
-                
-                material_data['project_id'] = project_id
-                
+
                 # Kode barang (optional, bisa null)
-                kode_barang = row.get('kode_barang', '').strip()
+                kode_barang = (row.get('kode_barang') or '').strip()
                 if kode_barang:
-                    material_data['kode_barang'] = kode_barang
-                    
-                    # Check duplicate dalam file yang sama (dalam batch yang sama)
-                    if kode_barang in processed_kodes:
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: Kode barang '{kode_barang}' duplikat dalam file"
-                        errors.append(error_msg)
-                        self.logger.warning(error_msg)
+                    kode_key = kode_barang.lower()
+                    if kode_key in processed_kodes:
+                        errors.append(f"Row {row_num}: Kode barang '{kode_barang}' duplikat dalam file")
                         continue
-                    
-                    # Check duplicate di database (per project)
-                    existing = self.repository.get_by_kode(kode_barang, project_id=project_id)
-                    if existing:
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: Kode barang '{kode_barang}' sudah terdaftar di project ini"
-                        errors.append(error_msg)
-                        self.logger.warning(f"Row {row_num}: Kode barang '{kode_barang}' sudah ada di database (id: {existing.id})")
+                    if kode_key in existing_kodes:
+                        errors.append(f"Row {row_num}: Kode barang '{kode_barang}' sudah terdaftar di project ini")
                         continue
-                    
-                    processed_kodes.add(kode_barang)
-                else:
-                    # Jika kode_barang kosong, biarkan null (sesuai requirement)
-                    material_data['kode_barang'] = None
-                
-                # Kategori (optional, bisa null atau harus valid jika ada)
-                kategori = row.get('kategori', '').strip()
-                if kategori:
-                    # Validate kategori dari list valid (case insensitive)
-                    kategori_upper = kategori.upper().strip()
-                    valid_upper = [k.upper() for k in VALID_KATEGORIS]
-                    if kategori_upper in valid_upper:
-                        # Find exact match dari VALID_KATEGORIS
-                        for valid_kategori in VALID_KATEGORIS:
-                            if valid_kategori.upper() == kategori_upper:
-                                material_data['kategori'] = valid_kategori
-                                break
-                    else:
-                        # Jika kategori tidak valid, set ke None (kategori optional)
-                        # Kategori optional, jadi tidak perlu error, hanya set ke None
-                        material_data['kategori'] = None
-                else:
-                    material_data['kategori'] = None
-                
+                    processed_kodes.add(kode_key)
+                material_data['kode_barang'] = kode_barang or None
+
+                # Kategori (optional, jika tidak valid diabaikan / set None)
+                kategori = (row.get('kategori') or '').strip()
+                material_data['kategori'] = kategori_map.get(kategori.upper()) if kategori else None
+
                 # Harga (optional, tapi kalau ada harus numerik dan >= 0)
-                harga_str = row.get('harga', '').strip()
+                harga_str = (row.get('harga') or '').strip()
                 if harga_str:
                     try:
-                        from decimal import Decimal
-                        harga_value = Decimal(str(harga_str))
-                        if harga_value < 0:
-                            failed_count += 1
-                            errors.append(f"Row {row_num}: Harga tidak boleh negatif")
-                            continue
-                        material_data['harga'] = harga_value
-                    except (ValueError, TypeError, Exception) as e:
-                        failed_count += 1
+                        harga_value = Decimal(harga_str)
+                        if not harga_value.is_finite():
+                            raise InvalidOperation(harga_str)
+                    except (InvalidOperation, ValueError, TypeError):
                         errors.append(f"Row {row_num}: Harga harus berupa angka (contoh: 150000 atau 150000.50)")
                         continue
+                    if harga_value < 0:
+                        errors.append(f"Row {row_num}: Harga tidak boleh negatif")
+                        continue
+                    material_data['harga'] = harga_value
                 else:
                     material_data['harga'] = None
-                
-                # Create material
-                try:
-                    # Validasi nama_barang dan satuan tidak boleh kosong
-                    if not material_data.get('nama_barang'):
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: Nama Barang wajib diisi"
-                        errors.append(error_msg)
-                        self.logger.warning(error_msg)
-                        continue
-                    
-                    if not material_data.get('satuan'):
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: Satuan wajib diisi"
-                        errors.append(error_msg)
-                        self.logger.warning(error_msg)
-                        continue
-                    
-                    self.logger.info(f"Row {row_num}: Mencoba membuat material: {material_data}")
-                    material = self.repository.create(material_data)
-                    if material:
-                        success_count += 1
-                        self.logger.info(f"Row {row_num}: Berhasil membuat material dengan id: {material.id}")
-                    else:
-                        failed_count += 1
-                        error_msg = f"Row {row_num}: Gagal membuat material '{material_data['nama_barang']}'"
-                        errors.append(error_msg)
-                        self.logger.error(error_msg)
-                except IntegrityError as ie:
-                    # Handle duplicate entry error
-                    failed_count += 1
-                    error_msg = str(ie.orig) if hasattr(ie, 'orig') else str(ie)
-                    self.logger.error(f"Row {row_num}: IntegrityError - {error_msg}")
-                    
-                    if "Duplicate entry" in error_msg or "uq_material_project_kode" in error_msg:
-                        kode = material_data.get('kode_barang', '')
-                        error_msg = f"Row {row_num}: Kode barang '{kode}' sudah terdaftar di project ini"
-                        errors.append(error_msg)
-                    else:
-                        error_msg = f"Row {row_num}: Error database - {error_msg}"
-                        errors.append(error_msg)
-                except Exception as db_error:
-                    # Handle other database errors
-                    failed_count += 1
-                    error_msg = f"Row {row_num}: Error membuat material - {str(db_error)}"
-                    errors.append(error_msg)
-                    self.logger.error(f"Row {row_num}: Database error - {str(db_error)}", exc_info=True)
-                    
+
+                if not material_data['nama_barang']:
+                    errors.append(f"Row {row_num}: Nama Barang wajib diisi")
+                    continue
+                if not material_data['satuan']:
+                    errors.append(f"Row {row_num}: Satuan wajib diisi")
+                    continue
+
+                prepared.append((row_num, material_data))
             except Exception as e:
-                failed_count += 1
-                error_msg = f"Row {row_num}: Error memproses data - {str(e)}"
-                errors.append(error_msg)
+                errors.append(f"Row {row_num}: Error memproses data - {str(e)}")
                 self.logger.error(f"Row {row_num}: Exception - {str(e)}", exc_info=True)
-        
+
+        return prepared
+
+    def _insert_rows_individually(self, prepared: List[tuple], errors: List[str]) -> int:
+        """Fallback insert per row dengan SAVEPOINT agar row yang bentrok tidak membatalkan row lain"""
+        success_count = 0
+        with unit_of_work(self.db):
+            for row_num, material_data in prepared:
+                try:
+                    with self.db.begin_nested():
+                        self.repository.bulk_create([material_data], return_ids=False)
+                    success_count += 1
+                except IntegrityError:
+                    errors.append(f"Row {row_num}: Kode barang '{material_data.get('kode_barang', '')}' sudah terdaftar di project ini")
+            if success_count:
+                bump_version(self.db, REFERENCE_DATA_CACHE, scope=prepared[0][1]['project_id'])
+        return success_count
+
+    @staticmethod
+    def _bulk_result(success_count: int, errors: List[str], rolled_back: bool) -> Dict[str, Any]:
         return {
             'success_count': success_count,
-            'failed_count': failed_count,
-            'errors': errors
+            'failed_count': len(errors),
+            'errors': errors,
+            'rolled_back': rolled_back
         }
 
     @staticmethod
@@ -328,11 +401,11 @@ class MaterialService(BaseService[MaterialRepository]):
         """Get list of valid kategori"""
         return VALID_KATEGORIS.copy()
 
-    def get_unique_satuans(self) -> List[str]:
-        """Get unique satuan values from database"""
-        return self.repository.get_unique_satuans()
+    def get_unique_satuans(self, project_id: Optional[int] = None) -> List[str]:
+        """Get unique satuan values from database (tanpa cache, lihat ReferenceDataService)"""
+        return self.repository.get_unique_satuans(project_id=project_id)
 
-    def get_unique_kategoris(self) -> List[str]:
-        """Get unique kategori values from database"""
-        return self.repository.get_unique_kategoris()
+    def get_unique_kategoris(self, project_id: Optional[int] = None) -> List[str]:
+        """Get unique kategori values from database (tanpa cache, lihat ReferenceDataService)"""
+        return self.repository.get_unique_kategoris(project_id=project_id)
 
@@ -9,6 +9,12 @@ from app.repositories.inventory import (
     MaterialRepository,
 )
 from app.models.inventory.notification import Notification
+from app.core.cache import NOTIFICATIONS_CACHE, VersionedCache, bump_version
+from app.repositories.base import unit_of_work
+
+# Counter notifikasi belum dibaca per project (key: project_id, None = semua project).
+# Version project material-nya di-bump saat notifikasi dibuat, dihapus atau ditandai sudah dibaca.
+_unread_count_cache = VersionedCache(NOTIFICATIONS_CACHE, scoped=True)
 
 
 class NotificationService:
@@ -32,11 +38,12 @@ class NotificationService:
         """
         discrepancies = []
         
-        # Get all active mandors, filter by project_id if provided
-        mandors = self.mandor_repo.get_active_mandors(skip=0, limit=10000, project_id=project_id)
+        # Get all active mandors, filter by project_id if provided (tanpa batas row)
+        # Dibaca penuh ke list karena loop di bawah menjalankan query lain di session yang sama
+        mandors = list(self.mandor_repo.iter_all(self.mandor_repo.active_query(project_id=project_id)))
         
         # Get all active materials, filter by project_id if provided
-        materials = self.material_repo.get_active_materials(skip=0, limit=10000, project_id=project_id)
+        materials = list(self.material_repo.iter_all(self.material_repo.active_query(project_id=project_id)))
         
         # Kumpulkan stock_out_id yang berasal dari rilis retur (harus dikecualikan dari perhitungan barang keluar)
         try:
@@ -60,71 +67,83 @@ class NotificationService:
         except Exception:
             released_so_ids = set()
 
-        for mandor in mandors:
-            for material in materials:
-                # Get total barang keluar untuk mandor + material ini, filter by project_id if provided
-                stock_outs = self.stock_out_repo.get_by_mandor_and_material(
-                    mandor.id, material.id, project_id=project_id
-                )
-                # Exclude stock-out yang merupakan hasil rilis retur
-                total_keluar = sum(
-                    so.quantity for so in stock_outs 
-                    if so.is_deleted == 0 and so.id not in released_so_ids
-                )
+        # Semua create/update/delete notifikasi di-commit sekali di akhir (satu transaksi)
+        # Project (lewat material) yang counter unread-nya berubah
+        changed_projects = set()
+        with unit_of_work(self.db):
+            for mandor in mandors:
+                for material in materials:
+                    # Get total barang keluar untuk mandor + material ini, filter by project_id if provided
+                    stock_outs = self.stock_out_repo.get_by_mandor_and_material(
+                        mandor.id, material.id, project_id=project_id
+                    )
+                    # Exclude stock-out yang merupakan hasil rilis retur
+                    total_keluar = sum(
+                        so.quantity for so in stock_outs 
+                        if so.is_deleted == 0 and so.id not in released_so_ids
+                    )
                 
-                # Get total barang terpasang untuk mandor + material ini, filter by project_id if provided
-                installed_items = self.installed_repo.get_by_mandor_and_material(
-                    mandor.id, material.id, project_id=project_id
-                )
-                total_terpasang = sum(i.quantity for i in installed_items if i.is_deleted == 0)
+                    # Get total barang terpasang untuk mandor + material ini, filter by project_id if provided
+                    installed_items = self.installed_repo.get_by_mandor_and_material(
+                        mandor.id, material.id, project_id=project_id
+                    )
+                    total_terpasang = sum(i.quantity for i in installed_items if i.is_deleted == 0)
                 
-                # Get total barang kembali yang sudah dicatat, filter by project_id if provided
-                # PENTING: Exclude return yang sudah di-release (is_released = 1) karena 
-                # return tersebut sudah dikeluarkan lagi sebagai stock out baru
-                returns = self.return_repo.get_by_mandor_and_material(
-                    mandor.id, material.id, project_id=project_id
-                )
-                total_kembali_dicatat = sum(
-                    r.quantity_kembali for r in returns 
-                    if r.is_deleted == 0 and getattr(r, 'is_released', 0) == 0
-                )
+                    # Get total barang kembali yang sudah dicatat, filter by project_id if provided
+                    # PENTING: Exclude return yang sudah di-release (is_released = 1) karena 
+                    # return tersebut sudah dikeluarkan lagi sebagai stock out baru
+                    returns = self.return_repo.get_by_mandor_and_material(
+                        mandor.id, material.id, project_id=project_id
+                    )
+                    total_kembali_dicatat = sum(
+                        r.quantity_kembali for r in returns 
+                        if r.is_deleted == 0 and getattr(r, 'is_released', 0) == 0
+                    )
                 
-                # Calculate selisih yang seharusnya
-                selisih_seharusnya = total_keluar - total_terpasang
-                selisih_aktual = selisih_seharusnya - total_kembali_dicatat
+                    # Calculate selisih yang seharusnya
+                    selisih_seharusnya = total_keluar - total_terpasang
+                    selisih_aktual = selisih_seharusnya - total_kembali_dicatat
                 
-                # Jika ada selisih (barang keluar > barang terpasang)
-                if selisih_seharusnya > 0:
-                    discrepancies.append({
-                        "mandor_id": mandor.id,
-                        "mandor_nama": mandor.nama,
-                        "material_id": material.id,
-                        "material_kode": material.kode_barang,
-                        "material_nama": material.nama_barang,
-                        "barang_keluar": total_keluar,
-                        "barang_terpasang": total_terpasang,
-                        "barang_kembali_dicatat": total_kembali_dicatat,
-                        "selisih_seharusnya": selisih_seharusnya,
-                        "selisih_aktual": selisih_aktual,  # Selisih yang belum dicatat
-                        "status": "warning" if selisih_aktual > 0 else "info"
-                    })
+                    # Jika ada selisih (barang keluar > barang terpasang)
+                    if selisih_seharusnya > 0:
+                        discrepancies.append({
+                            "mandor_id": mandor.id,
+                            "mandor_nama": mandor.nama,
+                            "material_id": material.id,
+                            "material_kode": material.kode_barang,
+                            "material_nama": material.nama_barang,
+                            "barang_keluar": total_keluar,
+                            "barang_terpasang": total_terpasang,
+                            "barang_kembali_dicatat": total_kembali_dicatat,
+                            "selisih_seharusnya": selisih_seharusnya,
+                            "selisih_aktual": selisih_aktual,  # Selisih yang belum dicatat
+                            "status": "warning" if selisih_aktual > 0 else "info"
+                        })
                     
-                    # Create or update notification jika ada selisih yang belum dicatat
-                    if selisih_aktual > 0:
-                        self._create_or_update_notification(
-                            mandor.id,
-                            material.id,
-                            total_keluar,
-                            total_terpasang,
-                            selisih_aktual
-                        )
+                        # Create or update notification jika ada selisih yang belum dicatat
+                        if selisih_aktual > 0:
+                            if self._create_or_update_notification(
+                                mandor.id,
+                                material.id,
+                                total_keluar,
+                                total_terpasang,
+                                selisih_aktual
+                            ):
+                                changed_projects.add(material.project_id)
+                        else:
+                            # Jika selisih sudah 0 atau negatif, hapus notifikasi yang ada (jika ada)
+                            if self._delete_notification_if_exists(mandor.id, material.id):
+                                changed_projects.add(material.project_id)
                     else:
-                        # Jika selisih sudah 0 atau negatif, hapus notifikasi yang ada (jika ada)
-                        self._delete_notification_if_exists(mandor.id, material.id)
-                else:
-                    # Jika tidak ada selisih sama sekali (selisih_seharusnya <= 0),
-                    # hapus notifikasi yang ada (jika ada) karena sudah tidak relevan
-                    self._delete_notification_if_exists(mandor.id, material.id)
+                        # Jika tidak ada selisih sama sekali (selisih_seharusnya <= 0),
+                        # hapus notifikasi yang ada (jika ada) karena sudah tidak relevan
+                        if self._delete_notification_if_exists(mandor.id, material.id):
+                            changed_projects.add(material.project_id)
+            
+            # Update notifikasi yang sudah ada tidak mengubah is_read, jadi counter hanya
+            # di-invalidasi (per project) jika ada notifikasi baru atau yang dihapus
+            for changed_project_id in changed_projects:
+                bump_version(self.db, NOTIFICATIONS_CACHE, scope=changed_project_id)
         
         return discrepancies
 
@@ -135,8 +154,8 @@ class NotificationService:
         barang_keluar: int,
         barang_terpasang: int,
         selisih: int
-    ):
-        """Create or update notification for discrepancy"""
+    ) -> bool:
+        """Create or update notification for discrepancy. Return True jika notifikasi baru dibuat"""
         # Check if notification already exists (baik yang sudah dibaca maupun belum)
         existing = self.notification_repo.get_by(
             mandor_id=mandor_id,
@@ -161,59 +180,93 @@ class NotificationService:
         if existing:
             # Update existing notification
             self.notification_repo.update(existing.id, notification_data)
-        else:
-            # Create new notification
-            self.notification_repo.create(notification_data)
+            return False
+        # Create new notification
+        self.notification_repo.create(notification_data)
+        return True
     
     def _delete_notification_if_exists(
         self,
         mandor_id: int,
         material_id: int
-    ):
-        """Delete notification if exists (untuk case ketika selisih sudah 0 atau negatif)"""
-        try:
-            existing = self.notification_repo.get_by(
-                mandor_id=mandor_id,
-                material_id=material_id
-            )
-            
-            if existing:
-                # Hapus notifikasi yang ada
-                self.notification_repo.delete(existing.id)
-        except Exception:
-            # Jika ada error, skip saja (tidak critical)
-            pass
+    ) -> bool:
+        """
+        Delete notification if exists (untuk case ketika selisih sudah 0 atau negatif). Return True jika ada yang dihapus.
+        Dipanggil di dalam unit_of_work check_discrepancy: error tidak ditelan agar seluruh transaksi di-rollback.
+        """
+        existing = self.notification_repo.get_by(
+            mandor_id=mandor_id,
+            material_id=material_id
+        )
+        
+        if existing:
+            # Hapus notifikasi yang ada
+            self.notification_repo.delete(existing.id)
+            return True
+        return False
 
     def get_notifications(self, is_read: bool = None, skip: int = 0, limit: int = 100, project_id: Optional[int] = None) -> tuple[List[Notification], int]:
-        """Get notifications, optionally filtered by project_id through material"""
+        """
+        Get notifications, optionally filtered by project_id through material.
+        
+        Best practice: nama mandor dan material ikut di query yang sama (join + load_only), bukan
+        get() per notifikasi. Total untuk is_read=False diambil dari counter unread yang di-cache.
+        """
+        from sqlalchemy.orm import contains_eager, joinedload
         from app.models.inventory.material import Material
+        from app.models.inventory.mandor import Mandor
         
         # Base query
-        query = self.db.query(self.notification_repo.model)
+        query = self.db.query(Notification)
         
         # Filter by project_id through material if provided
         if project_id is not None:
-            query = query.join(Material).filter(
+            query = query.join(Notification.material).filter(
                 Material.project_id == project_id
             )
         
         # Apply is_read filter if specified
         if is_read is not None:
-            query = query.filter(self.notification_repo.model.is_read == is_read)
+            query = query.filter(Notification.is_read == is_read)
         
         # Get total count before pagination
-        total = query.count()
+        if is_read is False:
+            total = self.get_unread_count(project_id)
+        else:
+            total = query.count()
+        
+        if project_id is not None:
+            material_loader = contains_eager(Notification.material)
+        else:
+            material_loader = joinedload(Notification.material)
         
         # Apply pagination and get results
-        notifications = query.offset(skip).limit(limit).all()
+        notifications = query.options(
+            material_loader.load_only(Material.id, Material.nama_barang),
+            joinedload(Notification.mandor).load_only(Mandor.id, Mandor.nama)
+        ).offset(skip).limit(limit).all()
         
         return notifications, total
 
+    def get_unread_count(self, project_id: Optional[int] = None) -> int:
+        """Jumlah notifikasi belum dibaca per project, dari cache (invalidasi lewat version stamp)"""
+        return _unread_count_cache.get_or_load(
+            self.db, project_id, lambda: self.notification_repo.count_unread(project_id)
+        )
+
     def mark_as_read(self, notification_id: int) -> bool:
         """Mark notification as read"""
-        return self.notification_repo.mark_as_read(notification_id)
+        with unit_of_work(self.db):
+            updated = self.notification_repo.mark_as_read(notification_id)
+            if updated:
+                project_id = self.notification_repo.get_project_id(notification_id)
+                bump_version(self.db, NOTIFICATIONS_CACHE, scope=project_id)
+        return updated
 
     def mark_all_as_read(self) -> int:
-        """Mark all notifications as read"""
-        return self.notification_repo.mark_all_as_read()
-
+        """Mark all notifications as read (counter unread semua project di-invalidasi)"""
+        with unit_of_work(self.db):
+            count = self.notification_repo.mark_all_as_read()
+            if count:
+                bump_version(self.db, NOTIFICATIONS_CACHE)
+        return count
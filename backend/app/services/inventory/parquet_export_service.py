@@ -0,0 +1,408 @@
+"""
+Snapshot Parquet per project untuk analitik (DuckDB / pandas) tanpa membebani MySQL.
+
+Struktur file di PARQUET_EXPORT_DIR:
+    project_<id>/
+        manifest.json               fingerprint tiap partisi yang sudah ditulis
+        status.json                 status export terakhir (running / completed / failed)
+        materials/snapshot.parquet
+        mandors/snapshot.parquet
+        stock_ins/2025-01.parquet   satu file per bulan (berdasarkan tanggal transaksi)
+        stock_outs/..., installed/..., returns/...
+
+Incremental: fingerprint (jumlah row termasuk yang di-soft delete + updated_at terbesar) per bulan
+dihitung dengan satu query GROUP BY. Hanya bulan yang baru / berubah yang ditulis ulang,
+bulan lain dilewati. Row dibaca per chunk (repository.stream, server-side cursor) dan ditulis sebagai
+row group sehingga memory tetap kecil.
+
+Tipe kolom mengikuti model: Numeric -> decimal, Date -> date32, DateTime -> timestamp.
+Membutuhkan paket opsional pyarrow.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, extract, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Jumlah row per chunk baca database (= satu row group Parquet)
+PARQUET_CHUNK_SIZE = 5000
+# Lock export yang lebih tua dari ini dianggap sisa worker yang mati
+LOCK_STALE_SECONDS = 3600
+# Nama partisi untuk tabel master (tidak dipecah per bulan)
+SNAPSHOT_PARTITION = "snapshot"
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parquet-export")
+    return _executor
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ValidationError("Export Parquet membutuhkan paket pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _table_specs() -> Dict[str, Dict[str, Any]]:
+    """
+    Definisi tabel yang diekspor.
+    Kolom ditulis eksplisit (sama dengan list endpoint) karena sebagian kolom project_id
+    belum ada di database production; kolom pertama harus id (dipakai keyset pagination).
+    """
+    from app.models.inventory.material import Material
+    from app.models.inventory.mandor import Mandor
+    from app.models.inventory.stock_in import StockIn
+    from app.models.inventory.stock_out import StockOut
+    from app.models.inventory.installed import Installed
+    from app.models.inventory.return_model import Return
+    from app.repositories.inventory import (
+        MaterialRepository,
+        MandorRepository,
+        StockInRepository,
+        StockOutRepository,
+        InstalledRepository,
+        ReturnRepository,
+    )
+
+    return {
+        "materials": {
+            "model": Material,
+            "repository": MaterialRepository,
+            "columns": ["id", "kode_barang", "nama_barang", "satuan", "kategori", "harga", "is_active",
+                        "project_id", "created_at", "updated_at"],
+            "date_column": None,
+            "project_via_material": False,
+        },
+        "mandors": {
+            "model": Mandor,
+            "repository": MandorRepository,
+            "columns": ["id", "nama", "nomor_kontak", "alamat", "is_active", "project_id", "created_at", "updated_at"],
+            "date_column": None,
+            "project_via_material": False,
+        },
+        "stock_ins": {
+            "model": StockIn,
+            "repository": StockInRepository,
+            "columns": ["id", "nomor_invoice", "material_id", "quantity", "tanggal_masuk", "created_by",
+                        "created_at", "updated_at"],
+            "date_column": "tanggal_masuk",
+            "project_via_material": True,
+        },
+        "stock_outs": {
+            "model": StockOut,
+            "repository": StockOutRepository,
+            "columns": ["id", "nomor_barang_keluar", "mandor_id", "material_id", "quantity", "tanggal_keluar",
+                        "created_by", "created_at", "updated_at"],
+            "date_column": "tanggal_keluar",
+            "project_via_material": True,
+        },
+        "installed": {
+            "model": Installed,
+            "repository": InstalledRepository,
+            "columns": ["id", "no_register", "material_id", "mandor_id", "stock_out_id", "quantity",
+                        "tanggal_pasang", "created_by", "created_at", "updated_at"],
+            "date_column": "tanggal_pasang",
+            "project_via_material": True,
+        },
+        "returns": {
+            "model": Return,
+            "repository": ReturnRepository,
+            "columns": ["id", "mandor_id", "material_id", "stock_out_id", "quantity_kembali",
+                        "quantity_kondisi_baik", "quantity_kondisi_reject", "tanggal_kembali", "is_released",
+                        "created_by", "created_at", "updated_at"],
+            "date_column": "tanggal_kembali",
+            "project_via_material": False,
+        },
+    }
+
+
+EXPORT_TABLES = ("materials", "mandors", "stock_ins", "stock_outs", "installed", "returns")
+
+
+def _arrow_type(pa, column):
+    """Tipe Arrow dari tipe kolom SQLAlchemy"""
+    column_type = column.type
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision or 18, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def _month_range(partition: str) -> Tuple[date, date]:
+    year, month = (int(part) for part in partition.split("-"))
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+class ParquetExportService:
+    """Service untuk snapshot Parquet inventory per project"""
+
+    def __init__(self, db: Session, session_factory: Optional[Callable[[], Session]] = None):
+        self.db = db
+        if session_factory is None:
+            from app.config.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    @staticmethod
+    def project_dir(project_id: int) -> Path:
+        return Path(settings.PARQUET_EXPORT_DIR) / f"project_{project_id}"
+
+    # ---------- query ----------
+
+    def _project_filter(self, spec: Dict[str, Any], statement, project_id: int):
+        model = spec["model"]
+        if spec["project_via_material"]:
+            # Sama dengan list endpoint: project transaksi diambil dari material
+            from app.models.inventory.material import Material
+            return statement.join(Material, model.material_id == Material.id).where(Material.project_id == project_id)
+        return statement.where(model.project_id == project_id)
+
+    def _fingerprints(self, spec: Dict[str, Any], project_id: int) -> Dict[str, List[Any]]:
+        """
+        {partisi: [jumlah row, updated_at terbesar]} dalam satu query.
+        Row soft delete ikut dihitung karena penghapusan juga mengubah updated_at.
+        """
+        model = spec["model"]
+        aggregates = [func.count(model.id), func.max(model.updated_at)]
+        if spec["date_column"] is None:
+            statement = self._project_filter(spec, select(*aggregates), project_id)
+            count, max_updated = self.db.execute(statement).one()
+            return {SNAPSHOT_PARTITION: [count, str(max_updated)]} if count else {}
+
+        date_column = getattr(model, spec["date_column"])
+        year = extract("year", date_column)
+        month = extract("month", date_column)
+        statement = self._project_filter(spec, select(year, month, *aggregates), project_id).group_by(year, month)
+        return {
+            f"{int(y):04d}-{int(m):02d}": [count, str(max_updated)]
+            for y, m, count, max_updated in self.db.execute(statement).all()
+        }
+
+    def _partition_statement(self, spec: Dict[str, Any], project_id: int, partition: str):
+        model = spec["model"]
+        statement = self._project_filter(
+            spec, self.db.query(*[getattr(model, name) for name in spec["columns"]]), project_id
+        )
+        if hasattr(model, "is_deleted"):
+            # Sama dengan repository dan stream export: is_deleted 0 atau NULL dianggap belum dihapus
+            statement = statement.where(or_(model.is_deleted == 0, model.is_deleted.is_(None)))
+        if spec["date_column"] is not None:
+            start, end = _month_range(partition)
+            date_column = getattr(model, spec["date_column"])
+            statement = statement.where(date_column >= start, date_column < end)
+        return statement.order_by(model.id)
+
+    # ---------- tulis file ----------
+
+    def _write_partition(self, spec: Dict[str, Any], project_id: int, partition: str, path: Path) -> int:
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        model = spec["model"]
+        schema = pa.schema([
+            pa.field(name, _arrow_type(pa, model.__table__.columns[name])) for name in spec["columns"]
+        ])
+        repository = spec["repository"](self.db)
+        statement = self._partition_statement(spec, project_id, partition)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        row_count = 0
+        try:
+            with pq.ParquetWriter(str(tmp_path), schema, compression="snappy") as writer:
+                for rows in repository.stream(statement, PARQUET_CHUNK_SIZE):
+                    columns = list(zip(*rows))
+                    writer.write_table(pa.Table.from_arrays(
+                        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                        schema=schema
+                    ))
+                    row_count += len(rows)
+            # Ganti file lama secara atomik agar pembaca tidak melihat file setengah jadi
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return row_count
+
+    def export_project(self, project_id: int, tables: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Tulis snapshot Parquet project. Partisi yang fingerprint-nya sama dengan manifest dilewati
+        (kecuali force=True); partisi yang sudah tidak punya data dihapus.
+
+        Returns:
+            Laporan per tabel: partisi yang ditulis, dilewati, dihapus dan jumlah row yang ditulis
+        """
+        _require_pyarrow()
+        specs = _table_specs()
+        tables = tables or list(EXPORT_TABLES)
+        unknown = [table for table in tables if table not in specs]
+        if unknown:
+            raise ValidationError(f"Tabel export tidak dikenal: {', '.join(unknown)}")
+
+        base_dir = self.project_dir(project_id)
+        manifest_path = base_dir / "manifest.json"
+        manifest = _read_json(manifest_path)
+        manifest_tables = manifest.setdefault("tables", {})
+        report: Dict[str, Any] = {}
+
+        for table in tables:
+            spec = specs[table]
+            table_dir = base_dir / table
+            known = manifest_tables.setdefault(table, {})
+            fingerprints = self._fingerprints(spec, project_id)
+            written, removed, skipped, rows_written = [], [], 0, 0
+
+            for partition, fingerprint in sorted(fingerprints.items()):
+                path = table_dir / f"{partition}.parquet"
+                previous = known.get(partition)
+                if not force and previous and previous.get("fingerprint") == fingerprint and path.exists():
+                    skipped += 1
+                    continue
+                row_count = self._write_partition(spec, project_id, partition, path)
+                known[partition] = {
+                    "fingerprint": fingerprint,
+                    "rows": row_count,
+                    "file": str(path.relative_to(base_dir)),
+                    "written_at": datetime.utcnow().isoformat(),
+                }
+                written.append(partition)
+                rows_written += row_count
+
+            for partition in [p for p in known if p not in fingerprints]:
+                (table_dir / f"{partition}.parquet").unlink(missing_ok=True)
+                del known[partition]
+                removed.append(partition)
+
+            report[table] = {"written": written, "skipped": skipped, "removed": removed, "rows_written": rows_written}
+            # Simpan manifest per tabel agar progress tidak hilang jika tabel berikutnya gagal
+            manifest["project_id"] = project_id
+            manifest["updated_at"] = datetime.utcnow().isoformat()
+            base_dir.mkdir(parents=True, exist_ok=True)
+            _write_json(manifest_path, manifest)
+
+        return report
+
+    # ---------- job di background ----------
+
+    def _acquire_lock(self, project_id: int) -> Path:
+        base_dir = self.project_dir(project_id)
+        base_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = base_dir / ".lock"
+        try:
+            if time.time() - lock_path.stat().st_mtime > LOCK_STALE_SECONDS:
+                lock_path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        try:
+            # O_EXCL: aman dipakai bersama antar worker uvicorn
+            os.close(os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise ValidationError("Export Parquet project ini sedang berjalan")
+        return lock_path
+
+    def submit(self, project_id: int, user_id: int, force: bool = False) -> Dict[str, Any]:
+        """Jalankan export di background, langsung kembalikan status running"""
+        _require_pyarrow()
+        lock_path = self._acquire_lock(project_id)
+        status_data = {
+            "status": STATUS_RUNNING,
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "requested_by": user_id,
+            "force": force,
+            "message": None,
+            "report": None,
+        }
+        _write_json(self.project_dir(project_id) / "status.json", status_data)
+        _get_executor().submit(_run_export, project_id, force, lock_path, self.session_factory)
+        return status_data
+
+    def get_status(self, project_id: int) -> Dict[str, Any]:
+        """Status export terakhir dan daftar partisi yang tersedia"""
+        base_dir = self.project_dir(project_id)
+        manifest = _read_json(base_dir / "manifest.json")
+        return {
+            "export_dir": str(base_dir),
+            "status": _read_json(base_dir / "status.json") or None,
+            "tables": {
+                table: {
+                    partition: {"rows": info.get("rows"), "file": info.get("file"), "written_at": info.get("written_at")}
+                    for partition, info in sorted(partitions.items())
+                }
+                for table, partitions in manifest.get("tables", {}).items()
+            },
+        }
+
+
+def _run_export(project_id: int, force: bool, lock_path: Path, session_factory: Callable[[], Session]) -> None:
+    """Dijalankan di thread background dengan session sendiri"""
+    from app.core.metrics import track_job
+
+    status_path = ParquetExportService.project_dir(project_id) / "status.json"
+    status_data = _read_json(status_path)
+    db = session_factory()
+    try:
+        with track_job("export"):
+            report = ParquetExportService(db, session_factory).export_project(project_id, force=force)
+        status_data.update({
+            "status": STATUS_COMPLETED,
+            "report": report,
+            "message": f"{sum(len(item['written']) for item in report.values())} partisi ditulis, "
+                       f"{sum(item['skipped'] for item in report.values())} partisi tidak berubah",
+        })
+    except Exception as e:
+        logger.error(f"Parquet export project {project_id} gagal: {str(e)}", exc_info=True)
+        status_data.update({"status": STATUS_FAILED, "message": str(getattr(e, "detail", None) or e)})
+    finally:
+        db.close()
+        status_data["finished_at"] = datetime.utcnow().isoformat()
+        _write_json(status_path, status_data)
+        lock_path.unlink(missing_ok=True)
@@ -0,0 +1,54 @@
+"""
+Reference data untuk form (satuan, kategori, kategori valid, konfigurasi pages).
+
+Nilai distinct satuan/kategori per project di-cache in-memory (VersionedCache) dan di-invalidasi
+lewat version stamp REFERENCE_DATA_CACHE per project yang di-bump oleh MaterialService setiap kali
+material di project tersebut berubah (project lain tetap memakai cache-nya).
+ETag dihitung sekali saat data di-load sehingga revalidasi (If-None-Match -> 304) cukup satu
+lookup version tanpa query ke table materials.
+"""
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from app.config.pages_config import PAGES_CONFIG
+from app.core.cache import REFERENCE_DATA_CACHE, VersionedCache
+from app.repositories.inventory import MaterialRepository
+from app.services.inventory.material_service import VALID_KATEGORIS
+from app.utils.response import make_etag
+
+_reference_cache = VersionedCache(REFERENCE_DATA_CACHE, scoped=True)
+
+# Bagian reference data yang bisa diminta terpisah (selain bundle lengkap "all")
+REFERENCE_SATUANS = "satuans"
+REFERENCE_KATEGORIS = "kategoris"
+REFERENCE_ALL = "all"
+
+
+class ReferenceDataService:
+    """Service untuk reference data material per project (dengan cache dan ETag)"""
+
+    def __init__(self, db: Session):
+        self.material_repo = MaterialRepository(db)
+        self.db = db
+
+    def get(self, project_id: Optional[int], part: str = REFERENCE_ALL) -> Dict[str, Any]:
+        """
+        Return {"data": ..., "etag": ...} untuk bagian `part` (satuans, kategoris atau all).
+        Bundle all berisi satuans, kategoris, valid_kategoris dan pages untuk bootstrap form.
+        """
+        entry = _reference_cache.get_or_load(self.db, project_id, lambda: self._load(project_id))
+        return entry[part]
+
+    def _load(self, project_id: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        satuans = self.material_repo.get_unique_satuans(project_id=project_id)
+        kategoris = self.material_repo.get_unique_kategoris(project_id=project_id)
+        bundle = {
+            "satuans": satuans,
+            "kategoris": kategoris,
+            "valid_kategoris": list(VALID_KATEGORIS),
+            "pages": PAGES_CONFIG,
+        }
+        return {
+            REFERENCE_SATUANS: {"data": satuans, "etag": make_etag(satuans)},
+            REFERENCE_KATEGORIS: {"data": kategoris, "etag": make_etag(kategoris)},
+            REFERENCE_ALL: {"data": bundle, "etag": make_etag(bundle)},
+        }
@@ -0,0 +1,313 @@
+"""
+Import barang masuk (stock in) dan barang keluar (stock out) dari file Excel / CSV,
+untuk input massal maupun backfill data historis puluhan ribu row.
+
+Best practice:
+- Kode barang dan nama mandor di-resolve lewat map yang di-preload sekali per import
+- Stok tersedia untuk validasi barang keluar dihitung dengan query GROUP BY, bukan per row
+- Nomor JRGS-KDL-YYYYMMDD-XXXX dialokasikan per blok (satu query untuk semua tanggal di file)
+- Row valid di-insert dengan executemany per batch dalam satu transaksi
+"""
+import logging
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.repositories.inventory import (
+    InstalledRepository,
+    MandorRepository,
+    MaterialRepository,
+    StockInRepository,
+    StockOutRepository,
+)
+from app.repositories.base import unit_of_work
+from app.services.inventory.material_service import IMPORT_BATCH_SIZE, IMPORT_PROGRESS_EVERY
+from app.utils.excel_importer import build_import_report, import_report_message, parse_import_date
+from app.utils.file_upload import save_evidence_paths_to_db
+
+# Percobaan ulang alokasi nomor barang keluar jika bentrok dengan input lain yang berjalan bersamaan
+MAX_NUMBER_RETRIES = 3
+# Batas kolom Numeric(10, 1)
+MAX_QUANTITY = Decimal("999999999")
+
+ProgressCallback = Callable[[int, List[str]], None]
+
+
+class RowError(Exception):
+    """Error validasi satu row file import"""
+
+
+class StockImportService:
+    """Service untuk import barang masuk / barang keluar dari spreadsheet"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.material_repo = MaterialRepository(db)
+        self.mandor_repo = MandorRepository(db)
+        self.stock_in_repo = StockInRepository(db)
+        self.stock_out_repo = StockOutRepository(db)
+        self.installed_repo = InstalledRepository(db)
+        self.logger = logging.getLogger(__name__)
+
+    # ---- barang masuk ----
+
+    def import_stock_in_rows(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        project_id: int,
+        created_by: int,
+        all_or_nothing: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Validasi dan simpan row barang masuk (kolom: NOMOR INVOICE, KODE BARANG, QUANTITY, TANGGAL MASUK)
+
+        Returns:
+            Laporan import (lihat build_import_report)
+        """
+        kode_map = self.material_repo.get_kode_map(project_id)
+        evidence_paths = save_evidence_paths_to_db([])
+
+        def prepare(row: Dict[str, Any], row_num: Any) -> Dict[str, Any]:
+            nomor_invoice = (row.get('nomor_invoice') or '').strip()
+            if not nomor_invoice:
+                raise RowError(f"Row {row_num}: Nomor Invoice wajib diisi")
+            if len(nomor_invoice) > 255:
+                raise RowError(f"Row {row_num}: Nomor Invoice maksimal 255 karakter")
+            return {
+                "nomor_invoice": nomor_invoice,
+                "material_id": self._resolve_material(row, row_num, kode_map),
+                "quantity": self._parse_quantity(row, row_num),
+                "tanggal_masuk": self._parse_date(row, row_num, 'tanggal_masuk', "Tanggal Masuk"),
+                "evidence_paths": evidence_paths,
+                "project_id": project_id,
+                "created_by": created_by,
+                "is_deleted": 0,
+            }
+
+        prepared, validation_errors, total_rows = self._collect(rows, prepare, progress)
+        return self._insert(prepared, validation_errors, total_rows, all_or_nothing,
+                            lambda data: self.stock_in_repo.bulk_create(data, batch_size=batch_size, return_ids=False))
+
+    # ---- barang keluar ----
+
+    def import_stock_out_rows(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        project_id: int,
+        created_by: int,
+        all_or_nothing: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Validasi dan simpan row barang keluar (kolom: NAMA MANDOR, KODE BARANG, QUANTITY, TANGGAL KELUAR)
+        Nomor barang keluar dibuat otomatis seperti input manual.
+
+        Returns:
+            Laporan import (lihat build_import_report)
+        """
+        kode_map = self.material_repo.get_kode_map(project_id)
+        mandor_map = self.mandor_repo.get_name_map(project_id)
+        evidence_paths = save_evidence_paths_to_db([])
+        # Kode barang sesuai penulisan di file, untuk pesan error stok
+        kode_by_id: Dict[int, str] = {}
+
+        def prepare(row: Dict[str, Any], row_num: Any) -> Dict[str, Any]:
+            nama_mandor = " ".join((row.get('nama_mandor') or '').split())
+            if not nama_mandor:
+                raise RowError(f"Row {row_num}: Nama Mandor wajib diisi")
+            mandor_ids = mandor_map.get(nama_mandor.lower())
+            if not mandor_ids:
+                raise RowError(f"Row {row_num}: Mandor '{nama_mandor}' tidak ditemukan di project ini")
+            if len(mandor_ids) > 1:
+                raise RowError(f"Row {row_num}: Nama mandor '{nama_mandor}' dipakai lebih dari satu mandor aktif")
+            material_id = self._resolve_material(row, row_num, kode_map)
+            kode_by_id.setdefault(material_id, row['kode_barang'].strip())
+            return {
+                "nomor_barang_keluar": None,  # Dialokasikan per blok sebelum insert
+                "mandor_id": mandor_ids[0],
+                "material_id": material_id,
+                "quantity": self._parse_quantity(row, row_num),
+                "tanggal_keluar": self._parse_date(row, row_num, 'tanggal_keluar', "Tanggal Keluar"),
+                "evidence_paths": evidence_paths,
+                "project_id": project_id,
+                "created_by": created_by,
+                "is_deleted": 0,
+            }
+
+        prepared, validation_errors, total_rows = self._collect(rows, prepare, progress)
+        prepared = self._check_stock_available(prepared, kode_by_id, validation_errors)
+
+        def insert(data: List[Dict[str, Any]]) -> None:
+            self._allocate_numbers(data)
+            self.stock_out_repo.bulk_create(data, batch_size=batch_size, return_ids=False)
+
+        return self._insert(prepared, validation_errors, total_rows, all_or_nothing, insert,
+                            retries=MAX_NUMBER_RETRIES)
+
+    def _check_stock_available(self, prepared: List[Tuple[Any, Dict[str, Any]]], kode_by_id: Dict[int, str],
+                               errors: List[str]) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Validasi stok seperti create_stock_out_bulk: quantity per row tidak boleh melebihi
+        stok saat ini (total masuk - total terpasang) material tersebut. Stok dikurangi
+        quantity setiap row yang diterima, sehingga total keluar satu material di seluruh file
+        tidak bisa melebihi stok walaupun tiap row sendiri terlihat valid.
+        """
+        material_ids = {data["material_id"] for _, data in prepared}
+        total_in = self.stock_in_repo.sum_quantity_by_material(material_ids)
+        total_installed = self.installed_repo.sum_quantity_by_material(material_ids)
+        remaining = {
+            material_id: total_in.get(material_id, Decimal(0)) - total_installed.get(material_id, Decimal(0))
+            for material_id in material_ids
+        }
+
+        available = []
+        for row_num, data in prepared:
+            material_id = data["material_id"]
+            current_stock = remaining[material_id]
+            if current_stock < data["quantity"]:
+                errors.append(
+                    f"Row {row_num}: Stok tidak cukup untuk material {kode_by_id.get(material_id, material_id)}. "
+                    f"Stok tersedia: {current_stock}, dibutuhkan: {data['quantity']}"
+                )
+                continue
+            remaining[material_id] = current_stock - data["quantity"]
+            available.append((row_num, data))
+        return available
+
+    def _allocate_numbers(self, data: List[Dict[str, Any]]) -> None:
+        """Alokasikan nomor JRGS-KDL-YYYYMMDD-XXXX berurutan per tanggal, mulai dari nomor terbesar yang ada"""
+        next_numbers = self.stock_out_repo.get_max_numbers_for_dates({item["tanggal_keluar"] for item in data})
+        for item in data:
+            tanggal = item["tanggal_keluar"]
+            next_numbers[tanggal] += 1
+            item["nomor_barang_keluar"] = f"JRGS-KDL-{tanggal.strftime('%Y%m%d')}-{next_numbers[tanggal]:04d}"
+
+    # ---- shared ----
+
+    def _collect(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        prepare: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+        progress: Optional[ProgressCallback]
+    ) -> Tuple[List[Tuple[Any, Dict[str, Any]]], List[str], int]:
+        """Validasi semua row di memory. Return (row valid, error validasi, jumlah row)"""
+        prepared: List[Tuple[Any, Dict[str, Any]]] = []
+        errors: List[str] = []
+        total_rows = 0
+        for row in rows:
+            total_rows += 1
+            row_num = row.get('_row_number', '?')
+            try:
+                prepared.append((row_num, prepare(row, row_num)))
+            except RowError as e:
+                errors.append(str(e))
+            if progress is not None and total_rows % IMPORT_PROGRESS_EVERY == 0:
+                progress(total_rows, errors)
+        if progress is not None:
+            progress(total_rows, errors)
+        return prepared, errors, total_rows
+
+    def _insert(
+        self,
+        prepared: List[Tuple[Any, Dict[str, Any]]],
+        validation_errors: List[str],
+        total_rows: int,
+        all_or_nothing: bool,
+        insert: Callable[[List[Dict[str, Any]]], None],
+        retries: int = 1
+    ) -> Dict[str, Any]:
+        """Insert semua row valid dalam satu transaksi (executemany per batch)"""
+        if not prepared:
+            return build_import_report(total_rows, 0, validation_errors, [], rolled_back=False)
+        if all_or_nothing and validation_errors:
+            self.logger.warning(f"Import dibatalkan (all-or-nothing): {len(validation_errors)} row gagal validasi")
+            return build_import_report(total_rows, 0, validation_errors, [], rolled_back=True)
+
+        data = [item for _, item in prepared]
+        for attempt in range(1, retries + 1):
+            try:
+                with unit_of_work(self.db):
+                    insert(data)
+                break
+            except IntegrityError as e:
+                detail = str(e.orig) if hasattr(e, 'orig') else str(e)
+                if attempt < retries:
+                    # Nomor bentrok dengan data yang masuk setelah alokasi, alokasikan ulang
+                    self.logger.warning(f"Import konflik (percobaan {attempt}/{retries}): {detail}")
+                    continue
+                self.logger.error(f"Import gagal disimpan: {detail}")
+                return build_import_report(total_rows, 0, validation_errors, [f"Error database - {detail}"],
+                                           rolled_back=True)
+            except Exception as e:
+                self.logger.error(f"Import gagal disimpan: {str(e)}", exc_info=True)
+                return build_import_report(total_rows, 0, validation_errors, [f"Error database - {str(e)}"],
+                                           rolled_back=True)
+
+        self.logger.info(f"Import: {len(data)} row disimpan, {len(validation_errors)} row gagal validasi")
+        return build_import_report(total_rows, len(data), validation_errors, [], rolled_back=False)
+
+    @staticmethod
+    def _resolve_material(row: Dict[str, Any], row_num: Any, kode_map: Dict[str, Tuple[int, int]]) -> int:
+        kode_barang = (row.get('kode_barang') or '').strip()
+        if not kode_barang:
+            raise RowError(f"Row {row_num}: Kode Barang wajib diisi")
+        material = kode_map.get(kode_barang.lower())
+        if material is None:
+            raise RowError(f"Row {row_num}: Kode barang '{kode_barang}' tidak ditemukan di project ini")
+        material_id, is_active = material
+        if not is_active:
+            raise RowError(f"Row {row_num}: Material '{kode_barang}' tidak aktif")
+        return material_id
+
+    @staticmethod
+    def _parse_quantity(row: Dict[str, Any], row_num: Any) -> Decimal:
+        quantity_str = (row.get('quantity') or '').strip()
+        if not quantity_str:
+            raise RowError(f"Row {row_num}: Quantity wajib diisi")
+        try:
+            quantity = Decimal(quantity_str.replace(",", "."))
+            if not quantity.is_finite():
+                raise InvalidOperation(quantity_str)
+        except (InvalidOperation, ValueError):
+            raise RowError(f"Row {row_num}: Quantity harus berupa angka")
+        # Normalisasi quantity ke 2 desimal (sama dengan input manual)
+        quantity = quantity.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        if quantity <= 0:
+            raise RowError(f"Row {row_num}: Quantity harus lebih dari 0")
+        if quantity > MAX_QUANTITY:
+            raise RowError(f"Row {row_num}: Quantity terlalu besar")
+        return quantity
+
+    @staticmethod
+    def _parse_date(row: Dict[str, Any], row_num: Any, key: str, label: str) -> date:
+        value = (row.get(key) or '').strip()
+        if not value:
+            raise RowError(f"Row {row_num}: {label} wajib diisi")
+        parsed = parse_import_date(value)
+        if parsed is None:
+            raise RowError(f"Row {row_num}: {label} '{value}' tidak valid (format: YYYY-MM-DD atau DD/MM/YYYY)")
+        return parsed
+
+    @staticmethod
+    def import_message(report: Dict[str, Any], item_label: str) -> str:
+        return import_report_message(report, item_label)
+
+    def record_import_audit(self, user_id: int, table_name: str, file_name: str, report: Dict[str, Any]) -> None:
+        """Audit log untuk import transaksi (satu entry per file)"""
+        from app.services.inventory.audit_log_service import AuditLogService, ActionType
+
+        total_failed = report['validation_failed_count'] + report['processing_failed_count']
+        AuditLogService(self.db).create_log(
+            user_id=user_id,
+            action=ActionType.CREATE,
+            table_name=table_name,
+            record_id=0,  # Bulk operation, tidak punya single record_id
+            new_values={"bulk_import": True, "file_name": file_name},
+            description=f"Import {table_name} dari file: {report['success_count']} sukses, {total_failed} gagal"
+        )
@@ -0,0 +1,56 @@
+from typing import Dict, Iterable, Any
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from app.models.inventory.stock_out import StockOut
+from app.repositories.inventory import InstalledRepository, ReturnRepository
+
+
+class StockOutQuantityService:
+    """
+    Service untuk menghitung sisa quantity stock out (terpasang, sudah kembali, reject, sisa).
+    Dipakai bersama oleh picker stock out per mandor, lookup by nomor barang keluar dan
+    validasi create return agar aturan sisa sama di semua tempat.
+
+    Best practice: total terpasang dan total return dihitung dengan satu query GROUP BY per tabel
+    untuk semua stock out sekaligus, bukan dua query per stock out.
+    """
+
+    def __init__(self, db: Session):
+        self.installed_repo = InstalledRepository(db)
+        self.return_repo = ReturnRepository(db)
+        self.db = db
+
+    def get_remaining(self, stock_outs: Iterable[StockOut]) -> Dict[int, Dict[str, Decimal]]:
+        """
+        Sisa quantity per stock_out_id:
+        - quantity_terpasang: total terpasang yang tertaut langsung (by stock_out_id)
+        - quantity_sudah_kembali: total quantity_kembali yang sudah dicatat
+        - quantity_reject: total kondisi reject (informasi, tidak mengurangi sisa)
+        - quantity_sisa_total: Qty Keluar - Terpasang (batas maksimal total barang kembali)
+        - quantity_sisa_kembali: Qty Keluar - Terpasang - Sudah Kembali (sisa yang masih bisa dikembalikan)
+        """
+        stock_outs = list(stock_outs)
+        so_ids = [so.id for so in stock_outs]
+        installed_by_so = self.installed_repo.sum_quantity_by_stock_out(so_ids)
+        returns_by_so = self.return_repo.sum_by_stock_out(so_ids)
+
+        result: Dict[int, Dict[str, Decimal]] = {}
+        for so in stock_outs:
+            qty_keluar = Decimal(str(so.quantity)) if so.quantity is not None else Decimal('0')
+            terpasang = max(Decimal('0'), installed_by_so.get(so.id, Decimal('0')))
+            sudah_kembali, reject = returns_by_so.get(so.id, (Decimal('0'), Decimal('0')))
+            result[so.id] = {
+                "quantity_terpasang": terpasang,
+                "quantity_sudah_kembali": max(Decimal('0'), sudah_kembali),
+                "quantity_reject": max(Decimal('0'), reject),
+                "quantity_sisa_total": max(Decimal('0'), qty_keluar - terpasang),
+                "quantity_sisa_kembali": max(Decimal('0'), qty_keluar - terpasang - sudah_kembali),
+            }
+        return result
+
+    @staticmethod
+    def to_response_fields(remaining: Dict[str, Decimal]) -> Dict[str, Any]:
+        """Field sisa quantity untuk response (float agar nilai desimal tetap di JSON)"""
+        fields = {key: float(value) for key, value in remaining.items()}
+        fields["quantity_sisa"] = fields["quantity_sisa_kembali"]  # Backward compatibility
+        return fields
@@ -10,6 +10,7 @@ from app.repositories.inventory import (
     ReturnRepository,
     MaterialRepository,
 )
+from app.repositories.base import unit_of_work
 from app.core.exceptions import NotFoundError, ValidationError
 from app.utils.file_upload import save_evidence_paths_to_db, get_evidence_paths_from_db
 import json
@@ -34,18 +35,6 @@ class StockService:
         self.db = db
         self.logger = logging.getLogger(__name__)
 
-    def _filter_not_deleted(self, items: List) -> List:
-        """Helper method untuk filter items yang tidak deleted (is_deleted == 0 or None)"""
-        return [item for item in items if (getattr(item, 'is_deleted', None) == 0 or getattr(item, 'is_deleted', None) is None)]
-    
-    def _filter_by_material_and_not_deleted(self, items: List, material_id: int) -> List:
-        """Helper method untuk filter items by material_id dan tidak deleted"""
-        return [
-            item for item in items
-            if (getattr(item, 'material_id', None) == material_id and 
-                (getattr(item, 'is_deleted', None) == 0 or getattr(item, 'is_deleted', None) is None))
-        ]
-
     def create_stock_in(
         self,
         nomor_invoice: str,
@@ -370,14 +359,14 @@ class StockService:
             )
 
         # VALIDASI: Hitung batas maksimal barang kembali berbasis
-        # Sisa Barang Kembali = Barang Keluar - Terpasang
-        total_installed_for_stock_out = self.installed_repo.get_total_quantity_by_stock_out(stock_out_id)
-        # Pastikan semua nilai menggunakan Decimal
-        stock_out_quantity = Decimal(str(stock_out.quantity)) if stock_out.quantity is not None else Decimal('0')
-        max_return_allowed = max(Decimal('0'), stock_out_quantity - total_installed_for_stock_out)
-
-        # Hitung total quantity_kembali yang sudah ada untuk stock_out_id ini
-        total_quantity_kembali_existing = self.return_repo.get_total_quantity_by_stock_out(stock_out_id)
+        # Sisa Barang Kembali = Barang Keluar - Terpasang (aturan sama dengan picker stock out)
+        from app.services.inventory.stock_out_quantity_service import StockOutQuantityService
+        remaining = StockOutQuantityService(self.db).get_remaining([stock_out])[stock_out.id]
+        total_installed_for_stock_out = remaining["quantity_terpasang"]
+        max_return_allowed = remaining["quantity_sisa_total"]
+
+        # Total quantity_kembali yang sudah ada untuk stock_out_id ini
+        total_quantity_kembali_existing = remaining["quantity_sudah_kembali"]
         total_quantity_kembali_new = total_quantity_kembali_existing + quantity_kembali
 
         # Validasi: total kembali tidak boleh melebihi Sisa Barang Kembali
@@ -442,109 +431,118 @@ class StockService:
             if not materials[0]:
                 raise NotFoundError(f"Material dengan ID {material_id} tidak ditemukan")
         elif search:
-            materials = self.material_repo.search_by_name_or_code(search_term=search, skip=0, limit=10000, project_id=project_id)
+            search_query = self.material_repo.search_query(search, project_id=project_id)
+            materials = list(self.material_repo.iter_all(search_query)) if search_query is not None else []
         else:
-            materials = self.material_repo.get_active_materials(skip=0, limit=10000, project_id=project_id)
+            materials = list(self.material_repo.iter_all(self.material_repo.active_query(project_id=project_id)))
         
+        balance_data = self.build_balance_rows(materials, start_date, end_date, project_id=project_id)
+        return balance_data if material_id is None else balance_data[0]
+
+    def build_balance_rows(
+        self,
+        materials: List,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[int] = None,
+        stock_in_all_dates: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Hitung stock balance untuk daftar material.
+        Setiap tabel transaksi dibaca satu kali lewat stream (tanpa batas row, memory per batch),
+        lalu dijumlahkan per material; sebelumnya setiap material mengambil ulang data dengan limit 10000.
+
+        Args:
+            materials: Material yang dihitung (urutan hasil mengikuti list ini)
+            start_date / end_date: Filter tanggal transaksi (inklusif)
+            project_id: Project material, dipakai membatasi transaksi yang dibaca (lewat material)
+            stock_in_all_dates: Barang masuk dihitung tanpa filter tanggal (dipakai sheet Summary export Excel)
+        """
+        from sqlalchemy.orm import load_only
+        from app.models.inventory.stock_in import StockIn
+        from app.models.inventory.stock_out import StockOut
+        from app.models.inventory.installed import Installed
+        from app.models.inventory.return_model import Return
+
+        totals = {
+            material.id: {
+                "masuk": 0, "keluar": 0, "terpasang": 0, "kembali_all": 0,
+                "baik_released": 0, "baik_not_released": 0, "reject": 0,
+            }
+            for material in materials
+        }
+        if not totals:
+            return []
+
+        def scoped(repo, model, query):
+            # Satu material: filter langsung material_id (index); banyak material: filter project lewat material
+            if len(totals) == 1:
+                query = query.filter(model.material_id == next(iter(totals)))
+            return repo.stream(query)
+
+        material_project_id = project_id if len(totals) > 1 else None
+
+        in_start, in_end = (None, None) if stock_in_all_dates else (start_date, end_date)
+        query = self.stock_in_repo.query_by_date_range(in_start, in_end, material_project_id).options(
+            load_only(StockIn.id, StockIn.material_id, StockIn.quantity)
+        )
+        for batch in scoped(self.stock_in_repo, StockIn, query):
+            for stock_in in batch:
+                item = totals.get(stock_in.material_id)
+                if item is not None:
+                    item["masuk"] += stock_in.quantity
+
+        # Returns dibaca sebelum stock out untuk mengumpulkan stock_out_id hasil retur keluar
+        # TIDAK filter returns.project_id karena data lama mungkin punya project_id NULL (project lewat material)
+        stock_out_ids_from_return = set()
+        query = self.return_repo.query_by_date_range(start_date, end_date, material_project_id).options(
+            load_only(
+                Return.id, Return.material_id, Return.stock_out_id, Return.is_released,
+                Return.quantity_kembali, Return.quantity_kondisi_baik, Return.quantity_kondisi_reject,
+            )
+        )
+        for batch in scoped(self.return_repo, Return, query):
+            for return_item in batch:
+                item = totals.get(return_item.material_id)
+                if item is None:
+                    continue
+                item["kembali_all"] += return_item.quantity_kembali
+                item["reject"] += return_item.quantity_kondisi_reject or 0
+                if getattr(return_item, 'is_released', 0) == 1:
+                    item["baik_released"] += return_item.quantity_kondisi_baik or 0
+                    if return_item.stock_out_id is not None:
+                        stock_out_ids_from_return.add(return_item.stock_out_id)
+                else:
+                    item["baik_not_released"] += return_item.quantity_kondisi_baik or 0
+
+        # PENTING: stock_out yang berasal dari retur keluar TIDAK mengurangi stok
+        # karena sudah pernah masuk ke gudang sebagai return
+        query = self.stock_out_repo.query_by_date_range(start_date, end_date, material_project_id).options(
+            load_only(StockOut.id, StockOut.material_id, StockOut.quantity)
+        )
+        for batch in scoped(self.stock_out_repo, StockOut, query):
+            for stock_out in batch:
+                item = totals.get(stock_out.material_id)
+                if item is not None and stock_out.id not in stock_out_ids_from_return:
+                    item["keluar"] += stock_out.quantity
+
+        query = self.installed_repo.query_by_date_range(start_date, end_date, material_project_id).options(
+            load_only(Installed.id, Installed.material_id, Installed.quantity)
+        )
+        for batch in scoped(self.installed_repo, Installed, query):
+            for installed in batch:
+                item = totals.get(installed.material_id)
+                if item is not None:
+                    item["terpasang"] += installed.quantity
+
         balance_data = []
-        
         for material in materials:
-            # Get stock ins dengan date filter dan project filter jika ada
-            if start_date or end_date:
-                if start_date and end_date:
-                    stock_ins = self.stock_in_repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
-                    stock_ins = self._filter_by_material_and_not_deleted(stock_ins, material.id)
-                else:
-                    stock_ins = self.stock_in_repo.get_by_material(material.id, skip=0, limit=10000)
-                    stock_ins = self._filter_not_deleted(stock_ins)
-                    if start_date:
-                        stock_ins = [si for si in stock_ins if si.tanggal_masuk >= start_date]
-                    if end_date:
-                        stock_ins = [si for si in stock_ins if si.tanggal_masuk <= end_date]
-            else:
-                stock_ins = self.stock_in_repo.get_by_material(material.id, skip=0, limit=10000)
-                stock_ins = self._filter_not_deleted(stock_ins)
-            
-            # Get stock outs dengan date filter
-            # TIDAK filter project_id karena data lama mungkin punya project_id NULL
-            # Filter hanya berdasarkan material_id (material sudah terfilter project_id)
-            if start_date or end_date:
-                if start_date and end_date:
-                    stock_outs = self.stock_out_repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
-                    stock_outs = self._filter_by_material_and_not_deleted(stock_outs, material.id)
-                else:
-                    stock_outs = self.stock_out_repo.get_all_by_material(material.id, skip=0, limit=10000)
-                    if start_date:
-                        stock_outs = [so for so in stock_outs if so.tanggal_keluar >= start_date]
-                    if end_date:
-                        stock_outs = [so for so in stock_outs if so.tanggal_keluar <= end_date]
-            else:
-                stock_outs = self.stock_out_repo.get_all_by_material(material.id, skip=0, limit=10000)
-            
-            # Get returns dengan date filter
-            # TIDAK filter project_id karena data lama mungkin punya project_id NULL
-            # Filter hanya berdasarkan material_id (material sudah terfilter project_id)
-            if start_date or end_date:
-                if start_date and end_date:
-                    returns = self.return_repo.get_by_date_range(start_date, end_date, skip=0, limit=10000, project_id=None)
-                    returns = self._filter_by_material_and_not_deleted(returns, material.id)
-                else:
-                    returns = self.return_repo.get_all_by_material(material.id, skip=0, limit=10000)
-                    if start_date:
-                        returns = [r for r in returns if r.tanggal_kembali >= start_date]
-                    if end_date:
-                        returns = [r for r in returns if r.tanggal_kembali <= end_date]
-            else:
-                returns = self.return_repo.get_all_by_material(material.id, skip=0, limit=10000)
-            
-            # Get installed items dengan date filter dan project filter jika ada
-            # Filter selalu menggunakan project_id melalui material.project_id
-            if start_date or end_date:
-                if start_date and end_date:
-                    installed_items = self.installed_repo.get_by_date_range(start_date, end_date, skip=0, limit=10000, project_id=project_id)
-                    installed_items = self._filter_by_material_and_not_deleted(installed_items, material.id)
-                else:
-                    installed_items = self.installed_repo.get_all_by_project(skip=0, limit=10000, project_id=project_id)
-                    installed_items = self._filter_by_material_and_not_deleted(installed_items, material.id)
-                    if start_date:
-                        installed_items = [i for i in installed_items if i.tanggal_pasang >= start_date]
-                    if end_date:
-                        installed_items = [i for i in installed_items if i.tanggal_pasang <= end_date]
-            else:
-                installed_items = self.installed_repo.get_all_by_project(skip=0, limit=10000, project_id=project_id)
-                installed_items = self._filter_by_material_and_not_deleted(installed_items, material.id)
-            
-            # Get returns yang sudah dikeluarkan kembali (is_released = 1)
-            returns_released = [r for r in returns if getattr(r, 'is_released', 0) == 1]
-            # Get returns yang BELUM dikeluarkan lagi (is_released = 0)
-            returns_not_released = [r for r in returns if getattr(r, 'is_released', 0) == 0]
-            
-            # PENTING: Filter stock_out yang berasal dari retur keluar
-            # Stock out dari retur keluar TIDAK mengurangi stok karena sudah pernah masuk ke gudang sebagai return
-            # Identifikasi stock_out dari retur keluar: ada Return dengan stock_out_id = stock_out.id dan is_released = 1
-            stock_out_ids_from_return = {r.stock_out_id for r in returns_released if r.stock_out_id is not None}
-            stock_outs_excluding_return = [so for so in stock_outs if so.id not in stock_out_ids_from_return]
-            
-            total_in = sum(si.quantity for si in stock_ins)
-            # Hanya hitung stock_out yang BUKAN dari retur keluar
-            total_out = sum(so.quantity for so in stock_outs_excluding_return)
+            item = totals[material.id]
             
             # BEST PRACTICE: Perhitungan total_kembali
             # total_kembali = semua quantity_kembali - kondisi baik yang sudah dikeluarkan
             # Karena hanya kondisi baik yang dikeluarkan, kondisi reject tetap di gudang
-            total_quantity_kembali_all = sum(r.quantity_kembali for r in returns)
-            total_kondisi_baik_released = sum((r.quantity_kondisi_baik or 0) for r in returns_released)
-            total_return = total_quantity_kembali_all - total_kondisi_baik_released
-            
-            total_terpasang = sum(i.quantity for i in installed_items)
-            
-            # BEST PRACTICE: Kondisi baik hanya dari return yang BELUM dikeluarkan lagi
-            # Return yang sudah dikeluarkan lagi, kondisi baiknya sudah dikeluarkan
-            total_kondisi_baik = sum((r.quantity_kondisi_baik or 0) for r in returns_not_released)
-            
-            # BEST PRACTICE: Kondisi reject dari SEMUA return (termasuk yang is_released=1)
-            # Karena kondisi reject TIDAK ikut dikeluarkan, tetap di gudang dan tetap terhitung
-            total_kondisi_reject = sum((r.quantity_kondisi_reject or 0) for r in returns)
+            total_return = item["kembali_all"] - item["baik_released"]
             
             # BEST PRACTICE: Rumus Stock Balance yang menghindari double counting
             # Alur bisnis:
@@ -558,28 +556,29 @@ class StockService:
             # - Stock Saat Ini adalah sisa barang yang masih ada di gudang
             # - Barang yang sudah terpasang tidak lagi ada di gudang, jadi dikurangi
             # - "Kembali" dan "Keluar" sudah tercermin dalam perhitungan terpasang
-            current_stock = total_in - total_terpasang
+            current_stock = item["masuk"] - item["terpasang"]
             
             # Stok Ready = Stock Saat Ini - Kondisi Reject (barang reject tidak bisa dikeluarkan)
-            # Kondisi reject hanya dari return yang belum dikeluarkan lagi
-            stock_ready = max(0, current_stock - total_kondisi_reject)
+            # Kondisi reject dari SEMUA return (termasuk yang is_released=1) karena tidak ikut dikeluarkan
+            stock_ready = max(0, current_stock - item["reject"])
             
             balance_data.append({
                 "material_id": material.id,
                 "kode_barang": material.kode_barang,
                 "nama_barang": material.nama_barang,
                 "satuan": material.satuan,
-                "total_masuk": total_in,
-                "total_keluar": total_out,
-                "total_terpasang": total_terpasang,
+                "total_masuk": item["masuk"],
+                "total_keluar": item["keluar"],
+                "total_terpasang": item["terpasang"],
                 "total_kembali": total_return,
-                "total_kondisi_baik": total_kondisi_baik,
-                "total_kondisi_reject": total_kondisi_reject,
+                # Kondisi baik hanya dari return yang BELUM dikeluarkan lagi
+                "total_kondisi_baik": item["baik_not_released"],
+                "total_kondisi_reject": item["reject"],
                 "stock_ready": stock_ready,
                 "stock_saat_ini": current_stock
             })
         
-        return balance_data if material_id is None else balance_data[0]
+        return balance_data
 
     def _create_stock_out_with_retry(
         self,
@@ -806,83 +805,53 @@ class StockService:
         self.logger.debug(f"Surat jalan paths JSON: {surat_jalan_paths_json}")
         self.logger.debug(f"Material datang paths JSON: {material_datang_paths_json}")
 
-        created_records = []
-        failed_items = []
-        
-        # Commit per item to avoid nested transaction issues
-        for idx, it in enumerate(normalized):
-            try:
-                self.logger.info(f"Creating stock_in record {idx+1}/{len(normalized)}: material_id={it['material_id']}, quantity={it['quantity']}")
-                
-                # DEBUG: Log data sebelum create
-                self.logger.info(f"[DEBUG] Creating stock_in for item {idx+1}: quantity={it['quantity']} (type: {type(it['quantity'])})")
-                
-                stock_in_data = {
-                    "nomor_invoice": nomor_invoice,
-                    "material_id": it["material_id"],
-                    "quantity": it["quantity"],
-                    "tanggal_masuk": tanggal_masuk,
-                    "evidence_paths": evidence_paths_json,
-                    "surat_jalan_paths": surat_jalan_paths_json,
-                    "material_datang_paths": material_datang_paths_json,
-                    "created_by": created_by,
-                    "is_deleted": 0
-                }
-                
-                if project_id is not None:
-                    stock_in_data["project_id"] = project_id
-                
-                try:
-                    stock_in = self.stock_in_repo.create(stock_in_data)
-                    if not stock_in:
-                        self.logger.error(f"Failed to create stock_in for item {idx+1}: repository.create returned None")
-                        raise ValidationError(f"Gagal membuat data barang masuk untuk item ke-{idx+1}")
-                    
-                    # DEBUG: Log quantity setelah create (dari database)
-                    self.logger.info(f"[DEBUG] Successfully created stock_in record ID: {stock_in.id}, quantity in DB: {stock_in.quantity} (type: {type(stock_in.quantity)})")
-                    
-                    # Validasi quantity di database sama dengan yang dikirim
-                    if stock_in.quantity != it["quantity"]:
-                        self.logger.error(f"[ERROR] Quantity mismatch after DB save! Sent: {it['quantity']}, Saved in DB: {stock_in.quantity}")
-                    
-                    created_records.append(stock_in)
-                    
-                except IntegrityError as e:
-                    self.logger.error(f"Integrity error creating stock_in for item {idx+1}: {str(e)}", exc_info=True)
-                    self.db.rollback()
-                    error_msg = str(e).lower()
-                    if "foreign key constraint" in error_msg:
-                        if "materials" in error_msg:
-                            raise ValidationError(f"Material dengan ID {it['material_id']} tidak ditemukan atau tidak valid")
-                        elif "users" in error_msg:
-                            raise ValidationError(f"User dengan ID {created_by} tidak ditemukan atau tidak valid")
-                        else:
-                            raise ValidationError(f"Data referensi tidak valid untuk item ke-{idx+1}")
-                    elif "duplicate" in error_msg or "unique" in error_msg:
-                        raise ValidationError(f"Data duplikat untuk item ke-{idx+1}. Periksa nomor invoice atau data lain.")
-                    else:
-                        raise ValidationError(f"Gagal menyimpan item ke-{idx+1}: {str(e)}")
-                        
-                except SQLAlchemyError as e:
-                    self.logger.error(f"SQLAlchemy error creating stock_in for item {idx+1}: {str(e)}", exc_info=True)
-                    self.db.rollback()
-                    raise ValidationError(f"Gagal membuat data barang masuk untuk item ke-{idx+1}: {str(e)}")
-                    
-            except (ValidationError, NotFoundError):
-                # Re-raise validation and not found errors as-is
-                raise
-            except Exception as e:
-                self.logger.error(f"Unexpected error creating stock_in for item {idx+1}: {str(e)}", exc_info=True)
-                self.db.rollback()
-                failed_items.append(idx+1)
-                # Don't raise here, continue with other items but log the failure
-                # In a more robust implementation, we might want to rollback all or continue partial
-                # For now, we'll raise on first error
-                raise ValidationError(f"Gagal membuat data barang masuk untuk item ke-{idx+1}: {str(e)}")
+        stock_in_rows = []
+        for it in normalized:
+            stock_in_data = {
+                "nomor_invoice": nomor_invoice,
+                "material_id": it["material_id"],
+                "quantity": it["quantity"],
+                "tanggal_masuk": tanggal_masuk,
+                "evidence_paths": evidence_paths_json,
+                "surat_jalan_paths": surat_jalan_paths_json,
+                "material_datang_paths": material_datang_paths_json,
+                "created_by": created_by,
+                "is_deleted": 0
+            }
+            if project_id is not None:
+                stock_in_data["project_id"] = project_id
+            stock_in_rows.append(stock_in_data)
+
+        # Semua item dalam satu transaksi lewat bulk_create, rollback semua jika ada yang gagal
+        try:
+            with unit_of_work(self.db):
+                ids = self.stock_in_repo.bulk_create(stock_in_rows)
+        except IntegrityError as e:
+            self.logger.error(f"Integrity error creating stock_in bulk: {str(e)}", exc_info=True)
+            error_msg = str(e).lower()
+            if "foreign key constraint" in error_msg:
+                if "materials" in error_msg:
+                    raise ValidationError("Material pada items tidak ditemukan atau tidak valid")
+                elif "users" in error_msg:
+                    raise ValidationError(f"User dengan ID {created_by} tidak ditemukan atau tidak valid")
+                else:
+                    raise ValidationError("Data referensi tidak valid pada items")
+            elif "duplicate" in error_msg or "unique" in error_msg:
+                raise ValidationError("Data duplikat pada items. Periksa nomor invoice atau data lain.")
+            else:
+                raise ValidationError(f"Gagal menyimpan data barang masuk: {str(e)}")
+        except SQLAlchemyError as e:
+            self.logger.error(f"SQLAlchemy error creating stock_in bulk: {str(e)}", exc_info=True)
+            raise ValidationError(f"Gagal membuat data barang masuk: {str(e)}")
+
+        # Record dibaca ulang dengan satu query IN, urutan sama dengan items
+        from app.models.inventory.stock_in import StockIn
+        records_by_id = {
+            record.id: record
+            for record in self.db.query(StockIn).filter(StockIn.id.in_(ids)).all()
+        }
+        created_records = [records_by_id[record_id] for record_id in ids]
 
-        if failed_items:
-            self.logger.warning(f"Some items failed: {failed_items}")
-            
         self.logger.info(f"Successfully created {len(created_records)}/{len(normalized)} stock_in records")
         return created_records
 
@@ -6,6 +6,7 @@ from app.repositories.inventory.surat_jalan_repository import SuratJalanReposito
 from app.repositories.project.project_repository import ProjectRepository
 from app.models.inventory.surat_jalan_item import SuratJalanItem
 from app.models.inventory.surat_jalan import SuratJalan
+from app.repositories.base import unit_of_work
 from app.core.exceptions import NotFoundError, ValidationError
 import logging
 
@@ -178,27 +179,28 @@ class SuratJalanService:
         }
         
         try:
-            # Create surat jalan
-            surat_jalan = self.surat_jalan_repo.create(surat_jalan_data)
-            if not surat_jalan:
-                raise ValidationError("Gagal membuat surat jalan")
+            # Header dan items dalam satu transaksi (header tidak tersimpan jika item tidak valid)
+            with unit_of_work(self.db):
+                # Create surat jalan
+                surat_jalan = self.surat_jalan_repo.create(surat_jalan_data)
+                if not surat_jalan:
+                    raise ValidationError("Gagal membuat surat jalan")
             
-            # Create items
-            for item in items:
-                if not item.get('nama_barang') or not item['nama_barang'].strip():
-                    raise ValidationError("Nama barang tidak boleh kosong")
+                # Create items
+                for item in items:
+                    if not item.get('nama_barang') or not item['nama_barang'].strip():
+                        raise ValidationError("Nama barang tidak boleh kosong")
                 
-                item_data = {
-                    "surat_jalan_id": surat_jalan.id,
-                    "nama_barang": item['nama_barang'].strip(),
-                    "qty": item.get('qty', 0),
-                    "keterangan": item.get('keterangan', '').strip() if item.get('keterangan') else None
-                }
+                    item_data = {
+                        "surat_jalan_id": surat_jalan.id,
+                        "nama_barang": item['nama_barang'].strip(),
+                        "qty": item.get('qty', 0),
+                        "keterangan": item.get('keterangan', '').strip() if item.get('keterangan') else None
+                    }
                 
-                item_obj = SuratJalanItem(**item_data)
-                self.db.add(item_obj)
+                    item_obj = SuratJalanItem(**item_data)
+                    self.db.add(item_obj)
             
-            self.db.commit()
             self.db.refresh(surat_jalan)
             
             # Update status surat permintaan jika nomor cocok
@@ -270,10 +272,10 @@ class SuratJalanService:
         try:
             if search:
                 items = self.surat_jalan_repo.search_by_nomor_or_kepada(search, skip, limit, project_id)
-                total = len(self.surat_jalan_repo.search_by_nomor_or_kepada(search, 0, 10000, project_id))
+                total = self.surat_jalan_repo.count_search(search, project_id)
             elif start_date and end_date:
                 items = self.surat_jalan_repo.get_by_date_range(start_date, end_date, skip, limit, project_id)
-                total = len(self.surat_jalan_repo.get_by_date_range(start_date, end_date, 0, 10000, project_id))
+                total = self.surat_jalan_repo.count_by_date_range(start_date, end_date, project_id)
             else:
                 filters = {"is_deleted": 0}
                 items = self.surat_jalan_repo.get_all(skip=skip, limit=limit, filters=filters, project_id=project_id, user_id=user_id)
@@ -284,6 +286,29 @@ class SuratJalanService:
             self.logger.error(f"Error getting all surat jalan: {str(e)}", exc_info=True)
             return [], 0
 
+    def get_page_keyset(
+        self,
+        cursor_values: Optional[Dict[str, Any]],
+        limit: int = 100,
+        search: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False
+    ) -> tuple[List, Optional[str], Optional[int]]:
+        """Get surat jalan dengan keyset (cursor) pagination"""
+        return self.surat_jalan_repo.get_page_keyset(
+            cursor_values,
+            limit=limit,
+            search=search,
+            start_date=start_date,
+            end_date=end_date,
+            project_id=project_id,
+            user_id=user_id,
+            include_total=include_total
+        )
+
     def get_by_id(self, id: int, project_id: Optional[int] = None) -> Optional[SuratJalan]:
         """Get surat jalan by ID"""
         try:
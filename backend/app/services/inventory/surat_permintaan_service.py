@@ -7,6 +7,7 @@ from app.repositories.inventory.material_repository import MaterialRepository
 from app.repositories.project.project_repository import ProjectRepository
 from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
 from app.models.inventory.surat_permintaan import SuratPermintaan
+from app.repositories.base import unit_of_work
 from app.core.exceptions import NotFoundError, ValidationError
 import json
 import logging
@@ -85,44 +86,45 @@ class SuratPermintaanService:
         }
         
         try:
-            # Create surat permintaan
-            surat_permintaan = self.surat_permintaan_repo.create(surat_permintaan_data)
-            if not surat_permintaan:
-                raise ValidationError("Gagal membuat surat permintaan")
+            # Header dan items dalam satu transaksi
+            with unit_of_work(self.db):
+                # Create surat permintaan
+                surat_permintaan = self.surat_permintaan_repo.create(surat_permintaan_data)
+                if not surat_permintaan:
+                    raise ValidationError("Gagal membuat surat permintaan")
             
-            # Create items
-            for item in items:
-                # Prepare sumber_barang JSON
-                sumber_barang_json = None
-                if item.get('sumber_barang'):
-                    try:
-                        sumber_barang_json = json.dumps(item['sumber_barang'])
-                    except Exception:
-                        pass
+                # Create items
+                for item in items:
+                    # Prepare sumber_barang JSON
+                    sumber_barang_json = None
+                    if item.get('sumber_barang'):
+                        try:
+                            sumber_barang_json = json.dumps(item['sumber_barang'])
+                        except Exception:
+                            pass
                 
-                # Prepare peruntukan JSON
-                peruntukan_json = None
-                if item.get('peruntukan'):
-                    try:
-                        peruntukan_json = json.dumps(item['peruntukan'])
-                    except Exception:
-                        pass
+                    # Prepare peruntukan JSON
+                    peruntukan_json = None
+                    if item.get('peruntukan'):
+                        try:
+                            peruntukan_json = json.dumps(item['peruntukan'])
+                        except Exception:
+                            pass
                 
-                item_data = {
-                    "surat_permintaan_id": surat_permintaan.id,
-                    "material_id": item.get('material_id'),
-                    "kode_barang": item.get('kode_barang'),
-                    "nama_barang": item['nama_barang'],
-                    "qty": item['qty'],
-                    "satuan": item['satuan'],
-                    "sumber_barang": sumber_barang_json,
-                    "peruntukan": peruntukan_json
-                }
+                    item_data = {
+                        "surat_permintaan_id": surat_permintaan.id,
+                        "material_id": item.get('material_id'),
+                        "kode_barang": item.get('kode_barang'),
+                        "nama_barang": item['nama_barang'],
+                        "qty": item['qty'],
+                        "satuan": item['satuan'],
+                        "sumber_barang": sumber_barang_json,
+                        "peruntukan": peruntukan_json
+                    }
                 
-                item_obj = SuratPermintaanItem(**item_data)
-                self.db.add(item_obj)
+                    item_obj = SuratPermintaanItem(**item_data)
+                    self.db.add(item_obj)
             
-            self.db.commit()
             self.db.refresh(surat_permintaan)
             
             return surat_permintaan
@@ -191,10 +193,10 @@ class SuratPermintaanService:
         try:
             if search:
                 items = self.surat_permintaan_repo.search_by_nomor_or_date(search, skip, limit, project_id)
-                total = len(self.surat_permintaan_repo.search_by_nomor_or_date(search, 0, 10000, project_id))
+                total = self.surat_permintaan_repo.count_search(search, project_id)
             elif start_date and end_date:
                 items = self.surat_permintaan_repo.get_by_date_range(start_date, end_date, skip, limit, project_id)
-                total = len(self.surat_permintaan_repo.get_by_date_range(start_date, end_date, 0, 10000, project_id))
+                total = self.surat_permintaan_repo.count_by_date_range(start_date, end_date, project_id)
             else:
                 filters = {"is_deleted": 0}
                 items = self.surat_permintaan_repo.get_all(skip=skip, limit=limit, filters=filters, project_id=project_id, user_id=user_id)
@@ -205,6 +207,40 @@ class SuratPermintaanService:
             self.logger.error(f"Error getting all surat permintaan: {str(e)}", exc_info=True)
             return [], 0
 
+    def get_page_keyset(
+        self,
+        cursor_values: Optional[Dict[str, Any]],
+        limit: int = 100,
+        search: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        include_total: bool = False
+    ) -> tuple[List, Optional[str], Optional[int]]:
+        """Get surat permintaan dengan keyset (cursor) pagination"""
+        return self.surat_permintaan_repo.get_page_keyset(
+            cursor_values,
+            limit=limit,
+            search=search,
+            start_date=start_date,
+            end_date=end_date,
+            project_id=project_id,
+            user_id=user_id,
+            include_total=include_total
+        )
+
+    def to_list_response(self, surat_permintaans: List[SuratPermintaan]) -> List[Dict[str, Any]]:
+        """
+        Serialize satu halaman listing lewat schema listing (parsing JSON ada di schema).
+        Relasi (items -> material, project, creator) sudah di-load oleh query halaman di repository.
+        """
+        from app.schemas.inventory.surat_permintaan import SuratPermintaanListAdapter
+
+        return SuratPermintaanListAdapter.dump_python(
+            SuratPermintaanListAdapter.validate_python(surat_permintaans, from_attributes=True), mode="json"
+        )
+
     def get_by_id(self, id: int, project_id: Optional[int] = None) -> Optional:
         """Get surat permintaan by ID"""
         try:
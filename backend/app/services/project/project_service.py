@@ -4,9 +4,15 @@ from app.repositories.project import ProjectRepository, UserProjectRepository
 from app.services.base import BaseService
 from app.schemas.project.request import ProjectCreateRequest, ProjectUpdateRequest, UserProjectCreateRequest
 from app.schemas.project.response import ProjectResponse, ProjectWithUserResponse
+from app.core.cache import USER_PROJECTS_CACHE, VersionedCache, bump_version
 from app.core.exceptions import NotFoundError, ValidationError, ForbiddenError
+from app.repositories.base import unit_of_work
 from app.utils.helpers import sanitize_dict
 
+# Cache daftar project per user (project switcher dipanggil hampir di setiap navigasi).
+# Di-invalidasi lewat bump_version saat project atau membership berubah.
+_user_projects_cache = VersionedCache(USER_PROJECTS_CACHE)
+
 
 class ProjectService(BaseService[ProjectRepository]):
     """
@@ -40,32 +46,32 @@ class ProjectService(BaseService[ProjectRepository]):
         skip: int = 0,
         limit: int = 100
     ) -> tuple[List[ProjectWithUserResponse], int]:
-        """Get all projects untuk user tertentu dengan info apakah user adalah owner"""
-        projects = self.repository.get_projects_by_user(user_id, skip=skip, limit=limit)
+        """
+        Get all projects untuk user tertentu dengan info apakah user adalah owner.
         
-        result = []
-        for project in projects:
-            is_owner = self.user_project_repo.user_is_owner(user_id, project.id)
-            project_dict = {
+        Best practice: project dan flag is_owner diambil dengan satu query join, total dihitung
+        dari hasil query yang sama, dan daftar lengkap per user di-cache (version stamp).
+        """
+        projects = _user_projects_cache.get_or_load(
+            self.db, user_id, lambda: self._load_user_projects(user_id)
+        )
+        return list(projects[skip:skip + limit]), len(projects)
+
+    def _load_user_projects(self, user_id: int) -> tuple:
+        """Load semua project user (satu query) dan serialize ke response schema"""
+        return tuple(
+            ProjectWithUserResponse.model_validate({
                 "id": project.id,
                 "name": project.name,
                 "code": project.code,
                 "description": project.description,
                 "is_active": project.is_active,
-                "is_owner": is_owner,
+                "is_owner": bool(is_owner),
                 "created_at": project.created_at,
                 "updated_at": project.updated_at,
-            }
-            result.append(ProjectWithUserResponse.model_validate(project_dict))
-        
-        # Count total
-        from app.models.project.user_project import UserProject
-        total = self.db.query(UserProject).filter(
-            UserProject.user_id == user_id,
-            UserProject.is_active == True
-        ).count()
-        
-        return result, total
+            })
+            for project, is_owner in self.repository.get_projects_with_ownership_by_user(user_id)
+        )
 
     def create(self, project_data: ProjectCreateRequest, creator_user_id: int) -> ProjectResponse:
         """Create new project dan assign creator sebagai owner"""
@@ -83,18 +89,21 @@ class ProjectService(BaseService[ProjectRepository]):
             "is_active": True,
         }
         
-        project = self.repository.create(project_dict)
-        if not project:
-            raise ValidationError("Gagal membuat project baru")
-        
-        # Assign creator sebagai owner
-        user_project_dict = {
-            "user_id": creator_user_id,
-            "project_id": project.id,
-            "is_active": True,
-            "is_owner": True,
-        }
-        self.user_project_repo.create(user_project_dict)
+        # Project dan membership owner disimpan dalam satu transaksi
+        with unit_of_work(self.db):
+            project = self.repository.create(project_dict)
+            if not project:
+                raise ValidationError("Gagal membuat project baru")
+            
+            # Assign creator sebagai owner
+            user_project_dict = {
+                "user_id": creator_user_id,
+                "project_id": project.id,
+                "is_active": True,
+                "is_owner": True,
+            }
+            self.user_project_repo.create(user_project_dict)
+            bump_version(self.db, USER_PROJECTS_CACHE)
         
         return self.get_by_id(project.id)
 
@@ -124,8 +133,13 @@ class ProjectService(BaseService[ProjectRepository]):
         # Prepare update data
         update_data = sanitize_dict(project_data.model_dump(exclude_unset=True))
         
-        # Gunakan BaseService.update()
-        updated_project = super().update(project_id, update_data)
+        # Langsung lewat repository: BaseService.update() memanggil get_by_id(project_id=...)
+        # yang bentrok dengan signature get_by_id milik ProjectService
+        with unit_of_work(self.db):
+            updated_project = self.repository.update(project_id, update_data)
+            if not updated_project:
+                raise ValidationError(f"Gagal mengupdate {self.entity_name}")
+            bump_version(self.db, USER_PROJECTS_CACHE)
         return ProjectResponse.model_validate(updated_project)
 
     def delete(self, project_id: int, user_id: int) -> bool:
@@ -137,8 +151,12 @@ class ProjectService(BaseService[ProjectRepository]):
         if not self.user_project_repo.user_is_owner(user_id, project_id):
             raise ForbiddenError("Hanya owner project yang dapat menghapus project")
         
-        # Soft delete menggunakan BaseService.delete()
-        return super().delete(project_id, soft_delete=True)
+        # Soft delete (is_active = False), alasan sama dengan update() di atas
+        super().get_by_id(project_id)
+        with unit_of_work(self.db):
+            deleted = self.repository.update(project_id, {"is_active": False})
+            bump_version(self.db, USER_PROJECTS_CACHE)
+        return deleted is not None
 
     def assign_user_to_project(
         self,
@@ -160,21 +178,23 @@ class ProjectService(BaseService[ProjectRepository]):
             user_project_data.user_id,
             user_project_data.project_id
         )
-        if existing:
-            # Update existing assignment
-            self.user_project_repo.update(existing.id, {
-                "is_active": True,
-                "is_owner": user_project_data.is_owner
-            })
-        else:
-            # Create new assignment
-            user_project_dict = {
-                "user_id": user_project_data.user_id,
-                "project_id": user_project_data.project_id,
-                "is_active": True,
-                "is_owner": user_project_data.is_owner,
-            }
-            self.user_project_repo.create(user_project_dict)
+        with unit_of_work(self.db):
+            if existing:
+                # Update existing assignment
+                self.user_project_repo.update(existing.id, {
+                    "is_active": True,
+                    "is_owner": user_project_data.is_owner
+                })
+            else:
+                # Create new assignment
+                user_project_dict = {
+                    "user_id": user_project_data.user_id,
+                    "project_id": user_project_data.project_id,
+                    "is_active": True,
+                    "is_owner": user_project_data.is_owner,
+                }
+                self.user_project_repo.create(user_project_dict)
+            bump_version(self.db, USER_PROJECTS_CACHE)
         
         return True
 
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.repositories.user.permission_repository import PageRepository, PermissionRepository
@@ -16,9 +16,14 @@ from app.schemas.user.permission_response import (
     PermissionDetailResponse
 )
 from app.models.user.user_permission import UserPermission
+from app.core.cache import PERMISSIONS_CACHE, VersionedCache, bump_version
 from app.core.exceptions import NotFoundError, ValidationError
+from app.repositories.base import unit_of_work
 from app.utils.helpers import sanitize_dict
 
+# Permission efektif per user (per worker), invalidasi lewat version stamp PERMISSIONS_CACHE
+_user_permissions_cache = VersionedCache(PERMISSIONS_CACHE)
+
 
 class PageService:
     """Service untuk handle business logic Page"""
@@ -91,9 +96,12 @@ class PageService:
         
         update_data = sanitize_dict(page_data.model_dump(exclude_unset=True))
         
-        updated_page = self.page_repo.update(page_id, update_data)
-        if not updated_page:
-            raise ValidationError("Gagal mengupdate page")
+        with unit_of_work(self.db):
+            updated_page = self.page_repo.update(page_id, update_data)
+            if not updated_page:
+                raise ValidationError("Gagal mengupdate page")
+            # Nama / path / display_name page ikut di permission efektif user
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         return PageResponse.model_validate(updated_page)
 
@@ -103,9 +111,11 @@ class PageService:
         if not page:
             raise NotFoundError(f"Page dengan ID {page_id} tidak ditemukan")
         
-        result = self.page_repo.delete(page_id)
-        if not result:
-            raise ValidationError("Gagal menghapus page")
+        with unit_of_work(self.db):
+            result = self.page_repo.delete(page_id)
+            if not result:
+                raise ValidationError("Gagal menghapus page")
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         return True
 
@@ -216,9 +226,11 @@ class PermissionService:
         
         update_data = sanitize_dict(permission_data.model_dump(exclude_unset=True))
         
-        updated_permission = self.permission_repo.update(permission_id, update_data)
-        if not updated_permission:
-            raise ValidationError("Gagal mengupdate permission")
+        with unit_of_work(self.db):
+            updated_permission = self.permission_repo.update(permission_id, update_data)
+            if not updated_permission:
+                raise ValidationError("Gagal mengupdate permission")
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         return self.get_by_id(permission_id)
 
@@ -228,9 +240,11 @@ class PermissionService:
         if not permission:
             raise NotFoundError(f"Permission dengan ID {permission_id} tidak ditemukan")
         
-        result = self.permission_repo.delete(permission_id)
-        if not result:
-            raise ValidationError("Gagal menghapus permission")
+        with unit_of_work(self.db):
+            result = self.permission_repo.delete(permission_id)
+            if not result:
+                raise ValidationError("Gagal menghapus permission")
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         return True
 
@@ -282,6 +296,7 @@ class PermissionService:
                 self.db.add(user_permission)
                 added_permission_ids.add(permission_id)
             
+            bump_version(self.db, PERMISSIONS_CACHE)
             self.db.commit()
             return True
             
@@ -350,52 +365,83 @@ class PermissionService:
         
         return new_permission.id
 
+    def get_or_create_permissions(
+        self,
+        combinations: List[Tuple[int, bool, bool, bool, bool]]
+    ) -> Dict[Tuple[int, bool, bool, bool, bool], int]:
+        """
+        Versi batch get_or_create_permission untuk banyak (page_id, can_create, can_read,
+        can_update, can_delete) sekaligus. Return dict kombinasi -> permission ID.
+        
+        Best practice: page divalidasi dengan satu query IN, permission yang sudah ada dibaca
+        dengan satu SELECT, yang belum ada dibuat dengan satu INSERT executemany lalu dibaca ulang.
+        Panggil di dalam unit_of_work caller agar insert ikut transaksi caller (tidak commit sendiri).
+        """
+        combinations = list(dict.fromkeys(
+            (int(page_id), bool(c), bool(r), bool(u), bool(d)) for page_id, c, r, u, d in combinations
+        ))
+        if not combinations:
+            return {}
+        
+        page_ids = list(dict.fromkeys(combo[0] for combo in combinations))
+        existing_page_ids = self.page_repo.get_existing_ids(page_ids)
+        missing_pages = [page_id for page_id in page_ids if page_id not in existing_page_ids]
+        if missing_pages:
+            raise NotFoundError(f"Page dengan ID {', '.join(map(str, missing_pages))} tidak ditemukan")
+        
+        def load_existing() -> Dict[Tuple[int, bool, bool, bool, bool], int]:
+            existing: Dict[Tuple[int, bool, bool, bool, bool], int] = {}
+            for perm in self.permission_repo.get_by_page_ids(page_ids):
+                key = (perm.page_id, bool(perm.can_create), bool(perm.can_read), bool(perm.can_update), bool(perm.can_delete))
+                # Jika ada duplikat kombinasi, pakai ID terkecil (hasil sudah urut ID)
+                existing.setdefault(key, perm.id)
+            return existing
+        
+        existing = load_existing()
+        to_create = [combo for combo in combinations if combo not in existing]
+        if to_create:
+            # Id dibaca ulang lewat get_by_page_ids, jadi cukup satu INSERT executemany
+            self.permission_repo.bulk_create([
+                {"page_id": page_id, "can_create": c, "can_read": r, "can_update": u, "can_delete": d}
+                for page_id, c, r, u, d in to_create
+            ], return_ids=False)
+            existing = load_existing()
+        
+        return {combo: existing[combo] for combo in combinations}
+
     def get_user_permissions(self, user_id: int) -> List[PermissionResponse]:
-        """Get all permissions for a user (role permissions + user overrides)"""
-        from app.repositories.user.user_repository import UserRepository
-        from app.models.user.role_permission import RolePermission
+        """Get all permissions for a user (role permissions + user overrides)
         
-        user_repo = UserRepository(self.db)
-        user = user_repo.get(user_id)
+        Best practice: hasil di-cache per user dengan version stamp "permissions" yang di-bump
+        oleh assign permission, perubahan role/page/permission dan perubahan role user.
+        Cache hit = satu lookup version; cache miss = lookup user + satu query join.
+        """
+        return list(_user_permissions_cache.get_or_load(
+            self.db, user_id, lambda: self._load_user_permissions(user_id)
+        ))
+
+    def _load_user_permissions(self, user_id: int) -> List[PermissionResponse]:
+        from app.models.user.user import User
+        
+        user = self.db.query(User.id, User.role_id).filter(User.id == user_id).first()
         if not user:
             raise NotFoundError(f"User dengan ID {user_id} tidak ditemukan")
         
-        permission_ids = set()
-        
-        # Get permissions from role
-        if user.role_id:
-            role_permissions = self.db.query(RolePermission).filter(
-                RolePermission.role_id == user.role_id
-            ).all()
-            for rp in role_permissions:
-                permission_ids.add(rp.permission_id)
-        
-        # Get user override permissions (will override role permissions)
-        user_permissions = self.db.query(UserPermission).filter(
-            UserPermission.user_id == user_id
-        ).all()
-        for up in user_permissions:
-            permission_ids.add(up.permission_id)
-        
-        # Fetch all permissions
         permissions = []
-        for perm_id in permission_ids:
-            perm = self.permission_repo.get_with_page(perm_id)
-            if perm:
-                perm_dict = {
-                    "id": perm.id,
-                    "page_id": perm.page_id,
-                    "page_name": perm.page.name if perm.page else None,
-                    "page_path": perm.page.path if perm.page else None,
-                    "display_name": perm.page.display_name if perm.page else None,
-                    "can_create": perm.can_create,
-                    "can_read": perm.can_read,
-                    "can_update": perm.can_update,
-                    "can_delete": perm.can_delete,
-                    "created_at": perm.created_at,
-                    "updated_at": perm.updated_at,
-                }
-                permissions.append(PermissionResponse.model_validate(perm_dict))
+        for perm in self.permission_repo.get_effective_for_user(user_id, user.role_id):
+            perm_dict = {
+                "id": perm.id,
+                "page_id": perm.page_id,
+                "page_name": perm.page.name if perm.page else None,
+                "page_path": perm.page.path if perm.page else None,
+                "display_name": perm.page.display_name if perm.page else None,
+                "can_create": perm.can_create,
+                "can_read": perm.can_read,
+                "can_update": perm.can_update,
+                "can_delete": perm.can_delete,
+                "created_at": perm.created_at,
+                "updated_at": perm.updated_at,
+            }
+            permissions.append(PermissionResponse.model_validate(perm_dict))
         
         return permissions
-
@@ -2,7 +2,6 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
 from app.repositories.user.role_repository import RoleRepository
 from app.repositories.user.permission_repository import PermissionRepository
-from app.models.user.role_permission import RolePermission
 from app.schemas.user.role_request import (
     RoleCreateRequest,
     RoleUpdateRequest,
@@ -11,7 +10,9 @@ from app.schemas.user.role_request import (
     AssignRolePermissionsCRUDRequest
 )
 from app.schemas.user.role_response import RoleResponse, RoleDetailResponse, RoleListResponse
+from app.core.cache import PERMISSIONS_CACHE, bump_version
 from app.core.exceptions import NotFoundError, ValidationError
+from app.repositories.base import unit_of_work
 from app.utils.helpers import sanitize_dict
 
 
@@ -140,38 +141,35 @@ class RoleService:
         if not role:
             raise NotFoundError(f"Role dengan ID {role_id} tidak ditemukan")
         
-        result = self.role_repo.delete(role_id)
-        if not result:
-            raise ValidationError("Gagal menghapus role")
+        with unit_of_work(self.db):
+            result = self.role_repo.delete(role_id)
+            if not result:
+                raise ValidationError("Gagal menghapus role")
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         return True
 
     def assign_permissions(self, role_id: int, permissions_data: AssignPermissionsRequest) -> RoleDetailResponse:
-        """Assign permissions to role"""
+        """Assign permissions to role
+        
+        Best practice: semua permission_ids divalidasi dengan satu query IN, lalu role_permissions
+        diganti dengan satu DELETE dan satu INSERT executemany dalam satu transaksi.
+        """
         role = self.role_repo.get(role_id)
         if not role:
             raise NotFoundError(f"Role dengan ID {role_id} tidak ditemukan")
         
-        # Delete existing role permissions
-        existing_rps = self.db.query(RolePermission).filter(RolePermission.role_id == role_id).all()
-        for rp in existing_rps:
-            self.db.delete(rp)
-        
-        # Add new role permissions
-        for permission_id in permissions_data.permission_ids:
-            # Verify permission exists
-            permission = self.permission_repo.get(permission_id)
-            if not permission:
-                raise NotFoundError(f"Permission dengan ID {permission_id} tidak ditemukan")
-            
-            # Create role permission
-            role_permission = RolePermission(
-                role_id=role_id,
-                permission_id=permission_id
+        permission_ids = list(dict.fromkeys(permissions_data.permission_ids))
+        existing_ids = self.permission_repo.get_existing_ids(permission_ids)
+        invalid_permission_ids = [permission_id for permission_id in permission_ids if permission_id not in existing_ids]
+        if invalid_permission_ids:
+            raise NotFoundError(
+                f"Permission dengan ID {', '.join(map(str, invalid_permission_ids))} tidak ditemukan"
             )
-            self.db.add(role_permission)
         
-        self.db.commit()
+        with unit_of_work(self.db):
+            self.role_repo.replace_permissions(role_id, permission_ids)
+            bump_version(self.db, PERMISSIONS_CACHE)
         
         # Return updated role with permissions
         return self.get_by_id(role_id, include_permissions=True)
@@ -181,6 +179,9 @@ class RoleService:
         Assign CRUD permissions per page ke role.
         Untuk setiap page, buat atau cari permission dengan kombinasi CRUD yang sesuai,
         lalu assign ke role.
+        
+        Best practice: semua kombinasi page/CRUD di-resolve sekaligus (satu SELECT + satu INSERT
+        untuk yang belum ada), bukan lookup per page.
         """
         from app.services.user.permission_service import PermissionService
         from sqlalchemy.exc import IntegrityError
@@ -189,47 +190,21 @@ class RoleService:
         if not role:
             raise NotFoundError(f"Role dengan ID {role_id} tidak ditemukan")
         
-        permission_service = PermissionService(self.db)
-        permission_ids = []
-        
-        # Loop setiap page_permission di crud_data
-        for page_perm in crud_data.page_permissions:
-            # Cek apakah ada minimal satu CRUD yang enabled
-            if not (page_perm.can_create or page_perm.can_read or page_perm.can_update or page_perm.can_delete):
-                # Skip jika semua CRUD false (tidak ada akses sama sekali)
-                continue
-            
-            # Get atau create permission dengan kombinasi CRUD yang sesuai
-            permission_id = permission_service.get_or_create_permission(
-                page_id=page_perm.page_id,
-                can_create=page_perm.can_create,
-                can_read=page_perm.can_read,
-                can_update=page_perm.can_update,
-                can_delete=page_perm.can_delete
-            )
-            permission_ids.append(permission_id)
-        
-        # Remove duplicates dari permission_ids (preserves order)
-        permission_ids = list(dict.fromkeys(permission_ids))
-        
-        # Delete existing role permissions dengan bulk delete
-        self.db.query(RolePermission).filter(RolePermission.role_id == role_id).delete(synchronize_session=False)
-        
-        # Flush untuk memastikan delete sudah dilakukan sebelum insert
-        self.db.flush()
-        
-        # Add new role permissions (langsung insert karena kita sudah delete semua)
-        for permission_id in permission_ids:
-            role_permission = RolePermission(
-                role_id=role_id,
-                permission_id=permission_id
-            )
-            self.db.add(role_permission)
+        # Skip page yang semua CRUD false (tidak ada akses sama sekali)
+        combinations = [
+            (page_perm.page_id, page_perm.can_create, page_perm.can_read, page_perm.can_update, page_perm.can_delete)
+            for page_perm in crud_data.page_permissions
+            if page_perm.can_create or page_perm.can_read or page_perm.can_update or page_perm.can_delete
+        ]
         
         try:
-            self.db.commit()
-        except IntegrityError as e:
-            self.db.rollback()
+            with unit_of_work(self.db):
+                permission_map = PermissionService(self.db).get_or_create_permissions(combinations)
+                # Remove duplicates dari permission_ids (preserves order)
+                permission_ids = list(dict.fromkeys(permission_map.values()))
+                self.role_repo.replace_permissions(role_id, permission_ids)
+                bump_version(self.db, PERMISSIONS_CACHE)
+        except IntegrityError:
             # Jika masih ada duplicate error, berarti ada issue dengan data atau race condition
             raise ValidationError(f"Gagal menyimpan permissions. Pastikan tidak ada duplikasi permission untuk role ini.")
         
@@ -15,6 +15,10 @@ from app.schemas.user.response import UserResponse, UserListResponse
 from app.core.exceptions import NotFoundError, ValidationError, ForbiddenError
 from app.core.security import get_password_hash, verify_password
 from app.utils.helpers import sanitize_dict
+from app.utils.text_search import SEARCH_PREFIX
+from app.utils.user_hierarchy import add_user_to_closure, remove_user_from_closure
+from app.repositories.base import unit_of_work
+from app.core.cache import PERMISSIONS_CACHE, bump_version
 
 
 class UserService:
@@ -30,42 +34,48 @@ class UserService:
         self,
         skip: int = 0,
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[str] = None,
+        search_mode: str = SEARCH_PREFIX
     ) -> tuple[List[UserListResponse], int]:
-        """Get all users with pagination"""
+        """
+        Get all users with pagination (id DESC, urutan sama dengan get_page_keyset)
+        
+        Best practice: COUNT dijalankan pada query dasar tanpa join role, halaman diambil dengan
+        joinedload role (many-to-one, tidak menggandakan row), lalu diserialize langsung dari ORM.
+        """
+        from sqlalchemy import func
         from sqlalchemy.orm import joinedload
         from app.models.user.user import User
         
-        query = self.db.query(User).options(joinedload(User.role_obj))
-        if filters:
-            for key, value in filters.items():
-                if hasattr(User, key):
-                    query = query.filter(getattr(User, key) == value)
+        query = self.repository.list_query(filters, search, search_mode)
+        total = query.with_entities(func.count(User.id)).scalar() or 0
         
-        users = query.offset(skip).limit(limit).all()
-        total = query.count()
+        users = query.options(joinedload(User.role_obj)).order_by(User.id.desc()).offset(skip).limit(limit).all()
+        return [UserListResponse.model_validate(user) for user in users], total
+
+    def get_page_keyset(
+        self,
+        cursor_values: Optional[Dict[str, Any]],
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[str] = None,
+        search_mode: str = SEARCH_PREFIX,
+        include_total: bool = False
+    ) -> tuple[List[UserListResponse], Optional[str], Optional[int]]:
+        """Get users dengan keyset (cursor) pagination (id DESC), filter sama dengan get_all"""
+        from sqlalchemy import func
+        from sqlalchemy.orm import joinedload
+        from app.models.user.user import User
+        from app.utils.pagination import paginate_keyset
         
-        result = []
-        for user in users:
-            user_dict = {
-                "id": user.id,
-                "email": user.email,
-                "name": user.name,
-                "is_active": user.is_active,
-                "is_superuser": user.is_superuser,
-                "role_id": user.role_id,
-                "role": {
-                    "id": user.role_obj.id,
-                    "name": user.role_obj.name,
-                    "description": user.role_obj.description
-                } if user.role_obj else None,
-                "created_by": user.created_by,
-                "created_at": user.created_at,
-                "updated_at": user.updated_at,
-            }
-            result.append(UserListResponse.model_validate(user_dict))
+        query = self.repository.list_query(filters, search, search_mode)
+        total = (query.with_entities(func.count(User.id)).scalar() or 0) if include_total else None
         
-        return result, total
+        users, next_cursor = paginate_keyset(
+            query.options(joinedload(User.role_obj)), User.id, cursor_values, limit
+        )
+        return [UserListResponse.model_validate(user) for user in users], next_cursor, total
 
     def get_by_id(self, user_id: int) -> UserResponse:
         """Get user by ID"""
@@ -121,9 +131,12 @@ class UserService:
             "created_by": created_by_user_id,  # Set created_by dari user yang membuat
         }
         
-        user = self.repository.create(user_dict)
-        if not user:
-            raise ValidationError("Gagal membuat user baru")
+        # User dan baris closure hierarchy-nya disimpan dalam satu transaksi
+        with unit_of_work(self.db):
+            user = self.repository.create(user_dict)
+            if not user:
+                raise ValidationError("Gagal membuat user baru")
+            add_user_to_closure(self.db, user.id, created_by_user_id)
         
         # Copy project access dari parent user ke user baru
         if created_by_user_id:
@@ -179,10 +192,15 @@ class UserService:
         
         # Prepare update data
         update_data = sanitize_dict(user_data.model_dump(exclude_unset=True))
+        role_changed = "role_id" in update_data and update_data["role_id"] != user.role_id
         
-        updated_user = self.repository.update(user_id, update_data)
-        if not updated_user:
-            raise ValidationError("Gagal mengupdate user")
+        with unit_of_work(self.db):
+            updated_user = self.repository.update(user_id, update_data)
+            if not updated_user:
+                raise ValidationError("Gagal mengupdate user")
+            if role_changed:
+                # Permission efektif user ikut berubah
+                bump_version(self.db, PERMISSIONS_CACHE)
         
         return self.get_by_id(user_id)
 
@@ -210,10 +228,15 @@ class UserService:
         # Handle password update
         if "password" in update_data:
             update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+        role_changed = "role_id" in update_data and update_data["role_id"] != user.role_id
         
-        updated_user = self.repository.update(user_id, update_data)
-        if not updated_user:
-            raise ValidationError("Gagal mengupdate user")
+        with unit_of_work(self.db):
+            updated_user = self.repository.update(user_id, update_data)
+            if not updated_user:
+                raise ValidationError("Gagal mengupdate user")
+            if role_changed:
+                # Permission efektif user ikut berubah
+                bump_version(self.db, PERMISSIONS_CACHE)
         
         return self.get_by_id(user_id)
 
@@ -250,102 +273,99 @@ class UserService:
             
             logger.info(f"Menghapus user ID {user_id}, menggunakan fallback user ID {fallback_user_id}")
             
-            # Update semua foreign key yang merujuk ke user ini
+            # Update foreign key, closure hierarchy dan delete user dalam satu transaksi:
+            # jika delete gagal, closure dan foreign key ikut di-rollback
             try:
-                # Helper untuk update kolom wajib (harus berhasil agar FK tidak menghalangi delete)
-                def update_required(model, filter_expr, update_dict, label: str):
-                    try:
-                        count_local = self.db.query(model).filter(filter_expr).update(update_dict)
-                        logger.info(f"Updated {count_local} {label} records (required)")
-                    except Exception as ex:
-                        # Jika gagal pada kolom/relasi wajib, bubble up agar ketahuan jelas
-                        logger.error(f"Gagal update wajib {label}: {str(ex)}", exc_info=True)
-                        raise
+                with unit_of_work(self.db):
+                    # Helper untuk update kolom wajib (harus berhasil agar FK tidak menghalangi delete)
+                    def update_required(model, filter_expr, update_dict, label: str):
+                        try:
+                            count_local = self.db.query(model).filter(filter_expr).update(update_dict)
+                            logger.info(f"Updated {count_local} {label} records (required)")
+                        except Exception as ex:
+                            # Jika gagal pada kolom/relasi wajib, bubble up agar ketahuan jelas
+                            logger.error(f"Gagal update wajib {label}: {str(ex)}", exc_info=True)
+                            raise
 
-                # Helper untuk update kolom opsional (jika kolom tidak ada / mismatch skema, jangan gagalkan proses)
-                def update_optional(model, filter_expr, update_dict, label: str):
-                    try:
-                        self.db.query(model).filter(filter_expr).update(update_dict)
-                        logger.info(f"Updated optional {label}")
-                    except Exception as ex:
-                        logger.warning(f"Lewati optional update {label} karena error: {str(ex)}")
+                    # Helper untuk update kolom opsional (jika kolom tidak ada / mismatch skema, jangan gagalkan proses)
+                    def update_optional(model, filter_expr, update_dict, label: str):
+                        try:
+                            self.db.query(model).filter(filter_expr).update(update_dict)
+                            logger.info(f"Updated optional {label}")
+                        except Exception as ex:
+                            logger.warning(f"Lewati optional update {label} karena error: {str(ex)}")
+
+                    # Import model-model terkait
+                    from app.models.inventory.stock_in import StockIn
+                    from app.models.inventory.stock_out import StockOut
+                    from app.models.inventory.installed import Installed
+                    from app.models.inventory.return_model import Return
+                    from app.models.inventory.surat_permintaan import SuratPermintaan
+                    from app.models.inventory.surat_jalan import SuratJalan
+                    from app.models.inventory.audit_log import AuditLog
+                    from app.models.project.user_project import UserProject
+                    from app.models.user.user_permission import UserPermission
+                    from app.models.user.user_menu_preference import UserMenuPreference
 
-                # Import model-model terkait
-                from app.models.inventory.stock_in import StockIn
-                from app.models.inventory.stock_out import StockOut
-                from app.models.inventory.installed import Installed
-                from app.models.inventory.return_model import Return
-                from app.models.inventory.surat_permintaan import SuratPermintaan
-                from app.models.inventory.surat_jalan import SuratJalan
-                from app.models.inventory.audit_log import AuditLog
-                from app.models.project.user_project import UserProject
-                from app.models.user.user_permission import UserPermission
-                from app.models.user.user_menu_preference import UserMenuPreference
+                    # Kolom wajib: created_by dan audit_logs.user_id
+                    update_required(StockIn, StockIn.created_by == user_id, {"created_by": fallback_user_id}, "StockIn(created_by)")
+                    update_optional(StockIn, StockIn.updated_by == user_id, {"updated_by": None}, "StockIn(updated_by)")
+                    update_optional(StockIn, StockIn.deleted_by == user_id, {"deleted_by": None}, "StockIn(deleted_by)")
 
-                # Kolom wajib: created_by dan audit_logs.user_id
-                update_required(StockIn, StockIn.created_by == user_id, {"created_by": fallback_user_id}, "StockIn(created_by)")
-                update_optional(StockIn, StockIn.updated_by == user_id, {"updated_by": None}, "StockIn(updated_by)")
-                update_optional(StockIn, StockIn.deleted_by == user_id, {"deleted_by": None}, "StockIn(deleted_by)")
+                    update_required(StockOut, StockOut.created_by == user_id, {"created_by": fallback_user_id}, "StockOut(created_by)")
+                    update_optional(StockOut, StockOut.updated_by == user_id, {"updated_by": None}, "StockOut(updated_by)")
+                    update_optional(StockOut, StockOut.deleted_by == user_id, {"deleted_by": None}, "StockOut(deleted_by)")
 
-                update_required(StockOut, StockOut.created_by == user_id, {"created_by": fallback_user_id}, "StockOut(created_by)")
-                update_optional(StockOut, StockOut.updated_by == user_id, {"updated_by": None}, "StockOut(updated_by)")
-                update_optional(StockOut, StockOut.deleted_by == user_id, {"deleted_by": None}, "StockOut(deleted_by)")
+                    update_required(Installed, Installed.created_by == user_id, {"created_by": fallback_user_id}, "Installed(created_by)")
+                    update_optional(Installed, Installed.updated_by == user_id, {"updated_by": None}, "Installed(updated_by)")
+                    update_optional(Installed, Installed.deleted_by == user_id, {"deleted_by": None}, "Installed(deleted_by)")
 
-                update_required(Installed, Installed.created_by == user_id, {"created_by": fallback_user_id}, "Installed(created_by)")
-                update_optional(Installed, Installed.updated_by == user_id, {"updated_by": None}, "Installed(updated_by)")
-                update_optional(Installed, Installed.deleted_by == user_id, {"deleted_by": None}, "Installed(deleted_by)")
+                    update_required(Return, Return.created_by == user_id, {"created_by": fallback_user_id}, "Return(created_by)")
+                    update_optional(Return, Return.updated_by == user_id, {"updated_by": None}, "Return(updated_by)")
+                    update_optional(Return, Return.deleted_by == user_id, {"deleted_by": None}, "Return(deleted_by)")
 
-                update_required(Return, Return.created_by == user_id, {"created_by": fallback_user_id}, "Return(created_by)")
-                update_optional(Return, Return.updated_by == user_id, {"updated_by": None}, "Return(updated_by)")
-                update_optional(Return, Return.deleted_by == user_id, {"deleted_by": None}, "Return(deleted_by)")
+                    update_required(SuratPermintaan, SuratPermintaan.created_by == user_id, {"created_by": fallback_user_id}, "SuratPermintaan(created_by)")
+                    update_optional(SuratPermintaan, SuratPermintaan.updated_by == user_id, {"updated_by": None}, "SuratPermintaan(updated_by)")
+                    update_optional(SuratPermintaan, SuratPermintaan.deleted_by == user_id, {"deleted_by": None}, "SuratPermintaan(deleted_by)")
 
-                update_required(SuratPermintaan, SuratPermintaan.created_by == user_id, {"created_by": fallback_user_id}, "SuratPermintaan(created_by)")
-                update_optional(SuratPermintaan, SuratPermintaan.updated_by == user_id, {"updated_by": None}, "SuratPermintaan(updated_by)")
-                update_optional(SuratPermintaan, SuratPermintaan.deleted_by == user_id, {"deleted_by": None}, "SuratPermintaan(deleted_by)")
+                    update_required(SuratJalan, SuratJalan.created_by == user_id, {"created_by": fallback_user_id}, "SuratJalan(created_by)")
+                    update_optional(SuratJalan, SuratJalan.updated_by == user_id, {"updated_by": None}, "SuratJalan(updated_by)")
+                    update_optional(SuratJalan, SuratJalan.deleted_by == user_id, {"deleted_by": None}, "SuratJalan(deleted_by)")
 
-                update_required(SuratJalan, SuratJalan.created_by == user_id, {"created_by": fallback_user_id}, "SuratJalan(created_by)")
-                update_optional(SuratJalan, SuratJalan.updated_by == user_id, {"updated_by": None}, "SuratJalan(updated_by)")
-                update_optional(SuratJalan, SuratJalan.deleted_by == user_id, {"deleted_by": None}, "SuratJalan(deleted_by)")
+                    # AuditLog (wajib)
+                    update_required(AuditLog, AuditLog.user_id == user_id, {"user_id": fallback_user_id}, "AuditLog(user_id)")
 
-                # AuditLog (wajib)
-                update_required(AuditLog, AuditLog.user_id == user_id, {"user_id": fallback_user_id}, "AuditLog(user_id)")
+                    # Tabel relasi (hapus baris, aman jika kosong)
+                    try:
+                        count_up = self.db.query(UserProject).filter(UserProject.user_id == user_id).delete()
+                        logger.info(f"Deleted {count_up} UserProject records")
+                    except Exception as ex:
+                        logger.warning(f"Lewati delete UserProject karena error: {str(ex)}")
 
-                # Tabel relasi (hapus baris, aman jika kosong)
-                try:
-                    count_up = self.db.query(UserProject).filter(UserProject.user_id == user_id).delete()
-                    logger.info(f"Deleted {count_up} UserProject records")
-                except Exception as ex:
-                    logger.warning(f"Lewati delete UserProject karena error: {str(ex)}")
+                    try:
+                        count_perm = self.db.query(UserPermission).filter(UserPermission.user_id == user_id).delete()
+                        logger.info(f"Deleted {count_perm} UserPermission records")
+                    except Exception as ex:
+                        logger.warning(f"Lewati delete UserPermission karena error: {str(ex)}")
 
-                try:
-                    count_perm = self.db.query(UserPermission).filter(UserPermission.user_id == user_id).delete()
-                    logger.info(f"Deleted {count_perm} UserPermission records")
-                except Exception as ex:
-                    logger.warning(f"Lewati delete UserPermission karena error: {str(ex)}")
+                    try:
+                        count_pref = self.db.query(UserMenuPreference).filter(UserMenuPreference.user_id == user_id).delete()
+                        logger.info(f"Deleted {count_pref} UserMenuPreference records")
+                    except Exception as ex:
+                        logger.warning(f"Lewati delete UserMenuPreference karena error: {str(ex)}")
 
-                try:
-                    count_pref = self.db.query(UserMenuPreference).filter(UserMenuPreference.user_id == user_id).delete()
-                    logger.info(f"Deleted {count_pref} UserMenuPreference records")
-                except Exception as ex:
-                    logger.warning(f"Lewati delete UserMenuPreference karena error: {str(ex)}")
+                    # Closure hierarchy (wajib, agar visibility user lain tetap konsisten)
+                    remove_user_from_closure(self.db, user_id)
+                    bump_version(self.db, PERMISSIONS_CACHE)
 
-                # Commit perubahan foreign key
-                self.db.commit()
-                logger.info(f"Foreign key constraints berhasil diupdate untuk user ID {user_id}")
+                    logger.info(f"Foreign key constraints berhasil diupdate untuk user ID {user_id}")
 
-            except Exception as e:
-                self.db.rollback()
-                logger.error(f"Error saat update foreign key untuk user ID {user_id}: {str(e)}", exc_info=True)
-                raise
-            
-            # Sekarang baru hapus user (repository.delete sudah commit sendiri)
-            try:
-                result = self.repository.delete(user_id)
-                if not result:
-                    raise ValidationError("Gagal menghapus user")
+                    result = self.repository.delete(user_id)
+                    if not result:
+                        raise ValidationError("Gagal menghapus user")
                 logger.info(f"User ID {user_id} berhasil dihapus")
             except Exception as e:
-                logger.error(f"Error saat delete user ID {user_id}: {str(e)}", exc_info=True)
+                logger.error(f"Error saat menghapus user ID {user_id}: {str(e)}", exc_info=True)
                 raise
             
             return True
@@ -1,31 +1,87 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - registrasi semua model ke metadata
 from app.main import app
-from app.config.database import Base, get_db
-from app.config.settings import settings
+from app.config.database import get_db
+from app.models.base import Base
 
-# Test database URL (gunakan SQLite untuk testing)
-TEST_DATABASE_URL = "sqlite:///./test.db"
 
-engine = create_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="function")
+def engine():
+    """
+    Database SQLite in-memory per test. StaticPool + check_same_thread=False agar semua session
+    (termasuk session_factory untuk job / export di thread lain) memakai database yang sama.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
-def db():
-    """Create test database tables"""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+def session_factory(engine):
+    """Session factory untuk service yang membuka session sendiri (background job, streaming export)"""
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(session_factory):
+    """Session test; seed data dibuat oleh fixture di masing-masing file test"""
+    db = session_factory()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def project(db):
+    """Project uji (id 1) yang dipakai sebagian besar seed data"""
+    from app.models.project.project import Project
+
+    project = Project(id=1, name="Test", code="TST")
+    db.add(project)
+    db.commit()
+    return project
+
+
+@pytest.fixture(scope="function")
+def other_project(db):
+    """Project kedua (id 2) untuk memastikan filter project_id"""
+    from app.models.project.project import Project
+
+    project = Project(id=2, name="Lain", code="LN")
+    db.add(project)
+    db.commit()
+    return project
+
+
+@pytest.fixture(scope="function")
+def material(db, project):
+    """Material uji PE-020 (id 1) di project 1"""
+    from app.models.inventory.material import Material
+
+    material = Material(id=1, kode_barang="PE-020", nama_barang="Pipa PE 20mm", satuan="m", project_id=project.id)
+    db.add(material)
+    db.commit()
+    return material
+
+
+@pytest.fixture(scope="function")
+def count_queries(engine):
+    """
+    Pencatat statement SQL. Panggil count_queries() untuk mulai mencatat; return list statement
+    yang dieksekusi setelahnya (bisa di-clear() di tengah test).
+    """
+    def start():
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        return statements
+    return start
 
 
 @pytest.fixture(scope="function")
@@ -36,7 +92,7 @@ def client(db):
             yield db
         finally:
             db.close()
-    
+
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
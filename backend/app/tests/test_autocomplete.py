@@ -0,0 +1,46 @@
+"""
+Test untuk autocomplete material (app/services/inventory/autocomplete_service.py)
+"""
+import pytest
+
+from app.models.inventory.material import Material
+from app.services.inventory.autocomplete_service import AutocompleteService, clear_indexes
+
+
+@pytest.fixture(autouse=True)
+def seed(db, material):
+    clear_indexes()
+    db.add_all([
+        Material(kode_barang="FT-001", nama_barang="Elbow PE 20mm", satuan="pcs", project_id=1),
+        Material(kode_barang="FT-002", nama_barang="Tee PE 3/4\"", satuan="pcs", project_id=1),
+    ])
+    db.commit()
+    yield
+    clear_indexes()
+
+
+def test_prefix_and_token_match(db):
+    service = AutocompleteService(db)
+    assert [m["kode_barang"] for m in service.search_materials(1, "ft")] == ["FT-001", "FT-002"]
+    assert [m["nama_barang"] for m in service.search_materials(1, "pipa")] == ["Pipa PE 20mm"]
+    # Kata di tengah nama dan kombinasi beberapa kata
+    assert [m["nama_barang"] for m in service.search_materials(1, "elb 20")] == ["Elbow PE 20mm"]
+    assert len(service.search_materials(1, "pe", limit=2)) == 2
+
+
+def test_index_follows_orm_changes(db):
+    service = AutocompleteService(db)
+    assert service.search_materials(1, "reducer") == []
+
+    db.add(Material(kode_barang="FT-003", nama_barang="Reducer 32x20", satuan="pcs", project_id=1))
+    db.commit()
+    assert [m["kode_barang"] for m in service.search_materials(1, "reducer")] == ["FT-003"]
+
+    tee = db.query(Material).filter(Material.kode_barang == "FT-002").one()
+    tee.is_active = 0
+    db.commit()
+    assert service.search_materials(1, "tee") == []
+
+    db.delete(db.query(Material).filter(Material.kode_barang == "FT-003").one())
+    db.commit()
+    assert service.search_materials(1, "reducer") == []
@@ -0,0 +1,110 @@
+"""
+Test untuk import job di background (app/services/inventory/import_job_service.py)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.user.user import User, UserRole
+from app.models.inventory.material import Material
+from app.models.inventory.import_job import ImportJob, ImportJobStatus
+from app.core.exceptions import NotFoundError
+from app.services.inventory import import_job_service
+from app.services.inventory.import_job_service import ImportJobService, IMPORT_JOB_MATERIALS, run_import_job
+
+
+class InlineExecutor:
+    """Jalankan job langsung di thread test"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class IdleExecutor:
+    """Job tidak pernah dijalankan (worker mati sebelum sempat memproses)"""
+
+    def submit(self, fn, *args):
+        pass
+
+
+@pytest.fixture
+def setup(db, session_factory, project, tmp_path, monkeypatch):
+    # session_factory (conftest): session progress / job memakai database in-memory yang sama
+    db.add_all([
+        User(id=1, email="gudang@test.com", name="Gudang", password_hash="x", role=UserRole.GUDANG),
+        User(id=2, email="lain@test.com", name="Lain", password_hash="x", role=UserRole.GUDANG),
+        User(id=3, email="admin@test.com", name="Admin", password_hash="x", role=UserRole.ADMIN),
+    ])
+    db.commit()
+
+    monkeypatch.setattr(import_job_service, "_get_executor", lambda: InlineExecutor())
+    monkeypatch.setattr(import_job_service.settings, "IMPORT_JOB_DIR", str(tmp_path))
+    return ImportJobService(db, session_factory=session_factory), db, tmp_path
+
+
+CSV_HEADER = "NO,NAMA BARANG,KODE BARANG,SATUAN,KATEGORI,HARGA\n"
+
+
+def test_material_job_stores_report(setup):
+    service, db, tmp_path = setup
+    content = CSV_HEADER + "1,Pipa PE 20mm,PE-020,m,,1500\n2,,FT-001,pcs,,\n3,Elbow,FT-002,pcs,,abc\n"
+    job = service.submit(IMPORT_JOB_MATERIALS, "materials.csv", content.encode("utf-8"), project_id=1, user_id=1)
+
+    db.expire_all()
+    data = ImportJobService.to_dict(service.get_job(job.id, 1, db.get(User, 1)))
+    assert data["status"] == "completed"
+    assert (data["processed_rows"], data["success_count"], data["failed_count"]) == (3, 1, 2)
+    assert data["result"]["validation_failed_count"] == 2
+    assert data["message"] == "Berhasil mengimpor 1 material, 2 data tidak valid (tidak masuk database)"
+    assert db.query(Material).filter(Material.kode_barang == "PE-020").count() == 1
+    # File upload sementara dihapus setelah job selesai
+    assert list(tmp_path.iterdir()) == []
+
+    # Job hanya terlihat oleh pembuatnya dan admin
+    assert service.get_job(job.id, 1, db.get(User, 3)).id == job.id
+    with pytest.raises(NotFoundError):
+        service.get_job(job.id, 1, db.get(User, 2))
+
+
+def test_material_job_fails_on_bad_header(setup):
+    service, db, _ = setup
+    job = service.submit(IMPORT_JOB_MATERIALS, "materials.csv", b"NO,NAMA BARANG\n1,Pipa\n", project_id=1, user_id=1)
+
+    db.expire_all()
+    data = ImportJobService.to_dict(service.get_job(job.id, 1, db.get(User, 1)))
+    assert data["status"] == "failed"
+    assert data["message"] == "Gagal membaca file"
+    assert len(data["errors"]) == 1 and data["finished_at"] is not None
+
+
+def test_stale_job_is_failed_and_upload_removed(setup, session_factory, monkeypatch):
+    service, db, tmp_path = setup
+    monkeypatch.setattr(import_job_service, "_get_executor", lambda: IdleExecutor())
+    job = service.submit(IMPORT_JOB_MATERIALS, "materials.csv", (CSV_HEADER + "1,Pipa,PE-021,m,,\n").encode(),
+                         project_id=1, user_id=1)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    job.updated_at = datetime.utcnow() - timedelta(seconds=import_job_service.settings.IMPORT_JOB_STALE_SECONDS + 1)
+    db.commit()
+    assert service.get_job(job.id, 1, db.get(User, 1)).status == "failed"
+    assert job.file_path is None and list(tmp_path.iterdir()) == []
+
+    # Worker yang terlambat tidak mengubah job yang sudah ditandai gagal
+    run_import_job(job.id, session_factory)
+    db.expire_all()
+    assert service.get_job(job.id, 1, db.get(User, 1)).status == "failed"
+    assert db.query(Material).filter(Material.kode_barang == "PE-021").count() == 0
+
+
+def test_skipped_job_removes_upload(setup, session_factory, monkeypatch):
+    service, db, tmp_path = setup
+    monkeypatch.setattr(import_job_service, "_get_executor", lambda: IdleExecutor())
+    job = service.submit(IMPORT_JOB_MATERIALS, "materials.csv", CSV_HEADER.encode(), project_id=1, user_id=1)
+    # Ditandai gagal oleh proses lain sebelum worker mulai, file masih tersimpan
+    job.status = ImportJobStatus.FAILED.value
+    db.commit()
+
+    run_import_job(job.id, session_factory)
+    db.expire_all()
+    assert db.get(ImportJob, job.id).file_path is None
+    assert list(tmp_path.iterdir()) == []
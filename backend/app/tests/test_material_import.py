@@ -0,0 +1,90 @@
+"""
+Test untuk bulk import material (MaterialService.bulk_create)
+"""
+import pytest
+
+from app.models.inventory.material import Material
+from app.services.inventory.material_service import MaterialService
+
+
+pytestmark = pytest.mark.usefixtures("material")
+
+
+def _row(number, nama, kode="", satuan="pcs", harga=""):
+    return {"_row_number": number, "nama_barang": nama, "kode_barang": kode, "satuan": satuan,
+            "kategori": "bungan rumah", "harga": harga}
+
+
+def test_bulk_create_reports_per_row_errors(db):
+    rows = [
+        _row(2, "Elbow", "FT-001", harga="1500.50"),
+        _row(3, "Elbow lagi", "ft-001"),
+        _row(4, "Pipa", "pe-020"),
+        _row(5, "Tee", harga="abc"),
+        _row(6, "Tanpa kode"),
+    ]
+    result = MaterialService(db).bulk_create(rows, project_id=1)
+
+    assert result["success_count"] == 2
+    assert result["errors"] == [
+        "Row 3: Kode barang 'ft-001' duplikat dalam file",
+        "Row 4: Kode barang 'pe-020' sudah terdaftar di project ini",
+        "Row 5: Harga harus berupa angka (contoh: 150000 atau 150000.50)",
+    ]
+    elbow = db.query(Material).filter(Material.kode_barang == "FT-001").one()
+    assert elbow.kategori == "BUNGAN RUMAH" and str(elbow.harga) == "1500.50"
+    assert elbow.created_at is not None
+
+
+def test_bulk_create_all_or_nothing(db):
+    rows = [_row(2, "Elbow", "FT-001"), _row(3, "Pipa", "PE-020")]
+    result = MaterialService(db).bulk_create(rows, project_id=1, all_or_nothing=True)
+
+    assert result["success_count"] == 0
+    assert result["rolled_back"] is True
+    assert db.query(Material).count() == 1
+
+
+def test_bulk_create_large_file_in_batches(db):
+    rows = [_row(i + 2, f"Material {i}", f"KD-{i:05d}") for i in range(5000)]
+    result = MaterialService(db).bulk_create(rows, project_id=1, batch_size=700)
+
+    assert result["success_count"] == 5000 and result["errors"] == []
+    assert db.query(Material).count() == 5001
+
+
+HEADERS = ["NO", "NAMA BARANG", "KODE BARANG", "SATUAN", "KATEGORI", "HARGA"]
+
+
+def test_streaming_parsers_xlsx_and_csv():
+    from io import BytesIO
+    from openpyxl import Workbook
+    from app.utils.excel_importer import iter_import_rows
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    sheet.append([1, "Pipa PE 20mm", "PE-020", "m", None, 1500.5])
+    sheet.append([None] * 6)
+    sheet.append([2, "Elbow", None, "pcs"])
+    buffer = BytesIO()
+    workbook.save(buffer)
+
+    excel_rows = list(iter_import_rows(buffer.getvalue(), "materials.xlsx", HEADERS))
+    assert [(r["_row_number"], r["nama_barang"], r["kode_barang"], r["harga"]) for r in excel_rows] == [
+        (2, "Pipa PE 20mm", "PE-020", "1500.5"),
+        (4, "Elbow", "", ""),
+    ]
+
+    csv_content = "\ufeffNO;NAMA BARANG;KODE BARANG;SATUAN;KATEGORI;HARGA\n1;Pipa PE 20mm;PE-020;m;;1500.5\n;;;;;\n2;Elbow;;pcs\n"
+    csv_rows = list(iter_import_rows(csv_content.encode("utf-8"), "materials.csv", HEADERS))
+    assert csv_rows == excel_rows
+
+
+def test_streaming_parser_missing_header():
+    from app.core.exceptions import ValidationError
+    from app.utils.excel_importer import iter_import_rows
+
+    rows = iter_import_rows(b"NO,NAMA BARANG\n1,Pipa\n", "materials.csv", HEADERS)
+    with pytest.raises(ValidationError):
+        list(rows)
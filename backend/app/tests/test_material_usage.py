@@ -0,0 +1,62 @@
+"""
+Test untuk cek pemakaian material sebelum delete (satu query UNION ALL, juga untuk batch)
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.models.user.user import User
+from app.models.inventory.mandor import Mandor
+from app.models.inventory.material import Material
+from app.models.inventory.stock_in import StockIn
+from app.models.inventory.stock_out import StockOut
+from app.models.inventory.surat_permintaan import SuratPermintaan
+from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
+from app.services.inventory.material_service import MaterialService
+
+TODAY = date(2025, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def seed(db, project):
+    db.add(User(id=1, email="u1@test.id", name="U1", password_hash="x"))
+    db.add(Mandor(id=1, nama="Budi", project_id=1))
+    db.add_all([
+        Material(id=i, kode_barang=f"M{i}", nama_barang=f"Material {i}", satuan="pcs", project_id=1)
+        for i in range(1, 5)
+    ])
+    db.add_all([
+        StockIn(nomor_invoice=f"INV-{n}", material_id=1, quantity=Decimal("5"), tanggal_masuk=TODAY,
+                created_by=1, project_id=1, is_deleted=0)
+        for n in range(2)
+    ])
+    # Stock in yang sudah dihapus tidak dihitung
+    db.add(StockIn(nomor_invoice="INV-X", material_id=3, quantity=Decimal("5"), tanggal_masuk=TODAY,
+                   created_by=1, project_id=1, is_deleted=1))
+    db.add(StockOut(nomor_barang_keluar="SO-1", mandor_id=1, material_id=1, quantity=Decimal("1"),
+                    tanggal_keluar=TODAY, created_by=1, project_id=1, is_deleted=0))
+    db.add(SuratPermintaan(id=1, nomor_surat="SP-1", tanggal=TODAY, project_id=1, created_by=1, is_deleted=0))
+    db.add(SuratPermintaanItem(surat_permintaan_id=1, material_id=2, nama_barang="Material 2",
+                               qty=Decimal("1"), satuan="pcs"))
+    db.commit()
+
+
+def test_usage_is_single_query_for_a_page(db, count_queries):
+    service = MaterialService(db)
+    statements = count_queries()
+
+    assert service.get_deletable_flags([1, 2, 3, 4]) == {1: False, 2: False, 3: True, 4: True}
+    assert len(statements) == 1
+
+
+def test_delete_reports_usage_counts(db):
+    service = MaterialService(db)
+    with pytest.raises(ValidationError, match="2 data stock in, 1 data stock out"):
+        service.delete(1, project_id=1)
+    with pytest.raises(ValidationError, match="1 data surat permintaan"):
+        service.delete(2, project_id=1)
+
+    assert service.delete(4, project_id=1)
+    assert db.get(Material, 4) is None
@@ -0,0 +1,36 @@
+"""
+Test untuk Prometheus metrics (app/core/metrics.py)
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import PrometheusMiddleware, render_metrics, is_metrics_access_allowed
+
+
+def test_route_template_used_as_label():
+    """Label route harus berupa template path, bukan raw path"""
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+
+    content, _ = render_metrics()
+    text = content.decode()
+    assert 'route="/items/{item_id}"' in text
+    assert 'route="/items/1"' not in text
+
+
+def test_metrics_access_gate():
+    networks = ["127.0.0.1", "10.0.0.0/8"]
+    assert is_metrics_access_allowed("127.0.0.1", None, networks, "")
+    assert is_metrics_access_allowed("10.1.2.3", None, networks, "")
+    assert not is_metrics_access_allowed("8.8.8.8", None, networks, "")
+    assert is_metrics_access_allowed("8.8.8.8", "Bearer rahasia", networks, "rahasia")
+    assert not is_metrics_access_allowed("8.8.8.8", "Bearer salah", networks, "rahasia")
+    assert not is_metrics_access_allowed(None, None, networks, "")
@@ -0,0 +1,61 @@
+"""
+Test untuk listing notifikasi (nama mandor/material di query yang sama + counter unread di-cache)
+"""
+import pytest
+
+from app.models.project.project import Project
+from app.models.inventory.mandor import Mandor
+from app.models.inventory.material import Material
+from app.models.inventory.notification import Notification
+from app.services.inventory import notification_service
+from app.services.inventory.notification_service import NotificationService
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    # Cache per proses: kosongkan agar tidak terbawa dari database test lain
+    notification_service._unread_count_cache.clear()
+    db.add_all([Project(id=1, name="Batang", code="BTG"), Project(id=2, name="Kendal", code="KDL")])
+    db.add_all([Mandor(id=i, nama=f"Mandor {i}", project_id=1) for i in range(1, 6)])
+    db.add_all([
+        Material(id=i, kode_barang=f"M{i}", nama_barang=f"Material {i}", satuan="pcs", project_id=1 if i <= 10 else 2)
+        for i in range(1, 13)
+    ])
+    db.add_all([
+        Notification(id=n, mandor_id=n % 5 + 1, material_id=n % 12 + 1, title="Selisih", message="-",
+                     barang_keluar=10, barang_terpasang=5, selisih=5, is_read=n % 3 == 0)
+        for n in range(1, 61)
+    ])
+    db.commit()
+
+
+def test_listing_loads_names_in_one_query_and_caches_unread(db, count_queries):
+    service = NotificationService(db)
+    expected_unread = db.query(Notification).join(Material).filter(
+        Material.project_id == 1, Notification.is_read == False
+    ).count()
+    statements = count_queries()
+
+    notifications, total = service.get_notifications(is_read=False, limit=500, project_id=1)
+    assert total == expected_unread == len(notifications)
+    assert all(n.mandor.nama == f"Mandor {n.mandor_id}" for n in notifications)
+    assert all(n.material.nama_barang == f"Material {n.material_id}" for n in notifications)
+    # version + counter unread + satu query listing
+    assert len(statements) == 3
+
+    statements.clear()
+    _, total = service.get_notifications(is_read=False, limit=500, project_id=1)
+    assert total == expected_unread
+    # version + satu query listing
+    assert len(statements) == 2
+
+    other_unread = service.get_unread_count(2)
+    service.mark_as_read(notifications[0].id)
+    assert service.get_unread_count(1) == expected_unread - 1
+    assert service.get_unread_count() == expected_unread - 1 + other_unread
+    # Counter project lain tetap dari cache (hanya lookup version)
+    statements.clear()
+    assert service.get_unread_count(2) == other_unread
+    assert len(statements) == 1
+    service.mark_all_as_read()
+    assert service.get_unread_count(1) == 0 and service.get_unread_count() == 0
@@ -0,0 +1,57 @@
+"""
+Test untuk keyset pagination (app/utils/pagination.py)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, Column, Integer, DateTime
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.core.exceptions import ValidationError
+from app.utils.pagination import encode_cursor, decode_cursor, paginate_keyset
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    base_time = datetime(2024, 1, 1)
+    # created_at sengaja kembar per pasangan untuk menguji tie-breaker id
+    db.add_all([Row(id=i, created_at=base_time + timedelta(hours=i // 2)) for i in range(1, 26)])
+    db.commit()
+    yield db
+    db.close()
+
+
+def test_cursor_roundtrip_and_invalid():
+    values = {"id": 10, "created_at": datetime(2024, 1, 1, 8, 30)}
+    assert decode_cursor(encode_cursor(values)) == {"id": 10, "created_at": "2024-01-01T08:30:00"}
+    assert decode_cursor(None) is None
+    with pytest.raises(ValidationError):
+        decode_cursor("bukan-cursor")
+
+
+@pytest.mark.parametrize("use_sort_column", [False, True])
+def test_keyset_walks_all_rows_without_gaps(session, use_sort_column):
+    sort_column = Row.created_at if use_sort_column else None
+    seen = []
+    cursor_values = None
+    while True:
+        items, next_cursor = paginate_keyset(
+            session.query(Row), Row.id, cursor_values, 7, sort_column=sort_column
+        )
+        seen.extend(row.id for row in items)
+        if next_cursor is None:
+            break
+        cursor_values = decode_cursor(next_cursor)
+
+    assert seen == list(range(25, 0, -1))
@@ -0,0 +1,86 @@
+"""
+Test untuk snapshot Parquet (app/services/inventory/parquet_export_service.py)
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.inventory.material import Material
+from app.models.inventory.stock_in import StockIn
+from app.services.inventory import parquet_export_service
+from app.services.inventory.parquet_export_service import ParquetExportService
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def service(db, session_factory, material, other_project, tmp_path, monkeypatch):
+    material.harga = 1500
+    db.add(Material(id=2, kode_barang="FT-001", nama_barang="Elbow", satuan="pcs", project_id=2))
+    db.add_all([
+        StockIn(nomor_invoice=f"INV-{i}", material_id=1, quantity=Decimal("1.5") * i, created_by=1,
+                tanggal_masuk=date(2025, 1 if i <= 3 else 2, i))
+        for i in range(1, 6)
+    ])
+    # Project lain tidak ikut
+    db.add(StockIn(nomor_invoice="INV-LAIN", material_id=2, quantity=1, tanggal_masuk=date(2025, 1, 1), created_by=1))
+    db.commit()
+
+    monkeypatch.setattr(parquet_export_service.settings, "PARQUET_EXPORT_DIR", str(tmp_path))
+    # Chunk kecil agar file terdiri dari beberapa row group
+    monkeypatch.setattr(parquet_export_service, "PARQUET_CHUNK_SIZE", 2)
+    return ParquetExportService(db, session_factory=session_factory), db, tmp_path
+
+
+def test_export_writes_monthly_partitions_with_types(service):
+    service, db, tmp_path = service
+    report = service.export_project(1, tables=["materials", "stock_ins"])
+
+    assert report["stock_ins"]["written"] == ["2025-01", "2025-02"]
+    assert report["materials"]["written"] == ["snapshot"]
+
+    table = pq.read_table(tmp_path / "project_1" / "stock_ins" / "2025-01.parquet")
+    assert table.num_rows == 3
+    assert table.schema.field("quantity").type == pa.decimal128(10, 1)
+    assert table.schema.field("tanggal_masuk").type == pa.date32()
+    assert table.column("nomor_invoice").to_pylist() == ["INV-1", "INV-2", "INV-3"]
+    assert table.column("quantity").to_pylist()[1] == Decimal("3.0")
+
+    materials = pq.read_table(tmp_path / "project_1" / "materials" / "snapshot.parquet")
+    assert materials.column("kode_barang").to_pylist() == ["PE-020"]
+    assert materials.schema.field("harga").type == pa.decimal128(15, 2)
+
+
+def test_export_is_incremental(service):
+    service, db, tmp_path = service
+    service.export_project(1, tables=["stock_ins"])
+
+    report = service.export_project(1, tables=["stock_ins"])
+    assert report["stock_ins"]["written"] == [] and report["stock_ins"]["skipped"] == 2
+
+    # Soft delete di Februari: hanya bulan itu yang ditulis ulang
+    row = db.query(StockIn).filter(StockIn.nomor_invoice == "INV-5").one()
+    row.is_deleted = 1
+    row.updated_at = datetime(2030, 1, 1)
+    db.commit()
+    report = service.export_project(1, tables=["stock_ins"])
+    assert report["stock_ins"]["written"] == ["2025-02"] and report["stock_ins"]["skipped"] == 1
+    assert pq.read_table(tmp_path / "project_1" / "stock_ins" / "2025-02.parquet").num_rows == 1
+
+    # Bulan yang tidak punya data lagi dihapus
+    db.query(StockIn).filter(StockIn.tanggal_masuk >= date(2025, 2, 1)).delete()
+    db.commit()
+    report = service.export_project(1, tables=["stock_ins"])
+    assert report["stock_ins"]["removed"] == ["2025-02"]
+    assert not (tmp_path / "project_1" / "stock_ins" / "2025-02.parquet").exists()
+    assert list(service.get_status(1)["tables"]["stock_ins"]) == ["2025-01"]
+
+
+def test_partition_treats_null_is_deleted_as_not_deleted(service):
+    # Kolom NOT NULL di model, tapi data lama di MySQL bisa NULL: filter harus sama dengan repository
+    service, _, _ = service
+    spec = parquet_export_service._table_specs()["stock_ins"]
+    sql = str(service._partition_statement(spec, 1, "2025-01"))
+    assert "OR stock_ins.is_deleted IS NULL" in sql
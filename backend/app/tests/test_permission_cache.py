@@ -0,0 +1,63 @@
+"""
+Test untuk permission efektif user (satu query join + cache dengan version stamp)
+"""
+import pytest
+
+from app.models.user.user import User
+from app.models.user.role import Role
+from app.models.user.permission import Page, Permission
+from app.models.user.role_permission import RolePermission
+from app.models.user.user_permission import UserPermission
+from app.schemas.user.permission_request import AssignUserPermissionsRequest, PageUpdateRequest
+from app.schemas.user.role_request import AssignPermissionsRequest
+from app.services.user import permission_service
+from app.services.user.permission_service import PermissionService, PageService
+from app.services.user.role_service import RoleService
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    # Cache per proses: kosongkan agar tidak terbawa dari database test lain
+    permission_service._user_permissions_cache.clear()
+    db.add(Role(id=1, name="gudang"))
+    db.add_all([
+        Page(id=i, name=f"page{i}", path=f"/page{i}", display_name=f"Page {i}", order=i) for i in range(1, 5)
+    ])
+    db.add_all([Permission(id=i, page_id=i, can_read=True) for i in range(1, 5)])
+    db.add(User(id=1, email="u1@test.id", name="U1", password_hash="x", role_id=1))
+    db.add_all([
+        RolePermission(role_id=1, permission_id=1),
+        RolePermission(role_id=1, permission_id=2),
+        UserPermission(user_id=1, permission_id=2),
+        UserPermission(user_id=1, permission_id=3),
+    ])
+    db.commit()
+
+
+def test_effective_permissions_single_query_then_cached(db, count_queries):
+    service = PermissionService(db)
+    statements = count_queries()
+
+    permissions = service.get_user_permissions(1)
+    assert [p.id for p in permissions] == [1, 2, 3]
+    assert permissions[0].page_path == "/page1" and permissions[0].display_name == "Page 1"
+    # version + user + satu query join permission/page
+    assert len(statements) == 3
+
+    statements.clear()
+    assert [p.id for p in service.get_user_permissions(1)] == [1, 2, 3]
+    assert len(statements) == 1
+
+
+def test_changes_bump_version(db):
+    service = PermissionService(db)
+    service.get_user_permissions(1)
+
+    service.assign_user_permissions(1, AssignUserPermissionsRequest(permission_ids=[4]))
+    assert [p.id for p in service.get_user_permissions(1)] == [1, 2, 4]
+
+    RoleService(db).assign_permissions(1, AssignPermissionsRequest(permission_ids=[3]))
+    assert [p.id for p in service.get_user_permissions(1)] == [3, 4]
+
+    PageService(db).update(4, PageUpdateRequest(display_name="Laporan"))
+    assert service.get_user_permissions(1)[-1].display_name == "Laporan"
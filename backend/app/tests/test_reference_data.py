@@ -0,0 +1,71 @@
+"""
+Test untuk reference data material (cache per project + ETag/304)
+"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.models.project.project import Project
+from app.models.inventory.material import Material
+from app.services.inventory import reference_data_service
+from app.services.inventory.material_service import MaterialService
+from app.services.inventory.reference_data_service import ReferenceDataService, REFERENCE_ALL, REFERENCE_SATUANS
+from app.utils.response import etag_response
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    # Cache per proses: kosongkan agar tidak terbawa dari database test lain
+    reference_data_service._reference_cache.clear()
+    db.add_all([Project(id=1, name="Batang", code="BTG"), Project(id=2, name="Kendal", code="KDL")])
+    db.add_all([
+        Material(kode_barang="M1", nama_barang="Pipa", satuan="m", kategori="PIPA DITRIBUSI", project_id=1),
+        Material(kode_barang="M2", nama_barang="Elbow", satuan="pcs", project_id=1),
+        Material(kode_barang="M3", nama_barang="Kran", satuan="unit", kategori="BUNGAN KOMPOR", project_id=2),
+    ])
+    db.commit()
+
+
+def test_reference_data_cached_per_project_and_invalidated_on_write(db, count_queries):
+    service = ReferenceDataService(db)
+    statements = count_queries()
+
+    bundle = service.get(1)
+    assert bundle["data"]["satuans"] == ["m", "pcs"]
+    assert bundle["data"]["kategoris"] == ["PIPA DITRIBUSI"]
+    assert bundle["data"]["valid_kategoris"] and bundle["data"]["pages"]
+    assert service.get(2, REFERENCE_SATUANS)["data"] == ["unit"]
+    assert service.get(None, REFERENCE_SATUANS)["data"] == ["m", "pcs", "unit"]
+
+    statements.clear()
+    assert service.get(1)["etag"] == bundle["etag"]
+    # Cache hit: hanya lookup version
+    assert len(statements) == 1
+
+    MaterialService(db).create({"kode_barang": "M4", "nama_barang": "Tee", "satuan": "kg"}, project_id=1)
+    refreshed = service.get(1, REFERENCE_ALL)
+    assert refreshed["data"]["satuans"] == ["kg", "m", "pcs"]
+    assert refreshed["etag"] != bundle["etag"]
+    assert service.get(None, REFERENCE_SATUANS)["data"] == ["kg", "m", "pcs", "unit"]
+
+    # Perubahan di project 1 tidak membuang cache project 2
+    statements.clear()
+    assert service.get(2, REFERENCE_SATUANS)["data"] == ["unit"]
+    assert len(statements) == 1
+
+
+def test_etag_response_returns_304_on_match():
+    api = FastAPI()
+
+    @api.get("/ref")
+    def ref(request: Request):
+        return etag_response(request, data=["m", "pcs"], etag='W/"abc"')
+
+    client = TestClient(api)
+    first = client.get("/ref")
+    assert first.status_code == 200 and first.headers["etag"] == 'W/"abc"'
+    assert first.json()["data"] == ["m", "pcs"]
+
+    second = client.get("/ref", headers={"If-None-Match": 'W/"abc"'})
+    assert second.status_code == 304 and second.content == b""
+    assert client.get("/ref", headers={"If-None-Match": 'W/"old"'}).status_code == 200
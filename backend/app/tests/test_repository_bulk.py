@@ -0,0 +1,114 @@
+"""
+Test untuk bulk primitives dan unit_of_work di BaseRepository
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.models.inventory.material import Material
+from app.models.inventory.stock_in import StockIn
+from app.models.user.role import Role
+from app.repositories.base import unit_of_work
+from app.repositories.inventory.material_repository import MaterialRepository
+from app.repositories.inventory.stock_in_repository import StockInRepository
+from app.repositories.user.role_repository import RoleRepository
+
+
+pytestmark = pytest.mark.usefixtures("material", "other_project")
+
+
+def _stock_in_rows(count, project_id=1):
+    return [
+        {"nomor_invoice": f"INV-{project_id}-{i}", "material_id": 1, "quantity": i, "tanggal_masuk": date(2025, 1, 1),
+         "created_by": 1, "is_deleted": 0, "project_id": project_id}
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_create_returns_ids_in_order(db, returning, monkeypatch):
+    dialect = db.get_bind().dialect
+    # returning=False mensimulasikan MySQL (tanpa INSERT ... RETURNING)
+    monkeypatch.setattr(dialect, "insert_executemany_returning_sort_by_parameter_order", returning)
+    repo = StockInRepository(db)
+
+    ids = repo.bulk_create(_stock_in_rows(5), batch_size=2)
+
+    assert len(ids) == 5
+    invoices = dict(db.query(StockIn.id, StockIn.nomor_invoice).all())
+    assert [invoices[i] for i in ids] == [f"INV-1-{i}" for i in range(1, 6)]
+
+
+def test_bulk_update_and_soft_delete(db):
+    repo = StockInRepository(db)
+    ids = repo.bulk_create(_stock_in_rows(3) + _stock_in_rows(2, project_id=2))
+
+    assert repo.bulk_update(ids[:3], {"quantity": 7, "tidak_ada": 1}) == 3
+    assert repo.bulk_update(ids, {"quantity": 9}, project_id=2) == 2
+    assert [row.quantity for row in db.query(StockIn).order_by(StockIn.id)] == [7, 7, 7, 9, 9]
+
+    assert repo.bulk_soft_delete(ids[:2], deleted_by=1) == 2
+    # Yang sudah terhapus tidak disentuh lagi
+    assert repo.bulk_soft_delete(ids[:3], deleted_by=2) == 1
+    deleted_by = dict(db.query(StockIn.id, StockIn.deleted_by).filter(StockIn.is_deleted == 1).all())
+    assert deleted_by == {ids[0]: 1, ids[1]: 1, ids[2]: 2}
+
+
+def test_unit_of_work_commits_once_and_rolls_back(db):
+    stock_in_repo = StockInRepository(db)
+    material_repo = MaterialRepository(db)
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+
+    with unit_of_work(db):
+        stock_in = stock_in_repo.create(_stock_in_rows(1)[0])
+        assert stock_in.id is not None
+        with unit_of_work(db):
+            material_repo.update(1, {"nama_barang": "Pipa PE 20 mm"})
+        stock_in_repo.bulk_soft_delete([stock_in.id], deleted_by=1)
+    assert len(commits) == 1
+
+    with pytest.raises(ValueError):
+        with unit_of_work(db):
+            stock_in_repo.bulk_create(_stock_in_rows(3, project_id=2))
+            material_repo.update(1, {"nama_barang": "Berubah"})
+            raise ValueError("gagal")
+    assert len(commits) == 1
+    assert db.query(StockIn).filter(StockIn.project_id == 2).count() == 0
+    assert db.get(Material, 1).nama_barang == "Pipa PE 20 mm"
+
+
+def test_error_inside_unit_of_work_rolls_back_whole_block(db):
+    repo = StockInRepository(db)
+    role_repo = RoleRepository(db)
+
+    with pytest.raises(SQLAlchemyError):
+        with unit_of_work(db):
+            repo.create(_stock_in_rows(1)[0])
+            role_repo.create({"name": "Gudang"})
+            # Error yang ditangkap caller tidak boleh membuang perubahan sebelumnya lalu lanjut commit
+            with pytest.raises(IntegrityError):
+                role_repo.create({"name": "Gudang"})
+    assert db.query(StockIn).count() == 0
+    assert db.query(Role).count() == 0
+
+
+def test_soft_delete_single_update(db, count_queries):
+    repo = StockInRepository(db)
+    record_id = repo.bulk_create(_stock_in_rows(1))[0]
+    statements = count_queries()
+
+    assert repo.soft_delete(record_id, deleted_by=3) is True
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert repo.soft_delete(record_id, deleted_by=4) is False
+    assert db.get(StockIn, record_id).deleted_by == 3
+
+
+def test_bulk_create_without_ids_is_one_statement_per_batch(db, count_queries):
+    statements = count_queries()
+
+    assert StockInRepository(db).bulk_create(_stock_in_rows(5), batch_size=2, return_ids=False) == []
+    assert len([s for s in statements if s.startswith("INSERT")]) == 3
+    assert db.query(StockIn).count() == 5
@@ -0,0 +1,48 @@
+"""
+Test untuk streaming read di BaseRepository (stream / iter_all)
+"""
+from datetime import date
+
+import pytest
+
+from app.models.inventory.material import Material
+from app.models.inventory.stock_in import StockIn
+from app.repositories.inventory.material_repository import MaterialRepository
+from app.repositories.inventory.stock_in_repository import StockInRepository
+
+
+@pytest.fixture(autouse=True)
+def seed(db, project, other_project):
+    db.add_all([
+        Material(id=i, kode_barang=f"MAT-{i:05d}", nama_barang=f"Material {i}", satuan="pcs",
+                 project_id=1 if i % 4 else 2, is_active=0 if i == 3 else 1)
+        for i in range(1, 25)
+    ])
+    db.add_all([
+        StockIn(nomor_invoice=f"INV-{i}", material_id=1, quantity=1, created_by=1,
+                tanggal_masuk=date(2025, 1, 1 + i % 28), is_deleted=1 if i == 5 else 0)
+        for i in range(1, 12001)
+    ])
+    db.commit()
+
+
+def test_stream_yields_batches_with_filters(db):
+    repo = MaterialRepository(db)
+
+    batches = list(repo.stream(batch_size=5, project_id=1))
+    assert [len(batch) for batch in batches] == [5, 5, 5, 3]
+    assert all(m.project_id == 1 for batch in batches for m in batch)
+
+    active = list(repo.iter_all(repo.active_query(project_id=1), batch_size=4))
+    assert len(active) == 17 and all(m.is_active == 1 for m in active)
+
+
+def test_iter_all_has_no_row_cap(db):
+    repo = StockInRepository(db)
+
+    rows = list(repo.iter_all(repo.query_by_date_range()))
+    # Lebih dari 10000 row dan yang soft delete tidak ikut
+    assert len(rows) == 11999
+
+    january_first = repo.query_by_date_range(date(2025, 1, 1), date(2025, 1, 1))
+    assert sum(1 for _ in repo.iter_all(january_first, batch_size=100)) == 428
@@ -0,0 +1,63 @@
+"""
+Test untuk assign permission ke role secara set-based (jumlah query konstan)
+"""
+import pytest
+
+from app.core.exceptions import NotFoundError
+from app.models.user.role import Role
+from app.models.user.permission import Page, Permission
+from app.models.user.role_permission import RolePermission
+from app.schemas.user.role_request import AssignPermissionsRequest, AssignRolePermissionsCRUDRequest
+from app.services.user.role_service import RoleService
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    db.add(Role(id=1, name="gudang"))
+    db.add_all([
+        Page(id=i, name=f"page{i}", path=f"/page{i}", display_name=f"Page {i}", order=i) for i in range(1, 31)
+    ])
+    db.add_all([Permission(id=i, page_id=i, can_read=True) for i in range(1, 31)])
+    db.add(RolePermission(role_id=1, permission_id=1))
+    db.commit()
+
+
+def _role_permission_ids(db):
+    return sorted(pid for (pid,) in db.query(RolePermission.permission_id).filter(RolePermission.role_id == 1))
+
+
+def test_assign_permissions_is_set_based(db, count_queries):
+    service = RoleService(db)
+    statements = count_queries()
+
+    service.assign_permissions(1, AssignPermissionsRequest(permission_ids=list(range(1, 31)) + [5]))
+    writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "DELETE"))]
+    # DELETE role_permissions + satu INSERT executemany + upsert cache version
+    assert len(writes) == 3
+    assert _role_permission_ids(db) == list(range(1, 31))
+
+    with pytest.raises(NotFoundError):
+        service.assign_permissions(1, AssignPermissionsRequest(permission_ids=[2, 99]))
+    assert _role_permission_ids(db) == list(range(1, 31))
+
+
+def test_assign_permissions_crud_creates_missing_combinations_in_batch(db, count_queries):
+    service = RoleService(db)
+    page_permissions = [
+        {"page_id": i, "can_create": i % 2 == 0, "can_read": True, "can_update": False, "can_delete": False}
+        for i in range(1, 31)
+    ] + [{"page_id": 1, "can_create": False, "can_read": False, "can_update": False, "can_delete": False}]
+    statements = count_queries()
+
+    service.assign_permissions_crud(1, AssignRolePermissionsCRUDRequest(page_permissions=page_permissions))
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO PERMISSIONS")]
+    assert len(inserts) == 1
+    # Page ganjil memakai permission read-only yang sudah ada, page genap dapat permission baru
+    ids = _role_permission_ids(db)
+    assert len(ids) == 30 and [i for i in ids if i <= 30] == list(range(1, 31, 2))
+    assert db.query(Permission).count() == 45
+
+    with pytest.raises(NotFoundError):
+        service.assign_permissions_crud(1, AssignRolePermissionsCRUDRequest(page_permissions=[
+            {"page_id": 99, "can_create": False, "can_read": True, "can_update": False, "can_delete": False}
+        ]))
@@ -0,0 +1,81 @@
+"""
+Test untuk slow-query recorder (app/core/slow_query.py) dan endpoint /monitoring/slow-queries
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.api.v1.routes import monitoring
+from app.core import slow_query
+from app.core.security import get_current_user
+from app.core.slow_query import SKIP_OPTION, SlowQueryRecorder, param_shape
+from app.models.user.user import User
+
+
+def _recorder(engine, threshold_ms=0, buffer_size=200):
+    recorder = SlowQueryRecorder(threshold_ms=threshold_ms, buffer_size=buffer_size)
+    recorder.attach(engine)
+    return recorder
+
+
+def test_threshold_filter(engine):
+    recorder = _recorder(engine, threshold_ms=60_000)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert recorder.get_entries() == []
+
+    recorder.threshold_ms = 0
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 2"))
+    assert [e["statement"] for e in recorder.get_entries()] == ["SELECT 2"]
+    assert recorder.get_entries(min_duration_ms=60_000) == []
+
+
+def test_param_shape_does_not_leak_values():
+    shape = param_shape({"email": "rahasia@test.id", "ids": list(range(50)), "qty": 1.5})
+    assert shape == {"email": "str", "ids": {"count": 50, "types": ["int"]}, "qty": "float"}
+    assert "rahasia" not in repr(param_shape(("rahasia", 7)))
+    assert param_shape([{"nama": "Budi"}, {"nama": "Agus"}], executemany=True) == {
+        "executemany": 2, "row": {"nama": "str"}
+    }
+
+
+def test_ring_buffer_evicts_oldest(engine):
+    recorder = _recorder(engine, buffer_size=3)
+    for i in range(5):
+        recorder.record(f"SELECT {i}", None, duration_ms=i)
+    assert [e["statement"] for e in recorder.get_entries()] == ["SELECT 4", "SELECT 3", "SELECT 2"]
+    assert recorder.clear() == 3 and recorder.get_entries() == []
+
+
+def test_skip_option_not_recorded(engine):
+    recorder = _recorder(engine)
+    # Koneksi EXPLAIN memakai SKIP_OPTION agar tidak tercatat sebagai slow query
+    with engine.connect().execution_options(**{SKIP_OPTION: True}) as conn:
+        conn.execute(text("SELECT 1"))
+    assert recorder.get_entries() == []
+
+
+@pytest.mark.parametrize("method", ["get", "delete"])
+def test_slow_query_endpoints_require_superuser(engine, method, monkeypatch):
+    recorder = _recorder(engine)
+    recorder.record("SELECT 1", None, duration_ms=1)
+    monkeypatch.setattr(slow_query, "_recorder", recorder)
+
+    app = FastAPI()
+    app.include_router(monitoring.router, prefix="/monitoring")
+    current_user = User(id=1, email="u@test.id", name="U", password_hash="x", is_superuser=False)
+    app.dependency_overrides[get_current_user] = lambda: current_user
+    client = TestClient(app)
+
+    assert getattr(client, method)("/monitoring/slow-queries").status_code == 403
+    assert len(recorder.get_entries()) == 1
+
+    current_user.is_superuser = True
+    response = getattr(client, method)("/monitoring/slow-queries")
+    assert response.status_code == 200
+    if method == "get":
+        assert [e["statement"] for e in response.json()["data"]["items"]] == ["SELECT 1"]
+    else:
+        assert response.json()["data"]["cleared"] == 1
@@ -0,0 +1,103 @@
+"""
+Test untuk import barang masuk / barang keluar dari file (app/services/inventory/stock_import_service.py)
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.inventory.material import Material
+from app.models.inventory.mandor import Mandor
+from app.models.inventory.stock_in import StockIn
+from app.models.inventory.stock_out import StockOut
+from app.services.inventory.stock_import_service import StockImportService
+from app.utils.excel_importer import iter_import_rows, STOCK_IN_IMPORT_HEADERS, STOCK_OUT_IMPORT_HEADERS
+
+
+@pytest.fixture(autouse=True)
+def seed(db, material):
+    db.add_all([
+        Material(id=2, kode_barang="FT-001", nama_barang="Elbow", satuan="pcs", project_id=1),
+        Material(id=3, kode_barang="OLD-01", nama_barang="Lama", satuan="pcs", project_id=1, is_active=0),
+        Mandor(id=1, nama="Budi Santoso", project_id=1),
+        Mandor(id=2, nama="Agus", project_id=1),
+        Mandor(id=3, nama="agus", project_id=1),
+        StockOut(nomor_barang_keluar="JRGS-KDL-20250115-0007", mandor_id=1, material_id=1, quantity=1,
+                 tanggal_keluar=date(2025, 1, 15), created_by=1, project_id=1),
+    ])
+    db.commit()
+
+
+def _rows(content: str, filename: str, headers):
+    return iter_import_rows(content.encode("utf-8"), filename, headers)
+
+
+def test_stock_in_import(db):
+    content = (
+        "NO;NOMOR INVOICE;KODE BARANG;QUANTITY;TANGGAL MASUK\n"
+        "1;INV-1;pe-020;100;2025-01-10\n"
+        "2;INV-1;FT-001;12,5;10/01/2025\n"
+        "3;INV-2;XX-999;1;2025-01-10\n"
+        "4;INV-2;OLD-01;1;2025-01-10\n"
+        "5;INV-2;FT-001;0;2025-01-10\n"
+        "6;INV-2;FT-001;3;31/02/2025\n"
+    )
+    report = StockImportService(db).import_stock_in_rows(
+        _rows(content, "masuk.csv", STOCK_IN_IMPORT_HEADERS), project_id=1, created_by=1
+    )
+
+    assert report["success_count"] == 2
+    assert report["errors"] == [
+        "Row 4: Kode barang 'XX-999' tidak ditemukan di project ini",
+        "Row 5: Material 'OLD-01' tidak aktif",
+        "Row 6: Quantity harus lebih dari 0",
+        "Row 7: Tanggal Masuk '31/02/2025' tidak valid (format: YYYY-MM-DD atau DD/MM/YYYY)",
+    ]
+    elbow = db.query(StockIn).filter(StockIn.material_id == 2).one()
+    assert elbow.quantity == Decimal("12.5") and elbow.tanggal_masuk == date(2025, 1, 10)
+    assert elbow.created_at is not None and elbow.is_deleted == 0
+
+
+def test_stock_out_import_allocates_numbers_and_checks_stock(db):
+    db.add(StockIn(nomor_invoice="INV-1", material_id=1, quantity=50, tanggal_masuk=date(2025, 1, 1),
+                   created_by=1, project_id=1))
+    db.commit()
+    content = (
+        "NO,NAMA MANDOR,KODE BARANG,QUANTITY,TANGGAL KELUAR\n"
+        "1,budi  santoso,PE-020,20,2025-01-15\n"
+        "2,Budi Santoso,PE-020,20,2025-01-15\n"
+        "3,Budi Santoso,PE-020,10,2025-01-16\n"
+        "4,Budi Santoso,PE-020,1,2025-01-16\n"
+        "5,Agus,PE-020,1,2025-01-16\n"
+        "6,Tidak Ada,PE-020,1,2025-01-16\n"
+    )
+    report = StockImportService(db).import_stock_out_rows(
+        _rows(content, "keluar.csv", STOCK_OUT_IMPORT_HEADERS), project_id=1, created_by=1
+    )
+
+    assert report["success_count"] == 3
+    assert report["errors"] == [
+        "Row 6: Nama mandor 'Agus' dipakai lebih dari satu mandor aktif",
+        "Row 7: Mandor 'Tidak Ada' tidak ditemukan di project ini",
+        # Valid jika berdiri sendiri, tetapi stok 50 sudah habis dipakai row 2-4
+        "Row 5: Stok tidak cukup untuk material PE-020. Stok tersedia: 0.00, dibutuhkan: 1.00",
+    ]
+    nomors = [n for (n,) in db.query(StockOut.nomor_barang_keluar).order_by(StockOut.id).all()]
+    # Melanjutkan nomor terbesar per tanggal yang sudah ada
+    assert nomors == [
+        "JRGS-KDL-20250115-0007",
+        "JRGS-KDL-20250115-0008",
+        "JRGS-KDL-20250115-0009",
+        "JRGS-KDL-20250116-0001",
+    ]
+
+
+def test_stock_out_import_all_or_nothing(db):
+    content = "NO,NAMA MANDOR,KODE BARANG,QUANTITY,TANGGAL KELUAR\n1,Budi Santoso,PE-020,1,2025-01-15\n"
+    report = StockImportService(db).import_stock_out_rows(
+        _rows(content, "keluar.csv", STOCK_OUT_IMPORT_HEADERS), project_id=1, created_by=1, all_or_nothing=True
+    )
+
+    # Stok PE-020 hanya 0 (belum ada barang masuk)
+    assert report["success_count"] == 0 and report["validation_failed_count"] == 1
+    assert db.query(StockOut).count() == 1
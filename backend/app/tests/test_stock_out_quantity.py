@@ -0,0 +1,70 @@
+"""
+Test untuk sisa quantity stock out (GROUP BY per stock_out_id, dipakai picker dan validasi return)
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.models.user.user import User
+from app.models.inventory.mandor import Mandor
+from app.models.inventory.material import Material
+from app.models.inventory.stock_out import StockOut
+from app.models.inventory.installed import Installed
+from app.models.inventory.return_model import Return
+from app.services.inventory.stock_out_quantity_service import StockOutQuantityService
+from app.services.inventory.stock_service import StockService
+
+TODAY = date(2025, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def seed(db, project):
+    db.add(User(id=1, email="u1@test.id", name="U1", password_hash="x"))
+    db.add(Mandor(id=1, nama="Budi", project_id=1))
+    db.add(Material(id=1, kode_barang="PIPA", nama_barang="Pipa", satuan="m", project_id=1))
+    db.add_all([
+        StockOut(id=i, nomor_barang_keluar=f"SO-{i}", mandor_id=1, material_id=1, quantity=Decimal("10"),
+                 tanggal_keluar=TODAY, created_by=1, project_id=1, is_deleted=0)
+        for i in range(1, 31)
+    ])
+    db.add_all([
+        Installed(stock_out_id=1, material_id=1, mandor_id=1, quantity=Decimal("4"), tanggal_pasang=TODAY, created_by=1, is_deleted=0),
+        Installed(stock_out_id=1, material_id=1, mandor_id=1, quantity=Decimal("1.5"), tanggal_pasang=TODAY, created_by=1, is_deleted=0),
+        Installed(stock_out_id=1, material_id=1, mandor_id=1, quantity=Decimal("3"), tanggal_pasang=TODAY, created_by=1, is_deleted=1),
+        Return(stock_out_id=1, material_id=1, mandor_id=1, quantity_kembali=Decimal("2"), quantity_kondisi_reject=Decimal("0.5"),
+               tanggal_kembali=TODAY, created_by=1, project_id=1, is_deleted=0),
+        Return(stock_out_id=2, material_id=1, mandor_id=1, quantity_kembali=Decimal("3"), tanggal_kembali=TODAY,
+               created_by=1, project_id=1, is_deleted=0),
+    ])
+    db.commit()
+
+
+def test_remaining_is_two_grouped_queries(db, count_queries):
+    stock_outs = db.query(StockOut).all()
+    statements = count_queries()
+
+    remaining = StockOutQuantityService(db).get_remaining(stock_outs)
+    assert len(statements) == 2
+    assert remaining[1] == {
+        "quantity_terpasang": Decimal("5.5"),
+        "quantity_sudah_kembali": Decimal("2"),
+        "quantity_reject": Decimal("0.5"),
+        "quantity_sisa_total": Decimal("4.5"),
+        "quantity_sisa_kembali": Decimal("2.5"),
+    }
+    assert remaining[2]["quantity_sisa_kembali"] == Decimal("7")
+    assert remaining[30]["quantity_sisa_kembali"] == Decimal("10")
+
+    fields = StockOutQuantityService.to_response_fields(remaining[1])
+    assert fields["quantity_sisa"] == fields["quantity_sisa_kembali"] == 2.5
+
+
+def test_create_return_uses_same_remaining_rule(db):
+    service = StockService(db)
+    with pytest.raises(ValidationError, match="Sisa yang bisa dikembalikan: 2.5"):
+        service.create_return(1, 1, Decimal("3"), 1, TODAY, [], created_by=1, project_id=1)
+
+    service.create_return(1, 1, Decimal("2.5"), 1, TODAY, [], created_by=1, project_id=1)
+    assert StockOutQuantityService(db).get_remaining([db.get(StockOut, 1)])[1]["quantity_sisa_kembali"] == 0
@@ -0,0 +1,98 @@
+"""
+Test untuk export streaming CSV / NDJSON (app/utils/stream_exporter.py)
+"""
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.inventory.material import Material
+from app.models.inventory.mandor import Mandor
+from app.models.inventory.stock_in import StockIn
+from app.models.inventory.stock_out import StockOut
+from app.models.inventory.return_model import Return
+from app.core.exceptions import ValidationError
+from app.utils.stream_exporter import (
+    EXPORT_CSV, EXPORT_NDJSON, EXPORT_STOCK_INS, EXPORT_STOCK_OUTS, EXPORT_AUDIT_LOGS,
+    build_export_query, stream_export,
+)
+
+
+@pytest.fixture
+def setup(db, session_factory, material, other_project):
+    db.add_all([
+        Material(id=2, kode_barang="FT-001", nama_barang="Elbow", satuan="pcs", project_id=2),
+        Mandor(id=1, nama="Budi", project_id=1),
+    ])
+    db.add_all([
+        StockIn(nomor_invoice=f"INV-{i}", material_id=1, quantity=i + 0.5, tanggal_masuk=date(2025, 1, i),
+                created_by=1, project_id=1)
+        for i in range(1, 6)
+    ])
+    db.add_all([
+        StockIn(nomor_invoice="INV-LAIN", material_id=2, quantity=1, tanggal_masuk=date(2025, 1, 2), created_by=1),
+        StockIn(nomor_invoice="INV-HAPUS", material_id=1, quantity=1, tanggal_masuk=date(2025, 1, 2),
+                created_by=1, is_deleted=1),
+        # Quantity besar: presisi Decimal tidak boleh hilang lewat float
+        StockIn(nomor_invoice="INV-BESAR", material_id=1, quantity=Decimal("12345678.9"), tanggal_masuk=date(2025, 1, 6),
+                created_by=1, project_id=1),
+        StockOut(id=1, nomor_barang_keluar="JRGS-KDL-20250110-0001", mandor_id=1, material_id=1, quantity=2,
+                 tanggal_keluar=date(2025, 1, 10), created_by=1, project_id=1),
+        StockOut(id=2, nomor_barang_keluar="JRGS-KDL-20250110-0002", mandor_id=1, material_id=1, quantity=1,
+                 tanggal_keluar=date(2025, 1, 10), created_by=1, project_id=1),
+        # Stock out 2 berasal dari retur keluar, tidak ikut export (sama dengan list)
+        Return(mandor_id=1, material_id=1, quantity_kembali=1, stock_out_id=2, tanggal_kembali=date(2025, 1, 9),
+               is_released=1, created_by=1, project_id=1),
+    ])
+    db.commit()
+    return db, session_factory
+
+
+def _export(db, session_factory, table, export_format, **filters):
+    statement = build_export_query(db, table, project_id=1, **filters)
+    # batch_size kecil agar hasil terbagi ke beberapa chunk
+    chunks = list(stream_export(statement, export_format, session_factory=session_factory, batch_size=2))
+    return chunks, b"".join(chunks).decode("utf-8")
+
+
+def test_csv_export_filters_like_list(setup):
+    db, session_factory = setup
+    chunks, body = _export(db, session_factory, EXPORT_STOCK_INS, EXPORT_CSV, start_date=date(2025, 1, 2))
+
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [row["nomor_invoice"] for row in rows] == ["INV-2", "INV-3", "INV-4", "INV-5", "INV-BESAR"]
+    assert rows[-1]["quantity"] == "12345678.9"
+    assert rows[0]["kode_barang"] == "PE-020" and rows[0]["quantity"] == "2.5"
+    assert rows[0]["tanggal_masuk"] == "2025-01-02"
+    assert len(chunks) == 3
+
+    # Kolom NOT NULL di model (SQLite tidak bisa menyimpan NULL), tapi data lama di MySQL bisa NULL
+    assert "OR stock_ins.is_deleted IS NULL" in str(build_export_query(db, EXPORT_STOCK_INS, project_id=1))
+
+    _, body = _export(db, session_factory, EXPORT_STOCK_INS, EXPORT_CSV, search="inv-4")
+    assert [row["nomor_invoice"] for row in csv.DictReader(io.StringIO(body))] == ["INV-4"]
+
+
+def test_ndjson_export_excludes_released_returns(setup):
+    db, session_factory = setup
+    _, body = _export(db, session_factory, EXPORT_STOCK_OUTS, EXPORT_NDJSON)
+
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == 1
+    assert records[0]["nomor_barang_keluar"] == "JRGS-KDL-20250110-0001"
+    # Decimal ditulis sebagai string agar presisi quantity tidak hilang
+    assert records[0]["mandor"] == "Budi" and records[0]["quantity"] == "2.0"
+
+
+def test_empty_csv_export_keeps_header_and_invalid_action(setup):
+    db, session_factory = setup
+    _, body = _export(db, session_factory, EXPORT_AUDIT_LOGS, EXPORT_CSV)
+    assert body.splitlines() == [
+        "id,created_at,user_id,user_email,action,table_name,record_id,description,ip_address,old_values,new_values"
+    ]
+
+    with pytest.raises(ValidationError):
+        build_export_query(db, EXPORT_AUDIT_LOGS, project_id=1, action="hapus")
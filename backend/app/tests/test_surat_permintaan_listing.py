@@ -0,0 +1,72 @@
+"""
+Test untuk listing surat permintaan (selectinload + schema listing, jumlah query tetap)
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.user.user import User
+from app.models.inventory.material import Material
+from app.models.inventory.surat_permintaan import SuratPermintaan
+from app.models.inventory.surat_permintaan_item import SuratPermintaanItem
+from app.services.inventory.surat_permintaan_service import SuratPermintaanService
+
+
+@pytest.fixture(autouse=True)
+def seed(db, project):
+    db.add(User(id=1, email="u1@test.id", name="U1", password_hash="x"))
+    db.add(Material(id=1, kode_barang="PIPA", nama_barang="Pipa", satuan="m", project_id=1))
+    for i in range(1, 21):
+        db.add(SuratPermintaan(
+            id=i, nomor_surat=f"SP-{i:04d}", tanggal=date(2025, 1, 1), project_id=1, created_by=1,
+            created_at=datetime(2025, 1, 1, 8, 0, i), updated_at=datetime(2025, 1, 1, 8, 0, i),
+            signatures='{"pemohon": "Budi"}' if i == 20 else "bukan json", is_deleted=0,
+        ))
+        db.add_all([
+            SuratPermintaanItem(surat_permintaan_id=i, material_id=1, kode_barang="PIPA", nama_barang="Pipa",
+                                qty=Decimal("2.5"), satuan="m", sumber_barang='{"gudang": true}'),
+            SuratPermintaanItem(surat_permintaan_id=i, nama_barang="Manual", qty=Decimal("1"), satuan="pcs"),
+        ])
+    db.commit()
+
+
+def _page_selects(statements):
+    """Jumlah query yang mengambil row surat_permintaans (tanpa COUNT)"""
+    return sum(1 for statement in statements if statement.startswith("SELECT surat_permintaans."))
+
+
+def _list_page(db, count_queries, limit, keyset=False):
+    service = SuratPermintaanService(db)
+    statements = count_queries()
+    if keyset:
+        items, _, _ = service.get_page_keyset(None, limit=limit, project_id=1)
+    else:
+        items, _ = service.get_all(limit=limit, project_id=1)
+    data = service.to_list_response(items)
+    query_count = len(statements)
+    # Relasi ikut query halaman: row surat permintaan tidak diambil dua kali
+    assert _page_selects(statements) == 1
+    db.expunge_all()
+    return data, query_count
+
+
+def test_listing_query_count_independent_of_page_size(db, count_queries):
+    _, small = _list_page(db, count_queries, 2)
+    data, large = _list_page(db, count_queries, 20)
+    assert small == large
+    assert len(data) == 20
+    keyset_data, _ = _list_page(db, count_queries, 20, keyset=True)
+    assert keyset_data == data
+
+    first = data[0]
+    assert first["nomor_surat"] == "SP-0020" and first["tanggal"] == "2025-01-01"
+    assert first["created_at"] == "2025-01-01T08:00:20"
+    assert first["signatures"] == {"pemohon": "Budi"} and data[1]["signatures"] is None
+    assert first["project"] == {"id": 1, "name": "Test", "code": "TST"}
+    assert first["creator"] == {"id": 1, "name": "U1", "email": "u1@test.id"}
+
+    pipa, manual = first["items"]
+    assert pipa["qty"] == 2.5 and pipa["sumber_barang"] == {"gudang": True} and pipa["peruntukan"] is None
+    assert pipa["material"] == {"id": 1, "kode_barang": "PIPA", "nama_barang": "Pipa", "satuan": "m"}
+    assert manual["material"] is None and manual["material_id"] is None
@@ -0,0 +1,41 @@
+"""
+Test untuk pencarian material (app/utils/text_search.py, fallback LIKE di SQLite)
+"""
+import pytest
+
+from app.models.inventory.material import Material
+from app.repositories.inventory.material_repository import MaterialRepository
+from app.utils.text_search import SEARCH_PREFIX, SEARCH_FUZZY
+
+
+@pytest.fixture
+def repo(db, project, material):
+    db.add_all([
+        Material(kode_barang="FT-001", nama_barang="Elbow Pipa 20mm", satuan="pcs", project_id=project.id),
+        Material(kode_barang="FT-002", nama_barang="Tee PE 3/4\"", satuan="pcs", project_id=project.id),
+        Material(kode_barang="FT-003", nama_barang="Pipa 50%", satuan="m", project_id=project.id, is_active=0),
+    ])
+    db.commit()
+    return MaterialRepository(db), project.id
+
+
+def test_contains_matches_name_or_code_with_relevance(repo):
+    repository, project_id = repo
+    names = [m.nama_barang for m in repository.search_by_name_or_code("pipa", project_id=project_id)]
+    # Nama yang diawali term lebih relevan; material nonaktif tidak ikut
+    assert names == ["Pipa PE 20mm", "Elbow Pipa 20mm"]
+    assert [m.kode_barang for m in repository.search_by_name_or_code("ft-00", project_id=project_id)] == ["FT-001", "FT-002"]
+
+
+def test_prefix_and_wildcard_escape(repo):
+    repository, project_id = repo
+    names = [m.nama_barang for m in repository.search_by_name("pipa", project_id=project_id, mode=SEARCH_PREFIX)]
+    assert names == ["Pipa PE 20mm"]
+    # % dari input user tidak boleh menjadi wildcard
+    assert repository.search_by_name("%", project_id=project_id) == []
+
+
+def test_fuzzy_tolerates_typo(repo):
+    repository, project_id = repo
+    names = [m.nama_barang for m in repository.search_by_name("elbw pipa", project_id=project_id, mode=SEARCH_FUZZY)]
+    assert names[0] == "Elbow Pipa 20mm"
@@ -0,0 +1,100 @@
+"""
+Test untuk hierarchy user (app/utils/user_hierarchy.py) dengan closure table
+"""
+from datetime import date
+
+import pytest
+
+from app.models.user.user import User
+from app.models.user.user_closure import UserClosure
+from app.models.inventory.surat_jalan import SuratJalan
+from app.repositories.inventory.surat_jalan_repository import SuratJalanRepository
+from app.services.user.user_service import UserService
+from app.utils.user_hierarchy import (
+    add_user_to_closure, remove_user_from_closure, rebuild_user_closure,
+    get_child_user_ids, get_user_hierarchy_ids,
+)
+
+# parent: 1 -> 2 -> 3 -> 4, 1 -> 5, 6 berdiri sendiri
+PARENTS = {1: None, 2: 1, 3: 2, 4: 3, 5: 1, 6: None}
+
+
+@pytest.fixture(autouse=True)
+def seed(db, project):
+    for user_id, parent_id in PARENTS.items():
+        db.add(User(id=user_id, email=f"u{user_id}@test.id", name=f"U{user_id}", password_hash="x",
+                    created_by=parent_id))
+        db.flush()
+        add_user_to_closure(db, user_id, parent_id)
+    db.add_all([
+        SuratJalan(nomor_form=f"SJ-{user_id}", kepada="Budi", tanggal_pengiriman=date(2025, 1, 1),
+                   project_id=1, created_by=user_id, is_deleted=0)
+        for user_id in PARENTS
+    ])
+    db.commit()
+
+
+def _closure(db):
+    return sorted(db.query(UserClosure.ancestor_id, UserClosure.descendant_id, UserClosure.depth).all())
+
+
+def test_closure_matches_recursive_rebuild(db):
+    maintained = _closure(db)
+    assert (1, 4, 3) in maintained and (2, 4, 2) in maintained and (6, 6, 0) in maintained
+
+    rebuild_user_closure(db)
+    assert _closure(db) == maintained
+
+    assert get_child_user_ids(db, 1) == [2, 5, 3, 4]
+    assert get_child_user_ids(db, 1, recursive=False) == [2, 5]
+
+
+def test_visibility_filter_is_single_query_and_memoized(db, count_queries):
+    repo = SuratJalanRepository(db)
+    statements = count_queries()
+
+    # User 3: dirinya, parent (2) dan descendant (4)
+    items = repo.get_all(user_id=3, limit=100)
+    assert sorted(sj.created_by for sj in items) == [2, 3, 4]
+    assert len(statements) == 1
+
+    assert get_user_hierarchy_ids(db, 1) == [1, 2, 3, 4, 5]
+    statements.clear()
+    assert get_user_hierarchy_ids(db, 1) == [1, 2, 3, 4, 5]
+    assert statements == []
+
+    remove_user_from_closure(db, 4)
+    assert get_user_hierarchy_ids(db, 1) == [1, 2, 3, 5]
+    assert not db.query(UserClosure).filter(UserClosure.descendant_id == 4).count()
+
+
+def test_remove_middle_user_detaches_subtree(db):
+    # Hapus user 2 (rantai 1 -> 2 -> 3 -> 4): created_by user 3 menjadi NULL
+    UserService(db).delete(2)
+    assert db.get(User, 3).created_by is None
+    maintained = _closure(db)
+
+    assert get_user_hierarchy_ids(db, 1) == [1, 5]
+    assert get_user_hierarchy_ids(db, 3) == [3, 4]
+    rebuild_user_closure(db)
+    assert _closure(db) == maintained
+
+
+def test_failed_user_delete_keeps_closure(db, monkeypatch):
+    from sqlalchemy.exc import SQLAlchemyError
+    from app.core.exceptions import ValidationError
+    from app.repositories.user.user_repository import UserRepository
+
+    before = _closure(db)
+
+    def failing_delete(self, id):
+        raise SQLAlchemyError("delete gagal")
+
+    monkeypatch.setattr(UserRepository, "delete", failing_delete)
+    with pytest.raises(ValidationError):
+        UserService(db).delete(2)
+
+    # Closure, foreign key dan user ikut di-rollback bersama delete yang gagal
+    assert _closure(db) == before
+    assert db.get(User, 3).created_by == 2
+    assert get_user_hierarchy_ids(db, 1) == [1, 2, 3, 4, 5]
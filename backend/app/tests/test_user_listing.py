@@ -0,0 +1,58 @@
+"""
+Test untuk listing user (COUNT tanpa join role, serialisasi langsung, keyset dan pencarian)
+"""
+import pytest
+
+from app.models.user.user import User
+from app.models.user.role import Role
+from app.services.user.user_service import UserService
+from app.utils.pagination import decode_cursor
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    db.add(Role(id=1, name="gudang", description="Admin gudang"))
+    db.add_all([
+        User(id=i, email=f"user{i}@test.id", name=f"User {i}", password_hash="x",
+             role_id=1 if i % 2 else None, is_active=i != 5)
+        for i in range(1, 6)
+    ])
+    db.add(User(id=6, email="budi@test.id", name="Budi", password_hash="x"))
+    db.commit()
+
+
+def test_get_all_count_and_page_queries(db, count_queries):
+    statements = count_queries()
+
+    users, total = UserService(db).get_all(skip=0, limit=3, filters={"is_active": True})
+    assert total == 5
+    assert [u.id for u in users] == [6, 4, 3]
+    assert users[2].role.name == "gudang" and users[2].role.description == "Admin gudang"
+    assert users[1].role is None
+    # COUNT tanpa join role + satu query halaman
+    assert len(statements) == 2
+    assert "JOIN" not in statements[0].upper()
+
+
+def test_keyset_pages(db):
+    service = UserService(db)
+    first, next_cursor, total = service.get_page_keyset(None, limit=4, include_total=True)
+    assert [u.id for u in first] == [6, 5, 4, 3]
+    assert total == 6
+
+    second, next_cursor, _ = service.get_page_keyset(decode_cursor(next_cursor), limit=4)
+    assert [u.id for u in second] == [2, 1]
+    assert next_cursor is None
+
+    # Offset dan cursor memakai urutan yang sama
+    offset_users, _ = service.get_all(skip=0, limit=6)
+    assert [u.id for u in offset_users] == [u.id for u in first + second]
+
+
+def test_search_by_email_or_name(db):
+    service = UserService(db)
+    users, total = service.get_all(search="budi")
+    assert total == 1 and users[0].email == "budi@test.id"
+
+    users, total = service.get_all(search="User")
+    assert total == 5
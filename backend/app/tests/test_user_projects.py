@@ -0,0 +1,62 @@
+"""
+Test untuk daftar project user (satu query join + cache dengan version stamp)
+"""
+import pytest
+
+from app.models.project.project import Project
+from app.models.project.user_project import UserProject
+from app.models.user.user import User
+from app.schemas.project.request import ProjectCreateRequest, ProjectUpdateRequest, UserProjectCreateRequest
+from app.services.project import project_service
+from app.services.project.project_service import ProjectService
+
+
+@pytest.fixture(autouse=True)
+def seed(db):
+    # Cache per proses: kosongkan agar tidak terbawa dari database test lain
+    project_service._user_projects_cache.clear()
+    db.add_all([
+        User(id=i, email=f"u{i}@test.id", name=f"U{i}", password_hash="x") for i in (1, 2)
+    ])
+    db.add_all([Project(id=i, name=f"Project {i}", code=f"P{i}", is_active=True) for i in range(1, 6)])
+    db.add_all([
+        UserProject(user_id=1, project_id=i, is_active=True, is_owner=i % 2 == 1) for i in range(1, 5)
+    ])
+    # Project nonaktif tidak ikut daftar maupun total
+    db.add(Project(id=6, name="Project 6", code="P6", is_active=False))
+    db.add(UserProject(user_id=1, project_id=6, is_active=True, is_owner=True))
+    db.commit()
+
+
+def test_user_projects_single_query_then_cached(db, count_queries):
+    service = ProjectService(db)
+    statements = count_queries()
+
+    projects, total = service.get_user_projects(1, skip=1, limit=2)
+    assert [(p.id, p.is_owner) for p in projects] == [(2, False), (3, True)]
+    assert total == 4
+    # version + satu query join project/membership
+    assert len(statements) == 2
+
+    statements.clear()
+    projects, total = service.get_user_projects(1)
+    assert [p.id for p in projects] == [1, 2, 3, 4] and total == 4
+    assert len(statements) == 1
+
+
+def test_project_changes_bump_version(db):
+    service = ProjectService(db)
+    assert service.get_user_projects(2) == ([], 0)
+
+    service.assign_user_to_project(UserProjectCreateRequest(user_id=2, project_id=1, is_owner=False), 1)
+    projects, _ = service.get_user_projects(2)
+    assert [(p.id, p.is_owner) for p in projects] == [(1, False)]
+
+    service.update(1, ProjectUpdateRequest(name="Kendal"), 1)
+    assert service.get_user_projects(2)[0][0].name == "Kendal"
+
+    created = service.create(ProjectCreateRequest(name="Batang", code="BTG"), 2)
+    assert [p.id for p in service.get_user_projects(2)[0]] == [1, created.id]
+
+    service.delete(1, 1)
+    assert [p.id for p in service.get_user_projects(2)[0]] == [created.id]
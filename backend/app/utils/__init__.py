@@ -2,7 +2,10 @@ from .user_hierarchy import (
     get_parent_user_id,
     get_child_user_ids,
     get_user_hierarchy_ids,
-    filter_by_user_hierarchy
+    filter_by_user_hierarchy,
+    add_user_to_closure,
+    remove_user_from_closure,
+    rebuild_user_closure
 )
 
 __all__ = [
@@ -10,5 +13,8 @@ __all__ = [
     'get_child_user_ids',
     'get_user_hierarchy_ids',
     'filter_by_user_hierarchy',
+    'add_user_to_closure',
+    'remove_user_from_closure',
+    'rebuild_user_closure',
 ]
 
@@ -4,15 +4,19 @@ from openpyxl.utils import get_column_letter
 from datetime import date, datetime
 from typing import List, Dict, Any, Optional
 from io import BytesIO
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.repositories.inventory import (
     StockInRepository,
     StockOutRepository,
     InstalledRepository,
     ReturnRepository,
     MaterialRepository,
-    MandorRepository,
 )
+from app.models.inventory.stock_in import StockIn
+from app.models.inventory.stock_out import StockOut
+from app.models.inventory.installed import Installed
+from app.models.inventory.return_model import Return
+from app.services.inventory.stock_service import StockService
 from app.utils.formatters import format_date_indonesia
 
 
@@ -52,7 +56,6 @@ def create_excel_export(
     installed_repo = InstalledRepository(db)
     return_repo = ReturnRepository(db)
     material_repo = MaterialRepository(db)
-    mandor_repo = MandorRepository(db)
     
     # Set default date range jika tidak ada
     if not start_date:
@@ -62,28 +65,27 @@ def create_excel_export(
     
     # Sheet 1: Barang Masuk
     create_stock_in_sheet(
-        wb, stock_in_repo, material_repo, start_date, end_date, material_id
+        wb, stock_in_repo, start_date, end_date, material_id
     )
     
     # Sheet 2: Barang Keluar
     create_stock_out_sheet(
-        wb, stock_out_repo, material_repo, mandor_repo, start_date, end_date, mandor_id, material_id
+        wb, stock_out_repo, start_date, end_date, mandor_id, material_id
     )
     
     # Sheet 3: Barang Terpasang
     create_installed_sheet(
-        wb, installed_repo, material_repo, mandor_repo, start_date, end_date, mandor_id, material_id
+        wb, installed_repo, start_date, end_date, mandor_id, material_id
     )
     
     # Sheet 4: Barang Pengembalian
     create_return_sheet(
-        wb, return_repo, material_repo, mandor_repo, start_date, end_date, mandor_id, material_id
+        wb, return_repo, start_date, end_date, mandor_id, material_id
     )
     
     # Sheet 5: Summary
     create_summary_sheet(
-        wb, stock_in_repo, stock_out_repo, installed_repo, return_repo,
-        material_repo, start_date, end_date, search
+        wb, StockService(db), material_repo, start_date, end_date, search
     )
     
     # Save to BytesIO
@@ -97,7 +99,6 @@ def create_excel_export(
 def create_stock_in_sheet(
     wb: Workbook,
     repo: StockInRepository,
-    material_repo: MaterialRepository,
     start_date: date,
     end_date: date,
     material_id: Optional[int] = None
@@ -118,14 +119,14 @@ def create_stock_in_sheet(
         cell.alignment = CENTER_ALIGN
         cell.border = BORDER
     
-    # Get data
-    stock_ins = repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
+    # Get data (stream per batch, material di-eager load agar tidak query per row)
+    query = repo.query_by_date_range(start_date, end_date).options(joinedload(StockIn.material))
     if material_id:
-        stock_ins = [si for si in stock_ins if si.material_id == material_id]
+        query = query.filter(StockIn.material_id == material_id)
     
     # Write data
-    for idx, stock_in in enumerate(stock_ins, 2):
-        material = material_repo.get(stock_in.material_id)
+    for idx, stock_in in enumerate(repo.iter_all(query), 2):
+        material = stock_in.material
         ws.cell(row=idx, column=1, value=idx - 1).border = BORDER
         ws.cell(row=idx, column=2, value=format_date_indonesia(stock_in.tanggal_masuk)).border = BORDER
         ws.cell(row=idx, column=3, value=stock_in.nomor_invoice).border = BORDER
@@ -143,8 +144,6 @@ def create_stock_in_sheet(
 def create_stock_out_sheet(
     wb: Workbook,
     repo: StockOutRepository,
-    material_repo: MaterialRepository,
-    mandor_repo: MandorRepository,
     start_date: date,
     end_date: date,
     mandor_id: Optional[int] = None,
@@ -166,17 +165,19 @@ def create_stock_out_sheet(
         cell.alignment = CENTER_ALIGN
         cell.border = BORDER
     
-    # Get data
-    stock_outs = repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
+    # Get data (stream per batch, material & mandor di-eager load agar tidak query per row)
+    query = repo.query_by_date_range(start_date, end_date).options(
+        joinedload(StockOut.material), joinedload(StockOut.mandor)
+    )
     if mandor_id:
-        stock_outs = [so for so in stock_outs if so.mandor_id == mandor_id]
+        query = query.filter(StockOut.mandor_id == mandor_id)
     if material_id:
-        stock_outs = [so for so in stock_outs if so.material_id == material_id]
+        query = query.filter(StockOut.material_id == material_id)
     
     # Write data
-    for idx, stock_out in enumerate(stock_outs, 2):
-        material = material_repo.get(stock_out.material_id)
-        mandor = mandor_repo.get(stock_out.mandor_id)
+    for idx, stock_out in enumerate(repo.iter_all(query), 2):
+        material = stock_out.material
+        mandor = stock_out.mandor
         ws.cell(row=idx, column=1, value=idx - 1).border = BORDER
         ws.cell(row=idx, column=2, value=format_date_indonesia(stock_out.tanggal_keluar)).border = BORDER
         ws.cell(row=idx, column=3, value=stock_out.nomor_barang_keluar).border = BORDER
@@ -195,8 +196,6 @@ def create_stock_out_sheet(
 def create_installed_sheet(
     wb: Workbook,
     repo: InstalledRepository,
-    material_repo: MaterialRepository,
-    mandor_repo: MandorRepository,
     start_date: date,
     end_date: date,
     mandor_id: Optional[int] = None,
@@ -218,17 +217,19 @@ def create_installed_sheet(
         cell.alignment = CENTER_ALIGN
         cell.border = BORDER
     
-    # Get data
-    installed_items = repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
+    # Get data (stream per batch, material & mandor di-eager load agar tidak query per row)
+    query = repo.query_by_date_range(start_date, end_date).options(
+        joinedload(Installed.material), joinedload(Installed.mandor)
+    )
     if mandor_id:
-        installed_items = [i for i in installed_items if i.mandor_id == mandor_id]
+        query = query.filter(Installed.mandor_id == mandor_id)
     if material_id:
-        installed_items = [i for i in installed_items if i.material_id == material_id]
+        query = query.filter(Installed.material_id == material_id)
     
     # Write data
-    for idx, installed in enumerate(installed_items, 2):
-        material = material_repo.get(installed.material_id)
-        mandor = mandor_repo.get(installed.mandor_id)
+    for idx, installed in enumerate(repo.iter_all(query), 2):
+        material = installed.material
+        mandor = installed.mandor
         ws.cell(row=idx, column=1, value=idx - 1).border = BORDER
         ws.cell(row=idx, column=2, value=format_date_indonesia(installed.tanggal_pasang)).border = BORDER
         ws.cell(row=idx, column=3, value=mandor.nama if mandor else "").border = BORDER
@@ -246,8 +247,6 @@ def create_installed_sheet(
 def create_return_sheet(
     wb: Workbook,
     repo: ReturnRepository,
-    material_repo: MaterialRepository,
-    mandor_repo: MandorRepository,
     start_date: date,
     end_date: date,
     mandor_id: Optional[int] = None,
@@ -269,17 +268,19 @@ def create_return_sheet(
         cell.alignment = CENTER_ALIGN
         cell.border = BORDER
     
-    # Get data
-    returns = repo.get_by_date_range(start_date, end_date, skip=0, limit=10000)
+    # Get data (stream per batch, material & mandor di-eager load agar tidak query per row)
+    query = repo.query_by_date_range(start_date, end_date).options(
+        joinedload(Return.material), joinedload(Return.mandor)
+    )
     if mandor_id:
-        returns = [r for r in returns if r.mandor_id == mandor_id]
+        query = query.filter(Return.mandor_id == mandor_id)
     if material_id:
-        returns = [r for r in returns if r.material_id == material_id]
+        query = query.filter(Return.material_id == material_id)
     
     # Write data
-    for idx, return_item in enumerate(returns, 2):
-        material = material_repo.get(return_item.material_id)
-        mandor = mandor_repo.get(return_item.mandor_id)
+    for idx, return_item in enumerate(repo.iter_all(query), 2):
+        material = return_item.material
+        mandor = return_item.mandor
         ws.cell(row=idx, column=1, value=idx - 1).border = BORDER
         ws.cell(row=idx, column=2, value=format_date_indonesia(return_item.tanggal_kembali)).border = BORDER
         ws.cell(row=idx, column=3, value=mandor.nama if mandor else "").border = BORDER
@@ -298,10 +299,7 @@ def create_return_sheet(
 
 def create_summary_sheet(
     wb: Workbook,
-    stock_in_repo: StockInRepository,
-    stock_out_repo: StockOutRepository,
-    installed_repo: InstalledRepository,
-    return_repo: ReturnRepository,
+    stock_service: StockService,
     material_repo: MaterialRepository,
     start_date: date,
     end_date: date,
@@ -325,70 +323,24 @@ def create_summary_sheet(
         cell.border = BORDER
     
     # Get all materials
-    materials = material_repo.get_active_materials(skip=0, limit=10000)
+    materials = list(material_repo.iter_all(material_repo.active_query()))
     if search:
         s = (search or '').strip().lower()
         materials = [m for m in materials if (m.kode_barang or '').lower().find(s) != -1 or (m.nama_barang or '').lower().find(s) != -1]
     
+    # Rumus sama dengan stock balance (stock_service.py); barang masuk dihitung tanpa filter tanggal
+    balance_rows = stock_service.build_balance_rows(materials, start_date, end_date, stock_in_all_dates=True)
+    
     # Write data
-    for idx, material in enumerate(materials, 2):
-        # Calculate totals
-        stock_ins = stock_in_repo.get_by_material(material.id, skip=0, limit=10000)
-        stock_outs = [so for so in stock_out_repo.get_by_date_range(start_date, end_date, 0, 10000) 
-                     if so.material_id == material.id]
-        installed = [i for i in installed_repo.get_by_date_range(start_date, end_date, 0, 10000)
-                    if i.material_id == material.id]
-        returns = [r for r in return_repo.get_by_date_range(start_date, end_date, 0, 10000)
-                  if r.material_id == material.id]
-        
-        # Get returns yang sudah dikeluarkan kembali (is_released = 1)
-        returns_released = [r for r in returns if getattr(r, 'is_released', 0) == 1]
-        # Get returns yang BELUM dikeluarkan lagi (is_released = 0)
-        returns_not_released = [r for r in returns if getattr(r, 'is_released', 0) == 0]
-        
-        # PENTING: Filter stock_out yang berasal dari retur keluar
-        # Stock out dari retur keluar TIDAK mengurangi stok karena sudah pernah masuk ke gudang sebagai return
-        # Identifikasi stock_out dari retur keluar: ada Return dengan stock_out_id = stock_out.id dan is_released = 1
-        stock_out_ids_from_return = {r.stock_out_id for r in returns_released if r.stock_out_id is not None}
-        stock_outs_excluding_return = [so for so in stock_outs if so.id not in stock_out_ids_from_return]
-        
-        total_in = sum(si.quantity for si in stock_ins)
-        # Hanya hitung stock_out yang BUKAN dari retur keluar
-        total_out = sum(so.quantity for so in stock_outs_excluding_return)
-        total_installed = sum(i.quantity for i in installed)
-        
-        # BEST PRACTICE: Perhitungan total_kembali (sync dengan stock_service.py)
-        # total_kembali = semua quantity_kembali - kondisi baik yang sudah dikeluarkan
-        # Karena hanya kondisi baik yang dikeluarkan, kondisi reject tetap di gudang
-        total_quantity_kembali_all = sum(r.quantity_kembali for r in returns)
-        total_kondisi_baik_released = sum((r.quantity_kondisi_baik or 0) for r in returns_released)
-        total_return = total_quantity_kembali_all - total_kondisi_baik_released
-        
-        # BEST PRACTICE: Kondisi baik hanya dari return yang BELUM dikeluarkan lagi
-        # Return yang sudah dikeluarkan lagi, kondisi baiknya sudah dikeluarkan
-        total_kondisi_baik = sum((r.quantity_kondisi_baik or 0) for r in returns_not_released)
-        
-        # BEST PRACTICE: Kondisi reject dari SEMUA return (termasuk yang is_released=1)
-        # Karena kondisi reject TIDAK ikut dikeluarkan, tetap di gudang dan tetap terhitung
-        total_kondisi_reject = sum((r.quantity_kondisi_reject or 0) for r in returns)
-        
-        # BEST PRACTICE: Rumus Stock Balance yang menghindari double counting (sync dengan stock_service.py)
-        # Alur bisnis:
-        # 1. Masuk: Barang masuk ke gudang (+)
-        # 2. Keluar: Barang keluar dari gudang (-), TIDAK termasuk retur keluar
-        # 3. Kembali: Barang dikembalikan ke gudang (+) - HANYA yang BELUM dikeluarkan lagi
-        # 4. Terpasang: Barang yang sudah terpasang di lapangan (-)
-        #
-        # Stock Saat Ini = Masuk - Terpasang
-        # Penjelasan:
-        # - Stock Saat Ini adalah sisa barang yang masih ada di gudang
-        # - Barang yang sudah terpasang tidak lagi ada di gudang, jadi dikurangi
-        # - "Kembali" dan "Keluar" sudah tercermin dalam perhitungan terpasang
-        current_stock = total_in - total_installed
-        
-        # Stok Ready = Stock Saat Ini - Kondisi Reject (barang reject tidak bisa dikeluarkan)
-        # Kondisi reject hanya dari return yang belum dikeluarkan lagi
-        stock_ready = max(0, current_stock - total_kondisi_reject)
+    for idx, (material, balance) in enumerate(zip(materials, balance_rows), 2):
+        total_in = balance["total_masuk"]
+        total_out = balance["total_keluar"]
+        total_installed = balance["total_terpasang"]
+        total_return = balance["total_kembali"]
+        total_kondisi_baik = balance["total_kondisi_baik"]
+        total_kondisi_reject = balance["total_kondisi_reject"]
+        stock_ready = balance["stock_ready"]
+        current_stock = balance["stock_saat_ini"]
         
         ws.cell(row=idx, column=1, value=material.kode_barang).border = BORDER
         ws.cell(row=idx, column=2, value=material.nama_barang).border = BORDER
@@ -1,99 +1,197 @@
 from openpyxl import load_workbook
-from typing import List, Dict, Optional, Tuple
-from io import BytesIO
+from typing import Any, List, Dict, Optional, Tuple, Iterator, Iterable, Union, BinaryIO
+from io import BytesIO, TextIOWrapper
+from datetime import date, datetime, timedelta
+import csv
 from app.core.exceptions import ValidationError
 
+# Format file yang didukung untuk import
+SUPPORTED_IMPORT_EXTENSIONS = (".xlsx", ".csv")
+# Delimiter CSV yang didukung (Excel locale Indonesia memakai titik koma)
+CSV_DELIMITERS = (",", ";", "\t")
+# Header file import material (sama dengan template di excel_template.py)
+MATERIAL_IMPORT_HEADERS = ["NO", "NAMA BARANG", "KODE BARANG", "SATUAN", "KATEGORI", "HARGA"]
+# Header file import barang masuk / barang keluar
+STOCK_IN_IMPORT_HEADERS = ["NO", "NOMOR INVOICE", "KODE BARANG", "QUANTITY", "TANGGAL MASUK"]
+STOCK_OUT_IMPORT_HEADERS = ["NO", "NAMA MANDOR", "KODE BARANG", "QUANTITY", "TANGGAL KELUAR"]
+# Format tanggal yang diterima di file import (selain sel tanggal Excel)
+IMPORT_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+# Tanggal 0 untuk nomor seri tanggal Excel (sel tanggal yang tersimpan sebagai angka)
+EXCEL_EPOCH = date(1899, 12, 30)
 
-def parse_excel_file(
-    file_content: bytes,
-    expected_headers: List[str],
-    start_row: int = 2,
-    skip_empty_rows: bool = True
-) -> Tuple[List[Dict[str, any]], List[str]]:
+
+def _build_header_map(header_row: List[str], expected_headers: List[str], source_label: str = "file Excel") -> Dict[str, int]:
     """
-    Parse Excel file dan return list of dictionaries dan list of errors
-    
-    Args:
-        file_content: Bytes content dari uploaded file
-        expected_headers: List of expected column headers di row pertama
-        start_row: Row number dimana data mulai (1-indexed, default 2 = skip header)
-        skip_empty_rows: Jika True, skip rows yang semua kolomnya kosong
-    
+    Cocokkan header file dengan expected headers (case insensitive)
+
     Returns:
-        Tuple of (list of data dictionaries, list of error messages)
+        Dict expected header -> index kolom (0-indexed)
     """
-    errors = []
-    data = []
-    
+    header_map = {}
+    normalized_row = [actual.lower() for actual in header_row]
+    for expected in expected_headers:
+        # Nama kolom yang sama persis diutamakan (misal "NO" tidak boleh mengambil kolom "NOMOR INVOICE")
+        if expected.lower() in normalized_row:
+            header_map[expected] = normalized_row.index(expected.lower())
+            continue
+        found = False
+        for i, actual in enumerate(header_row):
+            if actual and expected.lower() in actual.lower() or actual.lower() in expected.lower():
+                header_map[expected] = i
+                found = True
+                break
+        if not found:
+            raise ValidationError(f"Header '{expected}' tidak ditemukan di {source_label}")
+    return header_map
+
+
+def _iter_mapped_rows(
+    rows: Iterable[Tuple[int, tuple]],
+    header_map: Dict[str, int]
+) -> Iterator[Dict[str, any]]:
+    """Ubah tuple nilai per row menjadi dict dengan key lowercase_underscore (row kosong dilewati)"""
+    keys = [(header.lower().replace(" ", "_"), index) for header, index in header_map.items()]
+    for row_num, values in rows:
+        row_data = {}
+        is_empty = True
+        for key, index in keys:
+            cell_value = values[index] if index < len(values) else None
+            if cell_value is not None:
+                # Convert to string dan strip whitespace
+                cell_value = str(cell_value).strip()
+                if cell_value:
+                    is_empty = False
+            else:
+                cell_value = ""
+            row_data[key] = cell_value
+
+        if is_empty:
+            continue
+
+        # Tambahkan row number untuk error reporting
+        row_data['_row_number'] = row_num
+        yield row_data
+
+
+def iter_excel_rows(
+    file_content: Union[bytes, BinaryIO],
+    expected_headers: List[str],
+    start_row: int = 2
+) -> Iterator[Dict[str, any]]:
+    """
+    Streaming parser Excel (.xlsx): yield dict per row (row kosong dilewati) tanpa memuat seluruh workbook.
+
+    Best practice: read_only mode + iter_rows(values_only=True) membaca XML sheet secara
+    berurutan sehingga memory konstan dan waktu parse linear terhadap jumlah row.
+    Error header dilempar sebagai ValidationError saat row pertama diminta.
+    """
+    source = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+    try:
+        workbook = load_workbook(filename=source, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValidationError(f"Gagal membaca file Excel: {str(e)}")
+
     try:
-        # Load workbook dari bytes
-        workbook = load_workbook(filename=BytesIO(file_content), read_only=False, data_only=True)
-        
         # Ambil sheet pertama
         if not workbook.sheetnames:
             raise ValidationError("File Excel tidak memiliki sheet")
-        
         worksheet = workbook[workbook.sheetnames[0]]
-        
-        # Validasi header (row 1)
-        if worksheet.max_row < 1:
+        # Dimensi yang tersimpan di file sering tidak akurat (file hasil export aplikasi lain)
+        worksheet.reset_dimensions()
+
+        column_count = len(expected_headers)
+        first_row = next(worksheet.iter_rows(min_row=1, max_row=1, max_col=column_count, values_only=True), None)
+        if first_row is None:
             raise ValidationError("File Excel kosong")
-        
-        header_row = []
-        for col in range(1, len(expected_headers) + 1):
-            cell_value = worksheet.cell(row=1, column=col).value
-            header_row.append(str(cell_value).strip() if cell_value else "")
-        
-        # Validasi header sesuai dengan expected headers (case insensitive)
-        header_map = {}
-        for idx, expected in enumerate(expected_headers):
-            found = False
-            for i, actual in enumerate(header_row):
-                if actual and expected.lower() in actual.lower() or actual.lower() in expected.lower():
-                    header_map[expected] = i + 1  # Excel column (1-indexed)
-                    found = True
-                    break
-            if not found:
-                raise ValidationError(f"Header '{expected}' tidak ditemukan di file Excel")
-        
-        # Parse data rows
-        for row_num in range(start_row, worksheet.max_row + 1):
-            row_data = {}
-            is_empty = True
-            
-            # Extract data per kolom
-            for header, col_num in header_map.items():
-                cell_value = worksheet.cell(row=row_num, column=col_num).value
-                if cell_value is not None:
-                    # Convert to string dan strip whitespace
-                    cell_value = str(cell_value).strip()
-                    if cell_value:
-                        is_empty = False
-                else:
-                    cell_value = ""
-                
-                # Map header ke key (lowercase dengan underscore)
-                key = header.lower().replace(" ", "_")
-                row_data[key] = cell_value
-            
-            # Skip empty rows jika diminta
-            if skip_empty_rows and is_empty:
-                continue
-            
-            # Validasi minimal data tidak kosong (harus ada isi)
-            if not is_empty:
-                # Tambahkan row number untuk error reporting
-                row_data['_row_number'] = row_num
-                data.append(row_data)
-        
-        workbook.close()
-        
+        header_row = [str(value).strip() if value else "" for value in first_row]
+        header_map = _build_header_map(header_row, expected_headers)
+
+        max_col = max(header_map.values()) + 1
+        rows = enumerate(
+            worksheet.iter_rows(min_row=start_row, max_col=max_col, values_only=True),
+            start=start_row
+        )
+        yield from _iter_mapped_rows(rows, header_map)
     except ValidationError:
         raise
     except Exception as e:
         raise ValidationError(f"Gagal membaca file Excel: {str(e)}")
-    
-    return data, errors
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(
+    file_content: Union[bytes, BinaryIO],
+    expected_headers: List[str],
+    start_row: int = 2
+) -> Iterator[Dict[str, any]]:
+    """
+    Streaming parser CSV: alternatif cepat untuk Excel dengan kolom yang sama.
+    Mendukung UTF-8 (dengan/tanpa BOM) dan delimiter koma atau titik koma (export Excel locale Indonesia).
+    """
+    source = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+    text = TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        # Delimiter ditentukan dari baris header (koma, titik koma, atau tab)
+        header_line = text.readline()
+        text.seek(0)
+        delimiter = max(CSV_DELIMITERS, key=header_line.count)
+        reader = csv.reader(text, delimiter=delimiter)
+
+        first_row = next(reader, None)
+        if first_row is None:
+            raise ValidationError("File CSV kosong")
+        header_row = [value.strip() for value in first_row[:len(expected_headers)]]
+        header_map = _build_header_map(header_row, expected_headers, "file CSV")
+
+        rows = ((line_num, values) for line_num, values in enumerate(reader, start=2) if line_num >= start_row)
+        yield from _iter_mapped_rows(rows, header_map)
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise ValidationError(f"Gagal membaca file CSV: {str(e)}")
+    finally:
+        text.detach()
+
+
+def iter_import_rows(
+    file_content: Union[bytes, BinaryIO],
+    filename: str,
+    expected_headers: List[str],
+    start_row: int = 2
+) -> Iterator[Dict[str, any]]:
+    """Pilih parser streaming berdasarkan ekstensi file (.xlsx atau .csv)"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_rows(file_content, expected_headers, start_row)
+    if name.endswith(".xlsx"):
+        return iter_excel_rows(file_content, expected_headers, start_row)
+    raise ValidationError("Format file tidak valid. Hanya file .xlsx atau .csv yang diperbolehkan")
+
+
+def parse_import_date(value: Optional[str]) -> Optional[date]:
+    """
+    Parse tanggal dari cell file import.
+    Menerima sel tanggal Excel (dibaca sebagai "YYYY-MM-DD HH:MM:SS"), nomor seri tanggal Excel,
+    dan teks dengan format IMPORT_DATE_FORMATS. Return None jika tidak bisa di-parse.
+    """
+    text = (value or "").strip()
+    if not text:
+        return None
+    # Buang bagian jam (sel datetime Excel / ISO format)
+    date_part = text.replace("T", " ").split(" ")[0]
+    for fmt in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_part, fmt).date()
+        except ValueError:
+            continue
+    try:
+        serial = float(text)
+    except ValueError:
+        return None
+    if 1 <= serial < 2958466:  # Batas nomor seri Excel (31/12/9999)
+        return EXCEL_EPOCH + timedelta(days=int(serial))
+    return None
 
 
 def validate_material_row(
@@ -154,3 +252,58 @@ def validate_material_row(
     
     return True, None
 
+
+def build_import_report(
+    total_rows: int,
+    success_count: int,
+    validation_errors: List[str],
+    processing_errors: List[str],
+    rolled_back: bool
+) -> Dict[str, Any]:
+    """Laporan hasil import file (struktur response bulk import, dipakai juga oleh import job)"""
+    all_errors = validation_errors + processing_errors
+    return {
+        'total_rows': total_rows,
+        'success_count': success_count,
+        'failed_count': len(all_errors),
+        'validation_failed_count': len(validation_errors),
+        'processing_failed_count': len(processing_errors),
+        'validation_errors': validation_errors,
+        'processing_errors': processing_errors,
+        'errors': all_errors,  # Backward compatibility
+        'rolled_back': rolled_back
+    }
+
+
+def import_was_attempted(report: Dict[str, Any]) -> bool:
+    """False jika tidak ada row yang sampai ke tahap insert (file kosong / semua tidak valid / dibatalkan)"""
+    return report['success_count'] > 0 or report['processing_failed_count'] > 0
+
+
+def import_report_message(report: Dict[str, Any], item_label: str) -> str:
+    """Pesan ringkasan laporan import. item_label misal: material, data barang masuk"""
+    success_count = report['success_count']
+    validation_failed_count = report['validation_failed_count']
+    processing_failed_count = report['processing_failed_count']
+
+    if report['total_rows'] == 0:
+        return "File tidak memiliki data"
+    if validation_failed_count == report['total_rows']:
+        return "Tidak ada data yang valid"
+    if report['rolled_back']:
+        if processing_failed_count == 0:
+            return f"Import dibatalkan: {validation_failed_count} data tidak valid (mode all-or-nothing)"
+        return f"Import dibatalkan: {processing_failed_count} data gagal, tidak ada data yang disimpan"
+    if success_count > 0:
+        # Fokus pada data yang berhasil masuk
+        message = f"Berhasil mengimpor {success_count} {item_label}"
+        if validation_failed_count > 0:
+            message += f", {validation_failed_count} data tidak valid (tidak masuk database)"
+        if processing_failed_count > 0:
+            message += f", {processing_failed_count} data gagal saat insert"
+        return message
+    if validation_failed_count > 0:
+        return f"Gagal mengimpor: {validation_failed_count} data tidak valid"
+    if processing_failed_count > 0:
+        return f"Gagal mengimpor: {processing_failed_count} data gagal saat insert"
+    return f"Gagal mengimpor {item_label}"
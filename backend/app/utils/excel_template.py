@@ -1,6 +1,8 @@
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from io import BytesIO
+from datetime import date
+from typing import List
 
 
 # Styles untuk template
@@ -94,3 +96,104 @@ def create_material_import_template() -> BytesIO:
     
     return output
 
+
+def _write_import_sheet(ws, headers: List[str], example_data: List[list], column_widths: List[int]) -> None:
+    """Tulis header dan contoh data template import (kolom tanggal diformat YYYY-MM-DD)"""
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.fill = HEADER_FILL
+        cell.font = HEADER_FONT
+        cell.alignment = CENTER_ALIGN
+        cell.border = BORDER
+
+    for row_idx, row_data in enumerate(example_data, 2):
+        for col_idx, value in enumerate(row_data, 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            cell.font = CELL_FONT
+            cell.border = BORDER
+            cell.alignment = CENTER_ALIGN if col_idx == 1 else LEFT_ALIGN
+            if isinstance(value, date):
+                cell.number_format = "YYYY-MM-DD"
+
+    for col_idx, width in enumerate(column_widths, 1):
+        ws.column_dimensions[chr(ord('A') + col_idx - 1)].width = width
+
+
+def _write_instruction_sheet(wb: Workbook, lines: List[str]) -> None:
+    """
+    Petunjuk di sheet terpisah: importer hanya membaca sheet pertama,
+    sehingga petunjuk tidak ikut terbaca sebagai data
+    """
+    ws = wb.create_sheet("Petunjuk")
+    ws.column_dimensions['A'].width = 100
+    for row_idx, line in enumerate(["PETUNJUK:"] + lines, 1):
+        cell = ws.cell(row=row_idx, column=1, value=line)
+        cell.font = Font(size=10, bold=row_idx == 1)
+
+
+def create_stock_in_import_template() -> BytesIO:
+    """
+    Create template Excel file untuk import barang masuk
+    Format: NO, NOMOR INVOICE, KODE BARANG, QUANTITY, TANGGAL MASUK
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Template Import Barang Masuk"
+
+    _write_import_sheet(
+        ws,
+        ["NO", "NOMOR INVOICE", "KODE BARANG", "QUANTITY", "TANGGAL MASUK"],
+        [
+            [1, "INV/2025/001", "PE125", 100, date(2025, 1, 15)],
+            [2, "INV/2025/001", "EQ63", 25, date(2025, 1, 15)],
+            [3, "INV/2025/002", "REG-RT", 50.5, date(2025, 1, 20)],
+        ],
+        [8, 25, 20, 12, 16]
+    )
+    _write_instruction_sheet(wb, [
+        "1. Jangan hapus atau ubah header di row pertama sheet template",
+        "2. Isi data mulai dari row kedua, satu row per material",
+        "3. KODE BARANG harus sudah terdaftar di menu Material pada project ini",
+        "4. QUANTITY harus berupa angka lebih dari 0 (contoh: 100 atau 50.5)",
+        "5. TANGGAL MASUK berupa sel tanggal atau teks YYYY-MM-DD / DD/MM/YYYY",
+    ])
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+def create_stock_out_import_template() -> BytesIO:
+    """
+    Create template Excel file untuk import barang keluar
+    Format: NO, NAMA MANDOR, KODE BARANG, QUANTITY, TANGGAL KELUAR
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Template Import Barang Keluar"
+
+    _write_import_sheet(
+        ws,
+        ["NO", "NAMA MANDOR", "KODE BARANG", "QUANTITY", "TANGGAL KELUAR"],
+        [
+            [1, "Budi Santoso", "PE125", 30, date(2025, 1, 16)],
+            [2, "Budi Santoso", "EQ63", 10, date(2025, 1, 16)],
+            [3, "Agus Wijaya", "REG-RT", 5, date(2025, 1, 21)],
+        ],
+        [8, 30, 20, 12, 16]
+    )
+    _write_instruction_sheet(wb, [
+        "1. Jangan hapus atau ubah header di row pertama sheet template",
+        "2. Isi data mulai dari row kedua, satu row per material",
+        "3. NAMA MANDOR harus sama dengan nama mandor aktif di project ini",
+        "4. KODE BARANG harus sudah terdaftar di menu Material pada project ini",
+        "5. QUANTITY harus berupa angka lebih dari 0 dan tidak melebihi stok tersedia",
+        "6. TANGGAL KELUAR berupa sel tanggal atau teks YYYY-MM-DD / DD/MM/YYYY",
+        "7. Nomor barang keluar (JRGS-KDL-YYYYMMDD-XXXX) dibuat otomatis per row",
+    ])
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -6,6 +6,7 @@ from fastapi import UploadFile
 from pathlib import Path
 from PIL import Image
 import json
+from app.core.metrics import track_job
 
 
 # Base upload directory
@@ -30,6 +31,16 @@ async def save_uploaded_files(
     Save multiple uploaded files dan return list of file paths
     evidence_type: stock_in, stock_out, installed, return
     """
+    # Dicatat di metrics queue "upload" selama file diproses
+    with track_job("upload"):
+        return await _save_uploaded_files(files, evidence_type, record_id)
+
+
+async def _save_uploaded_files(
+    files: List[UploadFile],
+    evidence_type: str,
+    record_id: int
+) -> List[str]:
     saved_paths = []
     today = date.today()
     
@@ -0,0 +1,104 @@
+"""
+Helper untuk keyset (cursor) pagination.
+
+Offset pagination (`OFFSET skip LIMIT limit`) makin lambat di halaman dalam karena database
+harus scan dan membuang semua row yang di-skip. Keyset pagination memakai nilai kolom sort
+dari row terakhir halaman sebelumnya (`WHERE id < :last_id ORDER BY id DESC LIMIT limit`),
+sehingga biaya halaman ke-500 sama dengan halaman pertama.
+
+Cursor di-encode sebagai string opaque (base64 JSON) agar client tidak bergantung ke formatnya.
+"""
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.core.exceptions import ValidationError
+
+PAGINATION_OFFSET = "offset"
+PAGINATION_CURSOR = "cursor"
+# Pattern untuk Query param `pagination`
+PAGINATION_MODE_PATTERN = f"^({PAGINATION_OFFSET}|{PAGINATION_CURSOR})$"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode nilai kolom sort row terakhir menjadi cursor opaque"""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode cursor dari client. Raises ValidationError jika cursor tidak valid"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, dict) or "id" not in values:
+            raise ValueError("cursor tanpa id")
+        return values
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValidationError("Cursor pagination tidak valid")
+
+
+def apply_keyset(query, id_column, cursor_values: Optional[Dict[str, Any]], sort_column=None):
+    """
+    Tambahkan filter keyset untuk urutan DESC.
+
+    - Tanpa sort_column: ORDER BY id DESC, filter id < last_id
+    - Dengan sort_column (misal created_at): ORDER BY sort_column DESC, id DESC,
+      filter (sort_column < last_sort) OR (sort_column = last_sort AND id < last_id)
+    """
+    if sort_column is None:
+        if cursor_values:
+            query = query.filter(id_column < int(cursor_values["id"]))
+        return query.order_by(id_column.desc())
+
+    if cursor_values:
+        last_sort = cursor_values.get(sort_column.key)
+        if last_sort is None:
+            raise ValidationError("Cursor pagination tidak valid")
+        if isinstance(last_sort, str):
+            last_sort = datetime.fromisoformat(last_sort)
+        last_id = int(cursor_values["id"])
+        query = query.filter(
+            or_(
+                sort_column < last_sort,
+                and_(sort_column == last_sort, id_column < last_id)
+            )
+        )
+    return query.order_by(sort_column.desc(), id_column.desc())
+
+
+def paginate_keyset(
+    query,
+    id_column,
+    cursor_values: Optional[Dict[str, Any]],
+    limit: int,
+    sort_column=None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Ambil satu halaman dengan keyset pagination.
+    Query limit+1 row untuk mengetahui apakah masih ada halaman berikutnya tanpa COUNT.
+
+    Returns:
+        (items, next_cursor) - next_cursor None jika sudah halaman terakhir
+    """
+    rows = apply_keyset(query, id_column, cursor_values, sort_column).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    items = rows[:limit]
+
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        values = {"id": getattr(last, id_column.key)}
+        if sort_column is not None:
+            values[sort_column.key] = getattr(last, sort_column.key)
+        next_cursor = encode_cursor(values)
+    return items, next_cursor
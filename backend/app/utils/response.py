@@ -1,5 +1,7 @@
 from typing import Any, Optional, Dict
-from fastapi import status
+import hashlib
+import json
+from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
@@ -74,3 +76,56 @@ def paginated_response(
     
     return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(content))
 
+
+
+def cursor_paginated_response(
+    data: list,
+    limit: int,
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None,
+    message: str = "Data berhasil diambil"
+) -> JSONResponse:
+    """Format response untuk data dengan keyset (cursor) pagination"""
+    content = {
+        "success": True,
+        "message": message,
+        "data": data,
+        "meta": {
+            "pagination": {
+                "mode": "cursor",
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None,
+                # total hanya dihitung jika diminta (include_total=true)
+                "total": total
+            }
+        }
+    }
+    
+    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(content))
+
+
+def make_etag(data: Any) -> str:
+    """Weak ETag dari isi data (JSON terurut), stabil antar worker"""
+    payload = json.dumps(jsonable_encoder(data), sort_keys=True, separators=(",", ":"))
+    return f'W/"{hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_response(
+    request: Request,
+    data: Any,
+    etag: str,
+    message: str = "Data berhasil diambil"
+) -> Response:
+    """
+    success_response dengan header ETag. Jika If-None-Match dari client cocok, kirim 304 tanpa body.
+    Cache-Control no-cache: browser selalu revalidasi, jadi perubahan data langsung terlihat.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response = success_response(data=data, message=message)
+    response.headers.update(headers)
+    return response
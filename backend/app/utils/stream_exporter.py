@@ -0,0 +1,356 @@
+"""
+Export streaming CSV / NDJSON untuk tabel transaksi dan audit log.
+
+Export Excel membangun seluruh workbook di memory sebelum dikirim, sehingga lambat dan boros
+memory untuk data besar. Export di sini memakai server-side cursor (`stream_results` + `yield_per`)
+dan generator untuk `StreamingResponse`: baris pertama langsung terkirim dan memory tetap konstan
+berapa pun jumlah barisnya.
+
+Filter sama dengan endpoint list masing-masing tabel (project, tanggal, search, search_mode),
+ditambah filter mandor_id / material_id untuk tabel yang punya kolom tersebut.
+"""
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql import Select
+
+from app.core.exceptions import ValidationError
+from app.utils.text_search import SEARCH_CONTAINS, text_search, text_search_ids
+
+EXPORT_CSV = "csv"
+EXPORT_NDJSON = "ndjson"
+# Pattern untuk Query param `format`
+EXPORT_FORMAT_PATTERN = f"^({EXPORT_CSV}|{EXPORT_NDJSON})$"
+EXPORT_MEDIA_TYPES = {
+    EXPORT_CSV: "text/csv",
+    EXPORT_NDJSON: "application/x-ndjson",
+}
+
+EXPORT_STOCK_INS = "stock_ins"
+EXPORT_STOCK_OUTS = "stock_outs"
+EXPORT_INSTALLED = "installed"
+EXPORT_RETURNS = "returns"
+EXPORT_AUDIT_LOGS = "audit_logs"
+EXPORT_TABLES = (EXPORT_STOCK_INS, EXPORT_STOCK_OUTS, EXPORT_INSTALLED, EXPORT_RETURNS, EXPORT_AUDIT_LOGS)
+# Pattern untuk path param `table`
+EXPORT_TABLE_PATTERN = f"^({'|'.join(EXPORT_TABLES)})$"
+
+# Jumlah baris per fetch dari server-side cursor (sekaligus per chunk response)
+STREAM_BATCH_SIZE = 1000
+
+
+def _material_columns(Material) -> List:
+    return [
+        Material.kode_barang.label("kode_barang"),
+        Material.nama_barang.label("nama_barang"),
+        Material.satuan.label("satuan"),
+    ]
+
+
+def _not_deleted(model):
+    """Sama dengan list endpoint dan repository: is_deleted 0 atau NULL dianggap belum dihapus"""
+    return or_(model.is_deleted == 0, model.is_deleted.is_(None))
+
+
+def _search_filter(db: Session, model, search: str, search_mode: str, nomor_columns: List, with_mandor: bool):
+    """Kondisi search seperti endpoint list: nomor transaksi, material dan (opsional) mandor"""
+    from app.models.inventory.material import Material
+    from app.models.inventory.mandor import Mandor
+
+    conditions = []
+    if nomor_columns:
+        nomor_filter, _ = text_search(db, nomor_columns, search, search_mode)
+        conditions.append(nomor_filter)
+    conditions.append(
+        model.material_id.in_(text_search_ids(db, Material.id, [Material.kode_barang, Material.nama_barang], search, search_mode))
+    )
+    if with_mandor:
+        conditions.append(model.mandor_id.in_(text_search_ids(db, Mandor.id, [Mandor.nama], search, search_mode)))
+    return or_(*conditions)
+
+
+def build_export_query(
+    db: Session,
+    table: str,
+    project_id: Optional[int],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    search: Optional[str] = None,
+    search_mode: str = SEARCH_CONTAINS,
+    mandor_id: Optional[int] = None,
+    material_id: Optional[int] = None,
+    is_released: Optional[bool] = None,
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    table_name: Optional[str] = None,
+) -> Select:
+    """
+    Bangun SELECT flat (kolom ber-label, tanpa objek ORM) untuk export satu tabel.
+
+    `db` hanya dipakai untuk menentukan strategi pencarian (FULLTEXT / LIKE);
+    statement yang dihasilkan dieksekusi di session terpisah oleh `stream_export`.
+    Urutan berdasarkan id agar stabil dan memakai primary key.
+    """
+    from app.models.inventory.material import Material
+    from app.models.inventory.mandor import Mandor
+    from app.models.inventory.stock_in import StockIn
+    from app.models.inventory.stock_out import StockOut
+    from app.models.inventory.installed import Installed
+    from app.models.inventory.return_model import Return
+    from app.models.inventory.audit_log import AuditLog, ActionType
+    from app.models.user.user import User
+
+    has_search = bool(search and search.strip())
+
+    if table == EXPORT_STOCK_INS:
+        stmt = (
+            select(
+                StockIn.id.label("id"),
+                StockIn.nomor_invoice.label("nomor_invoice"),
+                StockIn.tanggal_masuk.label("tanggal_masuk"),
+                *_material_columns(Material),
+                StockIn.quantity.label("quantity"),
+                StockIn.created_by.label("created_by"),
+                StockIn.created_at.label("created_at"),
+            )
+            .join(Material, StockIn.material_id == Material.id)
+            .where(_not_deleted(StockIn))
+        )
+        # Sama dengan list: project difilter lewat material
+        if project_id is not None:
+            stmt = stmt.where(Material.project_id == project_id)
+        if start_date:
+            stmt = stmt.where(StockIn.tanggal_masuk >= start_date)
+        if end_date:
+            stmt = stmt.where(StockIn.tanggal_masuk <= end_date)
+        if material_id is not None:
+            stmt = stmt.where(StockIn.material_id == material_id)
+        if has_search:
+            stmt = stmt.where(_search_filter(db, StockIn, search, search_mode, [StockIn.nomor_invoice], with_mandor=False))
+        return stmt.order_by(StockIn.id)
+
+    if table == EXPORT_STOCK_OUTS:
+        stmt = (
+            select(
+                StockOut.id.label("id"),
+                StockOut.nomor_barang_keluar.label("nomor_barang_keluar"),
+                StockOut.tanggal_keluar.label("tanggal_keluar"),
+                Mandor.nama.label("mandor"),
+                *_material_columns(Material),
+                StockOut.quantity.label("quantity"),
+                StockOut.created_by.label("created_by"),
+                StockOut.created_at.label("created_at"),
+            )
+            .join(Material, StockOut.material_id == Material.id)
+            .join(Mandor, StockOut.mandor_id == Mandor.id)
+            .where(_not_deleted(StockOut))
+            # Sama dengan list: stock out hasil retur keluar tidak ikut
+            .where(
+                ~exists().where(
+                    and_(
+                        Return.stock_out_id == StockOut.id,
+                        Return.is_released == 1,
+                        Return.is_deleted == 0,
+                    )
+                )
+            )
+        )
+        if project_id is not None:
+            stmt = stmt.where(Material.project_id == project_id)
+        if start_date:
+            stmt = stmt.where(StockOut.tanggal_keluar >= start_date)
+        if end_date:
+            stmt = stmt.where(StockOut.tanggal_keluar <= end_date)
+        if mandor_id is not None:
+            stmt = stmt.where(StockOut.mandor_id == mandor_id)
+        if material_id is not None:
+            stmt = stmt.where(StockOut.material_id == material_id)
+        if has_search:
+            stmt = stmt.where(_search_filter(db, StockOut, search, search_mode, [StockOut.nomor_barang_keluar], with_mandor=True))
+        return stmt.order_by(StockOut.id)
+
+    if table == EXPORT_INSTALLED:
+        stmt = (
+            select(
+                Installed.id.label("id"),
+                Installed.no_register.label("no_register"),
+                Installed.tanggal_pasang.label("tanggal_pasang"),
+                StockOut.nomor_barang_keluar.label("nomor_barang_keluar"),
+                Mandor.nama.label("mandor"),
+                *_material_columns(Material),
+                Installed.quantity.label("quantity"),
+                Installed.created_by.label("created_by"),
+                Installed.created_at.label("created_at"),
+            )
+            .join(Material, Installed.material_id == Material.id)
+            .join(Mandor, Installed.mandor_id == Mandor.id)
+            .outerjoin(StockOut, Installed.stock_out_id == StockOut.id)
+            .where(_not_deleted(Installed))
+        )
+        # installed.project_id belum ada di database, filter lewat material
+        if project_id is not None:
+            stmt = stmt.where(Material.project_id == project_id)
+        if start_date:
+            stmt = stmt.where(Installed.tanggal_pasang >= start_date)
+        if end_date:
+            stmt = stmt.where(Installed.tanggal_pasang <= end_date)
+        if mandor_id is not None:
+            stmt = stmt.where(Installed.mandor_id == mandor_id)
+        if material_id is not None:
+            stmt = stmt.where(Installed.material_id == material_id)
+        if has_search:
+            stmt = stmt.where(_search_filter(db, Installed, search, search_mode, [Installed.no_register], with_mandor=True))
+        return stmt.order_by(Installed.id)
+
+    if table == EXPORT_RETURNS:
+        ReleasedStockOut = aliased(StockOut)
+        stmt = (
+            select(
+                Return.id.label("id"),
+                Return.tanggal_kembali.label("tanggal_kembali"),
+                Mandor.nama.label("mandor"),
+                *_material_columns(Material),
+                Return.quantity_kembali.label("quantity_kembali"),
+                Return.quantity_kondisi_baik.label("quantity_kondisi_baik"),
+                Return.quantity_kondisi_reject.label("quantity_kondisi_reject"),
+                Return.is_released.label("is_released"),
+                ReleasedStockOut.nomor_barang_keluar.label("nomor_barang_keluar"),
+                Return.created_by.label("created_by"),
+                Return.created_at.label("created_at"),
+            )
+            .join(Material, Return.material_id == Material.id)
+            .join(Mandor, Return.mandor_id == Mandor.id)
+            .outerjoin(ReleasedStockOut, Return.stock_out_id == ReleasedStockOut.id)
+            .where(_not_deleted(Return))
+        )
+        if project_id is not None:
+            stmt = stmt.where(Return.project_id == project_id)
+        if is_released is not None:
+            stmt = stmt.where(Return.is_released == (1 if is_released else 0))
+        if start_date:
+            stmt = stmt.where(Return.tanggal_kembali >= start_date)
+        if end_date:
+            stmt = stmt.where(Return.tanggal_kembali <= end_date)
+        if mandor_id is not None:
+            stmt = stmt.where(Return.mandor_id == mandor_id)
+        if material_id is not None:
+            stmt = stmt.where(Return.material_id == material_id)
+        if has_search:
+            stmt = stmt.where(_search_filter(db, Return, search, search_mode, [], with_mandor=True))
+        return stmt.order_by(Return.id)
+
+    if table == EXPORT_AUDIT_LOGS:
+        stmt = (
+            select(
+                AuditLog.id.label("id"),
+                AuditLog.created_at.label("created_at"),
+                AuditLog.user_id.label("user_id"),
+                User.email.label("user_email"),
+                AuditLog.action.label("action"),
+                AuditLog.table_name.label("table_name"),
+                AuditLog.record_id.label("record_id"),
+                AuditLog.description.label("description"),
+                AuditLog.ip_address.label("ip_address"),
+                AuditLog.old_values.label("old_values"),
+                AuditLog.new_values.label("new_values"),
+            )
+            .outerjoin(User, AuditLog.user_id == User.id)
+        )
+        # Log lama / log tanpa konteks project (project_id NULL) tetap ikut
+        if project_id is not None:
+            stmt = stmt.where(or_(AuditLog.project_id == project_id, AuditLog.project_id.is_(None)))
+        # Rentang tanggal berdasarkan waktu log dibuat (end_date inklusif sampai akhir hari)
+        if start_date:
+            stmt = stmt.where(AuditLog.created_at >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            stmt = stmt.where(AuditLog.created_at <= datetime.combine(end_date, datetime.max.time()))
+        if user_id is not None:
+            stmt = stmt.where(AuditLog.user_id == user_id)
+        if action:
+            try:
+                stmt = stmt.where(AuditLog.action == ActionType(action.upper()))
+            except ValueError:
+                raise ValidationError(f"Action '{action}' tidak valid")
+        if table_name:
+            stmt = stmt.where(AuditLog.table_name == table_name)
+        if has_search:
+            term = f"%{search.strip()}%"
+            stmt = stmt.where(or_(AuditLog.description.like(term), AuditLog.table_name.like(term)))
+        return stmt.order_by(AuditLog.id)
+
+    raise ValidationError(f"Tabel export tidak dikenal: {table}")
+
+
+def _plain_value(value: Any) -> Any:
+    """Normalisasi nilai kolom agar bisa ditulis ke CSV / JSON"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # String agar quantity / harga tidak kehilangan presisi (float) di CSV / NDJSON
+        return str(value)
+    return value
+
+
+def _csv_chunks(columns: List[str], batches: Iterator[List[Tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for row in batch:
+            writer.writerow(["" if value is None else _plain_value(value) for value in row])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header tetap terkirim walau tidak ada data
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(columns: List[str], batches: Iterator[List[Tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [
+            json.dumps({column: _plain_value(value) for column, value in zip(columns, row)}, ensure_ascii=False)
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_export(
+    statement: Select,
+    export_format: str,
+    session_factory: Optional[Callable[[], Session]] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Generator chunk bytes CSV / NDJSON dari `statement`.
+
+    Memakai session sendiri (bukan session request) karena generator tetap berjalan setelah
+    handler route selesai. Baris diambil per `batch_size` dari server-side cursor sehingga
+    memory konstan; satu batch = satu chunk response.
+    """
+    from app.core.metrics import track_job
+
+    if session_factory is None:
+        from app.config.database import SessionLocal
+        session_factory = SessionLocal
+
+    writer = _csv_chunks if export_format == EXPORT_CSV else _ndjson_chunks
+    session = session_factory()
+    try:
+        with track_job("export"):
+            result = session.execute(
+                statement.execution_options(stream_results=True, yield_per=batch_size)
+            )
+            columns = list(result.keys())
+            yield from writer(columns, result.partitions())
+    finally:
+        session.close()
@@ -0,0 +1,202 @@
+"""
+Helper pencarian teks untuk material, mandor dan nomor transaksi.
+
+`LIKE '%term%'` tidak bisa memakai index B-tree karena wildcard di depan, sehingga setiap
+pencarian melakukan full scan. Di MySQL pencarian memakai FULLTEXT index dengan ngram parser
+(lihat migration a7c3e91f5d20) yang bisa mencocokkan potongan kata tanpa full scan.
+Jika index tidak ada (misal SQLite untuk test), otomatis fallback ke LIKE dengan hasil yang sama.
+
+Mode pencarian:
+- contains: substring (default, sama dengan perilaku LIKE '%term%' sebelumnya)
+- prefix: diawali term, memakai LIKE 'term%' yang bisa memakai index B-tree biasa
+- fuzzy: toleran salah ketik, cocok jika berbagi potongan 2 huruf (ngram) dengan term
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, inspect, literal, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+SEARCH_CONTAINS = "contains"
+SEARCH_PREFIX = "prefix"
+SEARCH_FUZZY = "fuzzy"
+# Pattern untuk Query param `search_mode`
+SEARCH_MODE_PATTERN = f"^({SEARCH_CONTAINS}|{SEARCH_PREFIX}|{SEARCH_FUZZY})$"
+
+# Harus sama dengan innodb ngram_token_size (default MySQL: 2)
+NGRAM_TOKEN_SIZE = 2
+# Batas jumlah ngram untuk fallback fuzzy agar query tidak terlalu panjang
+MAX_FUZZY_GRAMS = 16
+
+# Kolom yang punya FULLTEXT index (table -> daftar kombinasi kolom).
+# MATCH() di MySQL harus memakai kombinasi kolom yang persis sama dengan index.
+FULLTEXT_INDEXES: Dict[str, List[Tuple[str, ...]]] = {
+    "materials": [("kode_barang", "nama_barang")],
+    "mandors": [("nama",)],
+    "stock_ins": [("nomor_invoice",)],
+    "stock_outs": [("nomor_barang_keluar",)],
+}
+
+# Cache hasil cek index per (database, table, kolom)
+_fulltext_cache: Dict[Tuple[str, str, Tuple[str, ...]], bool] = {}
+_fulltext_lock = threading.Lock()
+
+
+def normalize_search_term(term: Optional[str]) -> str:
+    """Trim dan rapikan spasi pada term pencarian"""
+    if not term:
+        return ""
+    return " ".join(term.split())
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _bigrams(term: str) -> List[str]:
+    grams = []
+    for word in term.lower().split():
+        if len(word) < NGRAM_TOKEN_SIZE:
+            continue
+        for i in range(len(word) - NGRAM_TOKEN_SIZE + 1):
+            gram = word[i:i + NGRAM_TOKEN_SIZE]
+            if gram not in grams:
+                grams.append(gram)
+    return grams[:MAX_FUZZY_GRAMS]
+
+
+def _table_and_columns(columns: Sequence) -> Tuple[str, Tuple[str, ...]]:
+    table = columns[0].property.columns[0].table
+    return table.name, tuple(col.key for col in columns)
+
+
+def has_fulltext_index(db: Session, table_name: str, column_names: Tuple[str, ...]) -> bool:
+    """
+    Cek apakah FULLTEXT index untuk kombinasi kolom ini ada di database.
+    Hasil di-cache per proses; hanya MySQL yang dicek.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "mysql" or column_names not in FULLTEXT_INDEXES.get(table_name, []):
+        return False
+
+    key = (bind.url.render_as_string(hide_password=True), table_name, column_names)
+    cached = _fulltext_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        indexes = inspect(bind).get_indexes(table_name)
+        found = any(
+            idx.get("dialect_options", {}).get("mysql_prefix") == "FULLTEXT"
+            and tuple(idx.get("column_names", [])) == column_names
+            for idx in indexes
+        )
+    except Exception:
+        found = False
+
+    with _fulltext_lock:
+        _fulltext_cache[key] = found
+    return found
+
+
+def clear_fulltext_cache() -> None:
+    """Reset cache cek index (misal setelah migration dijalankan di proses yang sama)"""
+    with _fulltext_lock:
+        _fulltext_cache.clear()
+
+
+def text_search(db: Session, columns: Sequence, term: Optional[str], mode: str = SEARCH_CONTAINS):
+    """
+    Buat kondisi WHERE dan ekspresi relevansi untuk pencarian pada kolom-kolom satu tabel.
+
+    Args:
+        db: Session (dipakai untuk menentukan dialect dan cek index)
+        columns: Kolom model, misal [Material.kode_barang, Material.nama_barang]
+        term: Kata kunci pencarian dari user
+        mode: contains / prefix / fuzzy
+
+    Returns:
+        (criterion, relevance) - keduanya None jika term kosong.
+        relevance makin besar makin relevan, dipakai untuk ORDER BY relevance DESC.
+    """
+    term = normalize_search_term(term)
+    if not term:
+        return None, None
+
+    table_name, column_names = _table_and_columns(columns)
+    compact_length = len(term.replace(" ", ""))
+
+    if (
+        mode != SEARCH_PREFIX
+        and compact_length >= NGRAM_TOKEN_SIZE
+        and has_fulltext_index(db, table_name, column_names)
+    ):
+        if mode == SEARCH_FUZZY:
+            # Natural language mode: term dipecah menjadi ngram, cocok jika ada ngram yang sama
+            score = match(*columns, against=term).in_natural_language_mode()
+            return score > 0, score
+        # Phrase search di ngram parser = substring match. Operator boolean di dalam
+        # tanda kutip tidak berlaku, cukup buang tanda kutip dari input user.
+        phrase = " ".join(term.replace('"', " ").split())
+        score = match(*columns, against=f'"{phrase}"').in_boolean_mode()
+        return score > 0, score
+
+    return _like_search(columns, term, mode)
+
+
+def _like_search(columns: Sequence, term: str, mode: str):
+    """
+    Fallback LIKE (SQLite / MySQL tanpa FULLTEXT index) dengan skor relevansi sederhana.
+    LIKE di MySQL (collation *_ci) dan SQLite sudah case-insensitive, sehingga tidak perlu
+    lower() di kolom dan LIKE 'term%' tetap bisa memakai index B-tree.
+    """
+    escaped = _escape_like(term)
+    contains_pattern = f"%{escaped}%"
+    prefix_pattern = f"{escaped}%"
+
+    if mode == SEARCH_FUZZY:
+        grams = _bigrams(term) or [term.lower()]
+        gram_patterns = [f"%{_escape_like(gram)}%" for gram in grams]
+        criterion = or_(*[
+            col.like(pattern, escape="\\") for col in columns for pattern in gram_patterns
+        ])
+        # Skor: jumlah ngram yang cocok, ditambah bonus jika term utuh ditemukan
+        relevance = sum(
+            (case((col.like(pattern, escape="\\"), 1), else_=0) for col in columns for pattern in gram_patterns),
+            literal(0)
+        ) + sum(
+            (case((col.like(contains_pattern, escape="\\"), len(grams)), else_=0) for col in columns),
+            literal(0)
+        )
+        return criterion, relevance
+
+    pattern = prefix_pattern if mode == SEARCH_PREFIX else contains_pattern
+    criterion = or_(*[col.like(pattern, escape="\\") for col in columns])
+    # Skor: sama persis > diawali term > mengandung term
+    relevance = sum(
+        (
+            case(
+                (func.lower(col) == term.lower(), 3),
+                (col.like(prefix_pattern, escape="\\"), 2),
+                (col.like(contains_pattern, escape="\\"), 1),
+                else_=0
+            )
+            for col in columns
+        ),
+        literal(0)
+    )
+    return criterion, relevance
+
+
+def text_search_ids(db: Session, id_column, columns: Sequence, term: Optional[str], mode: str = SEARCH_CONTAINS):
+    """
+    Subquery `SELECT id FROM tabel WHERE <pencarian>` untuk filter tabel lain.
+
+    Dipakai list transaksi: `StockIn.material_id.in_(text_search_ids(...))` agar FULLTEXT index
+    material/mandor tetap terpakai, dibanding OR antar kolom hasil JOIN yang memaksa full scan.
+    """
+    criterion, _ = text_search(db, columns, term, mode)
+    if criterion is None:
+        return None
+    return select(id_column).where(criterion)
@@ -1,76 +1,97 @@
-from typing import List, Set
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from sqlalchemy import select, insert, delete, literal, union, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased
 from app.models.user.user import User
+from app.models.user.user_closure import UserClosure
+
+# Batas kedalaman recursive CTE (pengaman jika data created_by membentuk siklus)
+MAX_HIERARCHY_DEPTH = 100
+
+# Key memo di session.info; session dibuat per request oleh get_db sehingga memo berlaku per request
+_MEMO_KEY = "user_hierarchy_ids"
 
 
 def get_parent_user_id(db: Session, user_id: int) -> int | None:
     """
     Mendapatkan parent user ID (user yang membuat user ini)
-    
+
     Args:
         db: Database session
         user_id: ID user yang ingin dicari parent-nya
-        
+
     Returns:
         Parent user ID atau None jika tidak ada
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if user and user.created_by:
-        return user.created_by
-    return None
+    return db.query(User.created_by).filter(User.id == user_id).scalar()
+
+
+def _descendants_cte(user_id: int):
+    """WITH RECURSIVE atas users.created_by: semua descendant user_id (depth >= 1)"""
+    tree = select(User.id.label("id"), literal(1).label("depth")).where(
+        User.created_by == user_id
+    ).cte("user_tree", recursive=True)
+    child = aliased(User)
+    return tree.union_all(
+        select(child.id, tree.c.depth + 1).where(
+            child.created_by == tree.c.id,
+            tree.c.depth < MAX_HIERARCHY_DEPTH
+        )
+    )
 
 
 def get_child_user_ids(db: Session, user_id: int, recursive: bool = True) -> List[int]:
     """
     Mendapatkan semua child user IDs (users yang dibuat oleh user ini)
-    
+
     Args:
         db: Database session
         user_id: ID user yang ingin dicari child-nya
         recursive: Jika True, akan mencari child secara recursive (semua descendant)
-        
+
     Returns:
         List of child user IDs
+
+    Best practice: descendant dibaca dengan satu query WITH RECURSIVE langsung dari users,
+    bukan satu query per user.
     """
-    child_ids: List[int] = []
-    
-    # Get direct children
-    direct_children = db.query(User).filter(User.created_by == user_id).all()
-    for child in direct_children:
-        child_ids.append(child.id)
-        
-        # If recursive, get children of children
-        if recursive:
-            grand_children = get_child_user_ids(db, child.id, recursive=True)
-            child_ids.extend(grand_children)
-    
-    return child_ids
+    if not recursive:
+        return [row[0] for row in db.query(User.id).filter(User.created_by == user_id).order_by(User.id).all()]
+
+    tree = _descendants_cte(user_id)
+    return list(db.execute(select(tree.c.id).order_by(tree.c.depth, tree.c.id)).scalars())
+
+
+def _accessible_user_ids_select(user_id: int):
+    """
+    SELECT semua user ID yang bisa diakses user_id: self + parent + semua descendant (closure table).
+    Dipakai sebagai subquery sehingga filter visibility tidak butuh query tambahan.
+    """
+    return union(
+        select(literal(user_id)),
+        select(User.created_by).where(User.id == user_id, User.created_by.isnot(None)),
+        select(UserClosure.descendant_id).where(UserClosure.ancestor_id == user_id),
+    )
 
 
 def get_user_hierarchy_ids(db: Session, user_id: int) -> List[int]:
     """
     Mendapatkan semua user IDs yang bisa diakses oleh user ini
     (self + parent + all children recursive)
-    
+
     Args:
         db: Database session
         user_id: ID user yang ingin dicari hierarchy-nya
-        
+
     Returns:
         List of user IDs yang bisa diakses (termasuk user_id sendiri)
+
+    Hasil di-memo per session (per request); memo dibersihkan saat closure berubah.
     """
-    user_ids: Set[int] = {user_id}  # Include self
-    
-    # Get parent user ID
-    parent_id = get_parent_user_id(db, user_id)
-    if parent_id:
-        user_ids.add(parent_id)
-    
-    # Get all child user IDs (recursive)
-    child_ids = get_child_user_ids(db, user_id, recursive=True)
-    user_ids.update(child_ids)
-    
-    return list(user_ids)
+    memo = db.info.setdefault(_MEMO_KEY, {})
+    if user_id not in memo:
+        memo[user_id] = sorted(set(db.execute(_accessible_user_ids_select(user_id)).scalars()))
+    return list(memo[user_id])
 
 
 def filter_by_user_hierarchy(query, db: Session, user_id: int, created_by_column):
@@ -80,25 +101,99 @@ def filter_by_user_hierarchy(query, db: Session, user_id: int, created_by_column
     - Dirinya sendiri
     - Parent user (user yang membuatnya)
     - Semua child users (users yang dibuat oleh user tersebut, recursive)
-    
+
     Args:
         query: SQLAlchemy query object
         db: Database session
         user_id: ID user yang sedang mengakses
         created_by_column: Column reference untuk created_by (e.g., Model.created_by)
-        
+
     Returns:
         Filtered query
+
+    Best practice: jika hierarchy sudah di-memo di request ini pakai daftar ID-nya, selain itu
+    filter berupa subquery ke user_closure (semi-join ber-index) di dalam query yang sama.
+    """
+    memo = db.info.get(_MEMO_KEY, {})
+    if user_id in memo:
+        return query.filter(created_by_column.in_(memo[user_id]))
+    return query.filter(created_by_column.in_(_accessible_user_ids_select(user_id)))
+
+
+def _clear_memo(db: Union[Session, Connection]) -> None:
+    db.info.pop(_MEMO_KEY, None)
+
+
+def add_user_to_closure(db: Session, user_id: int, parent_id: Optional[int]) -> None:
+    """
+    Tambah baris closure untuk user baru: (user, user, 0), (parent, user, 1) dan semua
+    ancestor parent dengan depth + 1, dalam satu INSERT ... SELECT. Tidak commit.
     """
-    from sqlalchemy import or_
-    
-    # Get all user IDs that can be accessed
-    accessible_user_ids = get_user_hierarchy_ids(db, user_id)
-    
-    if not accessible_user_ids:
-        # If no accessible users, return empty result
-        return query.filter(False)
-    
-    # Filter by created_by in accessible user IDs
-    return query.filter(created_by_column.in_(accessible_user_ids))
+    rows = [select(literal(user_id), literal(user_id), literal(0))]
+    if parent_id is not None:
+        rows.append(select(literal(parent_id), literal(user_id), literal(1)))
+        rows.append(
+            select(UserClosure.ancestor_id, literal(user_id), UserClosure.depth + 1).where(
+                UserClosure.descendant_id == parent_id,
+                UserClosure.depth > 0
+            )
+        )
+    db.execute(
+        insert(UserClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            union_all(*rows) if len(rows) > 1 else rows[0]
+        )
+    )
+    _clear_memo(db)
 
+
+def remove_user_from_closure(db: Session, user_id: int) -> None:
+    """
+    Lepaskan user dari closure (dipanggil sebelum user dihapus). Tidak commit.
+
+    Saat user dihapus, created_by child-nya di-set NULL sehingga subtree user terlepas dari
+    ancestor-nya. Karena itu yang dihapus adalah semua pasangan (ancestor user, descendant user)
+    termasuk user itu sendiri, bukan hanya baris yang memuat user; path antar descendant tetap.
+    Ancestor dan descendant dibaca dulu karena MySQL tidak mengizinkan DELETE dengan subquery
+    ke tabel yang sama.
+    """
+    ancestor_ids = set(db.execute(
+        select(UserClosure.ancestor_id).where(UserClosure.descendant_id == user_id)
+    ).scalars())
+    descendant_ids = set(db.execute(
+        select(UserClosure.descendant_id).where(UserClosure.ancestor_id == user_id)
+    ).scalars())
+    ancestor_ids.add(user_id)
+    descendant_ids.add(user_id)
+    db.execute(
+        delete(UserClosure).where(
+            UserClosure.ancestor_id.in_(ancestor_ids),
+            UserClosure.descendant_id.in_(descendant_ids)
+        )
+    )
+    _clear_memo(db)
+
+
+def rebuild_user_closure(db: Union[Session, Connection]) -> None:
+    """
+    Bangun ulang seluruh user_closure dari users.created_by dengan satu WITH RECURSIVE.
+    Dipakai setelah user di-insert di luar UserService (import SQL, data sintetis). Tidak commit.
+    """
+    user = aliased(User)
+    tree = select(
+        User.id.label("ancestor_id"), User.id.label("descendant_id"), literal(0).label("depth")
+    ).cte("closure_tree", recursive=True)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, user.id, tree.c.depth + 1).where(
+            user.created_by == tree.c.descendant_id,
+            tree.c.depth < MAX_HIERARCHY_DEPTH
+        )
+    )
+    db.execute(delete(UserClosure))
+    db.execute(
+        insert(UserClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+        )
+    )
+    _clear_memo(db)
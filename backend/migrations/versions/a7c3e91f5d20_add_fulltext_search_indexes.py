@@ -0,0 +1,95 @@
+"""add_fulltext_search_indexes
+
+Revision ID: a7c3e91f5d20
+Revises: bf3546f4e4d2
+Create Date: 2026-10-19 09:12:44.318205
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import (
+    table_exists,
+    index_exists,
+    safe_drop_index,
+)
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f5d20'
+down_revision: Union[str, None] = 'bf3546f4e4d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Harus sama dengan FULLTEXT_INDEXES di app/utils/text_search.py
+FULLTEXT_INDEXES = [
+    ('materials', 'ft_materials_kode_nama', ['kode_barang', 'nama_barang']),
+    ('mandors', 'ft_mandors_nama', ['nama']),
+    ('stock_ins', 'ft_stock_ins_nomor_invoice', ['nomor_invoice']),
+    ('stock_outs', 'ft_stock_outs_nomor_barang_keluar', ['nomor_barang_keluar']),
+]
+
+
+def upgrade() -> None:
+    """
+    Tambah FULLTEXT index dengan ngram parser (MySQL only) untuk pencarian
+    material, mandor, nomor_invoice dan nomor_barang_keluar.
+    Database lain (SQLite untuk test) memakai fallback LIKE di app/utils/text_search.py.
+    """
+    logger.info(f"Starting migration: add_fulltext_search_indexes")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if connection.dialect.name != 'mysql':
+        logger.info(f"Dialect '{connection.dialect.name}' tidak mendukung FULLTEXT ngram, skip")
+        return
+
+    # Stopword default InnoDB (a, i, on, ...) membuat ngram parser membuang semua token
+    # yang mengandung huruf tersebut. Setting ini dibaca saat index dibuat.
+    connection.execute(sa.text("SET SESSION innodb_ft_enable_stopword = OFF"))
+
+    for table_name, index_name, columns in FULLTEXT_INDEXES:
+        if not table_exists(inspector, table_name):
+            logger.warning(f"Tabel '{table_name}' tidak ditemukan, skip")
+            continue
+        if index_exists(inspector, table_name, index_name):
+            logger.info(f"Index '{index_name}' sudah ada, skip")
+            continue
+        logger.info(f"Membuat FULLTEXT index '{index_name}' pada '{table_name}'...")
+        op.create_index(
+            index_name,
+            table_name,
+            columns,
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram'
+        )
+        logger.info(f"✅ Index '{index_name}' berhasil dibuat")
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_fulltext_search_indexes")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if connection.dialect.name != 'mysql':
+        return
+
+    for table_name, index_name, _ in FULLTEXT_INDEXES:
+        safe_drop_index(inspector, table_name, index_name)
+
+    logger.info("✅ Downgrade completed successfully")
@@ -0,0 +1,55 @@
+"""add_users_name_index
+
+Revision ID: b9d4e6a2c1f3
+Revises: f2c8b5d31a07
+Create Date: 2026-10-19 18:40:27.318462
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import safe_create_index, safe_drop_index
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e6a2c1f3'
+down_revision: Union[str, None] = 'f2c8b5d31a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index users.name untuk pencarian prefix (LIKE 'term%') di listing user.
+    Email sudah punya unique index.
+    """
+    logger.info(f"Starting migration: add_users_name_index")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    safe_create_index(inspector, 'users', 'ix_users_name', ['name'])
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_users_name_index")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    safe_drop_index(inspector, 'users', 'ix_users_name')
+
+    logger.info("✅ Downgrade completed successfully")
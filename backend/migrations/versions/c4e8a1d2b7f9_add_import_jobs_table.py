@@ -0,0 +1,96 @@
+"""add_import_jobs_table
+
+Revision ID: c4e8a1d2b7f9
+Revises: a7c3e91f5d20
+Create Date: 2026-10-19 13:40:02.517384
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import table_exists
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d2b7f9'
+down_revision: Union[str, None] = 'a7c3e91f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Buat table import_jobs untuk import spreadsheet yang diproses di background
+    (status, progress dan laporan akhir bisa di-poll dari worker manapun).
+    """
+    logger.info(f"Starting migration: add_import_jobs_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if table_exists(inspector, 'import_jobs'):
+        logger.info("Table import_jobs sudah ada, skip")
+        return
+
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('file_name', sa.String(length=255), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=True),
+        sa.Column('options', sa.Text(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('success_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_import_jobs_job_type'), 'import_jobs', ['job_type'], unique=False)
+    op.create_index(op.f('ix_import_jobs_status'), 'import_jobs', ['status'], unique=False)
+    op.create_index(op.f('ix_import_jobs_project_id'), 'import_jobs', ['project_id'], unique=False)
+    op.create_index(op.f('ix_import_jobs_created_by'), 'import_jobs', ['created_by'], unique=False)
+    logger.info("✅ Table import_jobs berhasil dibuat")
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_import_jobs_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if not table_exists(inspector, 'import_jobs'):
+        return
+
+    op.drop_index(op.f('ix_import_jobs_created_by'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_project_id'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_status'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_job_type'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
+
+    logger.info("✅ Downgrade completed successfully")
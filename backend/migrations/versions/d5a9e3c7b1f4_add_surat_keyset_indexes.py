@@ -0,0 +1,63 @@
+"""add_surat_keyset_indexes
+
+Revision ID: d5a9e3c7b1f4
+Revises: b9d4e6a2c1f3
+Create Date: 2026-10-19 21:05:12.604318
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import safe_create_index, safe_drop_index
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9e3c7b1f4'
+down_revision: Union[str, None] = 'b9d4e6a2c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, index name) untuk keyset pagination listing: WHERE project_id = ? ORDER BY created_at DESC, id DESC
+KEYSET_INDEXES = [
+    ('surat_permintaans', 'ix_surat_permintaans_project_created_id'),
+    ('surat_jalans', 'ix_surat_jalans_project_created_id'),
+]
+
+
+def upgrade() -> None:
+    """
+    Index (project_id, created_at, id) agar halaman cursor dibaca langsung dari index
+    tanpa filesort seluruh row project, sehingga halaman dalam secepat halaman pertama.
+    """
+    logger.info(f"Starting migration: add_surat_keyset_indexes")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    for table_name, index_name in KEYSET_INDEXES:
+        safe_create_index(inspector, table_name, index_name, ['project_id', 'created_at', 'id'])
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_surat_keyset_indexes")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    for table_name, index_name in KEYSET_INDEXES:
+        safe_drop_index(inspector, table_name, index_name)
+
+    logger.info("✅ Downgrade completed successfully")
@@ -0,0 +1,90 @@
+"""add_user_closure_table
+
+Revision ID: e7a4c2f19b36
+Revises: c4e8a1d2b7f9
+Create Date: 2026-10-19 16:05:41.208913
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import table_exists
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c2f19b36'
+down_revision: Union[str, None] = 'c4e8a1d2b7f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Batas kedalaman recursive CTE (sama dengan MAX_HIERARCHY_DEPTH di app/utils/user_hierarchy.py)
+MAX_HIERARCHY_DEPTH = 100
+
+
+def upgrade() -> None:
+    """
+    Buat closure table user_closure (ancestor, descendant, depth) untuk hierarchy users.created_by
+    dan isi dari data yang sudah ada dengan satu WITH RECURSIVE (MySQL 8 / MariaDB 10.2+).
+    """
+    logger.info(f"Starting migration: add_user_closure_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if table_exists(inspector, 'user_closure'):
+        logger.info("Table user_closure sudah ada, skip")
+        return
+
+    op.create_table(
+        'user_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_user_closure_descendant_id', 'user_closure', ['descendant_id'], unique=False)
+    logger.info("✅ Table user_closure berhasil dibuat")
+
+    connection.execute(sa.text(f"""
+        INSERT INTO user_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE closure_tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM users
+            UNION ALL
+            SELECT closure_tree.ancestor_id, users.id, closure_tree.depth + 1
+            FROM users
+            JOIN closure_tree ON users.created_by = closure_tree.descendant_id
+            WHERE closure_tree.depth < {MAX_HIERARCHY_DEPTH}
+        )
+        SELECT ancestor_id, descendant_id, depth FROM closure_tree
+    """))
+    logger.info("✅ Closure hierarchy user berhasil diisi")
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_user_closure_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if not table_exists(inspector, 'user_closure'):
+        return
+
+    op.drop_index('ix_user_closure_descendant_id', table_name='user_closure')
+    op.drop_table('user_closure')
+
+    logger.info("✅ Downgrade completed successfully")
@@ -0,0 +1,69 @@
+"""add_cache_versions_table
+
+Revision ID: f2c8b5d31a07
+Revises: e7a4c2f19b36
+Create Date: 2026-10-19 17:12:09.553174
+
+"""
+import logging
+from typing import Sequence, Union
+from pathlib import Path
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# Add migrations directory to path untuk import utils
+migrations_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(migrations_dir.parent))
+
+from migrations.utils import table_exists
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8b5d31a07'
+down_revision: Union[str, None] = 'e7a4c2f19b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Buat table cache_versions: version stamp cache in-memory per worker (permissions, dll).
+    Baris dibuat otomatis saat version pertama kali di-bump.
+    """
+    logger.info(f"Starting migration: add_cache_versions_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if table_exists(inspector, 'cache_versions'):
+        logger.info("Table cache_versions sudah ada, skip")
+        return
+
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    logger.info("✅ Table cache_versions berhasil dibuat")
+
+    logger.info("✅ Migration completed successfully")
+
+
+def downgrade() -> None:
+    logger.info(f"Starting downgrade: add_cache_versions_table")
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if not table_exists(inspector, 'cache_versions'):
+        return
+
+    op.drop_table('cache_versions')
+
+    logger.info("✅ Downgrade completed successfully")
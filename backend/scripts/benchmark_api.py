@@ -0,0 +1,404 @@
+"""
+Benchmark API yang repeatable untuk endpoint-endpoint utama.
+
+App FastAPI dijalankan in-process (httpx ASGITransport, tanpa network) terhadap database lokal
+yang sudah di-seed dengan scripts.generate_synthetic_data. Setiap skenario dijalankan dengan
+concurrency tetap dan dicatat:
+- latency p50/p95/p99/mean/max (ms)
+- throughput (request/detik)
+- jumlah query database per request (rata-rata dan maksimum)
+- peak RSS proses (MB)
+
+Latency hanya dihitung dari response 2xx. Skenario dengan response non-2xx membuat script exit
+dengan kode 1 (dan baseline tidak disimpan). Hasil ditulis ke JSON. Jika --baseline diberikan,
+script exit dengan kode 1 jika ada metric yang regresi melebihi --max-regression dibanding baseline.
+
+Contoh:
+    python -m scripts.generate_synthetic_data --database-url sqlite:///./bench.db --create-tables
+    python -m scripts.benchmark_api --database-url sqlite:///./bench.db --output bench_result.json --save-baseline scripts/benchmark_baseline.json
+    python -m scripts.benchmark_api --database-url sqlite:///./bench.db --baseline scripts/benchmark_baseline.json
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Callable
+
+# Tambahkan root directory ke path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import httpx
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.config.database import get_db
+from app.models.project import Project, UserProject
+from app.models.user.user import User, UserRole
+from app.models.inventory import Material, Mandor
+
+API_PREFIX = "/api/v1"
+DEFAULT_PASSWORD = "password123"
+
+# Metric yang dibandingkan dengan baseline: nama -> True jika "lebih besar = lebih buruk"
+REGRESSION_METRICS = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "queries_per_request": True,
+    "throughput_rps": False,
+}
+
+# Jumlah query untuk request yang sedang berjalan
+_query_counter: ContextVar[Optional[dict]] = ContextVar("benchmark_query_counter", default=None)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return round(peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024, 1)
+
+
+class BenchmarkContext:
+    """State yang dipakai skenario: token, project, data referensi dari database"""
+
+    def __init__(self, session_factory, project_code: Optional[str]):
+        db = session_factory()
+        try:
+            query = select(Project).order_by(Project.id)
+            if project_code:
+                query = query.where(Project.code == project_code)
+            project = db.execute(query).scalars().first()
+            if not project:
+                raise RuntimeError("Project tidak ditemukan. Jalankan scripts.generate_synthetic_data terlebih dahulu.")
+
+            user = db.execute(
+                select(User)
+                .join(UserProject, UserProject.user_id == User.id)
+                .where(UserProject.project_id == project.id, User.role == UserRole.ADMIN)
+                .order_by(User.id)
+            ).scalars().first()
+            if not user:
+                raise RuntimeError(f"Tidak ada user admin untuk project {project.code}")
+
+            self.project_id = project.id
+            self.project_code = project.code
+            self.email = user.email
+            self.material_ids = list(db.execute(
+                select(Material.id).where(Material.project_id == project.id, Material.is_active == 1).order_by(Material.id)
+            ).scalars())
+            self.mandor_ids = list(db.execute(
+                select(Mandor.id).where(Mandor.project_id == project.id, Mandor.is_active == 1).order_by(Mandor.id)
+            ).scalars())
+        finally:
+            db.close()
+
+        self.token: Optional[str] = None
+        self.sequence = 0
+        self.run_id = datetime.now().strftime("%H%M%S")
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}", "X-Project-ID": str(self.project_id)}
+
+    def next_sequence(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+
+def build_scenarios(ctx: BenchmarkContext, start_date: date, end_date: date) -> List[dict]:
+    """
+    Daftar skenario. Setiap skenario punya builder yang mengembalikan kwargs untuk httpx request.
+    `heavy` = skenario berat, jumlah request dibatasi (--heavy-requests).
+    """
+    date_params = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
+    inv = f"{API_PREFIX}/inventory"
+
+    def bulk_stock_in() -> dict:
+        seq = ctx.next_sequence()
+        items = [{"material_id": mid, "quantity": 10} for mid in ctx.material_ids[seq % 7::37][:5]]
+        return {
+            "method": "POST",
+            "url": f"{inv}/stock-in/bulk",
+            "data": {
+                "nomor_invoice": f"BENCH/{ctx.run_id}/{seq:05d}",
+                "tanggal_masuk": end_date.isoformat(),
+                "items": json.dumps(items),
+            },
+        }
+
+    def bulk_stock_out() -> dict:
+        seq = ctx.next_sequence()
+        items = [{"material_id": mid, "quantity": 1} for mid in ctx.material_ids[seq % 11::41][:5]]
+        return {
+            "method": "POST",
+            "url": f"{inv}/stock-out/bulk",
+            "data": {
+                "mandor_id": str(ctx.mandor_ids[seq % len(ctx.mandor_ids)]),
+                "tanggal_keluar": end_date.isoformat(),
+                "items": json.dumps(items),
+            },
+        }
+
+    return [
+        {
+            "name": "login",
+            "auth": False,
+            "build": lambda: {
+                "method": "POST",
+                "url": f"{API_PREFIX}/auth/login",
+                "json": {"email": ctx.email, "password": DEFAULT_PASSWORD},
+            },
+        },
+        {"name": "stock_balance", "heavy": True,
+         "build": lambda: {"method": "GET", "url": f"{inv}/stock-balance"}},
+        {"name": "discrepancy", "heavy": True,
+         "build": lambda: {"method": "GET", "url": f"{inv}/discrepancy"}},
+        {"name": "dashboard_stats",
+         "build": lambda: {"method": "GET", "url": f"{API_PREFIX}/dashboard/stats"}},
+        {"name": "stock_in_list_search",
+         "build": lambda: {"method": "GET", "url": f"{inv}/stock-in",
+                           "params": {"page": 1, "limit": 50, "search": "Pipa", **date_params}}},
+        {"name": "stock_out_list_search",
+         "build": lambda: {"method": "GET", "url": f"{inv}/stock-out",
+                           "params": {"page": 1, "limit": 50, "search": "Pipa", **date_params}}},
+        {"name": "installed_list_search",
+         "build": lambda: {"method": "GET", "url": f"{inv}/installed",
+                           "params": {"page": 1, "limit": 50, "search": "Pipa", **date_params}}},
+        {"name": "returns_list_search",
+         "build": lambda: {"method": "GET", "url": f"{inv}/returns",
+                           "params": {"page": 1, "limit": 50, "search": "Pipa", **date_params}}},
+        {"name": "stock_in_bulk_create", "build": bulk_stock_in},
+        {"name": "stock_out_bulk_create", "heavy": True, "build": bulk_stock_out},
+        {"name": "export_excel", "heavy": True,
+         "build": lambda: {"method": "POST", "url": f"{inv}/export-excel",
+                           "json": {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}}},
+    ]
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: BenchmarkContext, scenario: dict,
+                       requests: int, concurrency: int) -> dict:
+    """Jalankan satu skenario dengan concurrency tetap"""
+    build: Callable[[], dict] = scenario["build"]
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    status_codes: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with semaphore:
+            kwargs = build()
+            if scenario.get("auth", True):
+                kwargs["headers"] = ctx.headers
+            counter = {"count": 0}
+            token = _query_counter.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+                code = str(response.status_code)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"{scenario['name']}: {str(e)}")
+                code = "exception"
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+                _query_counter.reset(token)
+            status_codes[code] = status_codes.get(code, 0) + 1
+            # Response error (biasanya cepat gagal) tidak ikut statistik latency / query
+            if code.startswith("2"):
+                latencies.append(duration_ms)
+                query_counts.append(counter["count"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for code, count in status_codes.items() if not code.startswith("2"))
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_codes": status_codes,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "queries_per_request": round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+        "max_queries_per_request": max(query_counts) if query_counts else 0,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def scenario_failures(results: dict) -> List[str]:
+    """Skenario dengan response non-2xx: hasilnya tidak valid sebagai benchmark maupun baseline"""
+    return [
+        f"{name}: {result['errors']} dari {result['requests']} request gagal (status {result['status_codes']})"
+        for name, result in results["scenarios"].items()
+        if result["errors"]
+    ]
+
+
+def compare_with_baseline(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Bandingkan hasil dengan baseline, return daftar pesan regresi"""
+    regressions = []
+    base_scenarios = baseline.get("scenarios", {})
+    for name, current in results["scenarios"].items():
+        base = base_scenarios.get(name)
+        if not base:
+            continue
+        for metric, higher_is_worse in REGRESSION_METRICS.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if higher_is_worse:
+                # Query count deterministik: toleransi minimal 1 query agar tidak false positive
+                limit = old * (1 + max_regression)
+                if metric == "queries_per_request":
+                    limit = max(limit, old + 1)
+                if new > limit:
+                    regressions.append(f"{name}: {metric} {old} -> {new} (batas {limit:.2f})")
+            elif new < old * (1 - max_regression):
+                regressions.append(f"{name}: {metric} {old} -> {new} (batas {old * (1 - max_regression):.2f})")
+    base_rss, new_rss = baseline.get("peak_rss_mb"), results.get("peak_rss_mb")
+    if base_rss and new_rss and new_rss > base_rss * (1 + max_regression):
+        regressions.append(f"peak_rss_mb {base_rss} -> {new_rss}")
+    return regressions
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    engine_kwargs = {}
+    if args.database_url.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False, "timeout": 30}
+    engine = create_engine(args.database_url, **engine_kwargs)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter["count"] += 1
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    ctx = BenchmarkContext(session_factory, args.project_code)
+    end_date = args.end_date or date.today()
+    start_date = end_date - timedelta(days=args.range_days)
+    scenarios = build_scenarios(ctx, start_date, end_date)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s["name"] in wanted]
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "database": engine.url.render_as_string(hide_password=True),
+        "project_code": ctx.project_code,
+        "concurrency": args.concurrency,
+        "scenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=600) as client:
+        login = await client.post(f"{API_PREFIX}/auth/login", json={"email": ctx.email, "password": DEFAULT_PASSWORD})
+        if login.status_code != 200:
+            raise RuntimeError(f"Login gagal ({login.status_code}): {login.text[:200]}")
+        ctx.token = login.json()["data"]["token"]
+
+        for scenario in scenarios:
+            requests = min(args.requests, args.heavy_requests) if scenario.get("heavy") else args.requests
+            if args.warmup:
+                await run_scenario(client, ctx, scenario, min(args.warmup, requests), 1)
+            result = await run_scenario(client, ctx, scenario, requests, args.concurrency)
+            results["scenarios"][scenario["name"]] = result
+            print(
+                f"{scenario['name']:<24} p50={result['p50_ms']:>9.1f}ms p95={result['p95_ms']:>9.1f}ms "
+                f"p99={result['p99_ms']:>9.1f}ms {result['throughput_rps']:>8.1f} req/s "
+                f"q/req={result['queries_per_request']:>7.1f} err={result['errors']}"
+            )
+
+    app.dependency_overrides.pop(get_db, None)
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark API dengan regression threshold")
+    parser.add_argument("--database-url", required=True, help="Database yang sudah di-seed (SQLAlchemy URL)")
+    parser.add_argument("--project-code", default=None, help="Project yang dipakai (default: project pertama)")
+    parser.add_argument("--requests", type=int, default=50, help="Jumlah request per skenario")
+    parser.add_argument("--heavy-requests", type=int, default=5, help="Jumlah request untuk skenario berat")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="Request warmup per skenario (tidak dihitung)")
+    parser.add_argument("--scenarios", default=None, help="Comma-separated nama skenario (default: semua)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Akhir range filter tanggal (YYYY-MM-DD)")
+    parser.add_argument("--range-days", type=int, default=30, help="Panjang range filter tanggal")
+    parser.add_argument("--output", default="benchmark_result.json", help="File JSON hasil")
+    parser.add_argument("--baseline", default=None, help="File JSON baseline untuk cek regresi")
+    parser.add_argument("--save-baseline", default=None, help="Simpan hasil sebagai baseline baru")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan log aplikasi selama benchmark")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Toleransi regresi (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Log aplikasi tidak perlu selama benchmark (error tetap terhitung di status_codes)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    results = asyncio.run(run_benchmark(args))
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\n[INFO] Hasil benchmark disimpan ke {args.output} (peak RSS {results['peak_rss_mb']} MB)")
+
+    failures = scenario_failures(results)
+    if failures:
+        print(f"\n[FAILED] {len(failures)} skenario mendapat response error (baseline tidak disimpan):")
+        for message in failures:
+            print(f"   - {message}")
+        return 1
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+        print(f"[INFO] Baseline disimpan ke {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_with_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n[FAILED] {len(regressions)} regresi dibanding baseline {args.baseline}:")
+            for message in regressions:
+                print(f"   - {message}")
+            return 1
+        print(f"[SUCCESS] Tidak ada regresi dibanding baseline {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -168,18 +168,20 @@ def export_with_pymysql(
                 
                 if row_count > 0:
                     f.write(f"-- Dumping data for table `{table}`\n")
-                    cursor.execute(f"SELECT * FROM `{table}`")
+                    # Server-side cursor (unbuffered): row di-stream dari server per batch,
+                    # tidak dimuat seluruhnya ke memory dan query hanya dijalankan sekali
+                    data_cursor = conn.cursor(pymysql.cursors.SSCursor)
+                    data_cursor.execute(f"SELECT * FROM `{table}`")
                     
                     # Get column names
-                    columns = [desc[0] for desc in cursor.description]
+                    columns = [desc[0] for desc in data_cursor.description]
                     
                     # Fetch data in batches
                     batch_size = 1000
-                    cursor.execute(f"SELECT * FROM `{table}`")
                     
                     first_row = True
                     while True:
-                        rows = cursor.fetchmany(batch_size)
+                        rows = data_cursor.fetchmany(batch_size)
                         if not rows:
                             break
                         
@@ -205,6 +207,7 @@ def export_with_pymysql(
                             
                             f.write(f"({', '.join(values)})")
                     
+                    data_cursor.close()
                     f.write(";\n\n")
                     print(f"      [OK] {row_count} rows exported")
                 else:
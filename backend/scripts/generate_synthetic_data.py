@@ -0,0 +1,610 @@
+"""
+Script untuk generate dataset sintetis (multi-project) untuk load test dan scale test.
+
+Data yang di-generate per project:
+- Project, user dengan hierarki created_by (admin -> gudang -> mandor), user_projects
+- Materials, mandors
+- Stock in, stock out (nomor JRGS-KDL-YYYYMMDD-XXXX), installed, returns (sebagian sudah di-release)
+- Surat permintaan + items, surat jalan + items
+- Audit logs (opsional, --with-audit-logs)
+
+Data di-generate secara deterministik dari --seed (tanggal default juga fixed) dan di-insert
+dengan Core executemany per batch, dengan ID dialokasikan di client agar tidak perlu
+round trip untuk mengambil ID hasil insert.
+
+Jalankan dengan:
+    python -m scripts.generate_synthetic_data --database-url sqlite:///./synthetic.db --create-tables
+    python -m scripts.generate_synthetic_data --projects 5 --days 365 --stock-out-per-day 300
+
+Tanpa --database-url, script memakai database dari konfigurasi aplikasi (.env).
+HATI-HATI: jangan jalankan ke database production.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Tambahkan root directory ke path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import bcrypt
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.engine import Engine
+
+from app.models.base import Base
+import app.models  # noqa: F401 - register semua model ke metadata
+from app.models.user.user import User, UserRole
+from app.models.project import Project, UserProject
+from app.models.inventory import (
+    Material,
+    Mandor,
+    StockIn,
+    StockOut,
+    Installed,
+    Return,
+    AuditLog,
+    SuratPermintaan,
+    SuratPermintaanItem,
+    SuratJalan,
+    SuratJalanItem,
+)
+from app.models.inventory.audit_log import ActionType
+from app.services.inventory.material_service import VALID_KATEGORIS
+from app.utils.user_hierarchy import rebuild_user_closure
+
+DEFAULT_PASSWORD = "password123"
+
+MATERIAL_BASE_NAMES = [
+    "Pipa PE", "Elbow PE", "Tee PE", "Coupler", "Reducer", "Ball Valve", "Regulator",
+    "Meter Gas", "Selang Kompor", "Klem Pipa", "Tapping Saddle", "End Cap",
+    "Transition Fitting", "Stop Kran", "Sealtape", "Bracket", "Flexible Hose",
+]
+MATERIAL_SIZES = ["20mm", "32mm", "63mm", "90mm", "125mm", "1/2\"", "3/4\"", "1\""]
+MATERIAL_VARIANTS = ["SDR 11", "SDR 17", "PN 10", "PN 16", "Standard", "Heavy Duty"]
+SATUANS = ["pcs", "m", "unit", "roll", "set", "btg"]
+
+FIRST_NAMES = [
+    "Agus", "Budi", "Dedi", "Eko", "Fajar", "Hadi", "Iwan", "Joko", "Rudi", "Slamet",
+    "Teguh", "Wahyu", "Yusuf", "Bambang", "Heri", "Sugeng", "Andi", "Rizki", "Dimas", "Arif",
+]
+LAST_NAMES = [
+    "Santoso", "Wibowo", "Saputra", "Pratama", "Hidayat", "Nugroho", "Setiawan",
+    "Kurniawan", "Purnomo", "Susanto", "Gunawan", "Firmansyah",
+]
+KOTA = ["Batang", "Kendal", "Pekalongan", "Weleri", "Kaliwungu", "Subah", "Gringsing"]
+
+# Urutan flush: parent dulu agar aman untuk database dengan foreign key aktif
+TABLE_ORDER = [
+    Project.__table__,
+    User.__table__,
+    UserProject.__table__,
+    Material.__table__,
+    Mandor.__table__,
+    StockIn.__table__,
+    StockOut.__table__,
+    Installed.__table__,
+    Return.__table__,
+    SuratPermintaan.__table__,
+    SuratPermintaanItem.__table__,
+    SuratJalan.__table__,
+    SuratJalanItem.__table__,
+    AuditLog.__table__,
+]
+
+
+@dataclass
+class SeedConfig:
+    seed: int = 42
+    projects: int = 3
+    users_per_project: int = 12
+    materials_per_project: int = 300
+    mandors_per_project: int = 40
+    start_date: date = date(2025, 1, 1)
+    days: int = 180
+    stock_in_per_day: int = 40
+    stock_out_per_day: int = 60
+    install_ratio: float = 0.8
+    return_ratio: float = 0.1
+    release_ratio: float = 0.3
+    surat_permintaan_per_day: int = 5
+    surat_jalan_per_day: int = 3
+    max_items_per_document: int = 8
+    with_audit_logs: bool = False
+    batch_size: int = 5000
+
+
+class SyntheticDataGenerator:
+    """Generator dataset sintetis dengan alokasi ID di client dan insert per batch"""
+
+    def __init__(self, engine: Engine, config: SeedConfig):
+        self.engine = engine
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.password_hash = bcrypt.hashpw(DEFAULT_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        self.buffers: Dict[str, List[dict]] = {table.name: [] for table in TABLE_ORDER}
+        self.next_ids: Dict[str, int] = {}
+        self.row_counts: Dict[str, int] = {table.name: 0 for table in TABLE_ORDER}
+        # Nomor urut JRGS-KDL global per tanggal (sama seperti StockOutRepository.get_next_number_for_date)
+        self.stock_out_counters: Dict[str, int] = {}
+        # Nomor urut surat permintaan / surat jalan per project (tidak reset per hari)
+        self.sp_counters: Dict[int, int] = {}
+        self.sj_counters: Dict[int, int] = {}
+        self.conn = None
+
+    # ---------- infrastruktur ----------
+
+    def _init_state(self) -> None:
+        for table in TABLE_ORDER:
+            max_id = self.conn.execute(select(func.max(table.c.id))).scalar()
+            self.next_ids[table.name] = (max_id or 0) + 1
+
+        end_date = self.config.start_date + timedelta(days=self.config.days + 30)
+        existing = self.conn.execute(
+            select(StockOut.__table__.c.nomor_barang_keluar).where(
+                StockOut.__table__.c.tanggal_keluar.between(self.config.start_date, end_date)
+            )
+        )
+        for (nomor,) in existing:
+            prefix, _, num = nomor.rpartition("-")
+            if num.isdigit():
+                self.stock_out_counters[prefix] = max(self.stock_out_counters.get(prefix, 0), int(num))
+
+    def _next_id(self, table_name: str) -> int:
+        value = self.next_ids[table_name]
+        self.next_ids[table_name] = value + 1
+        return value
+
+    def _add(self, table_name: str, row: dict) -> int:
+        row_id = self._next_id(table_name)
+        row["id"] = row_id
+        self.buffers[table_name].append(row)
+        if len(self.buffers[table_name]) >= self.config.batch_size:
+            self.flush()
+        return row_id
+
+    def flush(self) -> None:
+        """Insert semua buffer (urut parent -> child) lalu commit"""
+        for table in TABLE_ORDER:
+            rows = self.buffers[table.name]
+            if rows:
+                self.conn.execute(table.insert(), rows)
+                self.row_counts[table.name] += len(rows)
+                self.buffers[table.name] = []
+        self.conn.commit()
+
+    def _timestamp(self, day: date) -> datetime:
+        return datetime(day.year, day.month, day.day, self.rng.randint(7, 17), self.rng.randint(0, 59))
+
+    def _qty(self, low: float, high: float) -> Decimal:
+        return Decimal(str(round(self.rng.uniform(low, high), 1)))
+
+    def _next_stock_out_number(self, day: date) -> str:
+        prefix = f"JRGS-KDL-{day.strftime('%Y%m%d')}"
+        num = self.stock_out_counters.get(prefix, 0) + 1
+        self.stock_out_counters[prefix] = num
+        return f"{prefix}-{num:04d}"
+
+    # ---------- master data ----------
+
+    def _create_project(self, index: int) -> dict:
+        code = f"SYN{self.config.seed % 1000:03d}{index:02d}"
+        exists = self.conn.execute(
+            select(Project.__table__.c.id).where(Project.__table__.c.code == code)
+        ).first()
+        if exists:
+            raise RuntimeError(
+                f"Project dengan code {code} sudah ada. Gunakan --seed lain atau database baru."
+            )
+        created_at = self._timestamp(self.config.start_date)
+        project_id = self._add("projects", {
+            "name": f"Proyek Sintetis {index} ({self.rng.choice(KOTA)})",
+            "code": code,
+            "description": f"Dataset sintetis seed={self.config.seed}",
+            "is_active": True,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+        return {"id": project_id, "code": code}
+
+    def _create_users(self, project: dict) -> List[int]:
+        """
+        Buat hierarki user: 1 admin (owner project) -> beberapa gudang -> sisanya mandor.
+        Mengembalikan list ID user yang membuat transaksi (admin + gudang).
+        """
+        created_at = self._timestamp(self.config.start_date)
+        code = project["code"].lower()
+        total = max(self.config.users_per_project, 1)
+        gudang_count = max(1, total // 4) if total > 1 else 0
+
+        def add_user(n: int, role: UserRole, parent_id: Optional[int], is_owner: bool) -> int:
+            user_id = self._add("users", {
+                "email": f"{code}.user{n}@synthetic.jargas.id",
+                "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "password_hash": self.password_hash,
+                "role": role,
+                "is_active": True,
+                "is_superuser": False,
+                "created_by": parent_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            self._add("user_projects", {
+                "user_id": user_id,
+                "project_id": project["id"],
+                "is_active": True,
+                "is_owner": is_owner,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            return user_id
+
+        admin_id = add_user(1, UserRole.ADMIN, None, True)
+        gudang_ids = [add_user(n, UserRole.GUDANG, admin_id, False) for n in range(2, 2 + gudang_count)]
+        for n in range(2 + gudang_count, total + 1):
+            add_user(n, UserRole.MANDOR, self.rng.choice(gudang_ids or [admin_id]), False)
+        return [admin_id] + gudang_ids
+
+    def _create_materials(self, project: dict) -> List[dict]:
+        created_at = self._timestamp(self.config.start_date)
+        materials = []
+        for n in range(1, self.config.materials_per_project + 1):
+            nama = (
+                f"{self.rng.choice(MATERIAL_BASE_NAMES)} {self.rng.choice(MATERIAL_SIZES)} "
+                f"{self.rng.choice(MATERIAL_VARIANTS)}"
+            )
+            row = {
+                "kode_barang": f"MAT-{n:05d}",
+                "nama_barang": nama,
+                "satuan": self.rng.choice(SATUANS),
+                "kategori": self.rng.choice(VALID_KATEGORIS),
+                "harga": Decimal(str(self.rng.randint(5, 5000) * 1000)),
+                "is_active": 1 if self.rng.random() > 0.03 else 0,
+                "project_id": project["id"],
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            row_id = self._add("materials", row)
+            materials.append({"id": row_id, **row})
+        return [m for m in materials if m["is_active"] == 1]
+
+    def _create_mandors(self, project: dict) -> List[int]:
+        created_at = self._timestamp(self.config.start_date)
+        mandor_ids = []
+        for _ in range(self.config.mandors_per_project):
+            mandor_ids.append(self._add("mandors", {
+                "nama": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "nomor_kontak": f"08{self.rng.randint(100000000, 999999999)}",
+                "alamat": f"Jl. {self.rng.choice(LAST_NAMES)} No. {self.rng.randint(1, 200)}, {self.rng.choice(KOTA)}",
+                "is_active": 1,
+                "project_id": project["id"],
+                "created_at": created_at,
+                "updated_at": created_at,
+            }))
+        return mandor_ids
+
+    # ---------- transaksi ----------
+
+    def _audit(self, user_id: int, table_name: str, record_id: int, project_id: int, created_at: datetime) -> None:
+        if not self.config.with_audit_logs:
+            return
+        self._add("audit_logs", {
+            "user_id": user_id,
+            "action": ActionType.CREATE,
+            "table_name": table_name,
+            "record_id": record_id,
+            "description": f"Create {table_name} (synthetic)",
+            "ip_address": "127.0.0.1",
+            "project_id": project_id,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+    def _generate_day(self, project: dict, day: date, creators: List[int],
+                      materials: List[dict], mandor_ids: List[int]) -> None:
+        cfg = self.config
+        last_day = cfg.start_date + timedelta(days=cfg.days - 1)
+
+        # Stock in: dikelompokkan per invoice (1-5 item per invoice)
+        remaining = cfg.stock_in_per_day
+        invoice_seq = 0
+        while remaining > 0:
+            invoice_seq += 1
+            nomor_invoice = f"INV/{project['code']}/{day.strftime('%Y%m%d')}/{invoice_seq:03d}"
+            for _ in range(min(remaining, self.rng.randint(1, 5))):
+                remaining -= 1
+                created_at = self._timestamp(day)
+                user_id = self.rng.choice(creators)
+                stock_in_id = self._add("stock_ins", {
+                    "nomor_invoice": nomor_invoice,
+                    "material_id": self.rng.choice(materials)["id"],
+                    "quantity": self._qty(50, 500),
+                    "tanggal_masuk": day,
+                    "evidence_paths": "[]",
+                    "project_id": project["id"],
+                    "created_by": user_id,
+                    "is_deleted": 0,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+                self._audit(user_id, "stock_ins", stock_in_id, project["id"], created_at)
+
+        # Stock out + installed + return
+        for _ in range(cfg.stock_out_per_day):
+            created_at = self._timestamp(day)
+            user_id = self.rng.choice(creators)
+            mandor_id = self.rng.choice(mandor_ids)
+            material_id = self.rng.choice(materials)["id"]
+            quantity = self._qty(1, 50)
+            stock_out_id = self._add("stock_outs", {
+                "nomor_barang_keluar": self._next_stock_out_number(day),
+                "mandor_id": mandor_id,
+                "material_id": material_id,
+                "quantity": quantity,
+                "tanggal_keluar": day,
+                "evidence_paths": "[]",
+                "project_id": project["id"],
+                "created_by": user_id,
+                "is_deleted": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            self._audit(user_id, "stock_outs", stock_out_id, project["id"], created_at)
+
+            installed_qty = Decimal("0")
+            if self.rng.random() < cfg.install_ratio:
+                installed_qty = (quantity * Decimal(str(self.rng.uniform(0.5, 1.0)))).quantize(Decimal("0.1"))
+                install_day = min(day + timedelta(days=self.rng.randint(0, 7)), last_day)
+                installed_at = self._timestamp(install_day)
+                self._add("installed", {
+                    "material_id": material_id,
+                    "quantity": installed_qty,
+                    "tanggal_pasang": install_day,
+                    "mandor_id": mandor_id,
+                    "stock_out_id": stock_out_id,
+                    "evidence_paths": "[]",
+                    "no_register": f"REG-{project['code']}-{stock_out_id:08d}",
+                    "created_by": user_id,
+                    "is_deleted": 0,
+                    "created_at": installed_at,
+                    "updated_at": installed_at,
+                })
+
+            sisa = quantity - installed_qty
+            if sisa > 0 and self.rng.random() < cfg.return_ratio:
+                return_day = min(day + timedelta(days=self.rng.randint(1, 14)), last_day)
+                reject = (sisa * Decimal(str(self.rng.uniform(0, 0.3)))).quantize(Decimal("0.1"))
+                baik = sisa - reject
+                returned_at = self._timestamp(return_day)
+                return_row = {
+                    "mandor_id": mandor_id,
+                    "material_id": material_id,
+                    "quantity_kembali": sisa,
+                    "quantity_kondisi_baik": baik,
+                    "quantity_kondisi_reject": reject,
+                    "stock_out_id": stock_out_id,
+                    "tanggal_kembali": return_day,
+                    "evidence_paths": "[]",
+                    "is_released": 0,
+                    "project_id": project["id"],
+                    "created_by": user_id,
+                    "is_deleted": 0,
+                    "created_at": returned_at,
+                    "updated_at": returned_at,
+                }
+                # Return yang di-release membuat stock out baru (seperti release_return_to_stock_out)
+                if baik > 0 and return_day < last_day and self.rng.random() < cfg.release_ratio:
+                    release_day = min(return_day + timedelta(days=self.rng.randint(1, 7)), last_day)
+                    released_at = self._timestamp(release_day)
+                    released_stock_out_id = self._add("stock_outs", {
+                        "nomor_barang_keluar": self._next_stock_out_number(release_day),
+                        "mandor_id": mandor_id,
+                        "material_id": material_id,
+                        "quantity": baik,
+                        "tanggal_keluar": release_day,
+                        "evidence_paths": "[]",
+                        "project_id": project["id"],
+                        "created_by": user_id,
+                        "is_deleted": 0,
+                        "created_at": released_at,
+                        "updated_at": released_at,
+                    })
+                    return_row["stock_out_id"] = released_stock_out_id
+                    return_row["is_released"] = 1
+                self._add("returns", return_row)
+
+        # Surat permintaan + items
+        for _ in range(cfg.surat_permintaan_per_day):
+            self.sp_counters[project["id"]] += 1
+            created_at = self._timestamp(day)
+            surat_id = self._add("surat_permintaans", {
+                "nomor_surat": f"JRGS-{project['code']}-{day.strftime('%Y%m%d')}-{self.sp_counters[project['id']]:04d}",
+                "tanggal": day,
+                "project_id": project["id"],
+                "status": self.rng.choice(["Draft", "Barang Keluar Dibuat", "Selesai"]),
+                "signatures": json.dumps({
+                    "pemohon": self.rng.choice(FIRST_NAMES),
+                    "menyetujui": self.rng.choice(FIRST_NAMES),
+                }),
+                "created_by": self.rng.choice(creators),
+                "is_deleted": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for material in self.rng.sample(materials, min(len(materials), self.rng.randint(1, cfg.max_items_per_document))):
+                self._add("surat_permintaan_items", {
+                    "surat_permintaan_id": surat_id,
+                    "material_id": material["id"],
+                    "kode_barang": material["kode_barang"],
+                    "nama_barang": material["nama_barang"],
+                    "qty": self._qty(1, 100),
+                    "satuan": material["satuan"],
+                    "sumber_barang": json.dumps({"proyek": False, "stok": True, "stokValue": "Gudang"}),
+                    "peruntukan": json.dumps({"proyek": True, "proyekValue": project["code"]}),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+
+        # Surat jalan + items
+        for _ in range(cfg.surat_jalan_per_day):
+            self.sj_counters[project["id"]] += 1
+            created_at = self._timestamp(day)
+            surat_jalan_id = self._add("surat_jalans", {
+                "nomor_form": f"SJ-{project['code']}-{day.strftime('%Y%m%d')}-{self.sj_counters[project['id']]:04d}",
+                "kepada": f"Mandor {self.rng.choice(FIRST_NAMES)}",
+                "tanggal_pengiriman": day,
+                "nama_pemberi": self.rng.choice(FIRST_NAMES),
+                "nama_penerima": self.rng.choice(FIRST_NAMES),
+                "tanggal_diterima": day,
+                "project_id": project["id"],
+                "created_by": self.rng.choice(creators),
+                "is_deleted": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for material in self.rng.sample(materials, min(len(materials), self.rng.randint(1, cfg.max_items_per_document))):
+                self._add("surat_jalan_items", {
+                    "surat_jalan_id": surat_jalan_id,
+                    "nama_barang": material["nama_barang"],
+                    "qty": self._qty(1, 100),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+
+    # ---------- entry point ----------
+
+    def run(self) -> Dict[str, int]:
+        cfg = self.config
+
+        with self.engine.connect() as conn:
+            self.conn = conn
+            if conn.dialect.name == "mysql":
+                # Percepat bulk load: data sintetis sudah konsisten, cek FK/unique per row tidak diperlukan
+                conn.execute(text("SET SESSION foreign_key_checks = 0"))
+                conn.execute(text("SET SESSION unique_checks = 0"))
+            self._init_state()
+
+            for index in range(1, cfg.projects + 1):
+                started = time.time()
+                project = self._create_project(index)
+                creators = self._create_users(project)
+                materials = self._create_materials(project)
+                mandor_ids = self._create_mandors(project)
+                if not materials or not mandor_ids:
+                    raise RuntimeError("materials_per_project dan mandors_per_project harus lebih dari 0")
+                self.sp_counters[project["id"]] = 0
+                self.sj_counters[project["id"]] = 0
+
+                for day_index in range(cfg.days):
+                    day = cfg.start_date + timedelta(days=day_index)
+                    self._generate_day(project, day, creators, materials, mandor_ids)
+                self.flush()
+                print(f"[INFO] Project {project['code']} selesai dalam {time.time() - started:.1f} detik")
+
+            # User di-insert langsung (bukan lewat UserService), jadi closure hierarchy dibangun ulang
+            rebuild_user_closure(conn)
+            conn.commit()
+
+            if conn.dialect.name == "mysql":
+                conn.execute(text("SET SESSION foreign_key_checks = 1"))
+                conn.execute(text("SET SESSION unique_checks = 1"))
+            self.conn = None
+
+        return self.row_counts
+
+
+def _sqlite_pragmas(engine: Engine) -> None:
+    """PRAGMA untuk mempercepat bulk load SQLite"""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+
+def build_engine(database_url: Optional[str]) -> Engine:
+    if not database_url:
+        from app.config.database import engine
+        return engine
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        _sqlite_pragmas(engine)
+    return engine
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Generate dataset sintetis untuk load/scale testing")
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: database dari .env)")
+    parser.add_argument("--create-tables", action="store_true", help="Buat tabel via metadata.create_all (untuk SQLite/DB kosong)")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument("--users-per-project", type=int, default=defaults.users_per_project)
+    parser.add_argument("--materials-per-project", type=int, default=defaults.materials_per_project)
+    parser.add_argument("--mandors-per-project", type=int, default=defaults.mandors_per_project)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=defaults.start_date, help="Format YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--stock-in-per-day", type=int, default=defaults.stock_in_per_day)
+    parser.add_argument("--stock-out-per-day", type=int, default=defaults.stock_out_per_day)
+    parser.add_argument("--install-ratio", type=float, default=defaults.install_ratio)
+    parser.add_argument("--return-ratio", type=float, default=defaults.return_ratio)
+    parser.add_argument("--release-ratio", type=float, default=defaults.release_ratio)
+    parser.add_argument("--surat-permintaan-per-day", type=int, default=defaults.surat_permintaan_per_day)
+    parser.add_argument("--surat-jalan-per-day", type=int, default=defaults.surat_jalan_per_day)
+    parser.add_argument("--max-items-per-document", type=int, default=defaults.max_items_per_document)
+    parser.add_argument("--with-audit-logs", action="store_true", help="Generate audit log untuk setiap stock in/out")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    args = parse_args(argv)
+    config = SeedConfig(
+        seed=args.seed,
+        projects=args.projects,
+        users_per_project=args.users_per_project,
+        materials_per_project=args.materials_per_project,
+        mandors_per_project=args.mandors_per_project,
+        start_date=args.start_date,
+        days=args.days,
+        stock_in_per_day=args.stock_in_per_day,
+        stock_out_per_day=args.stock_out_per_day,
+        install_ratio=args.install_ratio,
+        return_ratio=args.return_ratio,
+        release_ratio=args.release_ratio,
+        surat_permintaan_per_day=args.surat_permintaan_per_day,
+        surat_jalan_per_day=args.surat_jalan_per_day,
+        max_items_per_document=args.max_items_per_document,
+        with_audit_logs=args.with_audit_logs,
+        batch_size=args.batch_size,
+    )
+
+    engine = build_engine(args.database_url)
+    if args.create_tables:
+        Base.metadata.create_all(bind=engine)
+
+    print(f"[INFO] Generate dataset sintetis (seed={config.seed}) ke {engine.url.render_as_string(hide_password=True)}")
+    started = time.time()
+    counts = SyntheticDataGenerator(engine, config).run()
+    elapsed = time.time() - started
+
+    total = sum(counts.values())
+    print("\n[SUCCESS] Dataset sintetis berhasil dibuat:")
+    for table_name, count in counts.items():
+        print(f"   {table_name:<24} {count:>10,}")
+    print(f"   {'TOTAL':<24} {total:>10,} rows dalam {elapsed:.1f} detik ({total / max(elapsed, 0.001):,.0f} rows/detik)")
+    print(f"\nLogin user sintetis: <code>.user1@synthetic.jargas.id / {DEFAULT_PASSWORD}")
+    return counts
+
+
+if __name__ == "__main__":
+    main()
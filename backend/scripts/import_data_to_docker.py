@@ -358,6 +358,10 @@ def main():
     
     if success:
         print(f"\n[SUCCESS] Data berhasil diimport ke database '{database}'")
+        # User dari file SQL tidak lewat UserService, jadi closure hierarchy dibangun ulang
+        from scripts.rebuild_user_closure import rebuild_closure
+        if not rebuild_closure(host, port, user, password, database):
+            print("[WARNING] Jalankan ulang: python -m scripts.rebuild_user_closure")
         print(f"[INFO] Silakan test login dengan data yang sudah diimport")
     else:
         print(f"\n[ERROR] Import gagal!")
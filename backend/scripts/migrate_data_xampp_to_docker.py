@@ -142,6 +142,10 @@ def run_import(
     
     if success:
         print(f"\n[SUCCESS] Import selesai ke database '{database}'")
+        # User hasil import tidak lewat UserService, jadi closure hierarchy dibangun ulang
+        from scripts.rebuild_user_closure import rebuild_closure
+        if not rebuild_closure(docker_host, docker_port, docker_user, docker_password, database):
+            print("[WARNING] Jalankan ulang: python -m scripts.rebuild_user_closure")
         return True
     else:
         print(f"\n[ERROR] Import gagal!")
@@ -0,0 +1,71 @@
+"""
+Script maintenance untuk membangun ulang table user_closure (hierarchy user) dari users.created_by.
+Jalankan setelah user di-insert di luar UserService (import SQL, migrasi data), karena tanpa baris
+closure user tersebut tidak terlihat di filter hierarchy.
+
+Penggunaan:
+    python -m scripts.rebuild_user_closure
+    python -m scripts.rebuild_user_closure --host localhost --port 3308 --user root --database jargas_apbn
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Tambahkan root directory ke path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import URL
+
+from app.config.settings import settings
+from app.models.user.user_closure import UserClosure
+from app.utils.user_hierarchy import rebuild_user_closure
+
+
+def rebuild_closure(
+    host: str = None,
+    port: int = None,
+    user: str = None,
+    password: str = None,
+    database: str = None
+) -> bool:
+    """Bangun ulang user_closure di database target dalam satu transaksi (default: dari settings)"""
+    url = URL.create(
+        "mysql+pymysql",
+        username=user or settings.DB_USER,
+        password=(settings.DB_PASSWORD if password is None else password) or None,
+        host=host or settings.DB_HOST,
+        port=port or settings.DB_PORT,
+        database=database or settings.DB_NAME,
+    )
+    engine = create_engine(url, pool_pre_ping=True)
+    try:
+        with engine.begin() as conn:
+            rebuild_user_closure(conn)
+            count = conn.execute(select(func.count()).select_from(UserClosure)).scalar()
+        print(f"[SUCCESS] user_closure dibangun ulang: {count} baris")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Gagal membangun ulang user_closure: {str(e)}")
+        return False
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bangun ulang table user_closure dari users.created_by')
+    parser.add_argument('--host', type=str, default=None, help='MySQL host (default: dari settings)')
+    parser.add_argument('--port', type=int, default=None, help='MySQL port (default: dari settings)')
+    parser.add_argument('--user', type=str, default=None, help='MySQL user (default: dari settings)')
+    parser.add_argument('--password', type=str, default=None, help='MySQL password (default: dari settings)')
+    parser.add_argument('--database', type=str, default=None, help='Database name (default: dari settings)')
+    args = parser.parse_args()
+
+    if not rebuild_closure(args.host, args.port, args.user, args.password, args.database):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()